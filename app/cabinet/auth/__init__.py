@@ -6,17 +6,28 @@ from .jwt_handler import (
     decode_token,
     get_token_payload,
 )
-from .password_utils import hash_password, verify_password
+from .password_utils import (
+    PasswordHasherBusyError,
+    hash_password,
+    hash_password_async,
+    password_hasher,
+    verify_password,
+    verify_password_async,
+)
 from .telegram_auth import validate_telegram_init_data, validate_telegram_login_widget
 
 
 __all__ = [
+    'PasswordHasherBusyError',
     'create_access_token',
     'create_refresh_token',
     'decode_token',
     'get_token_payload',
     'hash_password',
+    'hash_password_async',
+    'password_hasher',
     'validate_telegram_init_data',
     'validate_telegram_login_widget',
     'verify_password',
+    'verify_password_async',
 ]
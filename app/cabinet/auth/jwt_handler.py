@@ -2,6 +2,7 @@
 
 from datetime import UTC, datetime, timedelta
 from typing import Any
+from uuid import uuid4
 
 import jwt
 
@@ -40,6 +41,8 @@ def create_access_token(
         'type': 'access',
         'exp': expires,
         'iat': datetime.now(UTC),
+        # Уникальный идентификатор токена — ключ кеша принципала кабинета
+        'jti': uuid4().hex,
     }
 
     # Добавляем telegram_id только если он есть
@@ -1,10 +1,33 @@
-"""Password hashing utilities using bcrypt."""
+"""Password hashing utilities using bcrypt.
+
+bcrypt takes 100-300 ms per call at the configured cost, so async handlers
+must use :func:`hash_password_async`/:func:`verify_password_async`, which run
+it in a small dedicated thread pool (bcrypt releases the GIL). The pool has
+a bounded queue: once it is full, :class:`PasswordHasherBusyError` is raised
+immediately instead of piling up requests behind a login burst.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
 
 import bcrypt
 
+from app.config import settings
+
 
 BCRYPT_ROUNDS = 12
 
+T = TypeVar('T')
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing pool and its queue are saturated."""
+
 
 def hash_password(password: str) -> str:
     """
@@ -39,3 +62,89 @@ def verify_password(password: str, password_hash: str) -> bool:
         return bcrypt.checkpw(password_bytes, hash_bytes)
     except (ValueError, TypeError):
         return False
+
+
+class PasswordHasher:
+    """Bounded thread pool for bcrypt with latency metrics."""
+
+    LATENCY_SAMPLES = 512
+
+    def __init__(self, max_workers: int | None = None, max_pending: int | None = None) -> None:
+        self.max_workers = max(1, max_workers or settings.CABINET_PASSWORD_HASH_WORKERS)
+        self.max_pending = max(
+            0, max_pending if max_pending is not None else settings.CABINET_PASSWORD_HASH_MAX_PENDING
+        )
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies_ms: deque[float] = deque(maxlen=self.LATENCY_SAMPLES)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._in_flight >= self.capacity:
+            self._rejected += 1
+            raise PasswordHasherBusyError('Password hashing pool is saturated')
+
+        self._in_flight += 1
+        started_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._latencies_ms.append((time.perf_counter() - started_at) * 1000)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Pool state and latency (queue wait + hashing) of recent calls in ms."""
+        samples = sorted(self._latencies_ms)
+        latency: dict[str, float | None] = {'avg': None, 'p50': None, 'p95': None, 'max': None}
+        if samples:
+            latency = {
+                'avg': round(statistics.fmean(samples), 2),
+                'p50': round(samples[len(samples) // 2], 2),
+                'p95': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                'max': round(samples[-1], 2),
+            }
+
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'in_flight': self._in_flight,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'latency_ms': latency,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the bounded pool. Raises PasswordHasherBusyError when saturated."""
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """Verify a password in the bounded pool. Raises PasswordHasherBusyError when saturated."""
+    return await password_hasher.verify(password, password_hash)
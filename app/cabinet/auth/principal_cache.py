@@ -0,0 +1,246 @@
+"""Short-lived cache of authenticated cabinet principals.
+
+A cabinet page fires many API calls in parallel, and each one used to load the
+user with all eager relations and re-check ``X-Telegram-Init-Data`` with HMAC.
+The principal (identity, status and RBAC level) is cached per
+``(user_id, token jti)`` for a few seconds, and verified initData results are
+memoized by the hash of the raw header.
+
+Entries are dropped when a transaction that changed the user's status/identity
+or role assignments commits in this process (ids are collected on flush and
+applied after commit, see below). Other processes rely on the TTL.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.crud.rbac import UserRoleCRUD
+from app.database.models import AdminRole, User, UserRole
+
+from .telegram_auth import validate_telegram_init_data
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CabinetPrincipal:
+    """Identity of the authenticated cabinet user without the ORM graph."""
+
+    id: int
+    telegram_id: int | None
+    status: str
+    username: str | None
+    email: str | None
+    email_verified: bool
+    role_names: tuple[str, ...] = ()
+    role_level: int = 0
+
+    @property
+    def verified_email(self) -> str | None:
+        return self.email if self.email_verified else None
+
+
+class PrincipalCache:
+    MAX_ENTRIES = 10_000
+
+    def __init__(self, ttl_seconds: float | None = None) -> None:
+        self._ttl = ttl_seconds
+        self._entries: dict[int, dict[str, tuple[float, CabinetPrincipal]]] = {}
+        self._size = 0
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return max(0, settings.CABINET_PRINCIPAL_CACHE_TTL_SECONDS)
+
+    def get(self, user_id: int, token_id: str) -> CabinetPrincipal | None:
+        tokens = self._entries.get(user_id)
+        if not tokens:
+            return None
+
+        cached = tokens.get(token_id)
+        if cached is None:
+            return None
+
+        expires_at, principal = cached
+        if expires_at <= time.monotonic():
+            tokens.pop(token_id, None)
+            self._size -= 1
+            return None
+
+        return principal
+
+    def set(self, principal: CabinetPrincipal, token_id: str) -> None:
+        if self.ttl <= 0:
+            return
+
+        if self._size >= self.MAX_ENTRIES:
+            self._evict_expired()
+            if self._size >= self.MAX_ENTRIES:
+                self.clear()
+
+        tokens = self._entries.setdefault(principal.id, {})
+        if token_id not in tokens:
+            self._size += 1
+        tokens[token_id] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate_user(self, user_id: int | None) -> None:
+        if user_id is None:
+            return
+        tokens = self._entries.pop(user_id, None)
+        if tokens:
+            self._size -= len(tokens)
+            logger.debug('Кеш принципала кабинета сброшен', user_id=user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for user_id in list(self._entries):
+            tokens = self._entries[user_id]
+            for token_id in [token_id for token_id, (expires_at, _) in tokens.items() if expires_at <= now]:
+                tokens.pop(token_id)
+                self._size -= 1
+            if not tokens:
+                self._entries.pop(user_id)
+
+
+class InitDataCache:
+    """Memoizes ``validate_telegram_init_data`` results by the hash of the raw string."""
+
+    TTL_SECONDS = 300
+    MAX_ENTRIES = 10_000
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[float, dict[str, Any] | None]] = {}
+
+    def validate(self, init_data: str, max_age_seconds: int) -> dict[str, Any] | None:
+        key = hashlib.sha256(f'{max_age_seconds}:{init_data}'.encode()).hexdigest()
+        now = time.monotonic()
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        result = validate_telegram_init_data(init_data, max_age_seconds=max_age_seconds)
+
+        if len(self._entries) >= self.MAX_ENTRIES:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            if len(self._entries) >= self.MAX_ENTRIES:
+                self._entries.clear()
+        self._entries[key] = (now + self.TTL_SECONDS, result)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+init_data_cache = InitDataCache()
+
+
+def get_token_cache_id(token: str, payload: dict[str, Any]) -> str:
+    """Token identifier for the cache key; tokens issued before ``jti`` fall back to a digest."""
+    jti = payload.get('jti')
+    if jti:
+        return str(jti)
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> CabinetPrincipal | None:
+    """Load the principal with a narrow column select instead of the full user graph."""
+    result = await db.execute(
+        select(
+            User.id,
+            User.telegram_id,
+            User.status,
+            User.username,
+            User.email,
+            User.email_verified,
+        ).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    _permissions, role_names, role_level = await UserRoleCRUD.get_user_permissions(db, user_id)
+
+    return CabinetPrincipal(
+        id=row.id,
+        telegram_id=row.telegram_id,
+        status=row.status,
+        username=row.username,
+        email=row.email,
+        email_verified=bool(row.email_verified),
+        role_names=tuple(role_names),
+        role_level=role_level,
+    )
+
+
+# ---- Invalidation ---------------------------------------------------------
+
+_PENDING_KEY = 'cabinet_principal_invalidations'
+_CLEAR_ALL = 'all'
+_PRINCIPAL_ATTRIBUTES = ('status', 'telegram_id', 'username', 'email', 'email_verified')
+
+
+def _principal_changed(user: User) -> bool:
+    attrs = inspect(user).attrs
+    return any(attrs[name].history.has_changes() for name in _PRINCIPAL_ATTRIBUTES)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_invalidations(session: Session, flush_context: Any) -> None:
+    # Списки new/dirty/deleted и история атрибутов здесь ещё в состоянии до flush
+    pending: set[int | str] = set()
+    for instance in session.deleted:
+        if isinstance(instance, User):
+            pending.add(instance.id)
+        elif isinstance(instance, UserRole):
+            pending.add(instance.user_id)
+        elif isinstance(instance, AdminRole):
+            pending.add(_CLEAR_ALL)
+    for instance in session.new:
+        if isinstance(instance, UserRole):
+            pending.add(instance.user_id)
+    for instance in session.dirty:
+        if isinstance(instance, User) and _principal_changed(instance):
+            pending.add(instance.id)
+        elif isinstance(instance, UserRole) and session.is_modified(instance):
+            pending.add(instance.user_id)
+            pending.update(inspect(instance).attrs.user_id.history.deleted)
+        elif isinstance(instance, AdminRole) and session.is_modified(instance):
+            pending.add(_CLEAR_ALL)
+    pending.discard(None)
+    if pending:
+        session.info.setdefault(_PENDING_KEY, set()).update(pending)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_invalidations(session: Session) -> None:
+    # Только после коммита: иначе параллельный запрос успеет закешировать строку до изменения
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if _CLEAR_ALL in pending:
+        principal_cache.clear()
+        return
+    for user_id in pending:
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
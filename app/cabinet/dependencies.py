@@ -7,13 +7,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.database.crud.user import get_user_by_id
-from app.database.database import AsyncSessionLocal
+from app.database.database import AsyncSessionLocal, db_manager
 from app.database.models import User
 from app.services.blacklist_service import blacklist_service
 from app.services.maintenance_service import maintenance_service
 
 from .auth.jwt_handler import get_token_payload
-from .auth.telegram_auth import validate_telegram_init_data
+from .auth.principal_cache import (
+    CabinetPrincipal,
+    get_token_cache_id,
+    init_data_cache,
+    load_principal,
+    principal_cache,
+)
 
 
 logger = structlog.get_logger(__name__)
@@ -30,30 +36,41 @@ async def get_cabinet_db() -> AsyncSession:
             await session.close()
 
 
-async def get_current_cabinet_user(
+async def get_cabinet_read_db() -> AsyncSession:
+    """Get read-only session (replica when its lag is acceptable) for analytics and exports."""
+    async with db_manager.session(read_only=True) as session:
+        yield session
+
+
+async def _resolve_principal(token: str, payload: dict, db: AsyncSession) -> CabinetPrincipal | None:
+    """Return the cached principal for the token, loading it on a miss."""
+    user_id = int(payload.get('sub'))
+    token_id = get_token_cache_id(token, payload)
+
+    principal = principal_cache.get(user_id, token_id)
+    if principal is None:
+        principal = await load_principal(db, user_id)
+        if principal is not None:
+            principal_cache.set(principal, token_id)
+
+    return principal
+
+
+async def get_current_cabinet_principal(
     request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: AsyncSession = Depends(get_cabinet_db),
-) -> User:
+) -> CabinetPrincipal:
     """
-    Get current authenticated cabinet user from JWT token.
+    Authenticate the cabinet request and return the lightweight principal.
 
-    Args:
-        request: FastAPI request object (for reading X-Telegram-Init-Data header)
-        credentials: HTTP Bearer credentials
-        db: Database session
-
-    Returns:
-        Authenticated User object
+    Performs every access check of ``get_current_cabinet_user`` without loading
+    the user with its relations, so endpoints that only need the identity
+    can depend on it directly.
 
     Raises:
         HTTPException: If token is invalid, expired, or user not found
     """
-    # Check maintenance mode first (except for admins - checked later)
-    if maintenance_service.is_maintenance_active():
-        # We need to check token first to see if user is admin
-        pass  # Will check after getting user
-
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,7 +89,7 @@ async def get_current_cabinet_user(
         )
 
     try:
-        user_id = int(payload.get('sub'))
+        principal = await _resolve_principal(token, payload, db)
     except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,15 +97,13 @@ async def get_current_cabinet_user(
             headers={'WWW-Authenticate': 'Bearer'},
         )
 
-    user = await get_user_by_id(db, user_id)
-
-    if not user:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='User not found',
         )
 
-    if user.status != 'active':
+    if principal.status != 'active':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail='User account is not active',
@@ -101,19 +116,19 @@ async def get_current_cabinet_user(
     # This prevents cross-account token reuse when Telegram WebView
     # shares localStorage across accounts on the same device.
     init_data_raw = request.headers.get('X-Telegram-Init-Data')
-    if init_data_raw and user.telegram_id is not None:
+    if init_data_raw and principal.telegram_id is not None:
         # Use generous max_age: Telegram Desktop caches initData
-        tg_user = validate_telegram_init_data(init_data_raw, max_age_seconds=86400 * 30)
+        tg_user = init_data_cache.validate(init_data_raw, max_age_seconds=86400 * 30)
         if tg_user is None:
             logger.warning(
                 'Telegram initData validation failed but header was present',
-                jwt_user_id=user.id,
+                jwt_user_id=principal.id,
             )
-        elif tg_user.get('id') != user.telegram_id:
+        elif tg_user.get('id') != principal.telegram_id:
             logger.warning(
                 'Telegram identity mismatch: JWT belongs to different user than current Telegram account',
-                jwt_user_id=user.id,
-                jwt_telegram_id=user.telegram_id,
+                jwt_user_id=principal.id,
+                jwt_telegram_id=principal.telegram_id,
                 init_data_telegram_id=tg_user.get('id'),
             )
             raise HTTPException(
@@ -123,8 +138,8 @@ async def get_current_cabinet_user(
             )
 
     # Check blacklist
-    if user.telegram_id is not None:
-        is_blacklisted, reason = await blacklist_service.is_user_blacklisted(user.telegram_id, user.username)
+    if principal.telegram_id is not None:
+        is_blacklisted, reason = await blacklist_service.is_user_blacklisted(principal.telegram_id, principal.username)
         if is_blacklisted:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -137,7 +152,7 @@ async def get_current_cabinet_user(
     # Check maintenance mode (allow admins to pass)
     if maintenance_service.is_maintenance_active():
         # Проверяем админа по telegram_id ИЛИ email
-        is_admin = settings.is_admin(telegram_id=user.telegram_id, email=user.email if user.email_verified else None)
+        is_admin = settings.is_admin(telegram_id=principal.telegram_id, email=principal.verified_email)
         if not is_admin:
             status_info = maintenance_service.get_status_info()
             raise HTTPException(
@@ -152,15 +167,15 @@ async def get_current_cabinet_user(
     # Check required channel subscription - Telegram users only
     if settings.CHANNEL_IS_REQUIRED_SUB:
         # Skip for email-only users (no telegram_id)
-        if user.telegram_id is not None:
+        if principal.telegram_id is not None:
             # Skip admin check
-            is_admin = settings.is_admin(
-                telegram_id=user.telegram_id, email=user.email if user.email_verified else None
-            )
+            is_admin = settings.is_admin(telegram_id=principal.telegram_id, email=principal.verified_email)
             if not is_admin:
                 from app.services.channel_subscription_service import channel_subscription_service
 
-                channels_with_status = await channel_subscription_service.get_channels_with_status(user.telegram_id)
+                channels_with_status = await channel_subscription_service.get_channels_with_status(
+                    principal.telegram_id
+                )
                 is_subscribed = (
                     all(ch['is_subscribed'] for ch in channels_with_status) if channels_with_status else True
                 )
@@ -175,6 +190,38 @@ async def get_current_cabinet_user(
                         },
                     )
 
+    return principal
+
+
+async def get_current_cabinet_user(
+    principal: CabinetPrincipal = Depends(get_current_cabinet_principal),
+    db: AsyncSession = Depends(get_cabinet_db),
+) -> User:
+    """
+    Get current authenticated cabinet user from JWT token.
+
+    Access checks are done by ``get_current_cabinet_principal``; this
+    dependency only loads the full user for handlers that need it.
+
+    Args:
+        principal: Authenticated cabinet principal
+        db: Database session
+
+    Returns:
+        Authenticated User object
+
+    Raises:
+        HTTPException: If token is invalid, expired, or user not found
+    """
+    user = await get_user_by_id(db, principal.id)
+
+    if not user:
+        principal_cache.invalidate_user(principal.id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='User not found',
+        )
+
     return user
 
 
@@ -198,67 +245,55 @@ async def get_optional_cabinet_user(
         return None
 
     try:
-        user_id = int(payload.get('sub'))
+        principal = await _resolve_principal(token, payload, db)
     except (TypeError, ValueError):
         return None
 
-    user = await get_user_by_id(db, user_id)
-
-    if not user or user.status != 'active':
+    if not principal or principal.status != 'active':
         return None
 
-    # Cross-validate Telegram identity (same as get_current_cabinet_user)
+    # Cross-validate Telegram identity (same as get_current_cabinet_principal)
     init_data_raw = request.headers.get('X-Telegram-Init-Data')
-    if init_data_raw and user.telegram_id is not None:
-        tg_user = validate_telegram_init_data(init_data_raw, max_age_seconds=86400 * 30)
-        if tg_user and tg_user.get('id') != user.telegram_id:
+    if init_data_raw and principal.telegram_id is not None:
+        tg_user = init_data_cache.validate(init_data_raw, max_age_seconds=86400 * 30)
+        if tg_user and tg_user.get('id') != principal.telegram_id:
             logger.warning(
                 'Telegram identity mismatch in optional auth',
-                jwt_user_id=user.id,
-                jwt_telegram_id=user.telegram_id,
+                jwt_user_id=principal.id,
+                jwt_telegram_id=principal.telegram_id,
                 init_data_telegram_id=tg_user.get('id'),
             )
             return None
 
-    return user
+    return await get_user_by_id(db, principal.id)
 
 
 async def get_current_admin_user(
-    request: Request,
-    user: User = Depends(get_current_cabinet_user),
-    db: AsyncSession = Depends(get_cabinet_db),
-) -> User:
+    principal: CabinetPrincipal = Depends(get_current_cabinet_principal),
+) -> CabinetPrincipal:
     """
-    Get current authenticated admin user.
+    Get current authenticated admin.
 
     Checks if the user is admin by legacy config (ADMIN_IDS / ADMIN_EMAILS)
-    **or** by RBAC role assignment (any role with level > 0).
+    **or** by RBAC role assignment (any role with level > 0). Works on the
+    cached principal, so the full user is not loaded.
 
     Args:
-        request: FastAPI request object
-        user: Authenticated User object
-        db: Database session
+        principal: Authenticated cabinet principal carrying the RBAC role level
 
     Returns:
-        Authenticated admin User object
+        Authenticated admin principal
 
     Raises:
         HTTPException: If user is not an admin by either mechanism
     """
     # Legacy check: config-based admin list
-    is_legacy_admin = settings.is_admin(
-        telegram_id=user.telegram_id,
-        email=user.email if user.email_verified else None,
-    )
-    if is_legacy_admin:
-        return user
+    if settings.is_admin(telegram_id=principal.telegram_id, email=principal.verified_email):
+        return principal
 
     # RBAC check: user has any active role with level > 0
-    from app.database.crud.rbac import UserRoleCRUD
-
-    _permissions, _role_names, max_level = await UserRoleCRUD.get_user_permissions(db, user.id)
-    if max_level > 0:
-        return user
+    if principal.role_level > 0:
+        return principal
 
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -275,18 +310,18 @@ def require_permission(*permissions: str):
         @router.get("/users", dependencies=[Depends(require_permission("users:read"))])
         async def list_users(...): ...
 
-        # Or inject the user:
+        # Or inject the admin principal:
         @router.get("/users")
-        async def list_users(user: User = Depends(require_permission("users:read"))): ...
+        async def list_users(admin: CabinetPrincipal = Depends(require_permission("users:read"))): ...
     """
     if not permissions:
         raise ValueError('require_permission() requires at least one permission argument')
 
     async def dependency(
         request: Request,
-        user: User = Depends(get_current_cabinet_user),
+        principal: CabinetPrincipal = Depends(get_current_cabinet_principal),
         db: AsyncSession = Depends(get_cabinet_db),
-    ) -> User:
+    ) -> CabinetPrincipal:
         from app.services.permission_service import PermissionService
 
         ip_address = (
@@ -306,14 +341,14 @@ def require_permission(*permissions: str):
         for perm in permissions:
             allowed, reason = await PermissionService.check_permission(
                 db,
-                user,
+                principal,
                 perm,
                 ip_address=ip_address,
             )
             if not allowed:
                 await PermissionService.log_action(
                     db,
-                    user_id=user.id,
+                    user_id=principal.id,
                     action=perm,
                     resource_type=resource_type,
                     status='denied',
@@ -350,7 +385,7 @@ def require_permission(*permissions: str):
         # Log successful access with all requested permissions
         await PermissionService.log_action(
             db,
-            user_id=user.id,
+            user_id=principal.id,
             action=','.join(permissions),
             resource_type=resource_type,
             status='success',
@@ -361,6 +396,6 @@ def require_permission(*permissions: str):
             details=details,
         )
         await db.commit()
-        return user
+        return principal
 
     return dependency
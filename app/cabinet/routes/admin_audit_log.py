@@ -2,20 +2,27 @@
 
 from __future__ import annotations
 
-import csv
-import io
-from datetime import UTC, datetime
+from datetime import datetime
 from typing import Any
 
 import structlog
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.crud.rbac import AuditLogCRUD
-from app.database.models import User
-
+from app.database.models import AdminAuditLog
+from app.utils.streaming_export import (
+    EXPORT_ID_PATTERN,
+    ExportColumn,
+    ExportFormat,
+    column,
+    export_response,
+    iter_keyset_rows,
+)
+
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 
 
@@ -55,64 +62,30 @@ class AuditLogListResponse(BaseModel):
     offset: int
 
 
-# ============ CSV Export ============
-
-_CSV_COLUMNS = [
-    'id',
-    'user_id',
-    'action',
-    'resource_type',
-    'resource_id',
-    'status',
-    'ip_address',
-    'request_method',
-    'request_path',
-    'created_at',
-    'user_agent',
-    'details',
+# ============ Export ============
+
+_EXPORT_COLUMNS = [
+    column('id'),
+    column('user_id'),
+    column('action'),
+    column('resource_type'),
+    column('resource_id'),
+    column('status'),
+    column('ip_address'),
+    column('request_method'),
+    column('request_path'),
+    column('created_at'),
+    ExportColumn('user_agent', lambda row: (row.user_agent or '')[:200]),
+    column('details'),
 ]
 
 
-def _sanitize_csv_cell(value: str) -> str:
-    """Prevent CSV formula injection by prefixing dangerous leading characters."""
-    if value and value[0] in ('=', '+', '-', '@', '\t', '\r'):
-        return f"'{value}"
-    return value
-
-
-def _logs_to_csv(logs) -> str:
-    """Serialize audit log entries to CSV string."""
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(_CSV_COLUMNS)
-
-    for log in logs:
-        writer.writerow(
-            [
-                log.id,
-                log.user_id,
-                log.action,
-                log.resource_type or '',
-                log.resource_id or '',
-                log.status,
-                log.ip_address or '',
-                log.request_method or '',
-                _sanitize_csv_cell(log.request_path or ''),
-                log.created_at.isoformat() if log.created_at else '',
-                _sanitize_csv_cell((log.user_agent or '')[:200]),
-                _sanitize_csv_cell(str(log.details) if log.details else ''),
-            ]
-        )
-
-    return output.getvalue()
-
-
 # ============ Routes ============
 
 
 @router.get('', response_model=AuditLogListResponse)
 async def list_audit_logs(
-    admin: User = Depends(require_permission('audit_log:read')),
+    admin: CabinetPrincipal = Depends(require_permission('audit_log:read')),
     db: AsyncSession = Depends(get_cabinet_db),
     user_id: int | None = Query(default=None),
     action: str | None = Query(default=None),
@@ -167,7 +140,7 @@ async def list_audit_logs(
 
 @router.get('/export')
 async def export_audit_logs(
-    admin: User = Depends(require_permission('audit_log:export')),
+    admin: CabinetPrincipal = Depends(require_permission('audit_log:export')),
     db: AsyncSession = Depends(get_cabinet_db),
     user_id: int | None = Query(default=None),
     action: str | None = Query(default=None),
@@ -175,34 +148,51 @@ async def export_audit_logs(
     status: str | None = Query(default=None),
     date_from: datetime | None = Query(default=None),
     date_to: datetime | None = Query(default=None),
-    limit: int = Query(default=10000, ge=1, le=50000),
+    limit: int = Query(default=10000, ge=1, le=1_000_000),
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias='format'),
+    gzip: bool = Query(default=False),
+    export_id: str | None = Query(default=None, pattern=EXPORT_ID_PATTERN),
 ):
-    """Export audit logs as CSV file."""
-    logs, _total = await AuditLogCRUD.get_logs(
-        db,
+    """Export audit logs as a streamed CSV or NDJSON file (newest first)."""
+    filters = AuditLogCRUD.build_filters(
         user_id=user_id,
         action=action,
         resource_type=resource_type,
         status=status,
         date_from=date_from,
         date_to=date_to,
-        limit=limit,
-        offset=0,
     )
-
-    csv_content = _logs_to_csv(logs)
-    timestamp = datetime.now(UTC).strftime('%Y%m%d_%H%M%S')
-    filename = f'audit_log_{timestamp}.csv'
+    total = await db.scalar(select(func.count(AdminAuditLog.id)).where(*filters)) or 0
+
+    stmt = select(
+        AdminAuditLog.id,
+        AdminAuditLog.user_id,
+        AdminAuditLog.action,
+        AdminAuditLog.resource_type,
+        AdminAuditLog.resource_id,
+        AdminAuditLog.status,
+        AdminAuditLog.ip_address,
+        AdminAuditLog.request_method,
+        AdminAuditLog.request_path,
+        AdminAuditLog.created_at,
+        AdminAuditLog.user_agent,
+        AdminAuditLog.details,
+    ).where(*filters)
 
     logger.info(
         'Admin exported audit logs',
         admin_id=admin.id,
-        rows=len(logs),
-        filename=filename,
+        rows=min(total, limit),
+        export_format=export_format,
     )
 
-    return StreamingResponse(
-        iter([csv_content]),
-        media_type='text/csv',
-        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    return export_response(
+        'audit_log',
+        iter_keyset_rows(stmt, AdminAuditLog.id, descending=True, limit=limit),
+        _EXPORT_COLUMNS,
+        export_format=export_format,
+        gzip=gzip,
+        export_id=export_id,
+        owner_id=admin.id,
+        total_rows=min(total, limit),
     )
@@ -6,9 +6,9 @@ import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.config import settings
-from app.database.models import User
 from app.external.ban_system_api import BanSystemAPI, BanSystemAPIError
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import require_permission
 from ..schemas.ban_system import (
     BanAgentHistoryItem,
@@ -103,7 +103,7 @@ async def _api_request(api: BanSystemAPI, method: str, *args, **kwargs) -> Any:
 
 @router.get('/status', response_model=BanSystemStatusResponse)
 async def get_ban_system_status(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanSystemStatusResponse:
     """Get Ban System integration status."""
     return BanSystemStatusResponse(
@@ -117,7 +117,7 @@ async def get_ban_system_status(
 
 @router.get('/stats/raw')
 async def get_stats_raw(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> dict:
     """Get raw stats from Ban System API for debugging."""
     api = _get_ban_api()
@@ -127,7 +127,7 @@ async def get_stats_raw(
 
 @router.get('/stats', response_model=BanSystemStatsResponse)
 async def get_stats(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanSystemStatsResponse:
     """Get overall Ban System statistics."""
     from datetime import datetime
@@ -181,7 +181,7 @@ async def get_users(
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     status: str | None = Query(None, description='Filter: over_limit, with_limit, unlimited'),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanUsersListResponse:
     """Get list of users from Ban System."""
     api = _get_ban_api()
@@ -211,7 +211,7 @@ async def get_users(
 @router.get('/users/over-limit', response_model=BanUsersListResponse)
 async def get_users_over_limit(
     limit: int = Query(50, ge=1, le=100),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanUsersListResponse:
     """Get users who exceeded their device limit."""
     api = _get_ban_api()
@@ -241,7 +241,7 @@ async def get_users_over_limit(
 @router.get('/users/search/{query}')
 async def search_users(
     query: str,
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanUsersListResponse:
     """Search for users."""
     api = _get_ban_api()
@@ -272,7 +272,7 @@ async def search_users(
 @router.get('/users/{email}', response_model=BanUserDetailResponse)
 async def get_user_detail(
     email: str,
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanUserDetailResponse:
     """Get detailed user information."""
     api = _get_ban_api()
@@ -325,7 +325,7 @@ async def get_user_detail(
 
 @router.get('/punishments', response_model=BanPunishmentsListResponse)
 async def get_punishments(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanPunishmentsListResponse:
     """Get list of active punishments (bans)."""
     api = _get_ban_api()
@@ -360,7 +360,7 @@ async def get_punishments(
 @router.post('/punishments/{user_id}/unban', response_model=UnbanResponse)
 async def unban_user(
     user_id: str,
-    admin: User = Depends(require_permission('ban_system:unban')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:unban')),
 ) -> UnbanResponse:
     """Unban (enable) a user."""
     api = _get_ban_api()
@@ -377,7 +377,7 @@ async def unban_user(
 @router.post('/ban', response_model=UnbanResponse)
 async def ban_user(
     request: BanUserRequest,
-    admin: User = Depends(require_permission('ban_system:ban')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:ban')),
 ) -> UnbanResponse:
     """Manually ban a user."""
     api = _get_ban_api()
@@ -401,7 +401,7 @@ async def ban_user(
 async def get_punishment_history(
     query: str,
     limit: int = Query(20, ge=1, le=100),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanHistoryResponse:
     """Get punishment history for a user."""
     api = _get_ban_api()
@@ -438,7 +438,7 @@ async def get_punishment_history(
 
 @router.get('/nodes', response_model=BanNodesListResponse)
 async def get_nodes(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanNodesListResponse:
     """Get list of connected nodes."""
     api = _get_ban_api()
@@ -480,7 +480,7 @@ async def get_agents(
     search: str | None = Query(None),
     health: str | None = Query(None, description='healthy, warning, critical'),
     agent_status: str | None = Query(None, alias='status', description='online, offline'),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanAgentsListResponse:
     """Get list of monitoring agents."""
     api = _get_ban_api()
@@ -579,7 +579,7 @@ async def get_agents(
 
 @router.get('/agents/summary', response_model=BanAgentsSummary)
 async def get_agents_summary(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanAgentsSummary:
     """Get agents summary statistics."""
     api = _get_ban_api()
@@ -603,7 +603,7 @@ async def get_agents_summary(
 @router.get('/traffic/violations', response_model=BanTrafficViolationsResponse)
 async def get_traffic_violations(
     limit: int = Query(50, ge=1, le=100),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanTrafficViolationsResponse:
     """Get list of traffic limit violations."""
     api = _get_ban_api()
@@ -637,7 +637,7 @@ async def get_traffic_violations(
 
 @router.get('/traffic', response_model=BanTrafficResponse)
 async def get_traffic(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanTrafficResponse:
     """Get full traffic statistics including top users."""
     api = _get_ban_api()
@@ -681,7 +681,7 @@ async def get_traffic(
 @router.get('/traffic/top')
 async def get_traffic_top(
     limit: int = Query(20, ge=1, le=100),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> list[BanTrafficTopItem]:
     """Get top users by traffic."""
     api = _get_ban_api()
@@ -744,7 +744,7 @@ def _parse_setting_response(key: str, data: Any, default_type: str = 'str') -> B
 
 @router.get('/settings', response_model=BanSettingsResponse)
 async def get_settings(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanSettingsResponse:
     """Get all Ban System settings."""
     api = _get_ban_api()
@@ -802,7 +802,7 @@ async def get_settings(
 @router.get('/settings/{key}')
 async def get_setting(
     key: str,
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanSettingDefinition:
     """Get a specific setting."""
     api = _get_ban_api()
@@ -815,7 +815,7 @@ async def get_setting(
 async def set_setting(
     key: str,
     value: str = Query(...),
-    admin: User = Depends(require_permission('ban_system:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:edit')),
 ) -> BanSettingDefinition:
     """Set a setting value."""
     api = _get_ban_api()
@@ -829,7 +829,7 @@ async def set_setting(
 @router.post('/settings/{key}/toggle')
 async def toggle_setting(
     key: str,
-    admin: User = Depends(require_permission('ban_system:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:edit')),
 ) -> BanSettingDefinition:
     """Toggle a boolean setting."""
     api = _get_ban_api()
@@ -846,7 +846,7 @@ async def toggle_setting(
 @router.post('/settings/whitelist/add', response_model=UnbanResponse)
 async def whitelist_add(
     request: BanWhitelistRequest,
-    admin: User = Depends(require_permission('ban_system:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:edit')),
 ) -> UnbanResponse:
     """Add user to whitelist."""
     api = _get_ban_api()
@@ -863,7 +863,7 @@ async def whitelist_add(
 @router.post('/settings/whitelist/remove', response_model=UnbanResponse)
 async def whitelist_remove(
     request: BanWhitelistRequest,
-    admin: User = Depends(require_permission('ban_system:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:edit')),
 ) -> UnbanResponse:
     """Remove user from whitelist."""
     api = _get_ban_api()
@@ -883,7 +883,7 @@ async def whitelist_remove(
 @router.get('/report', response_model=BanReportResponse)
 async def get_report(
     hours: int = Query(24, ge=1, le=168),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanReportResponse:
     """Get period report."""
     api = _get_ban_api()
@@ -913,7 +913,7 @@ async def get_report(
 
 @router.get('/health', response_model=BanHealthResponse)
 async def get_health(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanHealthResponse:
     """Get Ban System health status."""
     api = _get_ban_api()
@@ -947,7 +947,7 @@ async def get_health(
 
 @router.get('/health/detailed', response_model=BanHealthDetailedResponse)
 async def get_health_detailed(
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanHealthDetailedResponse:
     """Get detailed health information."""
     api = _get_ban_api()
@@ -967,7 +967,7 @@ async def get_health_detailed(
 async def get_agent_history(
     node_name: str,
     hours: int = Query(24, ge=1, le=168),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanAgentHistoryResponse:
     """Get agent statistics history."""
     api = _get_ban_api()
@@ -1003,7 +1003,7 @@ async def get_agent_history(
 async def get_user_punishment_history(
     email: str,
     limit: int = Query(20, ge=1, le=100),
-    admin: User = Depends(require_permission('ban_system:read')),
+    admin: CabinetPrincipal = Depends(require_permission('ban_system:read')),
 ) -> BanHistoryResponse:
     """Get punishment history for a specific user."""
     api = _get_ban_api()
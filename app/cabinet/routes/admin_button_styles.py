@@ -7,7 +7,6 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.models import User
 from app.utils.button_styles_cache import (
     ALLOWED_STYLE_VALUES,
     BOT_LOCALES,
@@ -17,6 +16,7 @@ from app.utils.button_styles_cache import (
     load_button_styles_cache,
 )
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 
 
@@ -112,7 +112,7 @@ def _build_response(styles: dict[str, dict]) -> ButtonStylesResponse:
 
 @router.get('', response_model=ButtonStylesResponse)
 async def get_button_styles(
-    _admin: User = Depends(require_permission('settings:read')),
+    _admin: CabinetPrincipal = Depends(require_permission('settings:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Return current per-section button styles. Admin only."""
@@ -145,7 +145,7 @@ async def get_button_styles(
 @router.patch('', response_model=ButtonStylesResponse)
 async def update_button_styles(
     payload: ButtonStylesUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Partially update per-section button styles. Admin only."""
@@ -243,7 +243,7 @@ async def update_button_styles(
 
 @router.post('/reset', response_model=ButtonStylesResponse)
 async def reset_button_styles(
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Reset all button styles to defaults. Admin only."""
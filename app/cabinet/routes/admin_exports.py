@@ -0,0 +1,44 @@
+"""Admin routes for tracking streamed exports."""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from pydantic import BaseModel
+
+from app.utils.streaming_export import EXPORT_ID_PATTERN, export_progress
+
+from ..auth.principal_cache import CabinetPrincipal
+from ..dependencies import get_current_admin_user
+
+
+router = APIRouter(prefix='/admin/exports', tags=['Cabinet Admin Exports'])
+
+
+class ExportProgressResponse(BaseModel):
+    """Progress of a streamed export."""
+
+    export_id: str
+    name: str
+    status: str
+    total_rows: int | None = None
+    rows_written: int
+    bytes_written: int
+    started_at: datetime
+    finished_at: datetime | None = None
+    error: str | None = None
+
+
+@router.get('/{export_id}', response_model=ExportProgressResponse)
+async def get_export_progress(
+    export_id: str = Path(..., pattern=EXPORT_ID_PATTERN),
+    admin: CabinetPrincipal = Depends(get_current_admin_user),
+) -> ExportProgressResponse:
+    """Get progress of an export started by the current admin."""
+    progress = export_progress.get(export_id)
+    if progress is None or progress.owner_id != admin.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Export not found',
+        )
+
+    return ExportProgressResponse(**progress.as_dict())
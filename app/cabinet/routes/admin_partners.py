@@ -20,7 +20,8 @@ from app.database.models import (
 from app.services.partner_application_service import partner_application_service
 from app.services.partner_stats_service import PartnerStatsService
 
-from ..dependencies import get_cabinet_db, require_permission
+from ..auth.principal_cache import CabinetPrincipal
+from ..dependencies import get_cabinet_db, get_cabinet_read_db, require_permission
 from ..schemas.partners import (
     AdminApproveRequest,
     AdminPartnerApplicationItem,
@@ -73,7 +74,7 @@ def _build_partner_settings_response() -> PartnerSettingsResponse:
 
 @router.get('/settings', response_model=PartnerSettingsResponse)
 async def get_partner_settings(
-    admin: User = Depends(require_permission('partners:settings')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:settings')),
 ):
     """Get partner system settings."""
     return _build_partner_settings_response()
@@ -82,7 +83,7 @@ async def get_partner_settings(
 @router.patch('/settings', response_model=PartnerSettingsResponse)
 async def update_partner_settings(
     request: PartnerSettingsUpdateRequest,
-    admin: User = Depends(require_permission('partners:settings')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:settings')),
 ):
     """Update partner system settings."""
     from pathlib import Path
@@ -159,7 +160,7 @@ async def list_applications(
     application_status: Literal['pending', 'approved', 'rejected', 'none'] | None = Query(None, alias='status'),
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    admin: User = Depends(require_permission('partners:read')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """List partner applications."""
@@ -206,7 +207,7 @@ async def list_applications(
 async def approve_application(
     application_id: int,
     request: AdminApproveRequest,
-    admin: User = Depends(require_permission('partners:approve')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:approve')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Approve a partner application."""
@@ -260,7 +261,7 @@ async def approve_application(
 async def reject_application(
     application_id: int,
     request: AdminRejectRequest,
-    admin: User = Depends(require_permission('partners:approve')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:approve')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Reject a partner application."""
@@ -311,8 +312,8 @@ async def reject_application(
 
 @router.get('/stats')
 async def get_partner_stats(
-    admin: User = Depends(require_permission('partners:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('partners:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get overall partner statistics."""
     total_partners = await db.execute(
@@ -341,7 +342,7 @@ async def get_partner_stats(
 async def list_partners(
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    admin: User = Depends(require_permission('partners:read')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """List approved partners."""
@@ -405,8 +406,8 @@ async def list_partners(
 @router.get('/{user_id}', response_model=AdminPartnerDetailResponse)
 async def get_partner_detail(
     user_id: int,
-    admin: User = Depends(require_permission('partners:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('partners:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get detailed partner info."""
     user = await db.get(User, user_id)
@@ -468,7 +469,7 @@ async def get_partner_detail(
 async def update_commission(
     user_id: int,
     request: AdminUpdateCommissionRequest,
-    admin: User = Depends(require_permission('partners:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update partner commission percent."""
@@ -503,7 +504,7 @@ async def update_commission(
 @router.post('/{user_id}/revoke')
 async def revoke_partner(
     user_id: int,
-    admin: User = Depends(require_permission('partners:revoke')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:revoke')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Revoke partner status."""
@@ -522,7 +523,7 @@ async def revoke_partner(
 async def assign_campaign(
     user_id: int,
     campaign_id: int,
-    admin: User = Depends(require_permission('partners:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Assign a campaign to a partner."""
@@ -572,7 +573,7 @@ async def assign_campaign(
 async def unassign_campaign(
     user_id: int,
     campaign_id: int,
-    admin: User = Depends(require_permission('partners:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('partners:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Unassign a campaign from a partner."""
@@ -11,8 +11,8 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.crud.rbac import AccessPolicyCRUD, AdminRoleCRUD
-from app.database.models import User
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 
 
@@ -102,7 +102,7 @@ async def _policy_to_response(db: AsyncSession, policy) -> PolicyResponse:
 
 @router.get('', response_model=list[PolicyResponse])
 async def list_policies(
-    admin: User = Depends(require_permission('roles:read')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:read')),
     db: AsyncSession = Depends(get_cabinet_db),
     role_id: int | None = None,
 ):
@@ -114,7 +114,7 @@ async def list_policies(
 @router.post('', response_model=PolicyResponse, status_code=status.HTTP_201_CREATED)
 async def create_policy(
     payload: PolicyCreateRequest,
-    admin: User = Depends(require_permission('roles:create')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:create')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Create a new access policy (ABAC rule)."""
@@ -155,7 +155,7 @@ async def create_policy(
 async def update_policy(
     policy_id: int,
     payload: PolicyUpdateRequest,
-    admin: User = Depends(require_permission('roles:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update an existing access policy."""
@@ -198,7 +198,7 @@ async def update_policy(
 @router.delete('/{policy_id}')
 async def delete_policy(
     policy_id: int,
-    admin: User = Depends(require_permission('roles:delete')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:delete')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Delete an access policy."""
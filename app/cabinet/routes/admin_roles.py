@@ -10,9 +10,9 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.crud.rbac import AdminRoleCRUD, UserRoleCRUD
-from app.database.models import User
 from app.services.permission_service import PERMISSION_REGISTRY, get_all_permissions
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 
 
@@ -128,7 +128,7 @@ async def _role_to_response(db: AsyncSession, role) -> RoleResponse:
     )
 
 
-async def _get_admin_level(db: AsyncSession, admin: User) -> int:
+async def _get_admin_level(db: AsyncSession, admin: CabinetPrincipal) -> int:
     """Get the maximum role level of the current admin.
 
     Legacy config-based admins (ADMIN_IDS) get superadmin level (999+1=1000)
@@ -169,7 +169,7 @@ def _validate_permissions(permissions: list[str]) -> None:
 
 @router.get('/permissions', response_model=list[PermissionSection])
 async def get_permission_registry(
-    admin: User = Depends(require_permission('roles:read')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:read')),
 ):
     """Get all available permissions grouped by section."""
     return [
@@ -180,7 +180,7 @@ async def get_permission_registry(
 @router.get('/roles/{role_id}/users', response_model=list[UserRoleResponse])
 async def list_role_users(
     role_id: int,
-    admin: User = Depends(require_permission('roles:read')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """List user-role assignments for a specific role."""
@@ -223,7 +223,7 @@ async def list_role_users(
 
 @router.get('/roles', response_model=list[RoleResponse])
 async def list_roles(
-    admin: User = Depends(require_permission('roles:read')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:read')),
     db: AsyncSession = Depends(get_cabinet_db),
     include_inactive: bool = False,
 ):
@@ -235,7 +235,7 @@ async def list_roles(
 @router.post('/roles', response_model=RoleResponse, status_code=status.HTTP_201_CREATED)
 async def create_role(
     payload: RoleCreateRequest,
-    admin: User = Depends(require_permission('roles:create')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:create')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Create a new custom admin role."""
@@ -278,7 +278,7 @@ async def create_role(
 async def update_role(
     role_id: int,
     payload: RoleUpdateRequest,
-    admin: User = Depends(require_permission('roles:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update an existing admin role."""
@@ -336,7 +336,7 @@ async def update_role(
 @router.delete('/roles/{role_id}')
 async def delete_role(
     role_id: int,
-    admin: User = Depends(require_permission('roles:delete')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:delete')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Delete a custom admin role. System roles cannot be deleted."""
@@ -376,7 +376,7 @@ async def delete_role(
 @router.post('/assignments', response_model=UserRoleResponse, status_code=status.HTTP_201_CREATED)
 async def assign_role(
     payload: RoleAssignRequest,
-    admin: User = Depends(require_permission('roles:assign')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:assign')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Assign a role to a user. Hierarchy enforcement applies."""
@@ -441,7 +441,7 @@ async def assign_role(
 @router.delete('/assignments/{assignment_id}')
 async def revoke_role(
     assignment_id: int,
-    admin: User = Depends(require_permission('roles:assign')),
+    admin: CabinetPrincipal = Depends(require_permission('roles:assign')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Revoke a role assignment. Cannot remove the last superadmin."""
@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from sqlalchemy import Integer as SAInteger, and_, case, cast, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.crud.stats_rollup import get_daily_activity, get_daily_revenue, sum_activity
 from app.database.crud.transaction import REAL_PAYMENT_METHODS
 from app.database.models import (
     Subscription,
@@ -19,8 +20,17 @@ from app.database.models import (
     TransactionType,
     User,
 )
+from app.utils.streaming_export import (
+    EXPORT_ID_PATTERN,
+    ExportColumn,
+    ExportFormat,
+    column,
+    export_response,
+    iter_keyset_rows,
+)
 
-from ..dependencies import get_cabinet_db, require_permission
+from ..auth.principal_cache import CabinetPrincipal
+from ..dependencies import get_cabinet_read_db, require_permission
 
 
 logger = structlog.get_logger(__name__)
@@ -80,6 +90,11 @@ def _parse_period(
     return datetime(2020, 1, 1, tzinfo=UTC), now
 
 
+def _exclusive_end(period_end: datetime) -> datetime:
+    """Rollup readers take ``[start, end)``; the endpoints here filter ``<= period_end``."""
+    return period_end + timedelta(microseconds=1)
+
+
 # ============ Summary Schemas ============
 
 
@@ -103,26 +118,22 @@ async def get_sales_summary(
     days: int | None = Query(default=30, description='Preset period in days (7, 30, 90, 0=all)'),
     start_date: str | None = Query(default=None, description='Custom start date ISO format'),
     end_date: str | None = Query(default=None, description='Custom end date ISO format'),
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ) -> SalesSummary:
     """Get summary statistics for sales dashboard cards."""
     try:
         period_start, period_end = _parse_period(days, start_date, end_date)
 
         # Total revenue (deposits with real payment methods)
-        revenue_result = await db.execute(
-            select(func.coalesce(func.sum(Transaction.amount_kopeks), 0)).where(
-                and_(
-                    Transaction.type == TransactionType.DEPOSIT.value,
-                    Transaction.is_completed == True,
-                    Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
-                    Transaction.created_at >= period_start,
-                    Transaction.created_at <= period_end,
-                )
-            )
+        deposits = await get_daily_revenue(
+            db,
+            period_start,
+            _exclusive_end(period_end),
+            types=[TransactionType.DEPOSIT.value],
+            payment_methods=REAL_PAYMENT_METHODS,
         )
-        total_revenue = revenue_result.scalar() or 0
+        total_revenue = sum(row.amount_kopeks for row in deposits)
 
         # Consolidated subscription counts: active paid, active trial, new trials in period
         sub_counts_result = await db.execute(
@@ -170,15 +181,7 @@ async def get_sales_summary(
         new_trials = row.new_trials or 0
 
         # Trial-to-paid conversion in period
-        conversions_result = await db.execute(
-            select(func.count(SubscriptionConversion.id)).where(
-                and_(
-                    SubscriptionConversion.converted_at >= period_start,
-                    SubscriptionConversion.converted_at <= period_end,
-                )
-            )
-        )
-        conversions = conversions_result.scalar() or 0
+        conversions = sum_activity(await get_daily_activity(db, period_start, _exclusive_end(period_end))).conversions
         # Cap at 100%: conversions from previous periods can exceed current new_trials
         conversion_rate = min(round((conversions / new_trials * 100), 1), 100.0) if new_trials > 0 else 0.0
 
@@ -272,33 +275,17 @@ async def get_trials_stats(
     days: int | None = Query(default=30),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ) -> TrialsStatsResponse:
     """Get trial registration statistics with provider breakdown."""
     try:
         period_start, period_end = _parse_period(days, start_date, end_date)
 
-        total_result = await db.execute(
-            select(func.count(Subscription.id)).where(
-                and_(
-                    Subscription.is_trial == True,
-                    Subscription.created_at >= period_start,
-                    Subscription.created_at <= period_end,
-                )
-            )
-        )
-        total_trials = total_result.scalar() or 0
-
-        conversions_result = await db.execute(
-            select(func.count(SubscriptionConversion.id)).where(
-                and_(
-                    SubscriptionConversion.converted_at >= period_start,
-                    SubscriptionConversion.converted_at <= period_end,
-                )
-            )
-        )
-        conversions = conversions_result.scalar() or 0
+        daily_activity = await get_daily_activity(db, period_start, _exclusive_end(period_end))
+        activity = sum_activity(daily_activity)
+        total_trials = activity.trials
+        conversions = activity.conversions
         # Cap at 100%: conversions from previous periods can exceed current period trials
         conversion_rate = min(round((conversions / total_trials * 100), 1), 100.0) if total_trials > 0 else 0.0
 
@@ -338,67 +325,12 @@ async def get_trials_stats(
         )
         by_provider = [ProviderBreakdownItem(provider=row.provider, count=row.count) for row in provider_query]
 
-        # Total registrations (all user signups in period)
-        reg_total_result = await db.execute(
-            select(func.count(User.id)).where(
-                and_(
-                    User.created_at >= period_start,
-                    User.created_at <= period_end,
-                )
-            )
-        )
-        total_registrations = reg_total_result.scalar() or 0
+        total_registrations = activity.registrations
 
-        # Daily registrations (user signups per day)
-        daily_reg_query = await db.execute(
-            select(
-                func.date(User.created_at).label('date'),
-                func.count(User.id).label('count'),
-            )
-            .where(
-                and_(
-                    User.created_at >= period_start,
-                    User.created_at <= period_end,
-                )
-            )
-            .group_by(func.date(User.created_at))
-            .order_by(func.date(User.created_at))
-        )
-        reg_by_date: dict[str, int] = {}
-        for row in daily_reg_query:
-            date_str = row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date)
-            reg_by_date[date_str] = row.count
-
-        # Daily trials (trial subscriptions per day)
-        daily_trial_query = await db.execute(
-            select(
-                func.date(Subscription.created_at).label('date'),
-                func.count(Subscription.id).label('count'),
-            )
-            .where(
-                and_(
-                    Subscription.is_trial == True,
-                    Subscription.created_at >= period_start,
-                    Subscription.created_at <= period_end,
-                )
-            )
-            .group_by(func.date(Subscription.created_at))
-            .order_by(func.date(Subscription.created_at))
-        )
-        trial_by_date: dict[str, int] = {}
-        for row in daily_trial_query:
-            date_str = row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date)
-            trial_by_date[date_str] = row.count
-
-        # Merge both series by date union
-        all_dates = sorted(set(reg_by_date.keys()) | set(trial_by_date.keys()))
         daily = [
-            DailyTrialItem(
-                date=d,
-                registrations=reg_by_date.get(d, 0),
-                trials=trial_by_date.get(d, 0),
-            )
-            for d in all_dates
+            DailyTrialItem(date=day.isoformat(), registrations=counts.registrations, trials=counts.trials)
+            for day, counts in daily_activity.items()
+            if counts.registrations or counts.trials
         ]
 
         return TrialsStatsResponse(
@@ -465,8 +397,8 @@ async def get_sales_stats(
     days: int | None = Query(default=30),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ) -> SalesStatsResponse:
     """Get subscription sales statistics."""
     try:
@@ -482,17 +414,17 @@ async def get_sales_stats(
         totals = totals_result.one()
         total_sales = totals.count
 
-        revenue_result = await db.execute(
-            select(func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0)).where(
-                and_(
-                    Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                    Transaction.is_completed == True,
-                    Transaction.created_at >= period_start,
-                    Transaction.created_at <= period_end,
-                )
-            )
-        )
-        total_revenue = revenue_result.scalar() or 0
+        payments_by_day: dict[str, list[int]] = {}
+        for row in await get_daily_revenue(
+            db,
+            period_start,
+            _exclusive_end(period_end),
+            types=[TransactionType.SUBSCRIPTION_PAYMENT.value],
+        ):
+            bucket = payments_by_day.setdefault(row.day.isoformat(), [0, 0])
+            bucket[0] += row.count
+            bucket[1] += row.abs_amount_kopeks
+        total_revenue = sum(revenue for _, revenue in payments_by_day.values())
         avg_order = total_revenue // total_sales if total_sales > 0 else 0
 
         by_tariff_query = await db.execute(
@@ -538,30 +470,9 @@ async def get_sales_stats(
             SalesByPeriodItem(period_days=int(row.period_days or 0), count=row.count) for row in by_period_query
         ]
 
-        daily_query = await db.execute(
-            select(
-                func.date(Transaction.created_at).label('date'),
-                func.count(Transaction.id).label('count'),
-                func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0).label('revenue'),
-            )
-            .where(
-                and_(
-                    Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                    Transaction.is_completed == True,
-                    Transaction.created_at >= period_start,
-                    Transaction.created_at <= period_end,
-                )
-            )
-            .group_by(func.date(Transaction.created_at))
-            .order_by(func.date(Transaction.created_at))
-        )
         daily = [
-            DailySalesItem(
-                date=row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date),
-                count=row.count,
-                revenue_kopeks=row.revenue,
-            )
-            for row in daily_query
+            DailySalesItem(date=day, count=count, revenue_kopeks=revenue)
+            for day, (count, revenue) in payments_by_day.items()
         ]
 
         # Daily sales grouped by tariff
@@ -644,8 +555,8 @@ async def get_renewals_stats(
     days: int | None = Query(default=30),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ) -> RenewalsStatsResponse:
     """Get renewal statistics with period comparison."""
     try:
@@ -859,8 +770,8 @@ async def get_addons_stats(
     days: int | None = Query(default=30),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ) -> AddonsStatsResponse:
     """Get add-on purchase statistics."""
     try:
@@ -1015,85 +926,46 @@ async def get_deposits_stats(
     days: int | None = Query(default=30),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ) -> DepositsStatsResponse:
     """Get deposit statistics with payment method breakdown."""
     try:
         period_start, period_end = _parse_period(days, start_date, end_date)
 
-        base_filter = and_(
-            Transaction.type == TransactionType.DEPOSIT.value,
-            Transaction.is_completed == True,
-            Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
-            Transaction.created_at >= period_start,
-            Transaction.created_at <= period_end,
+        deposits = await get_daily_revenue(
+            db,
+            period_start,
+            _exclusive_end(period_end),
+            types=[TransactionType.DEPOSIT.value],
+            payment_methods=REAL_PAYMENT_METHODS,
         )
 
-        totals_result = await db.execute(
-            select(
-                func.count(Transaction.id).label('count'),
-                func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('amount'),
-            ).where(base_filter)
-        )
-        totals = totals_result.one()
-        total_deposits = totals.count
-        total_amount = totals.amount
+        total_deposits = sum(row.count for row in deposits)
+        total_amount = sum(row.amount_kopeks for row in deposits)
         avg_deposit = total_amount // total_deposits if total_deposits > 0 else 0
 
-        by_method_query = await db.execute(
-            select(
-                Transaction.payment_method.label('method'),
-                func.count(Transaction.id).label('count'),
-                func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('amount'),
+        method_totals: dict[str, list[int]] = {}
+        daily_totals: dict[str, list[int]] = {}
+        daily_by_method = []
+        for row in deposits:
+            # REAL_PAYMENT_METHODS already excludes NULL methods
+            method = row.payment_method or 'unknown'
+            date_str = row.day.isoformat()
+            for bucket in (method_totals.setdefault(method, [0, 0]), daily_totals.setdefault(date_str, [0, 0])):
+                bucket[0] += row.count
+                bucket[1] += row.amount_kopeks
+            daily_by_method.append(
+                DailyDepositByMethodItem(date=date_str, method=method, amount_kopeks=row.amount_kopeks)
             )
-            .where(base_filter)
-            .group_by(Transaction.payment_method)
-            .order_by(func.sum(Transaction.amount_kopeks).desc())
-        )
+
         by_method = [
-            DepositByMethodItem(method=row.method or 'unknown', count=row.count, amount_kopeks=row.amount)
-            for row in by_method_query
+            DepositByMethodItem(method=method, count=count, amount_kopeks=amount)
+            for method, (count, amount) in sorted(method_totals.items(), key=lambda item: item[1][1], reverse=True)
         ]
-
-        daily_query = await db.execute(
-            select(
-                func.date(Transaction.created_at).label('date'),
-                func.count(Transaction.id).label('count'),
-                func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('amount'),
-            )
-            .where(base_filter)
-            .group_by(func.date(Transaction.created_at))
-            .order_by(func.date(Transaction.created_at))
-        )
         daily = [
-            DailyDepositItem(
-                date=row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date),
-                count=row.count,
-                amount_kopeks=row.amount,
-            )
-            for row in daily_query
-        ]
-
-        # Daily deposits grouped by payment method
-        # base_filter already excludes NULLs via .in_(REAL_PAYMENT_METHODS), no coalesce needed
-        daily_by_method_query = await db.execute(
-            select(
-                func.date(Transaction.created_at).label('date'),
-                Transaction.payment_method.label('method'),
-                func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('amount'),
-            )
-            .where(base_filter)
-            .group_by(func.date(Transaction.created_at), Transaction.payment_method)
-            .order_by(func.date(Transaction.created_at), Transaction.payment_method)
-        )
-        daily_by_method = [
-            DailyDepositByMethodItem(
-                date=row.date.isoformat() if hasattr(row.date, 'isoformat') else str(row.date),
-                method=row.method or 'unknown',
-                amount_kopeks=row.amount,
-            )
-            for row in daily_by_method_query
+            DailyDepositItem(date=date_str, count=count, amount_kopeks=amount)
+            for date_str, (count, amount) in daily_totals.items()
         ]
 
         return DepositsStatsResponse(
@@ -1113,3 +985,81 @@ async def get_deposits_stats(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail='Failed to load deposits statistics',
         )
+
+
+# ============ Transactions Export ============
+
+_TRANSACTION_EXPORT_COLUMNS = [
+    column('id'),
+    column('user_id'),
+    column('telegram_id'),
+    column('username'),
+    column('type'),
+    ExportColumn('amount_rubles', lambda row: round((row.amount_kopeks or 0) / 100, 2)),
+    column('payment_method'),
+    column('external_id'),
+    column('is_completed'),
+    column('description'),
+    column('created_at'),
+    column('completed_at'),
+]
+
+
+@router.get('/transactions/export')
+async def export_transactions(
+    days: int | None = Query(default=30),
+    start_date: str | None = Query(default=None),
+    end_date: str | None = Query(default=None),
+    transaction_type: TransactionType | None = Query(default=None, alias='type'),
+    only_completed: bool = Query(default=True),
+    export_format: ExportFormat = Query(default=ExportFormat.CSV, alias='format'),
+    gzip: bool = Query(default=False),
+    export_id: str | None = Query(default=None, pattern=EXPORT_ID_PATTERN),
+    admin: CabinetPrincipal = Depends(require_permission('stats:export')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
+):
+    """Stream transactions for the period as CSV or NDJSON."""
+    period_start, period_end = _parse_period(days, start_date, end_date)
+
+    filters = [
+        Transaction.created_at >= period_start,
+        Transaction.created_at <= period_end,
+    ]
+    if transaction_type is not None:
+        filters.append(Transaction.type == transaction_type.value)
+    if only_completed:
+        filters.append(Transaction.is_completed == True)
+
+    total = await db.scalar(select(func.count(Transaction.id)).where(*filters)) or 0
+
+    stmt = (
+        select(
+            Transaction.id,
+            Transaction.user_id,
+            User.telegram_id,
+            User.username,
+            Transaction.type,
+            Transaction.amount_kopeks,
+            Transaction.payment_method,
+            Transaction.external_id,
+            Transaction.is_completed,
+            Transaction.description,
+            Transaction.created_at,
+            Transaction.completed_at,
+        )
+        .join(User, User.id == Transaction.user_id)
+        .where(*filters)
+    )
+
+    logger.info('Admin exported transactions', admin_id=admin.id, rows=total, export_format=export_format)
+
+    return export_response(
+        'transactions',
+        iter_keyset_rows(stmt, Transaction.id),
+        _TRANSACTION_EXPORT_COLUMNS,
+        export_format=export_format,
+        gzip=gzip,
+        export_id=export_id,
+        owner_id=admin.id,
+        total_rows=total,
+    )
@@ -2,7 +2,7 @@
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import String, func, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.crud.server_squad import (
@@ -13,9 +13,11 @@ from app.database.crud.server_squad import (
     update_server_squad,
     update_server_squad_promo_groups,
 )
-from app.database.models import PromoGroup, ServerSquad, Subscription, Tariff, User
+from app.database.crud.subscription_squads import on_squad
+from app.database.models import PromoGroup, ServerSquad, Subscription, Tariff
 from app.services.subscription_service import SubscriptionService
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 from ..schemas.servers import (
     PromoGroupInfo,
@@ -66,7 +68,7 @@ async def _get_tariffs_using_server(db: AsyncSession, squad_uuid: str) -> list[s
 @router.get('', response_model=ServerListResponse)
 async def list_servers(
     include_unavailable: bool = True,
-    admin: User = Depends(require_permission('servers:read')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get list of all servers."""
@@ -103,7 +105,7 @@ async def list_servers(
 @router.get('/{server_id}', response_model=ServerDetailResponse)
 async def get_server(
     server_id: int,
-    admin: User = Depends(require_permission('servers:read')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get detailed server info."""
@@ -146,7 +148,7 @@ async def get_server(
 async def update_existing_server(
     server_id: int,
     request: ServerUpdateRequest,
-    admin: User = Depends(require_permission('servers:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update an existing server."""
@@ -191,7 +193,7 @@ async def update_existing_server(
 @router.post('/{server_id}/toggle', response_model=ServerToggleResponse)
 async def toggle_server(
     server_id: int,
-    admin: User = Depends(require_permission('servers:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Toggle server availability."""
@@ -218,7 +220,7 @@ async def toggle_server(
 @router.post('/{server_id}/trial', response_model=ServerTrialToggleResponse)
 async def toggle_server_trial(
     server_id: int,
-    admin: User = Depends(require_permission('servers:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Toggle server trial eligibility."""
@@ -245,7 +247,7 @@ async def toggle_server_trial(
 @router.get('/{server_id}/stats', response_model=ServerStatsResponse)
 async def get_server_stats(
     server_id: int,
-    admin: User = Depends(require_permission('servers:read')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get server statistics."""
@@ -259,12 +261,11 @@ async def get_server_stats(
     active_subs = await count_active_users_for_squad(db, server.squad_uuid)
 
     # Count trial subscriptions on this server
-    # Use LIKE query for JSON array since .contains() is DB-specific
     trial_result = await db.execute(
         select(func.count(Subscription.id)).where(
             Subscription.is_trial == True,
             Subscription.status == 'active',
-            func.cast(Subscription.connected_squads, String).like(f'%"{server.squad_uuid}"%'),
+            on_squad(server.squad_uuid),
         )
     )
     trial_count = trial_result.scalar() or 0
@@ -287,7 +288,7 @@ async def get_server_stats(
 
 @router.post('/sync', response_model=ServerSyncResponse)
 async def sync_servers(
-    admin: User = Depends(require_permission('servers:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('servers:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Sync servers with RemnaWave."""
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.aggregates import count_if, sum_if
 from app.database.crud.campaign import get_campaign_statistics, get_campaigns_count, get_campaigns_list
 from app.database.crud.server_squad import get_server_statistics
 from app.database.crud.subscription import get_subscriptions_statistics
@@ -25,14 +26,19 @@ from app.database.models import (
 )
 from app.services.remnawave_service import RemnaWaveService
 from app.services.version_service import version_service
+from app.utils.cache import cache, cache_key
 
-from ..dependencies import get_cabinet_db, require_permission
+from ..auth.principal_cache import CabinetPrincipal
+from ..dependencies import get_cabinet_read_db, require_permission
 
 
 logger = structlog.get_logger(__name__)
 
 _start_time = time.time()
 
+# Дашборд собирается из тяжёлых агрегатов — отдаём один результат всем админам в пределах TTL
+DASHBOARD_CACHE_TTL = 30
+
 router = APIRouter(prefix='/admin/stats', tags=['Cabinet Admin Stats'])
 
 
@@ -246,10 +252,18 @@ class RecentPaymentsResponse(BaseModel):
 
 @router.get('/dashboard', response_model=DashboardStats)
 async def get_dashboard_stats(
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get complete dashboard statistics for admin panel."""
+    dashboard_cache_key = cache_key('admin_stats', 'dashboard')
+    cached = await cache.get(dashboard_cache_key)
+    if cached:
+        try:
+            return DashboardStats.model_validate(cached)
+        except ValueError:
+            logger.warning('Некорректный кеш дашборда, пересчитываем')
+
     try:
         # Get nodes status from RemnaWave
         nodes_data = await _get_nodes_overview()
@@ -273,7 +287,7 @@ async def get_dashboard_stats(
         tariff_stats = await _get_tariff_stats(db)
 
         # Build response
-        return DashboardStats(
+        dashboard = DashboardStats(
             nodes=nodes_data,
             subscriptions=SubscriptionStats(
                 total=sub_stats.get('total_subscriptions', 0),
@@ -323,11 +337,14 @@ async def get_dashboard_stats(
             detail='Failed to load dashboard statistics',
         )
 
+    await cache.set(dashboard_cache_key, dashboard.model_dump(mode='json'), expire=DASHBOARD_CACHE_TTL)
+    return dashboard
+
 
 @router.get('/system-info', response_model=SystemInfoResponse)
 async def get_system_info(
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get system information for admin dashboard."""
     try:
@@ -358,7 +375,7 @@ async def get_system_info(
 
 @router.get('/nodes', response_model=NodesOverview)
 async def get_nodes_status(
-    admin: User = Depends(require_permission('stats:read')),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
 ):
     """Get status of all nodes."""
     try:
@@ -374,7 +391,7 @@ async def get_nodes_status(
 @router.post('/nodes/{node_uuid}/restart')
 async def restart_node(
     node_uuid: str,
-    admin: User = Depends(require_permission('remnawave:manage')),
+    admin: CabinetPrincipal = Depends(require_permission('remnawave:manage')),
 ):
     """Restart a node."""
     try:
@@ -401,7 +418,7 @@ async def restart_node(
 @router.post('/nodes/{node_uuid}/toggle')
 async def toggle_node(
     node_uuid: str,
-    admin: User = Depends(require_permission('remnawave:manage')),
+    admin: CabinetPrincipal = Depends(require_permission('remnawave:manage')),
 ):
     """Enable or disable a node."""
     try:
@@ -496,8 +513,8 @@ async def _get_tariff_stats(db: AsyncSession) -> TariffStats | None:
     """Get statistics for all tariffs."""
     try:
         # Получаем ВСЕ тарифы (включая неактивные) для статистики
-        tariffs_result = await db.execute(select(Tariff).order_by(Tariff.display_order))
-        tariffs = tariffs_result.scalars().all()
+        tariffs_result = await db.execute(select(Tariff.id, Tariff.name).order_by(Tariff.display_order))
+        tariffs = tariffs_result.all()
 
         if not tariffs:
             logger.info('📊 Нет тарифов в системе, пропускаем статистику')
@@ -508,71 +525,39 @@ async def _get_tariff_stats(db: AsyncSession) -> TariffStats | None:
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
 
+        is_active = Subscription.status == SubscriptionStatus.ACTIVE.value
+        is_paid = Subscription.is_trial == False
+        # Все счётчики по всем тарифам — один проход по подпискам
+        counts_result = await db.execute(
+            select(
+                Subscription.tariff_id,
+                count_if(is_active).label('active'),
+                count_if(and_(is_active, Subscription.is_trial == True)).label('trial'),
+                count_if(and_(is_paid, Subscription.created_at >= today_start)).label('today'),
+                count_if(and_(is_paid, Subscription.created_at >= week_ago)).label('week'),
+                count_if(and_(is_paid, Subscription.created_at >= month_ago)).label('month'),
+            )
+            .where(Subscription.tariff_id.isnot(None))
+            .group_by(Subscription.tariff_id)
+        )
+        counts = {row.tariff_id: row for row in counts_result}
+
         tariff_items = []
         total_tariff_subscriptions = 0
 
         for tariff in tariffs:
-            # Активные подписки на этом тарифе
-            active_result = await db.execute(
-                select(func.count(Subscription.id)).where(
-                    Subscription.tariff_id == tariff.id, Subscription.status == SubscriptionStatus.ACTIVE.value
-                )
-            )
-            active_count = active_result.scalar() or 0
-
-            # Триальные подписки на этом тарифе
-            trial_result = await db.execute(
-                select(func.count(Subscription.id)).where(
-                    Subscription.tariff_id == tariff.id,
-                    Subscription.status == SubscriptionStatus.ACTIVE.value,
-                    Subscription.is_trial == True,
-                )
-            )
-            trial_count = trial_result.scalar() or 0
-
-            # Куплено сегодня (не триальные)
-            today_result = await db.execute(
-                select(func.count(Subscription.id)).where(
-                    Subscription.tariff_id == tariff.id,
-                    Subscription.created_at >= today_start,
-                    Subscription.is_trial == False,
-                )
-            )
-            purchased_today = today_result.scalar() or 0
-
-            # Куплено за неделю
-            week_result = await db.execute(
-                select(func.count(Subscription.id)).where(
-                    Subscription.tariff_id == tariff.id,
-                    Subscription.created_at >= week_ago,
-                    Subscription.is_trial == False,
-                )
-            )
-            purchased_week = week_result.scalar() or 0
-
-            # Куплено за месяц
-            month_result = await db.execute(
-                select(func.count(Subscription.id)).where(
-                    Subscription.tariff_id == tariff.id,
-                    Subscription.created_at >= month_ago,
-                    Subscription.is_trial == False,
-                )
-            )
-            purchased_month = month_result.scalar() or 0
-
-            logger.info(
-                '📊 Тариф активных=, триал', tariff_name=tariff.name, active_count=active_count, trial_count=trial_count
-            )
+            row = counts.get(tariff.id)
+            active_count = row.active if row else 0
 
             tariff_items.append(
                 TariffStatItem(
                     tariff_id=tariff.id,
                     tariff_name=tariff.name,
                     active_subscriptions=active_count,
-                    trial_subscriptions=trial_count,
-                    purchased_today=purchased_today,
-                    purchased_week=purchased_week,
-                    purchased_month=purchased_month,
+                    trial_subscriptions=row.trial if row else 0,
+                    purchased_today=row.today if row else 0,
+                    purchased_week=row.week if row else 0,
+                    purchased_month=row.month if row else 0,
                 )
             )
 
@@ -596,8 +581,8 @@ async def _get_tariff_stats(db: AsyncSession) -> TariffStats | None:
 @router.get('/referrals/top', response_model=TopReferrersResponse)
 async def get_top_referrers(
     limit: int = 20,
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get top referrers with earnings breakdown by period."""
     try:
@@ -606,85 +591,35 @@ async def get_top_referrers(
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
 
-        # Get all referrers with their stats
+        # Invited counts by period for each referrer — one grouped pass
         referrers_query = await db.execute(
-            select(User.referred_by_id.label('referrer_id'), func.count(User.id).label('total_invited'))
+            select(
+                User.referred_by_id.label('referrer_id'),
+                func.count(User.id).label('total_invited'),
+                count_if(User.created_at >= today_start).label('invited_today'),
+                count_if(User.created_at >= week_ago).label('invited_week'),
+                count_if(User.created_at >= month_ago).label('invited_month'),
+            )
             .where(User.referred_by_id.isnot(None))
             .group_by(User.referred_by_id)
         )
-        referrers_data = {row.referrer_id: {'total_invited': row.total_invited} for row in referrers_query}
-
-        # Get invited counts by period for each referrer
-        # Today
-        today_invited_query = await db.execute(
-            select(User.referred_by_id.label('referrer_id'), func.count(User.id).label('count'))
-            .where(and_(User.referred_by_id.isnot(None), User.created_at >= today_start))
-            .group_by(User.referred_by_id)
-        )
-        for row in today_invited_query:
-            if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['invited_today'] = row.count
+        referrers_data = {row.referrer_id: dict(row._mapping) for row in referrers_query}
 
-        # Week
-        week_invited_query = await db.execute(
-            select(User.referred_by_id.label('referrer_id'), func.count(User.id).label('count'))
-            .where(and_(User.referred_by_id.isnot(None), User.created_at >= week_ago))
-            .group_by(User.referred_by_id)
-        )
-        for row in week_invited_query:
-            if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['invited_week'] = row.count
-
-        # Month
-        month_invited_query = await db.execute(
-            select(User.referred_by_id.label('referrer_id'), func.count(User.id).label('count'))
-            .where(and_(User.referred_by_id.isnot(None), User.created_at >= month_ago))
-            .group_by(User.referred_by_id)
-        )
-        for row in month_invited_query:
-            if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['invited_month'] = row.count
-
-        # Get earnings from ReferralEarning table
-        # Total earnings
-        total_earnings_query = await db.execute(
+        # Earnings from ReferralEarning table by period — one grouped pass
+        earnings_query = await db.execute(
             select(
-                ReferralEarning.user_id.label('referrer_id'), func.sum(ReferralEarning.amount_kopeks).label('total')
+                ReferralEarning.user_id.label('referrer_id'),
+                func.coalesce(func.sum(ReferralEarning.amount_kopeks), 0).label('earnings_total'),
+                sum_if(ReferralEarning.amount_kopeks, ReferralEarning.created_at >= today_start).label(
+                    'earnings_today'
+                ),
+                sum_if(ReferralEarning.amount_kopeks, ReferralEarning.created_at >= week_ago).label('earnings_week'),
+                sum_if(ReferralEarning.amount_kopeks, ReferralEarning.created_at >= month_ago).label('earnings_month'),
             ).group_by(ReferralEarning.user_id)
         )
-        for row in total_earnings_query:
-            if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['earnings_total'] = row.total or 0
-
-        # Today earnings
-        today_earnings_query = await db.execute(
-            select(ReferralEarning.user_id.label('referrer_id'), func.sum(ReferralEarning.amount_kopeks).label('total'))
-            .where(ReferralEarning.created_at >= today_start)
-            .group_by(ReferralEarning.user_id)
-        )
-        for row in today_earnings_query:
-            if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['earnings_today'] = row.total or 0
-
-        # Week earnings
-        week_earnings_query = await db.execute(
-            select(ReferralEarning.user_id.label('referrer_id'), func.sum(ReferralEarning.amount_kopeks).label('total'))
-            .where(ReferralEarning.created_at >= week_ago)
-            .group_by(ReferralEarning.user_id)
-        )
-        for row in week_earnings_query:
+        for row in earnings_query:
             if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['earnings_week'] = row.total or 0
-
-        # Month earnings
-        month_earnings_query = await db.execute(
-            select(ReferralEarning.user_id.label('referrer_id'), func.sum(ReferralEarning.amount_kopeks).label('total'))
-            .where(ReferralEarning.created_at >= month_ago)
-            .group_by(ReferralEarning.user_id)
-        )
-        for row in month_earnings_query:
-            if row.referrer_id in referrers_data:
-                referrers_data[row.referrer_id]['earnings_month'] = row.total or 0
+                referrers_data[row.referrer_id].update(row._mapping)
 
         # Get user info for all referrers
         referrer_ids = list(referrers_data.keys())
@@ -765,8 +700,8 @@ async def get_top_referrers(
 @router.get('/campaigns/top', response_model=TopCampaignsResponse)
 async def get_top_campaigns(
     limit: int = 20,
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get top advertising campaigns with statistics."""
     try:
@@ -822,8 +757,8 @@ async def get_top_campaigns(
 @router.get('/payments/recent', response_model=RecentPaymentsResponse)
 async def get_recent_payments(
     limit: int = 50,
-    admin: User = Depends(require_permission('stats:read')),
-    db: AsyncSession = Depends(get_cabinet_db),
+    admin: CabinetPrincipal = Depends(require_permission('stats:read')),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get recent payments with user info."""
     try:
@@ -908,9 +843,21 @@ async def get_recent_payments(
                 )
             )
 
-        # Calculate totals
-        total_count_result = await db.execute(
-            select(func.count(Transaction.id)).where(
+        # Calculate totals in one pass
+        is_completed_deposit = and_(
+            Transaction.type == TransactionType.DEPOSIT.value,
+            Transaction.is_completed == True,
+        )
+        totals_result = await db.execute(
+            select(
+                func.count(Transaction.id).label('total_count'),
+                sum_if(
+                    Transaction.amount_kopeks, and_(is_completed_deposit, Transaction.created_at >= today_start)
+                ).label('total_today'),
+                sum_if(Transaction.amount_kopeks, and_(is_completed_deposit, Transaction.created_at >= week_ago)).label(
+                    'total_week'
+                ),
+            ).where(
                 Transaction.type.in_(
                     [
                         TransactionType.DEPOSIT.value,
@@ -919,29 +866,10 @@ async def get_recent_payments(
                 )
             )
         )
-        total_count = total_count_result.scalar() or 0
-
-        today_total_result = await db.execute(
-            select(func.coalesce(func.sum(Transaction.amount_kopeks), 0)).where(
-                and_(
-                    Transaction.type == TransactionType.DEPOSIT.value,
-                    Transaction.is_completed == True,
-                    Transaction.created_at >= today_start,
-                )
-            )
-        )
-        total_today = today_total_result.scalar() or 0
-
-        week_total_result = await db.execute(
-            select(func.coalesce(func.sum(Transaction.amount_kopeks), 0)).where(
-                and_(
-                    Transaction.type == TransactionType.DEPOSIT.value,
-                    Transaction.is_completed == True,
-                    Transaction.created_at >= week_ago,
-                )
-            )
-        )
-        total_week = week_total_result.scalar() or 0
+        totals = totals_result.one()
+        total_count = totals.total_count or 0
+        total_today = totals.total_today or 0
+        total_week = totals.total_week or 0
 
         return RecentPaymentsResponse(
             payments=payment_items,
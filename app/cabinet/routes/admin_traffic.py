@@ -12,14 +12,15 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.types import BufferedInputFile
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.database.models import Subscription, Transaction, TransactionType, User
+from app.database.models import Subscription, User
 from app.services.remnawave_service import RemnaWaveService
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 from ..schemas.traffic import (
     ExportCsvRequest,
@@ -262,7 +263,7 @@ def _build_traffic_items(
 
 @router.get('', response_model=TrafficUsageResponse)
 async def get_traffic_usage(
-    admin: User = Depends(require_permission('traffic:read')),
+    admin: CabinetPrincipal = Depends(require_permission('traffic:read')),
     db: AsyncSession = Depends(get_cabinet_db),
     period: int = Query(30, ge=1, le=30),
     limit: int = Query(50, ge=1, le=200),
@@ -384,24 +385,6 @@ _ENRICHMENT_CACHE_TTL = 300  # 5 minutes
 _enrichment_lock = asyncio.Lock()
 
 
-async def _get_bulk_spending(db: AsyncSession, user_ids: list[int]) -> dict[int, int]:
-    """Get total spent kopeks for multiple users in a single query."""
-    if not user_ids:
-        return {}
-    result = await db.execute(
-        select(Transaction.user_id, func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0))
-        .where(
-            and_(
-                Transaction.user_id.in_(user_ids),
-                Transaction.is_completed.is_(True),
-                Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-            )
-        )
-        .group_by(Transaction.user_id)
-    )
-    return {row[0]: int(row[1]) for row in result.all()}
-
-
 async def _build_enrichment(db: AsyncSession, user_map: dict[str, User]) -> dict[int, UserTrafficEnrichment]:
     """Build enrichment data for all users: devices, spending, dates, last node."""
     uuid_to_user_id: dict[str, int] = {}
@@ -461,10 +444,6 @@ async def _build_enrichment(db: AsyncSession, user_map: dict[str, User]) -> dict
             except Exception:
                 logger.warning('Failed to fetch bulk devices for enrichment', exc_info=True)
 
-    # Bulk spending stats
-    all_user_ids = [u.id for u in user_map.values()]
-    spending_map = await _get_bulk_spending(db, all_user_ids)
-
     # Build enrichment data
     enrichment: dict[int, UserTrafficEnrichment] = {}
     for uuid, user in user_map.items():
@@ -486,7 +465,7 @@ async def _build_enrichment(db: AsyncSession, user_map: dict[str, User]) -> dict
 
         enrichment[uid] = UserTrafficEnrichment(
             devices_connected=devices_by_user.get(uid, 0),
-            total_spent_kopeks=spending_map.get(uid, 0),
+            total_spent_kopeks=user.total_spent_kopeks or 0,
             subscription_start_date=start_date,
             subscription_end_date=end_date,
             last_node_name=last_node_name,
@@ -497,7 +476,7 @@ async def _build_enrichment(db: AsyncSession, user_map: dict[str, User]) -> dict
 
 @router.get('/enrichment', response_model=TrafficEnrichmentResponse)
 async def get_traffic_enrichment(
-    admin: User = Depends(require_permission('traffic:read')),
+    admin: CabinetPrincipal = Depends(require_permission('traffic:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Return enrichment data: device counts, spending, dates, last node."""
@@ -530,7 +509,7 @@ async def get_traffic_enrichment(
 @router.post('/export-csv', response_model=ExportCsvResponse)
 async def export_traffic_csv(
     request: ExportCsvRequest,
-    admin: User = Depends(require_permission('traffic:export')),
+    admin: CabinetPrincipal = Depends(require_permission('traffic:export')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Generate CSV with traffic usage and send to admin's Telegram DM."""
@@ -7,9 +7,9 @@ import structlog
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
-from app.database.models import User
 from app.services.version_service import version_service
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import require_permission
 
 
@@ -93,7 +93,7 @@ async def _fetch_cabinet_releases(force: bool = False) -> list[dict]:
 
 @router.get('/releases', response_model=ReleasesResponse)
 async def get_releases(
-    current_user: User = Depends(require_permission('updates:read')),
+    current_user: CabinetPrincipal = Depends(require_permission('updates:read')),
 ) -> ReleasesResponse:
     """Get release information for bot and cabinet."""
     # Bot releases
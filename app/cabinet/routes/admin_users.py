@@ -14,12 +14,15 @@ from app.database.crud.subscription import (
 from app.database.crud.tariff import get_tariff_by_id
 from app.database.crud.user import (
     add_user_balance,
+    build_users_filters,
     delete_user as soft_delete_user,
     get_referrals,
     get_user_by_id,
     get_user_by_telegram_id,
     get_users_count,
+    get_users_count_estimate,
     get_users_list,
+    get_users_next_cursor,
     get_users_spending_stats,
     get_users_statistics,
     subtract_user_balance,
@@ -30,14 +33,24 @@ from app.database.models import (
     Subscription,
     SubscriptionServer,
     SubscriptionStatus,
+    Tariff,
     TrafficPurchase,
     Transaction,
     TransactionType,
     User,
     UserStatus,
 )
+from app.utils.streaming_export import (
+    EXPORT_ID_PATTERN,
+    ExportColumn,
+    ExportFormat,
+    column,
+    export_response,
+    iter_keyset_rows,
+)
 from app.utils.timezone import panel_datetime_to_utc
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 from ..schemas.users import (
     DeleteDeviceResponse,
@@ -373,13 +386,15 @@ async def list_users(
     email: str | None = Query(None, max_length=255),
     status: UserStatusEnum | None = Query(None),
     sort_by: SortByEnum = Query(SortByEnum.CREATED_AT),
-    admin: User = Depends(require_permission('users:read')),
+    cursor: str | None = Query(None, max_length=512),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
     Get paginated list of users with filtering and sorting.
 
-    - **offset**: Pagination offset
+    - **offset**: Pagination offset (ignored when `cursor` is given)
+    - **cursor**: `next_cursor` from the previous page; keyset pagination that stays fast on deep pages
     - **limit**: Number of users per page (max 200)
     - **search**: Search by telegram_id, username, first_name, last_name
     - **email**: Search by email
@@ -398,21 +413,32 @@ async def list_users(
     order_by_total_spent = sort_by == SortByEnum.TOTAL_SPENT
     order_by_purchase_count = sort_by == SortByEnum.PURCHASE_COUNT
 
-    users = await get_users_list(
-        db=db,
-        offset=offset,
-        limit=limit,
-        search=search,
-        email=email,
-        status=user_status,
-        order_by_balance=order_by_balance,
-        order_by_traffic=order_by_traffic,
-        order_by_last_activity=order_by_last_activity,
-        order_by_total_spent=order_by_total_spent,
-        order_by_purchase_count=order_by_purchase_count,
-    )
-
-    total = await get_users_count(db=db, status=user_status, search=search, email=email)
+    sort_flags = {
+        'order_by_balance': order_by_balance,
+        'order_by_traffic': order_by_traffic,
+        'order_by_last_activity': order_by_last_activity,
+        'order_by_total_spent': order_by_total_spent,
+        'order_by_purchase_count': order_by_purchase_count,
+    }
+    # Лишняя строка — признак следующей страницы
+    try:
+        users = await get_users_list(
+            db=db,
+            offset=offset,
+            limit=limit + 1,
+            search=search,
+            email=email,
+            status=user_status,
+            cursor=cursor,
+            **sort_flags,
+        )
+    except ValueError as error:
+        # `status` здесь — параметр фильтра, модуль fastapi.status затенён
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    next_cursor = get_users_next_cursor(users, limit, **sort_flags)
+    users = users[:limit]
+
+    total = await get_users_count_estimate(db=db, status=user_status, search=search, email=email)
 
     # Get spending stats for all users
     user_ids = [u.id for u in users]
@@ -425,12 +451,13 @@ async def list_users(
         total=total,
         offset=offset,
         limit=limit,
+        next_cursor=next_cursor,
     )
 
 
 @router.get('/stats', response_model=UsersStatsResponse)
 async def get_users_stats(
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get overall users statistics."""
@@ -525,13 +552,92 @@ async def get_users_stats(
     )
 
 
+# === Export ===
+
+
+_EXPORT_COLUMNS = [
+    column('id'),
+    column('telegram_id'),
+    column('username'),
+    column('first_name'),
+    column('last_name'),
+    column('email'),
+    column('status'),
+    column('language'),
+    ExportColumn('balance_rubles', lambda row: round((row.balance_kopeks or 0) / 100, 2)),
+    column('promo_group_id'),
+    column('referred_by_id'),
+    column('created_at'),
+    column('last_activity'),
+    column('subscription_status'),
+    column('subscription_is_trial'),
+    column('subscription_end_date'),
+    column('tariff_name'),
+]
+
+
+@router.get('/export')
+async def export_users(
+    search: str | None = Query(None, max_length=255),
+    email: str | None = Query(None, max_length=255),
+    status: UserStatusEnum | None = Query(None),
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias='format'),
+    gzip: bool = Query(False),
+    export_id: str | None = Query(None, pattern=EXPORT_ID_PATTERN),
+    admin: CabinetPrincipal = Depends(require_permission('users:export')),
+    db: AsyncSession = Depends(get_cabinet_db),
+):
+    """Stream all users matching the list filters as CSV or NDJSON."""
+    user_status = UserStatus(status.value) if status else None
+    filters = build_users_filters(search=search, email=email, status=user_status)
+    total = await get_users_count(db=db, status=user_status, search=search, email=email)
+
+    stmt = (
+        select(
+            User.id,
+            User.telegram_id,
+            User.username,
+            User.first_name,
+            User.last_name,
+            User.email,
+            User.status,
+            User.language,
+            User.balance_kopeks,
+            User.promo_group_id,
+            User.referred_by_id,
+            User.created_at,
+            User.last_activity,
+            Subscription.status.label('subscription_status'),
+            Subscription.is_trial.label('subscription_is_trial'),
+            Subscription.end_date.label('subscription_end_date'),
+            Tariff.name.label('tariff_name'),
+        )
+        .outerjoin(Subscription, Subscription.user_id == User.id)
+        .outerjoin(Tariff, Tariff.id == Subscription.tariff_id)
+        .where(*filters)
+    )
+
+    logger.info('Admin exported users', admin_id=admin.id, rows=total, export_format=export_format)
+
+    return export_response(
+        'users',
+        iter_keyset_rows(stmt, User.id),
+        _EXPORT_COLUMNS,
+        export_format=export_format,
+        gzip=gzip,
+        export_id=export_id,
+        owner_id=admin.id,
+        total_rows=total,
+    )
+
+
 # === User Detail ===
 
 
 @router.get('/{user_id}', response_model=UserDetailResponse)
 async def get_user_detail(
     user_id: int,
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get detailed user information by ID."""
@@ -660,7 +766,7 @@ async def get_user_detail(
 @router.get('/by-telegram/{telegram_id}', response_model=UserDetailResponse)
 async def get_user_by_telegram(
     telegram_id: int,
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user by Telegram ID."""
@@ -679,7 +785,7 @@ async def get_user_by_telegram(
 @router.get('/{user_id}/panel-info', response_model=UserPanelInfoResponse)
 async def get_user_panel_info(
     user_id: int,
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user panel info from Remnawave (config links, traffic, connection data)."""
@@ -757,7 +863,7 @@ async def get_user_panel_info(
 @router.get('/{user_id}/node-usage', response_model=UserNodeUsageResponse)
 async def get_user_node_usage(
     user_id: int,
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user per-node traffic usage (always 30 days with daily breakdown)."""
@@ -845,7 +951,7 @@ async def get_user_node_usage(
 async def update_user_balance(
     user_id: int,
     request: UpdateBalanceRequest,
-    admin: User = Depends(require_permission('users:balance')),
+    admin: CabinetPrincipal = Depends(require_permission('users:balance')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -922,7 +1028,7 @@ async def update_user_balance(
 async def update_user_subscription(
     user_id: int,
     request: UpdateSubscriptionRequest,
-    admin: User = Depends(require_permission('users:subscription')),
+    admin: CabinetPrincipal = Depends(require_permission('users:subscription')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -1313,7 +1419,7 @@ async def update_user_subscription(
 async def get_user_available_tariffs(
     user_id: int,
     include_inactive: bool = Query(False, description='Include inactive tariffs'),
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -1411,7 +1517,7 @@ async def get_user_available_tariffs(
 async def update_user_status(
     user_id: int,
     request: UpdateUserStatusRequest,
-    admin: User = Depends(require_permission('users:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('users:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update user status (active, blocked, deleted)."""
@@ -1456,7 +1562,7 @@ async def update_user_status(
 async def block_user(
     user_id: int,
     reason: str | None = None,
-    admin: User = Depends(require_permission('users:block')),
+    admin: CabinetPrincipal = Depends(require_permission('users:block')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Block a user (shortcut for status update)."""
@@ -1467,7 +1573,7 @@ async def block_user(
 @router.post('/{user_id}/unblock', response_model=UpdateUserStatusResponse)
 async def unblock_user(
     user_id: int,
-    admin: User = Depends(require_permission('users:block')),
+    admin: CabinetPrincipal = Depends(require_permission('users:block')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Unblock a user (shortcut for status update)."""
@@ -1482,7 +1588,7 @@ async def unblock_user(
 async def update_user_restrictions(
     user_id: int,
     request: UpdateRestrictionsRequest,
-    admin: User = Depends(require_permission('users:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('users:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update user restrictions (topup, subscription)."""
@@ -1530,7 +1636,7 @@ async def update_user_restrictions(
 async def update_user_promo_group(
     user_id: int,
     request: UpdatePromoGroupRequest,
-    admin: User = Depends(require_permission('users:promo_group')),
+    admin: CabinetPrincipal = Depends(require_permission('users:promo_group')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update user promo group."""
@@ -1585,7 +1691,7 @@ async def update_user_promo_group(
 async def update_user_referral_commission(
     user_id: int,
     request: UpdateReferralCommissionRequest,
-    admin: User = Depends(require_permission('users:referral')),
+    admin: CabinetPrincipal = Depends(require_permission('users:referral')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update user's individual referral commission percentage."""
@@ -1623,7 +1729,7 @@ async def update_user_referral_commission(
 @router.get('/{user_id}/devices', response_model=UserDevicesResponse)
 async def get_user_devices(
     user_id: int,
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user devices from Remnawave panel."""
@@ -1677,7 +1783,7 @@ async def get_user_devices(
 async def delete_user_device(
     user_id: int,
     hwid: str,
-    admin: User = Depends(require_permission('users:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('users:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Delete a single device for user."""
@@ -1708,7 +1814,7 @@ async def delete_user_device(
 @router.delete('/{user_id}/devices', response_model=ResetDevicesResponse)
 async def reset_user_devices(
     user_id: int,
-    admin: User = Depends(require_permission('users:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('users:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Reset all devices for user."""
@@ -1756,7 +1862,7 @@ async def reset_user_devices(
 async def delete_user(
     user_id: int,
     request: DeleteUserRequest = DeleteUserRequest(),
-    admin: User = Depends(require_permission('users:delete')),
+    admin: CabinetPrincipal = Depends(require_permission('users:delete')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -1794,7 +1900,7 @@ async def delete_user(
 async def full_delete_user(
     user_id: int,
     request: FullDeleteUserRequest = FullDeleteUserRequest(),
-    admin: User = Depends(require_permission('users:delete')),
+    admin: CabinetPrincipal = Depends(require_permission('users:delete')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -1843,7 +1949,7 @@ async def full_delete_user(
 async def reset_user_trial(
     user_id: int,
     request: ResetTrialRequest = ResetTrialRequest(),
-    admin: User = Depends(require_permission('users:subscription')),
+    admin: CabinetPrincipal = Depends(require_permission('users:subscription')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -1914,7 +2020,7 @@ async def reset_user_trial(
 async def reset_user_subscription(
     user_id: int,
     request: ResetSubscriptionRequest = ResetSubscriptionRequest(),
-    admin: User = Depends(require_permission('users:subscription')),
+    admin: CabinetPrincipal = Depends(require_permission('users:subscription')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -1999,7 +2105,7 @@ async def reset_user_subscription(
 async def disable_user(
     user_id: int,
     request: DisableUserRequest = DisableUserRequest(),
-    admin: User = Depends(require_permission('users:block')),
+    admin: CabinetPrincipal = Depends(require_permission('users:block')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -2076,7 +2182,7 @@ async def get_user_referrals(
     user_id: int,
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get list of users referred by this user."""
@@ -2116,7 +2222,7 @@ async def get_user_transactions(
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     transaction_type: str | None = Query(None),
-    admin: User = Depends(require_permission('users:read')),
+    admin: CabinetPrincipal = Depends(require_permission('users:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get user transactions."""
@@ -2173,7 +2279,7 @@ async def get_user_transactions(
 @router.get('/{user_id}/sync/status', response_model=PanelSyncStatusResponse)
 async def get_user_sync_status(
     user_id: int,
-    admin: User = Depends(require_permission('users:sync')),
+    admin: CabinetPrincipal = Depends(require_permission('users:sync')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -2330,7 +2436,7 @@ async def get_user_sync_status(
 async def sync_user_from_panel(
     user_id: int,
     request: SyncFromPanelRequest = SyncFromPanelRequest(),
-    admin: User = Depends(require_permission('users:sync')),
+    admin: CabinetPrincipal = Depends(require_permission('users:sync')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
@@ -2532,7 +2638,7 @@ async def sync_user_from_panel(
 async def sync_user_to_panel(
     user_id: int,
     request: SyncToPanelRequest = SyncToPanelRequest(),
-    admin: User = Depends(require_permission('users:sync')),
+    admin: CabinetPrincipal = Depends(require_permission('users:sync')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
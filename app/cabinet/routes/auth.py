@@ -34,13 +34,14 @@ from app.services.referral_service import process_referral_registration
 from app.utils.timezone import panel_datetime_to_utc
 
 from ..auth import (
+    PasswordHasherBusyError,
     create_access_token,
     create_refresh_token,
     get_token_payload,
-    hash_password,
+    hash_password_async,
     validate_telegram_init_data,
     validate_telegram_login_widget,
-    verify_password,
+    verify_password_async,
 )
 from ..auth.email_verification import (
     generate_email_change_code,
@@ -80,6 +81,33 @@ logger = structlog.get_logger(__name__)
 
 router = APIRouter(prefix='/auth', tags=['Cabinet Auth'])
 
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 2
+
+
+def _password_hasher_busy() -> HTTPException:
+    logger.warning('Пул хеширования паролей переполнен, запрос отклонён')
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail='Too many authentication requests. Please try again shortly.',
+        headers={'Retry-After': str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
+async def _hash_password(password: str) -> str:
+    """Hash off the event loop, answering 429 when the hashing pool is saturated."""
+    try:
+        return await hash_password_async(password)
+    except PasswordHasherBusyError:
+        raise _password_hasher_busy()
+
+
+async def _verify_password(password: str, password_hash: str) -> bool:
+    """Verify off the event loop, answering 429 when the hashing pool is saturated."""
+    try:
+        return await verify_password_async(password, password_hash)
+    except PasswordHasherBusyError:
+        raise _password_hasher_busy()
+
 
 def _user_to_response(user: User) -> UserResponse:
     """Convert User model to UserResponse."""
@@ -561,7 +589,7 @@ async def register_email(
 
     # Update user
     user.email = request.email
-    user.password_hash = hash_password(request.password)
+    user.password_hash = await _hash_password(request.password)
 
     if not settings.is_cabinet_email_verification_enabled():
         # Верификация отключена — сразу помечаем email как verified
@@ -661,7 +689,7 @@ async def register_email_standalone(
         )
 
     # Хешировать пароль
-    password_hash = hash_password(request.password)
+    password_hash = await _hash_password(request.password)
 
     # Найти реферера по коду (если указан)
     referrer = None
@@ -897,7 +925,7 @@ async def login_email(
         # For test email - auto-create user if not exists
         if is_test_email and settings.validate_test_email_password(request.email, request.password):
             logger.info('Test email login creating new user', email=request.email)
-            password_hash = hash_password(request.password)
+            password_hash = await _hash_password(request.password)
             user = await create_user_by_email(
                 db=db,
                 email=request.email,
@@ -920,7 +948,7 @@ async def login_email(
             detail='Password login not configured for this account',
         )
 
-    if not verify_password(request.password, user.password_hash):
+    if not await _verify_password(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Invalid email or password',
@@ -1119,7 +1147,7 @@ async def reset_password(
         )
 
     # Update password
-    user.password_hash = hash_password(request.password)
+    user.password_hash = await _hash_password(request.password)
     user.password_reset_token = None
     user.password_reset_expires = None
 
@@ -6,15 +6,17 @@ from pathlib import Path
 from typing import Literal
 
 import structlog
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database.models import SystemSetting, User
+from app.database.models import SystemSetting
+from app.utils.content_cache import ContentType, cached_content_response, content_cache
 
+from ..auth.principal_cache import CabinetPrincipal
 from ..dependencies import get_cabinet_db, require_permission
 
 
@@ -315,6 +317,7 @@ async def set_setting_value(db: AsyncSession, key: str, value: str):
         db.add(setting)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.BRANDING)
 
 
 def get_logo_path() -> Path | None:
@@ -341,29 +344,35 @@ def has_custom_logo() -> bool:
 
 @router.get('', response_model=BrandingResponse)
 async def get_branding(
+    request: Request,
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
     Get current branding settings.
     This is a public endpoint - no authentication required.
     """
-    # Get name from database or use default from env/settings
-    name = await get_setting_value(db, BRANDING_NAME_KEY)
-    if name is None:  # Only use fallback if not set at all (empty string is valid)
-        name = getattr(settings, 'CABINET_BRANDING_NAME', None) or os.getenv('VITE_APP_NAME', 'Cabinet')
 
-    # Check for custom logo
-    custom_logo = has_custom_logo()
+    async def _load() -> BrandingResponse:
+        # Get name from database or use default from env/settings
+        name = await get_setting_value(db, BRANDING_NAME_KEY)
+        if name is None:  # Only use fallback if not set at all (empty string is valid)
+            name = getattr(settings, 'CABINET_BRANDING_NAME', None) or os.getenv('VITE_APP_NAME', 'Cabinet')
 
-    # Get first letter for logo fallback (use "V" if name is empty)
-    logo_letter = name[0].upper() if name else 'V'
+        # Check for custom logo
+        custom_logo = has_custom_logo()
 
-    return BrandingResponse(
-        name=name,
-        logo_url='/cabinet/branding/logo' if custom_logo else None,
-        logo_letter=logo_letter,
-        has_custom_logo=custom_logo,
-    )
+        # Get first letter for logo fallback (use "V" if name is empty)
+        logo_letter = name[0].upper() if name else 'V'
+
+        return BrandingResponse(
+            name=name,
+            logo_url='/cabinet/branding/logo' if custom_logo else None,
+            logo_letter=logo_letter,
+            has_custom_logo=custom_logo,
+        )
+
+    entry = await content_cache.get_or_load(ContentType.BRANDING, None, _load, variant='branding')
+    return cached_content_response(request, entry)
 
 
 @router.get('/logo')
@@ -394,7 +403,7 @@ async def get_logo():
 @router.put('/name', response_model=BrandingResponse)
 async def update_branding_name(
     payload: BrandingNameUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update the project name. Admin only. Empty name allowed (logo only mode)."""
@@ -422,7 +431,7 @@ async def update_branding_name(
 @router.post('/logo', response_model=BrandingResponse)
 async def upload_logo(
     file: UploadFile = File(...),
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Upload a custom logo. Admin only."""
@@ -485,7 +494,7 @@ async def upload_logo(
 
 @router.delete('/logo', response_model=BrandingResponse)
 async def delete_logo(
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Delete custom logo and revert to letter. Admin only."""
@@ -534,30 +543,36 @@ def validate_hex_color(color: str) -> bool:
 
 @router.get('/colors', response_model=ThemeColorsResponse)
 async def get_theme_colors(
+    request: Request,
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
     Get current theme colors.
     This is a public endpoint - no authentication required.
     """
-    colors_json = await get_setting_value(db, THEME_COLORS_KEY)
 
-    if colors_json:
-        try:
-            colors = json.loads(colors_json)
-            # Merge with defaults to ensure all fields exist
-            merged = {**DEFAULT_THEME_COLORS, **colors}
-            return ThemeColorsResponse(**merged)
-        except (json.JSONDecodeError, TypeError):
-            pass
+    async def _load() -> ThemeColorsResponse:
+        colors_json = await get_setting_value(db, THEME_COLORS_KEY)
 
-    return ThemeColorsResponse(**DEFAULT_THEME_COLORS)
+        if colors_json:
+            try:
+                colors = json.loads(colors_json)
+                # Merge with defaults to ensure all fields exist
+                merged = {**DEFAULT_THEME_COLORS, **colors}
+                return ThemeColorsResponse(**merged)
+            except (json.JSONDecodeError, TypeError):
+                pass
+
+        return ThemeColorsResponse(**DEFAULT_THEME_COLORS)
+
+    entry = await content_cache.get_or_load(ContentType.BRANDING, None, _load, variant='colors')
+    return cached_content_response(request, entry)
 
 
 @router.patch('/colors', response_model=ThemeColorsResponse)
 async def update_theme_colors(
     payload: ThemeColorsUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update theme colors. Admin only. Partial update supported."""
@@ -591,7 +606,7 @@ async def update_theme_colors(
 
 @router.post('/colors/reset', response_model=ThemeColorsResponse)
 async def reset_theme_colors(
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Reset theme colors to defaults. Admin only."""
@@ -610,28 +625,34 @@ DEFAULT_ENABLED_THEMES = {'dark': True, 'light': True}
 
 @router.get('/themes', response_model=EnabledThemesResponse)
 async def get_enabled_themes(
+    request: Request,
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """
     Get which themes are enabled.
     This is a public endpoint - no authentication required.
     """
-    themes_json = await get_setting_value(db, ENABLED_THEMES_KEY)
 
-    if themes_json:
-        try:
-            themes = json.loads(themes_json)
-            return EnabledThemesResponse(**themes)
-        except (json.JSONDecodeError, TypeError):
-            pass
+    async def _load() -> EnabledThemesResponse:
+        themes_json = await get_setting_value(db, ENABLED_THEMES_KEY)
+
+        if themes_json:
+            try:
+                themes = json.loads(themes_json)
+                return EnabledThemesResponse(**themes)
+            except (json.JSONDecodeError, TypeError):
+                pass
+
+        return EnabledThemesResponse(**DEFAULT_ENABLED_THEMES)
 
-    return EnabledThemesResponse(**DEFAULT_ENABLED_THEMES)
+    entry = await content_cache.get_or_load(ContentType.BRANDING, None, _load, variant='themes')
+    return cached_content_response(request, entry)
 
 
 @router.patch('/themes', response_model=EnabledThemesResponse)
 async def update_enabled_themes(
     payload: EnabledThemesUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update which themes are enabled. Admin only. At least one theme must be enabled."""
@@ -685,7 +706,7 @@ async def get_animation_enabled(
 @router.patch('/animation', response_model=AnimationEnabledResponse)
 async def update_animation_enabled(
     payload: AnimationEnabledUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update animation enabled setting. Admin only."""
@@ -726,7 +747,7 @@ async def get_animation_config(
 @router.patch('/animation-config', response_model=AnimationConfigResponse)
 async def update_animation_config(
     payload: AnimationConfigUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update animation config (partial update). Admin only."""
@@ -783,7 +804,7 @@ async def get_fullscreen_enabled(
 @router.patch('/fullscreen', response_model=FullscreenEnabledResponse)
 async def update_fullscreen_enabled(
     payload: FullscreenEnabledUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update fullscreen enabled setting. Admin only."""
@@ -819,7 +840,7 @@ async def get_email_auth_enabled(
 @router.patch('/email-auth', response_model=EmailAuthEnabledResponse)
 async def update_email_auth_enabled(
     payload: EmailAuthEnabledUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update email auth enabled setting. Admin only."""
@@ -855,7 +876,7 @@ async def get_analytics_counters(
 @router.patch('/analytics', response_model=AnalyticsCountersResponse)
 async def update_analytics_counters(
     payload: AnalyticsCountersUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update analytics counter settings. Admin only. Partial update supported."""
@@ -919,7 +940,7 @@ async def get_lite_mode_enabled(
 @router.patch('/lite-mode', response_model=LiteModeEnabledResponse)
 async def update_lite_mode_enabled(
     payload: LiteModeEnabledUpdate,
-    admin: User = Depends(require_permission('settings:edit')),
+    admin: CabinetPrincipal = Depends(require_permission('settings:edit')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Update lite mode enabled setting. Admin only."""
@@ -1,7 +1,7 @@
 """Info pages routes for cabinet - FAQ, rules, privacy policy, etc."""
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,6 +11,7 @@ from app.database.models import User
 from app.services.faq_service import FaqService
 from app.services.privacy_policy_service import PrivacyPolicyService
 from app.services.public_offer_service import PublicOfferService
+from app.utils.content_cache import ContentType, cached_content_response, content_cache, content_language
 
 from ..dependencies import get_cabinet_db, get_current_cabinet_user
 
@@ -101,123 +102,154 @@ class SupportConfigResponse(BaseModel):
 
 @router.get('/faq', response_model=list[FaqPageResponse])
 async def get_faq_pages(
+    request: Request,
     language: str = Query('ru', min_length=2, max_length=10),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get list of FAQ pages."""
-    requested_lang = FaqService.normalize_language(language)
-    pages = await FaqService.get_pages(
-        db,
-        requested_lang,
-        include_inactive=False,  # Only active pages for cabinet
-        fallback=True,
-    )
-
-    return [
-        FaqPageResponse(
-            id=page.id,
-            title=page.title,
-            content=page.content or '',
-            order=page.display_order or 0,
+    requested_lang = content_language(language)
+
+    async def _load() -> list[FaqPageResponse]:
+        pages = await FaqService.get_pages(
+            db,
+            requested_lang,
+            include_inactive=False,  # Only active pages for cabinet
+            fallback=True,
         )
-        for page in pages
-    ]
+        return [
+            FaqPageResponse(
+                id=page.id,
+                title=page.title,
+                content=page.content or '',
+                order=page.display_order or 0,
+            )
+            for page in pages
+        ]
+
+    entry = await content_cache.get_or_load(ContentType.FAQ, requested_lang, _load, variant='cabinet')
+    return cached_content_response(request, entry)
 
 
 @router.get('/faq/{page_id}', response_model=FaqPageResponse)
 async def get_faq_page(
+    request: Request,
     page_id: int,
     language: str = Query('ru', min_length=2, max_length=10),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get a specific FAQ page by ID."""
-    requested_lang = FaqService.normalize_language(language)
-    page = await FaqService.get_page(
-        db,
-        page_id,
-        requested_lang,
-        include_inactive=False,
-        fallback=True,
-    )
+    requested_lang = content_language(language)
+
+    async def _load() -> FaqPageResponse | None:
+        page = await FaqService.get_page(
+            db,
+            page_id,
+            requested_lang,
+            include_inactive=False,
+            fallback=True,
+        )
+        if not page:
+            return None
+        return FaqPageResponse(
+            id=page.id,
+            title=page.title,
+            content=page.content or '',
+            order=page.display_order or 0,
+        )
 
-    if not page:
+    entry = await content_cache.get_or_load(
+        ContentType.FAQ, requested_lang, _load, variant=f'cabinet:page:{page_id}', cache_missing=False
+    )
+    if entry.payload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='FAQ page not found',
         )
 
-    return FaqPageResponse(
-        id=page.id,
-        title=page.title,
-        content=page.content or '',
-        order=page.display_order or 0,
-    )
+    return cached_content_response(request, entry)
 
 
 @router.get('/rules', response_model=RulesResponse)
 async def get_rules(
+    request: Request,
     language: str = Query('ru', min_length=2, max_length=10),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get service rules - uses same function as bot."""
-    requested_lang = language.split('-')[0].lower()
+    requested_lang = content_language(language)
 
-    # Use the same function as bot to ensure consistent content
-    content = await get_current_rules_content(db, requested_lang)
+    async def _load() -> RulesResponse:
+        # Use the same function as bot to ensure consistent content
+        content = await get_current_rules_content(db, requested_lang)
 
-    # Try to get updated_at from DB record
-    rules = await get_rules_by_language(db, requested_lang)
-    updated_at = None
-    if rules and rules.updated_at:
-        updated_at = rules.updated_at.isoformat()
+        # Try to get updated_at from DB record
+        rules = await get_rules_by_language(db, requested_lang)
+        updated_at = None
+        if rules and rules.updated_at:
+            updated_at = rules.updated_at.isoformat()
 
-    return RulesResponse(content=content, updated_at=updated_at)
+        return RulesResponse(content=content, updated_at=updated_at)
+
+    entry = await content_cache.get_or_load(ContentType.RULES, requested_lang, _load, variant='cabinet')
+    return cached_content_response(request, entry)
 
 
 @router.get('/privacy-policy', response_model=PrivacyPolicyResponse)
 async def get_privacy_policy(
+    request: Request,
     language: str = Query('ru', min_length=2, max_length=10),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get privacy policy."""
-    requested_lang = PrivacyPolicyService.normalize_language(language)
-    policy = await PrivacyPolicyService.get_policy(db, requested_lang, fallback=True)
+    requested_lang = content_language(language)
+
+    async def _load() -> PrivacyPolicyResponse:
+        policy = await PrivacyPolicyService.get_policy(db, requested_lang, fallback=True)
 
-    if policy and policy.content:
-        updated_at = policy.updated_at.isoformat() if policy.updated_at else None
-        return PrivacyPolicyResponse(content=policy.content, updated_at=updated_at)
+        if policy and policy.content:
+            updated_at = policy.updated_at.isoformat() if policy.updated_at else None
+            return PrivacyPolicyResponse(content=policy.content, updated_at=updated_at)
 
-    # Return default policy if none found
-    return PrivacyPolicyResponse(
-        content="""# Политика конфиденциальности
+        # Return default policy if none found
+        return PrivacyPolicyResponse(
+            content="""# Политика конфиденциальности
 
 Мы уважаем вашу конфиденциальность и защищаем ваши персональные данные.
 """,
-        updated_at=None,
-    )
+            updated_at=None,
+        )
+
+    entry = await content_cache.get_or_load(ContentType.PRIVACY_POLICY, requested_lang, _load, variant='cabinet')
+    return cached_content_response(request, entry)
 
 
 @router.get('/public-offer', response_model=PublicOfferResponse)
 async def get_public_offer(
+    request: Request,
     language: str = Query('ru', min_length=2, max_length=10),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get public offer."""
-    requested_lang = PublicOfferService.normalize_language(language)
-    offer = await PublicOfferService.get_offer(db, requested_lang, fallback=True)
+    requested_lang = content_language(language)
+
+    async def _load() -> PublicOfferResponse:
+        offer = await PublicOfferService.get_offer(db, requested_lang, fallback=True)
 
-    if offer and offer.content:
-        updated_at = offer.updated_at.isoformat() if offer.updated_at else None
-        return PublicOfferResponse(content=offer.content, updated_at=updated_at)
+        if offer and offer.content:
+            updated_at = offer.updated_at.isoformat() if offer.updated_at else None
+            return PublicOfferResponse(content=offer.content, updated_at=updated_at)
 
-    # Return default offer if none found
-    return PublicOfferResponse(
-        content="""# Публичная оферта
+        # Return default offer if none found
+        return PublicOfferResponse(
+            content="""# Публичная оферта
 
 Условия использования сервиса.
 """,
-        updated_at=None,
-    )
+            updated_at=None,
+        )
+
+    entry = await content_cache.get_or_load(ContentType.PUBLIC_OFFER, requested_lang, _load, variant='cabinet')
+    return cached_content_response(request, entry)
 
 
 @router.get('/service', response_model=ServiceInfoResponse)
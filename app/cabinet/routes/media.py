@@ -1,7 +1,5 @@
 """Media upload/download routes for cabinet tickets."""
 
-import mimetypes
-
 import structlog
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
@@ -12,6 +10,7 @@ from pydantic import BaseModel
 
 from app.config import settings
 from app.database.models import User
+from app.services.media_proxy_service import MediaNotFoundError, build_media_response, media_proxy
 
 from ..dependencies import get_current_cabinet_user
 
@@ -152,50 +151,26 @@ async def upload_media(
 
 @router.get('/{file_id}', name='cabinet_download_media')
 async def download_media(
+    request: Request,
     file_id: str,
 ) -> Response:
     """
     Download media file by file_id.
     Used to display images/documents in ticket messages.
     """
-    bot = Bot(
-        token=settings.BOT_TOKEN,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    )
-
     try:
-        file = await bot.get_file(file_id)
-        if not file.file_path:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail='Media file not found',
-            )
-
-        buffer = await bot.download_file(file.file_path)
-
-        if hasattr(buffer, 'seek'):
-            buffer.seek(0)
-
-        content = buffer.read() if hasattr(buffer, 'read') else bytes(buffer)
-        filename = file.file_path.split('/')[-1]
-
-        media_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
-
-        return Response(
-            content=content,
-            media_type=media_type,
-            headers={
-                'Content-Disposition': f'inline; filename={filename}',
-                'Cache-Control': 'public, max-age=86400',  # Cache for 24 hours
-            },
-        )
-    except HTTPException:
-        raise
+        media = await media_proxy.get(file_id)
+    except MediaNotFoundError as error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Media file not found',
+        ) from error
     except Exception as error:
         logger.error('Failed to download media', file_id=file_id, error=error)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail='Failed to download media',
         ) from error
-    finally:
-        await bot.session.close()
+
+    # Cache for 24 hours
+    return build_media_response(request, media, cache_control='public, max-age=86400')
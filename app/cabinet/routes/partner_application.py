@@ -11,7 +11,7 @@ from app.database.models import AdvertisingCampaign, User
 from app.services.partner_application_service import partner_application_service
 from app.services.partner_stats_service import PartnerStatsService
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user
+from ..dependencies import get_cabinet_db, get_cabinet_read_db, get_current_cabinet_user
 from ..schemas.partners import (
     CampaignReferralItem,
     DailyStatItem,
@@ -106,7 +106,7 @@ async def get_partner_status(
 async def get_campaign_stats(
     campaign_id: int,
     user: User = Depends(get_current_cabinet_user),
-    db: AsyncSession = Depends(get_cabinet_db),
+    db: AsyncSession = Depends(get_cabinet_read_db),
 ):
     """Get detailed stats for a single campaign belonging to the current partner."""
     if not user.is_partner:
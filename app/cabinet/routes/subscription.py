@@ -26,6 +26,7 @@ from app.services.notification_delivery_service import (
     NotificationType,
     notification_delivery_service,
 )
+from app.services.price_matrix_service import price_matrix_service
 from app.services.remnawave_service import RemnaWaveService
 from app.services.subscription_purchase_service import (
     MiniAppSubscriptionPurchaseService,
@@ -1376,29 +1377,26 @@ async def _build_tariff_response(
 
     periods = []
     if tariff.period_prices:
-        for period_str, price_kopeks in sorted(tariff.period_prices.items(), key=lambda x: int(x[0])):
-            if int(price_kopeks) < 0:
-                continue  # Skip disabled periods (negative price)
-            period_days = int(period_str)
+        # Disabled periods (negative price) are skipped by the price matrix
+        for tariff_period in price_matrix_service.tariff_periods(tariff, promo_group):
+            period_days = tariff_period.period_days
             months = max(1, period_days // 30)
 
             # Базовая цена тарифа
-            base_tariff_price = int(price_kopeks)
+            base_tariff_price = tariff_period.price.original
 
             # Стоимость доп. устройств за этот период
             extra_devices_cost = extra_devices_count * extra_device_price_per_month * months
 
             # Apply promo group discount for this period (на базовую цену тарифа)
             original_price = base_tariff_price + extra_devices_cost
-            discount_percent = 0
+            discount_percent = tariff_period.price.discount_percent
             discount_amount = 0
             final_price = original_price
 
-            if promo_group:
-                discount_percent = promo_group.get_discount_percent('period', period_days)
-                if discount_percent > 0:
-                    discount_amount = original_price * discount_percent // 100
-                    final_price = original_price - discount_amount
+            if discount_percent > 0:
+                discount_amount = original_price * discount_percent // 100
+                final_price = original_price - discount_amount
 
             per_month = final_price // months if months > 0 else final_price
             original_per_month = original_price // months if months > 0 else original_price
@@ -2886,14 +2884,15 @@ async def get_available_countries(
     db: AsyncSession = Depends(get_cabinet_db),
 ) -> dict[str, Any]:
     """Get available countries/servers for the user."""
-    from app.database.crud.server_squad import get_available_server_squads
+    from app.services.catalog_service import catalog_service
     from app.utils.pricing_utils import apply_percentage_discount, calculate_prorated_price
 
     await db.refresh(user, ['subscription'])
 
     promo_group_id = user.promo_group_id
     # Exclude trial-only servers from available servers for purchase
-    available_servers = await get_available_server_squads(db, promo_group_id=promo_group_id, exclude_trial_only=True)
+    catalog = await catalog_service.get(db)
+    available_servers = catalog.get_available_servers(promo_group_id, exclude_trial_only=True)
 
     connected_squads = []
     days_left = 0
@@ -8,9 +8,9 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.crud.ticket_notification import TicketNotificationCRUD
-from app.database.models import User
 
-from ..dependencies import get_cabinet_db, get_current_cabinet_user, require_permission
+from ..auth.principal_cache import CabinetPrincipal
+from ..dependencies import get_cabinet_db, get_current_cabinet_principal, require_permission
 
 
 logger = structlog.get_logger(__name__)
@@ -54,7 +54,7 @@ async def get_user_notifications(
     unread_only: bool = Query(False, description='Only return unread notifications'),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_current_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get ticket notifications for current user."""
@@ -71,7 +71,7 @@ async def get_user_notifications(
 
 @router.get('/unread-count', response_model=UnreadCountResponse)
 async def get_user_unread_count(
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_current_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get unread notifications count for current user."""
@@ -82,7 +82,7 @@ async def get_user_unread_count(
 @router.post('/{notification_id}/read')
 async def mark_notification_as_read(
     notification_id: int,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_current_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Mark a notification as read."""
@@ -107,7 +107,7 @@ async def mark_notification_as_read(
 
 @router.post('/read-all')
 async def mark_all_notifications_as_read(
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_current_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Mark all notifications as read for current user."""
@@ -118,7 +118,7 @@ async def mark_all_notifications_as_read(
 @router.post('/ticket/{ticket_id}/read')
 async def mark_ticket_notifications_as_read(
     ticket_id: int,
-    user: User = Depends(get_current_cabinet_user),
+    user: CabinetPrincipal = Depends(get_current_cabinet_principal),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Mark all notifications for a specific ticket as read."""
@@ -132,7 +132,7 @@ async def get_admin_notifications(
     unread_only: bool = Query(False, description='Only return unread notifications'),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    admin: User = Depends(require_permission('tickets:read')),
+    admin: CabinetPrincipal = Depends(require_permission('tickets:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get ticket notifications for admins."""
@@ -149,7 +149,7 @@ async def get_admin_notifications(
 
 @admin_router.get('/unread-count', response_model=UnreadCountResponse)
 async def get_admin_unread_count(
-    admin: User = Depends(require_permission('tickets:read')),
+    admin: CabinetPrincipal = Depends(require_permission('tickets:read')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Get unread notifications count for admins."""
@@ -160,7 +160,7 @@ async def get_admin_unread_count(
 @admin_router.post('/{notification_id}/read')
 async def mark_admin_notification_as_read(
     notification_id: int,
-    admin: User = Depends(require_permission('tickets:settings')),
+    admin: CabinetPrincipal = Depends(require_permission('tickets:settings')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Mark an admin notification as read."""
@@ -185,7 +185,7 @@ async def mark_admin_notification_as_read(
 
 @admin_router.post('/read-all')
 async def mark_all_admin_notifications_as_read(
-    admin: User = Depends(require_permission('tickets:settings')),
+    admin: CabinetPrincipal = Depends(require_permission('tickets:settings')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Mark all admin notifications as read."""
@@ -196,7 +196,7 @@ async def mark_all_admin_notifications_as_read(
 @admin_router.post('/ticket/{ticket_id}/read')
 async def mark_admin_ticket_notifications_as_read(
     ticket_id: int,
-    admin: User = Depends(require_permission('tickets:settings')),
+    admin: CabinetPrincipal = Depends(require_permission('tickets:settings')),
     db: AsyncSession = Depends(get_cabinet_db),
 ):
     """Mark all admin notifications for a specific ticket as read."""
@@ -12,6 +12,7 @@ from app.cabinet.auth.jwt_handler import get_token_payload
 from app.config import settings
 from app.database.crud.user import get_user_by_id
 from app.database.database import AsyncSessionLocal
+from app.services.ws_backplane import ws_backplane
 
 
 logger = structlog.get_logger(__name__)
@@ -19,8 +20,16 @@ logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
+CABINET_WS_TOPIC = 'cabinet'
+
+
 class CabinetConnectionManager:
-    """Менеджер WebSocket подключений для кабинета."""
+    """Менеджер WebSocket подключений для кабинета.
+
+    ``send_to_user``/``send_to_admins`` publish through the backplane so the
+    replica holding the socket delivers the message; ``deliver_*`` send to
+    the sockets of this process only.
+    """
 
     def __init__(self):
         # user_id -> set of websocket connections
@@ -31,6 +40,8 @@ class CabinetConnectionManager:
 
     async def connect(self, websocket: WebSocket, user_id: int, is_admin: bool) -> None:
         """Зарегистрировать подключение."""
+        ws_backplane.ensure_listening()
+
         async with self._lock:
             if user_id not in self._user_connections:
                 self._user_connections[user_id] = set()
@@ -64,7 +75,26 @@ class CabinetConnectionManager:
         logger.debug('Cabinet WS disconnected: user_id', user_id=user_id)
 
     async def send_to_user(self, user_id: int, message: dict) -> None:
-        """Отправить сообщение конкретному пользователю."""
+        """Отправить сообщение конкретному пользователю (на любой реплике)."""
+        await ws_backplane.publish(CABINET_WS_TOPIC, {'scope': 'user', 'user_id': user_id, 'message': message})
+
+    async def send_to_admins(self, message: dict) -> None:
+        """Отправить сообщение всем админам (на любой реплике)."""
+        await ws_backplane.publish(CABINET_WS_TOPIC, {'scope': 'admins', 'message': message})
+
+    async def handle_backplane_message(self, envelope: dict) -> None:
+        """Доставить сообщение из backplane локальным подключениям."""
+        message = envelope.get('message')
+        if not isinstance(message, dict):
+            return
+
+        if envelope.get('scope') == 'admins':
+            await self.deliver_to_admins(message)
+        elif envelope.get('scope') == 'user' and envelope.get('user_id') is not None:
+            await self.deliver_to_user(int(envelope['user_id']), message)
+
+    async def deliver_to_user(self, user_id: int, message: dict) -> None:
+        """Отправить сообщение подключениям пользователя в этом процессе."""
         # Snapshot connections under the lock to avoid mutation during iteration
         async with self._lock:
             connections = list(self._user_connections.get(user_id, set()))
@@ -88,8 +118,8 @@ class CabinetConnectionManager:
                 for ws in disconnected:
                     self._user_connections.get(user_id, set()).discard(ws)
 
-    async def send_to_admins(self, message: dict) -> None:
-        """Отправить сообщение всем админам."""
+    async def deliver_to_admins(self, message: dict) -> None:
+        """Отправить сообщение подключениям админов в этом процессе."""
         # Snapshot connections under the lock to avoid mutation during iteration
         async with self._lock:
             if not self._admin_connections:
@@ -120,6 +150,7 @@ class CabinetConnectionManager:
 
 # Глобальный менеджер подключений
 cabinet_ws_manager = CabinetConnectionManager()
+ws_backplane.register_topic(CABINET_WS_TOPIC, cabinet_ws_manager.handle_backplane_message)
 
 
 async def verify_cabinet_ws_token(token: str) -> tuple[int | None, bool]:
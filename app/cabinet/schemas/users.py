@@ -120,9 +120,10 @@ class UsersListResponse(BaseModel):
     """Paginated list of users."""
 
     users: list[UserListItem]
-    total: int
+    total: int  # approximate for the unfiltered list
     offset: int = 0
     limit: int = 50
+    next_cursor: str | None = None
 
 
 # === User Detail ===
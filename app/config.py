@@ -85,6 +85,18 @@ class Settings(BaseSettings):
 
     DATABASE_MODE: str = 'auto'
 
+    # Реплика только для чтения: аналитика, отчёты, экспорты, бекапы (пусто — всё читается с основной БД)
+    DATABASE_READ_REPLICA_URL: str | None = None
+    DATABASE_READ_REPLICA_MAX_LAG_SECONDS: float = 30.0  # При большем отставании чтение уходит на основную БД
+    DATABASE_READ_REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 10.0  # Как часто перепроверять отставание
+
+    # Допуск к пулу соединений по приоритетам: платежи/вебхуки > действия пользователей > фоновые задачи
+    DB_POOL_ADMISSION_ENABLED: bool = True
+    DB_POOL_RESERVED_CRITICAL: int = 5  # Соединения, которые доступны только платежам и вебхукам
+    DB_POOL_RESERVED_INTERACTIVE: int = 10  # Сверх них — недоступны фоновым задачам
+    DB_POOL_ADMISSION_WAIT_SECONDS: float = 2.0  # Ожидание свободного места до отказа («попробуйте позже»)
+    DB_POOL_BACKGROUND_BACKOFF_PERCENT: int = 70  # Загрузка пула, при которой фоновые циклы притормаживают
+
     REDIS_URL: str = 'redis://localhost:6379/0'
     CART_TTL_SECONDS: int = 3600  # Время жизни корзины пользователя в Redis (1 час)
 
@@ -101,6 +113,8 @@ class Settings(BaseSettings):
     REMNAWAVE_USER_DELETE_MODE: str = 'delete'  # "delete" или "disable"
     REMNAWAVE_AUTO_SYNC_ENABLED: bool = False
     REMNAWAVE_AUTO_SYNC_TIMES: str = '03:00'
+    REMNAWAVE_BULK_IMPORT_MIN_USERS: int = 50  # Порог новых пользователей панели для пакетного импорта
+    REMNAWAVE_BULK_IMPORT_CHUNK_SIZE: int = 1000
     CABINET_REMNA_SUB_CONFIG: str | None = None  # UUID конфига страницы подписки из RemnaWave
 
     # RemnaWave incoming webhooks (real-time event delivery from backend)
@@ -305,6 +319,7 @@ class Settings(BaseSettings):
     SUBSCRIPTION_RENEWAL_BALANCE_THRESHOLD_KOPEKS: int = 20000
 
     MONITORING_INTERVAL: int = 60
+    SUBSCRIPTION_EXPIRY_MAX_SLEEP_SECONDS: int = 300  # Максимальный сон планировщика истечения подписок
     INACTIVE_USER_DELETE_MONTHS: int = 3
 
     MAINTENANCE_MODE: bool = False
@@ -669,6 +684,12 @@ class Settings(BaseSettings):
     )
 
     DEBUG: bool = False
+    QUERY_PROFILER_ENABLED: bool = (
+        True  # Отпечатки SQL-запросов и время по обработчикам/маршрутам/задачам (GET /metrics/queries)
+    )
+    QUERY_PROFILER_N_PLUS_ONE_THRESHOLD: int = (
+        20  # Повторов одного запроса в единице работы, после которых это считается N+1 (0 — выкл.)
+    )
     WEBHOOK_URL: str | None = None
     WEBHOOK_PATH: str = '/webhook'
     WEBHOOK_SECRET_TOKEN: str | None = None
@@ -691,7 +712,28 @@ class Settings(BaseSettings):
     WEB_API_DEFAULT_TOKEN_NAME: str = 'Bootstrap Token'
     WEB_API_TOKEN_HASH_ALGORITHM: str = 'sha256'
     WEB_API_TOKEN_HMAC_SECRET: str | None = None
+    WEB_API_TOKEN_CACHE_TTL_SECONDS: int = 60  # Кеш проверенных токенов в памяти, 0 — отключить
+    WEB_API_TOKEN_USAGE_FLUSH_INTERVAL_SECONDS: int = 30  # Как часто сохранять last_used_at/IP токенов
     WEB_API_REQUEST_LOGGING: bool = True
+    FAST_JSON_ENABLED: bool = False  # orjson для ответов API и значений кеша (нужен пакет orjson)
+
+    # Очередь исходящих webhooks (доставка в фоне с повторами)
+    OUTBOUND_WEBHOOK_MAX_ATTEMPTS: int = 6
+    OUTBOUND_WEBHOOK_RETRY_BASE_SECONDS: int = 10  # Первая задержка, дальше удваивается (со случайным разбросом)
+    OUTBOUND_WEBHOOK_RETRY_MAX_SECONDS: int = 3600
+    OUTBOUND_WEBHOOK_CONCURRENCY_PER_ENDPOINT: int = 2
+    OUTBOUND_WEBHOOK_BATCH_SIZE: int = 1  # >1 — несколько событий в одном POST ({"events": [...]})
+    OUTBOUND_WEBHOOK_POLL_INTERVAL_SECONDS: int = 2
+
+    # Дневные агрегаты статистики (stats_daily_*): графики и отчёты читают закрытые дни из них
+    STATS_ROLLUP_ENABLED: bool = True
+    STATS_ROLLUP_RECONCILE_DAYS: int = 3  # Сколько последних закрытых дней пересчитывать каждую ночь
+    STATS_ROLLUP_BACKFILL_DAYS: int = 730  # Глубина заполнения истории при первом запуске
+    # Ночная сверка денормализованных трат пользователей (total_spent_kopeks, purchase_count, last_purchase_at)
+    USER_SPENDING_RECONCILE_ENABLED: bool = True
+
+    # Журнал изменений счётчиков серверов (server_squad_user_deltas) сворачивается в current_users
+    SERVER_USER_COUNTER_FOLD_INTERVAL_SECONDS: int = 30
 
     ENABLE_DEEP_LINKS: bool = True
     APP_CONFIG_CACHE_TTL: int = 3600
@@ -724,9 +766,14 @@ class Settings(BaseSettings):
     CABINET_EMAIL_VERIFICATION_ENABLED: bool = True
     CABINET_EMAIL_VERIFICATION_EXPIRE_HOURS: int = 24
     CABINET_PASSWORD_RESET_EXPIRE_HOURS: int = 1
+    CABINET_PASSWORD_HASH_WORKERS: int = 2  # Потоки для bcrypt (хеширование/проверка паролей)
+    CABINET_PASSWORD_HASH_MAX_PENDING: int = 16  # Очередь сверх потоков, дальше — 429
     CABINET_EMAIL_CHANGE_CODE_EXPIRE_MINUTES: int = 15  # Email change verification code expiration
     CABINET_EMAIL_AUTH_ENABLED: bool = True  # Enable email registration/login in cabinet
     CABINET_URL: str = 'https://example.com/cabinet'  # Base URL for cabinet (used in verification emails)
+    CABINET_PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # Кеш авторизованного пользователя кабинета, 0 — отключить
+    MEDIA_CACHE_DIR: str = 'data/media_cache'  # Дисковый кеш вложений тикетов из Telegram
+    MEDIA_CACHE_MAX_SIZE_MB: int = 512  # Лимит кеша, старые файлы удаляются первыми
 
     # OAuth 2.0 provider settings for cabinet
     OAUTH_GOOGLE_CLIENT_ID: str = ''
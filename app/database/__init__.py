@@ -9,6 +9,7 @@ from .database import (
     get_db_read_only,
     get_pool_metrics,
     sync_postgres_sequences,
+    with_read_only_db,
 )
 
 
@@ -21,4 +22,5 @@ __all__ = [
     'get_db_read_only',
     'get_pool_metrics',
     'sync_postgres_sequences',
+    'with_read_only_db',
 ]
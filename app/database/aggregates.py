@@ -0,0 +1,55 @@
+"""Conditional aggregates for single-pass statistics queries.
+
+``count_if(cond)`` and ``sum_if(value, cond)`` let one ``SELECT`` compute many
+counters over the same rows (``GROUP BY`` or whole-table) instead of one query
+per counter. PostgreSQL gets the native ``FILTER (WHERE ...)`` clause; other
+dialects (SQLite in tests and small installs) get the equivalent
+``SUM(CASE WHEN ... END)``. Both forms return ``0`` rather than ``NULL`` when
+no row matches.
+"""
+
+from typing import Any
+
+from sqlalchemy import BigInteger, case, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class count_if(FunctionElement):  # noqa: N801 - SQL function naming
+    """``COUNT(*) FILTER (WHERE cond)``."""
+
+    type = BigInteger()
+    name = 'count_if'
+    inherit_cache = True
+
+
+class sum_if(FunctionElement):  # noqa: N801 - SQL function naming
+    """``COALESCE(SUM(value) FILTER (WHERE cond), 0)``."""
+
+    type = BigInteger()
+    name = 'sum_if'
+    inherit_cache = True
+
+
+@compiles(count_if)
+def _count_if_default(element: count_if, compiler: Any, **kw: Any) -> str:
+    (condition,) = element.clauses
+    return compiler.process(func.coalesce(func.sum(case((condition, 1), else_=0)), 0), **kw)
+
+
+@compiles(count_if, 'postgresql')
+def _count_if_postgresql(element: count_if, compiler: Any, **kw: Any) -> str:
+    (condition,) = element.clauses
+    return compiler.process(func.count().filter(condition), **kw)
+
+
+@compiles(sum_if)
+def _sum_if_default(element: sum_if, compiler: Any, **kw: Any) -> str:
+    value, condition = element.clauses
+    return compiler.process(func.coalesce(func.sum(case((condition, value), else_=0)), 0), **kw)
+
+
+@compiles(sum_if, 'postgresql')
+def _sum_if_postgresql(element: sum_if, compiler: Any, **kw: Any) -> str:
+    value, condition = element.clauses
+    return compiler.process(func.coalesce(func.sum(value).filter(condition), 0), **kw)
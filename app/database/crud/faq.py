@@ -6,6 +6,7 @@ from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import FaqPage, FaqSetting
+from app.utils.content_cache import ContentType, content_cache
 
 
 logger = structlog.get_logger(__name__)
@@ -30,6 +31,7 @@ async def set_faq_enabled(db: AsyncSession, language: str, enabled: bool) -> Faq
         db.add(setting)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.FAQ)
     await db.refresh(setting)
 
     logger.info(
@@ -92,6 +94,7 @@ async def create_faq_page(
 
     db.add(page)
     await db.commit()
+    await content_cache.invalidate(ContentType.FAQ)
     await db.refresh(page)
 
     logger.info('✅ Создана страница FAQ для языка', page_id=page.id, language=language)
@@ -120,6 +123,7 @@ async def update_faq_page(
     page.updated_at = datetime.now(UTC)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.FAQ)
     await db.refresh(page)
 
     logger.info('✅ Страница FAQ обновлена', page_id=page.id)
@@ -130,6 +134,7 @@ async def update_faq_page(
 async def delete_faq_page(db: AsyncSession, page_id: int) -> None:
     await db.execute(delete(FaqPage).where(FaqPage.id == page_id))
     await db.commit()
+    await content_cache.invalidate(ContentType.FAQ)
     logger.info('🗑️ Страница FAQ удалена', page_id=page_id)
 
 
@@ -142,3 +147,4 @@ async def bulk_update_order(
             update(FaqPage).where(FaqPage.id == page_id).values(display_order=order, updated_at=datetime.now(UTC))
         )
     await db.commit()
+    await content_cache.invalidate(ContentType.FAQ)
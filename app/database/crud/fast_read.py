@@ -0,0 +1,166 @@
+"""Read-only fast path for the hottest lookups: Core selects into slotted rows.
+
+``get_user_by_telegram_id`` and friends load full ORM graphs (selectinload
+of subscription, tariff, promo groups, referrer) and register every object
+in the session identity map. Callers that only show a few fields or check a
+status pay for all of it. The functions here run one Core ``SELECT`` of the
+needed table columns and return frozen ``dataclass(slots=True)`` rows.
+
+Statements are built once at import with ``bindparam`` placeholders, so
+SQLAlchemy's compiled cache is hit on every call and no statement is
+constructed per request. Rows are detached snapshots: not tracked by the
+session, never lazy-load and cannot be modified. Paths that change the user
+or subscription must keep using the ORM getters.
+
+``python -m benchmarks.fast_read`` compares the cost per call with the ORM
+getters.
+"""
+
+from dataclasses import dataclass, fields, replace
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import Select, Table, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import (
+    Subscription,
+    SubscriptionStatus,
+    Tariff,
+    User,
+    UserChannelSubscription,
+    _aware,
+)
+
+
+@dataclass(slots=True, frozen=True)
+class UserRow:
+    id: int
+    telegram_id: int | None
+    username: str | None
+    first_name: str | None
+    last_name: str | None
+    email: str | None
+    status: str
+    language: str
+    balance_kopeks: int
+    remnawave_uuid: str | None
+    referral_code: str | None
+    referred_by_id: int | None
+    promo_group_id: int | None
+    has_had_paid_subscription: bool
+
+    @property
+    def full_name(self) -> str:
+        """Как ``User.full_name``."""
+        name = ' '.join(filter(None, (self.first_name, self.last_name)))
+        if name:
+            return name
+        if self.username:
+            return self.username
+        if self.telegram_id:
+            return f'ID{self.telegram_id}'
+        if self.email:
+            return self.email.split('@')[0]
+        return f'User{self.id}'
+
+
+@dataclass(slots=True, frozen=True)
+class SubscriptionRow:
+    id: int
+    user_id: int
+    status: str
+    is_trial: bool
+    start_date: datetime | None
+    end_date: datetime | None
+    traffic_limit_gb: int
+    traffic_used_gb: float
+    device_limit: int
+    connected_squads: list[str] | None
+    tariff_id: int | None
+    is_daily_paused: bool
+    autopay_enabled: bool
+
+    @property
+    def is_active(self) -> bool:
+        """Как ``Subscription.is_active``."""
+        end = _aware(self.end_date)
+        return self.status == SubscriptionStatus.ACTIVE.value and end is not None and end > datetime.now(UTC)
+
+
+@dataclass(slots=True, frozen=True)
+class TariffRow:
+    id: int
+    name: str
+    is_active: bool
+    is_daily: bool
+    daily_price_kopeks: int
+    traffic_limit_gb: int
+    device_limit: int
+    tier_level: int
+    allowed_squads: list[str] | None
+    period_prices: dict[str, int] | None
+
+
+@dataclass(slots=True, frozen=True)
+class ChannelSubRow:
+    channel_id: str
+    is_member: bool
+    checked_at: datetime | None
+
+
+def _select_row(table: Table, row_type: type) -> Select:
+    return select(*(table.c[field.name] for field in fields(row_type)))
+
+
+_users = User.__table__
+_subscriptions = Subscription.__table__
+
+_USER_BY_ID = _select_row(_users, UserRow).where(_users.c.id == bindparam('user_id'))
+_USER_BY_TELEGRAM_ID = _select_row(_users, UserRow).where(_users.c.telegram_id == bindparam('telegram_id'))
+_SUBSCRIPTION_BY_USER_ID = _select_row(_subscriptions, SubscriptionRow).where(
+    _subscriptions.c.user_id == bindparam('user_id')
+)
+_TARIFF_BY_ID = _select_row(Tariff.__table__, TariffRow).where(Tariff.__table__.c.id == bindparam('tariff_id'))
+_CHANNEL_SUBS_BY_TELEGRAM_ID = _select_row(UserChannelSubscription.__table__, ChannelSubRow).where(
+    UserChannelSubscription.__table__.c.telegram_id == bindparam('telegram_id')
+)
+
+
+async def _fetch_one(db: AsyncSession, statement: Select, row_type: type, params: dict[str, Any]):
+    row = (await db.execute(statement, params)).first()
+    return row_type(*row) if row is not None else None
+
+
+async def get_user_row_by_id(db: AsyncSession, user_id: int) -> UserRow | None:
+    return await _fetch_one(db, _USER_BY_ID, UserRow, {'user_id': user_id})
+
+
+async def get_user_row_by_telegram_id(db: AsyncSession, telegram_id: int) -> UserRow | None:
+    return await _fetch_one(db, _USER_BY_TELEGRAM_ID, UserRow, {'telegram_id': telegram_id})
+
+
+async def get_subscription_row_by_user_id(db: AsyncSession, user_id: int) -> SubscriptionRow | None:
+    """Подписка пользователя; просроченная активная отдаётся со статусом ``expired``.
+
+    Как и ``get_subscription_by_user_id``, но без записи статуса в базу —
+    её сделает планировщик истечения подписок.
+    """
+    subscription = await _fetch_one(db, _SUBSCRIPTION_BY_USER_ID, SubscriptionRow, {'user_id': user_id})
+    if (
+        subscription is not None
+        and subscription.status == SubscriptionStatus.ACTIVE.value
+        and not subscription.is_daily_paused
+        and not subscription.is_active
+    ):
+        return replace(subscription, status=SubscriptionStatus.EXPIRED.value)
+    return subscription
+
+
+async def get_tariff_row_by_id(db: AsyncSession, tariff_id: int) -> TariffRow | None:
+    return await _fetch_one(db, _TARIFF_BY_ID, TariffRow, {'tariff_id': tariff_id})
+
+
+async def get_user_channel_sub_rows(db: AsyncSession, telegram_id: int) -> list[ChannelSubRow]:
+    result = await db.execute(_CHANNEL_SUBS_BY_TELEGRAM_ID, {'telegram_id': telegram_id})
+    return [ChannelSubRow(*row) for row in result]
@@ -1,3 +1,5 @@
+from collections.abc import Collection
+
 import structlog
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -28,6 +30,23 @@ async def notification_sent(
     return result.scalars().first() is not None
 
 
+async def get_sent_notification_keys(
+    db: AsyncSession,
+    subscription_ids: Collection[int],
+    notification_type: str,
+) -> set[tuple[int, int | None]]:
+    """Пары ``(subscription_id, days_before)`` уже отправленных уведомлений типа — одним запросом."""
+    if not subscription_ids:
+        return set()
+    result = await db.execute(
+        select(SentNotification.subscription_id, SentNotification.days_before).where(
+            SentNotification.subscription_id.in_(subscription_ids),
+            SentNotification.notification_type == notification_type,
+        )
+    )
+    return {(subscription_id, days_before) for subscription_id, days_before in result}
+
+
 async def record_notification(
     db: AsyncSession,
     user_id: int,
@@ -0,0 +1,209 @@
+"""Bulk import of panel users: chunked upserts instead of one ORM object per row.
+
+Used by ``RemnaWaveService.sync_users_from_panel`` for panel users that are not
+in the bot yet (typically the initial import of an existing panel). Rows are
+staged as :class:`PanelImportRow` and applied per chunk:
+
+* users — ``INSERT ... ON CONFLICT (telegram_id) DO UPDATE``; referral codes are
+  generated up front and checked against the table with one query per chunk,
+  the default promo group is resolved once;
+* subscriptions — ``INSERT ... ON CONFLICT (user_id) DO UPDATE`` of the fields
+  the panel owns (``end_date`` only moves forward, an active subscription is
+  not expired by the panel — as in the per-user sync);
+* ``subscription_squads`` — rewritten for the affected subscriptions, because
+  Core inserts bypass the ORM hooks that normally maintain it.
+
+PostgreSQL and SQLite both support the upsert; SQLAlchemy sends each chunk as a
+batched executemany with ``RETURNING``.
+"""
+
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.crud.subscription_squads import squad_uuids_of
+from app.database.crud.user import _get_or_create_default_promo_group, generate_referral_code
+from app.database.models import Subscription, SubscriptionSquad, SubscriptionStatus, User
+from app.utils.validators import sanitize_telegram_name
+
+
+logger = structlog.get_logger(__name__)
+
+PANEL_IMPORT_CHUNK_SIZE = 1000
+# Поля подписки, которые при конфликте берутся из панели
+_PANEL_SUBSCRIPTION_FIELDS = (
+    'traffic_limit_gb',
+    'traffic_used_gb',
+    'device_limit',
+    'connected_squads',
+    'remnawave_short_uuid',
+    'subscription_url',
+    'subscription_crypto_link',
+)
+
+
+@dataclass(slots=True)
+class PanelImportRow:
+    telegram_id: int
+    username: str | None
+    first_name: str | None
+    last_name: str | None
+    remnawave_uuid: str | None
+    subscription: dict[str, Any]
+
+
+@dataclass(slots=True)
+class PanelImportResult:
+    users_created: int = 0
+    users_existing: int = 0
+    subscriptions: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.users_created + self.users_existing
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _upsert(db: AsyncSession, model):
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        raise NotImplementedError(f'Пакетный импорт не поддерживает диалект {dialect_name}')
+    return upsert(model)
+
+
+async def _unique_referral_codes(db: AsyncSession, count: int) -> list[str]:
+    codes: set[str] = set()
+    while len(codes) < count:
+        candidates = {generate_referral_code() for _ in range(count - len(codes))} - codes
+        taken = await db.execute(select(User.referral_code).where(User.referral_code.in_(candidates)))
+        codes |= candidates - set(taken.scalars())
+    return list(codes)
+
+
+async def _upsert_users(db: AsyncSession, rows: Sequence[PanelImportRow], promo_group_id: int) -> dict[int, tuple]:
+    codes = await _unique_referral_codes(db, len(rows))
+    stmt = _upsert(db, User)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={'remnawave_uuid': func.coalesce(User.remnawave_uuid, stmt.excluded.remnawave_uuid)},
+    ).returning(User.telegram_id, User.id, User.referral_code)
+
+    result = await db.execute(
+        stmt,
+        [
+            {
+                'telegram_id': row.telegram_id,
+                'username': row.username,
+                'first_name': sanitize_telegram_name(row.first_name),
+                'last_name': sanitize_telegram_name(row.last_name),
+                'language': 'ru',
+                'referral_code': code,
+                'remnawave_uuid': row.remnawave_uuid,
+                'balance_kopeks': 0,
+                'has_had_paid_subscription': False,
+                'has_made_first_topup': False,
+                'promo_group_id': promo_group_id,
+            }
+            for row, code in zip(rows, codes, strict=True)
+        ],
+    )
+    # Сгенерированный код вернулся — строка вставлена; иначе пользователь уже был
+    new_codes = set(codes)
+    return {telegram_id: (user_id, referral_code in new_codes) for telegram_id, user_id, referral_code in result.all()}
+
+
+async def _upsert_subscriptions(db: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    stmt = _upsert(db, Subscription)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Subscription.user_id],
+        set_={
+            **{field: excluded[field] for field in _PANEL_SUBSCRIPTION_FIELDS},
+            'end_date': case(
+                (excluded.end_date > Subscription.end_date, excluded.end_date),
+                else_=Subscription.end_date,
+            ),
+            'status': case(
+                (
+                    and_(
+                        excluded.status == SubscriptionStatus.EXPIRED.value,
+                        Subscription.status == SubscriptionStatus.ACTIVE.value,
+                    ),
+                    Subscription.status,
+                ),
+                else_=excluded.status,
+            ),
+            'updated_at': func.now(),
+        },
+    ).returning(Subscription.id, Subscription.connected_squads)
+    returned = (await db.execute(stmt, rows)).all()
+
+    subscription_ids = [subscription_id for subscription_id, _ in returned]
+    await db.execute(delete(SubscriptionSquad).where(SubscriptionSquad.subscription_id.in_(subscription_ids)))
+    squad_rows = [
+        {'subscription_id': subscription_id, 'squad_uuid': squad_uuid}
+        for subscription_id, connected_squads in returned
+        for squad_uuid in sorted(squad_uuids_of(connected_squads))
+    ]
+    if squad_rows:
+        await db.execute(insert(SubscriptionSquad), squad_rows)
+    return len(returned)
+
+
+async def import_panel_users(
+    db: AsyncSession,
+    rows: Sequence[PanelImportRow],
+    chunk_size: int = PANEL_IMPORT_CHUNK_SIZE,
+) -> PanelImportResult:
+    """Импортирует пользователей панели с подписками пакетами; коммит — за вызывающим."""
+    started_at = time.perf_counter()
+    result = PanelImportResult()
+    # Повтор telegram_id в одном пакете ON CONFLICT не допускает
+    rows = list({row.telegram_id: row for row in rows}.values())
+    if not rows:
+        return result
+
+    chunk_size = max(chunk_size, 1)
+    promo_group = await _get_or_create_default_promo_group(db)
+    autopay_defaults = {
+        'autopay_enabled': settings.is_autopay_enabled_by_default(),
+        'autopay_days_before': settings.DEFAULT_AUTOPAY_DAYS_BEFORE,
+    }
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        users = await _upsert_users(db, chunk, promo_group.id)
+        result.users_created += sum(created for _, created in users.values())
+        result.users_existing += sum(not created for _, created in users.values())
+
+        subscription_rows = [
+            {**autopay_defaults, **row.subscription, 'user_id': users[row.telegram_id][0]}
+            for row in chunk
+            if row.telegram_id in users
+        ]
+        if subscription_rows:
+            result.subscriptions += await _upsert_subscriptions(db, subscription_rows)
+
+    result.seconds = time.perf_counter() - started_at
+    logger.info(
+        '📦 Пакетный импорт пользователей панели',
+        users_created=result.users_created,
+        users_existing=result.users_existing,
+        subscriptions=result.subscriptions,
+        seconds=round(result.seconds, 3),
+        rows_per_second=round(result.rows_per_second, 1),
+    )
+    return result
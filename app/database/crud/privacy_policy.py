@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import PrivacyPolicy
+from app.utils.content_cache import ContentType, content_cache
 
 
 logger = structlog.get_logger(__name__)
@@ -36,6 +37,7 @@ async def upsert_privacy_policy(
         db.add(policy)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.PRIVACY_POLICY)
     await db.refresh(policy)
 
     logger.info('✅ Политика конфиденциальности для языка обновлена (ID:)', language=language, policy_id=policy.id)
@@ -62,6 +64,7 @@ async def set_privacy_policy_enabled(
         db.add(policy)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.PRIVACY_POLICY)
     await db.refresh(policy)
 
     logger.info(
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database.models import PromoGroup, User, UserPromoGroup
+from app.utils.content_cache import ContentType, content_cache
 
 
 def _normalize_period_discounts(period_discounts: dict[int, int] | None) -> dict[int, int]:
@@ -239,6 +240,9 @@ async def delete_promo_group(db: AsyncSession, group: PromoGroup) -> bool:
 
     await db.delete(group)
     await db.commit()
+    # Связи с тарифами и серверами удаляются каскадом
+    await content_cache.invalidate(ContentType.TARIFFS)
+    await content_cache.invalidate(ContentType.SERVERS)
 
     logger.info(
         "Промогруппа '' (id=) удалена, пользователи переведены в ''",
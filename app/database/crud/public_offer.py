@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import PublicOffer
+from app.utils.content_cache import ContentType, content_cache
 
 
 logger = structlog.get_logger(__name__)
@@ -36,6 +37,7 @@ async def upsert_public_offer(
         db.add(offer)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.PUBLIC_OFFER)
     await db.refresh(offer)
 
     logger.info('✅ Публичная оферта для языка обновлена (ID:)', language=language, offer_id=offer.id)
@@ -62,6 +64,7 @@ async def set_public_offer_enabled(
         db.add(offer)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.PUBLIC_OFFER)
     await db.refresh(offer)
 
     logger.info(
@@ -445,8 +445,7 @@ class AuditLogCRUD:
         return entry
 
     @staticmethod
-    async def get_logs(
-        db: AsyncSession,
+    def build_filters(
         *,
         user_id: int | None = None,
         action: str | None = None,
@@ -454,15 +453,8 @@ class AuditLogCRUD:
         status: str | None = None,
         date_from: datetime | None = None,
         date_to: datetime | None = None,
-        limit: int = 50,
-        offset: int = 0,
-        load_user: bool = False,
-    ) -> tuple[list[AdminAuditLog], int]:
-        """Get filtered audit logs with total count.
-
-        Returns:
-            (logs, total_count)
-        """
+    ) -> list:
+        """Build WHERE conditions shared by the list and export queries."""
         filters = []
         if user_id is not None:
             filters.append(AdminAuditLog.user_id == user_id)
@@ -476,7 +468,35 @@ class AuditLogCRUD:
             filters.append(AdminAuditLog.created_at >= date_from)
         if date_to is not None:
             filters.append(AdminAuditLog.created_at <= date_to)
+        return filters
 
+    @staticmethod
+    async def get_logs(
+        db: AsyncSession,
+        *,
+        user_id: int | None = None,
+        action: str | None = None,
+        resource_type: str | None = None,
+        status: str | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        load_user: bool = False,
+    ) -> tuple[list[AdminAuditLog], int]:
+        """Get filtered audit logs with total count.
+
+        Returns:
+            (logs, total_count)
+        """
+        filters = AuditLogCRUD.build_filters(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+        )
         where_clause = and_(*filters) if filters else True
 
         # Total count
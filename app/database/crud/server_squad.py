@@ -1,35 +1,43 @@
 import random
+from collections import Counter
 from collections.abc import Iterable, Sequence
 from datetime import UTC, datetime
+from typing import Any
 
 import structlog
 from sqlalchemy import (
-    String,
     and_,
-    cast,
+    case,
     delete,
     func,
+    insert,
     or_,
     select,
-    text,
     update,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.database.aggregates import count_if
+from app.database.crud.subscription_squads import ACTIVE_STATUSES, on_squad, subscription_ids_on_squads
 from app.database.models import (
     PromoGroup,
     ServerSquad,
+    ServerSquadUserDelta,
     Subscription,
     SubscriptionServer,
-    SubscriptionStatus,
+    SubscriptionSquad,
     Tariff,
     User,
 )
+from app.utils.content_cache import ContentType, content_cache
 
 
 logger = structlog.get_logger(__name__)
 
+# Ключ advisory-блокировки журнала счётчиков: запись — разделяемая, пересчёт — исключительная
+_USER_DELTAS_LOCK_KEY = 3091
+
 
 async def _get_default_promo_group_id(db: AsyncSession) -> int | None:
     result = await db.execute(select(PromoGroup.id).where(PromoGroup.is_default.is_(True)).limit(1))
@@ -83,6 +91,7 @@ async def create_server_squad(
     db.add(server_squad)
     await db.commit()
     await db.refresh(server_squad)
+    await content_cache.invalidate(ContentType.SERVERS)
 
     logger.info('✅ Создан сервер (UUID: )', display_name=display_name, squad_uuid=squad_uuid)
     return server_squad
@@ -160,10 +169,11 @@ async def get_active_server_squads(db: AsyncSession) -> list[ServerSquad]:
         return []
 
     eligible: list[ServerSquad] = []
+    counts = await get_server_user_counts(db, [squad.id for squad in squads if squad.max_users is not None])
 
     for squad in squads:
         max_users = squad.max_users
-        current_users = squad.current_users or 0
+        current_users = counts.get(squad.id, squad.current_users or 0)
 
         if max_users is not None and current_users >= max_users:
             continue
@@ -224,6 +234,7 @@ async def update_server_squad_promo_groups(
     server.allowed_promo_groups = promo_groups
     await db.commit()
     await db.refresh(server)
+    await content_cache.invalidate(ContentType.SERVERS)
 
     logger.info(
         'Обновлены промогруппы сервера %s (ID: %s): %s',
@@ -256,6 +267,7 @@ async def update_server_squad(db: AsyncSession, server_id: int, **updates) -> Se
     await db.execute(update(ServerSquad).where(ServerSquad.id == server_id).values(**filtered_updates))
 
     await db.commit()
+    await content_cache.invalidate(ContentType.SERVERS)
 
     return await get_server_squad_by_id(db, server_id)
 
@@ -276,6 +288,7 @@ async def delete_server_squad(db: AsyncSession, server_id: int) -> bool:
 
     await db.execute(delete(ServerSquad).where(ServerSquad.id == server_id))
     await db.commit()
+    await content_cache.invalidate(ContentType.SERVERS)
 
     logger.info('🗑️ Удален сервер (ID: )', server_id=server_id)
     return True
@@ -337,13 +350,10 @@ async def sync_with_remnawave(db: AsyncSession, remnawave_squads: list[dict]) ->
             for subscription in subscriptions_result.scalars().unique().all():
                 subscriptions_to_update[subscription.id] = subscription
 
-        for squad_uuid in removed_uuids:
-            if not squad_uuid:
-                continue
-
+        removed_squad_uuids = [squad_uuid for squad_uuid in removed_uuids if squad_uuid]
+        if removed_squad_uuids:
             extra_result = await db.execute(
-                select(Subscription).where(text('connected_squads::text LIKE :uuid_pattern')),
-                {'uuid_pattern': f'%"{squad_uuid}"%'},
+                select(Subscription).where(Subscription.id.in_(subscription_ids_on_squads(removed_squad_uuids)))
             )
 
             for subscription in extra_result.scalars().unique().all():
@@ -392,6 +402,9 @@ async def sync_with_remnawave(db: AsyncSession, remnawave_squads: list[dict]) ->
             logger.info('🧹 Обновлены тарифы после удаления серверов', cleaned_tariffs=cleaned_tariffs)
 
     await db.commit()
+    await content_cache.invalidate(ContentType.SERVERS)
+    # Удалённые сквады вычищаются и из allowed_squads тарифов
+    await content_cache.invalidate(ContentType.TARIFFS)
 
     logger.info('🔄 Синхронизация завершена: + ~', created=created, updated=updated, removed=removed)
     return created, updated, removed
@@ -404,7 +417,7 @@ async def get_server_connected_users(db: AsyncSession, server_id: int) -> list[U
     connection_filters = [SubscriptionServer.id.isnot(None)]
 
     if server_uuid:
-        connection_filters.append(cast(Subscription.connected_squads, String).like(f'%"{server_uuid}"%'))
+        connection_filters.append(on_squad(server_uuid))
 
     result = await db.execute(
         select(User)
@@ -438,9 +451,10 @@ async def get_trial_eligible_server_squads(
 
     preferred_squads: list[ServerSquad] = []
     fallback_squads: list[ServerSquad] = []
+    counts = await get_server_user_counts(db, [squad.id for squad in squads if squad.max_users is not None])
 
     for squad in squads:
-        current_users = squad.current_users or 0
+        current_users = counts.get(squad.id, squad.current_users or 0)
         is_full = squad.max_users is not None and current_users >= squad.max_users
 
         if is_full:
@@ -696,32 +710,32 @@ def _extract_country_code(original_name: str) -> str | None:
 
 
 async def get_server_statistics(db: AsyncSession) -> dict:
-    total_result = await db.execute(select(func.count(ServerSquad.id)))
-    total_servers = total_result.scalar()
-
-    available_result = await db.execute(select(func.count(ServerSquad.id)).where(ServerSquad.is_available == True))
-    available_servers = available_result.scalar()
-
-    servers_with_connections = 0
-    all_servers_result = await db.execute(select(ServerSquad.squad_uuid))
-    all_server_uuids = [row[0] for row in all_servers_result.fetchall()]
-
-    for squad_uuid in all_server_uuids:
-        count_result = await db.execute(
-            text("""
-                SELECT COUNT(s.id)
-                FROM subscriptions s
-                WHERE s.status IN ('active', 'trial')
-                AND s.connected_squads::text LIKE :uuid_pattern
-            """),
-            {'uuid_pattern': f'%"{squad_uuid}"%'},
+    # Сервер «с подключениями», если на него ссылается хотя бы одна активная/триальная подписка
+    has_connections = (
+        select(SubscriptionSquad.subscription_id)
+        .join(Subscription, Subscription.id == SubscriptionSquad.subscription_id)
+        .where(
+            SubscriptionSquad.squad_uuid == ServerSquad.squad_uuid,
+            Subscription.status.in_(ACTIVE_STATUSES),
         )
-        user_count = count_result.scalar() or 0
-        if user_count > 0:
-            servers_with_connections += 1
-
-    revenue_result = await db.execute(select(func.coalesce(func.sum(SubscriptionServer.paid_price_kopeks), 0)))
-    total_revenue_kopeks = revenue_result.scalar()
+        .exists()
+    )
+    revenue = select(func.coalesce(func.sum(SubscriptionServer.paid_price_kopeks), 0)).scalar_subquery()
+
+    stats = (
+        await db.execute(
+            select(
+                func.count(ServerSquad.id).label('total'),
+                count_if(ServerSquad.is_available == True).label('available'),
+                count_if(has_connections).label('with_connections'),
+                revenue.label('revenue'),
+            )
+        )
+    ).one()
+    total_servers = stats.total or 0
+    available_servers = stats.available or 0
+    servers_with_connections = stats.with_connections or 0
+    total_revenue_kopeks = stats.revenue or 0
 
     return {
         'total_servers': total_servers,
@@ -737,28 +751,49 @@ async def count_active_users_for_squad(db: AsyncSession, squad_uuid: str) -> int
     """Возвращает количество активных подписок, подключенных к указанному скваду."""
 
     result = await db.execute(
-        select(func.count(Subscription.id)).where(
-            Subscription.status.in_(
-                [
-                    SubscriptionStatus.ACTIVE.value,
-                    SubscriptionStatus.TRIAL.value,
-                ]
-            ),
-            cast(Subscription.connected_squads, String).like(f'%"{squad_uuid}"%'),
+        select(func.count(SubscriptionSquad.subscription_id))
+        .join(Subscription, Subscription.id == SubscriptionSquad.subscription_id)
+        .where(
+            SubscriptionSquad.squad_uuid == squad_uuid,
+            Subscription.status.in_(ACTIVE_STATUSES),
         )
     )
 
     return result.scalar() or 0
 
 
+def user_deltas_lock_statement(dialect_name: str, *, shared: bool) -> Any | None:
+    """Transaction-scoped advisory lock of the delta log (PostgreSQL only)."""
+    if dialect_name != 'postgresql':
+        return None
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    return select(lock(_USER_DELTAS_LOCK_KEY))
+
+
+async def _lock_user_deltas(db: AsyncSession, *, shared: bool) -> None:
+    statement = user_deltas_lock_statement(db.get_bind().dialect.name, shared=shared)
+    if statement is not None:
+        await db.execute(statement)
+
+
+async def record_server_user_deltas(db: AsyncSession, deltas: dict[int, int]) -> None:
+    """Дописывает изменения счётчиков серверов в журнал ``server_squad_user_deltas``.
+
+    В отличие от ``UPDATE server_squads SET current_users = current_users ± 1``
+    не блокирует строки серверов: параллельные покупки на одном сервере не
+    ждут друг друга. В ``current_users`` журнал сворачивает
+    :func:`fold_server_user_deltas`.
+    """
+    rows = [{'server_squad_id': server_id, 'delta': delta} for server_id, delta in sorted(deltas.items()) if delta]
+    if rows:
+        # Разделяемая блокировка до коммита: пересчёт не начнётся между изменением подписки и записью журнала
+        await _lock_user_deltas(db, shared=True)
+        await db.execute(insert(ServerSquadUserDelta), rows)
+
+
 async def add_user_to_servers(db: AsyncSession, server_squad_ids: list[int]) -> bool:
     try:
-        for server_id in sorted(server_squad_ids):
-            await db.execute(
-                update(ServerSquad)
-                .where(ServerSquad.id == server_id)
-                .values(current_users=ServerSquad.current_users + 1)
-            )
+        await record_server_user_deltas(db, Counter(server_squad_ids))
 
         await db.flush()
         logger.info('✅ Увеличен счетчик пользователей для серверов', server_squad_ids=server_squad_ids)
@@ -771,12 +806,9 @@ async def add_user_to_servers(db: AsyncSession, server_squad_ids: list[int]) ->
 
 async def remove_user_from_servers(db: AsyncSession, server_squad_ids: list[int]) -> bool:
     try:
-        for server_id in sorted(server_squad_ids):
-            await db.execute(
-                update(ServerSquad)
-                .where(ServerSquad.id == server_id)
-                .values(current_users=func.greatest(ServerSquad.current_users - 1, 0))
-            )
+        await record_server_user_deltas(
+            db, {server_id: -count for server_id, count in Counter(server_squad_ids).items()}
+        )
 
         await db.flush()
         logger.info('✅ Уменьшен счетчик пользователей для серверов', server_squad_ids=server_squad_ids)
@@ -792,41 +824,20 @@ async def update_server_user_counts(
     add_ids: list[int] | None = None,
     remove_ids: list[int] | None = None,
 ) -> None:
-    """Increment and decrement server user counters in a single sorted pass.
-
-    Prevents deadlocks by acquiring row locks in consistent ID order
-    across both add and remove operations within one transaction.
-    """
+    """Increment and decrement server user counters in one delta-log write."""
     try:
         add_set = set(add_ids) if add_ids else set()
         remove_set = set(remove_ids) if remove_ids else set()
 
-        if not add_set and not remove_set:
-            return
-
         # IDs in both sets cancel out — skip them
         overlap = add_set & remove_set
-        if overlap:
-            add_set -= overlap
-            remove_set -= overlap
+        add_set -= overlap
+        remove_set -= overlap
 
-        all_ids = sorted(add_set | remove_set)
-        if not all_ids:
+        if not add_set and not remove_set:
             return
 
-        for server_id in all_ids:
-            if server_id in add_set:
-                await db.execute(
-                    update(ServerSquad)
-                    .where(ServerSquad.id == server_id)
-                    .values(current_users=ServerSquad.current_users + 1)
-                )
-            if server_id in remove_set:
-                await db.execute(
-                    update(ServerSquad)
-                    .where(ServerSquad.id == server_id)
-                    .values(current_users=func.greatest(ServerSquad.current_users - 1, 0))
-                )
+        await record_server_user_deltas(db, {**dict.fromkeys(add_set, 1), **dict.fromkeys(remove_set, -1)})
 
         await db.flush()
         if add_set:
@@ -839,6 +850,64 @@ async def update_server_user_counts(
         raise
 
 
+def _pending_deltas_subquery():
+    return (
+        select(
+            ServerSquadUserDelta.server_squad_id,
+            func.sum(ServerSquadUserDelta.delta).label('delta'),
+        )
+        .group_by(ServerSquadUserDelta.server_squad_id)
+        .subquery()
+    )
+
+
+async def get_server_user_counts(db: AsyncSession, server_ids: Iterable[int] | None = None) -> dict[int, int]:
+    """Актуальные счётчики: ``current_users`` плюс ещё не свёрнутые изменения из журнала."""
+    if server_ids is not None:
+        server_ids = list(server_ids)
+        if not server_ids:
+            return {}
+    pending = _pending_deltas_subquery()
+    query = select(
+        ServerSquad.id,
+        func.coalesce(ServerSquad.current_users, 0) + func.coalesce(pending.c.delta, 0),
+    ).outerjoin(pending, pending.c.server_squad_id == ServerSquad.id)
+    if server_ids is not None:
+        query = query.where(ServerSquad.id.in_(server_ids))
+    result = await db.execute(query)
+    return {server_id: max(int(count or 0), 0) for server_id, count in result.all()}
+
+
+async def fold_server_user_deltas(db: AsyncSession) -> int:
+    """Переносит журнал изменений в ``server_squads.current_users`` и коммитит.
+
+    Строки удаляются через ``DELETE ... RETURNING``, поэтому учитывается ровно
+    то, что удалено: записи транзакций, ещё не закоммиченных к этому моменту,
+    останутся до следующего прохода. Возвращает число обновлённых серверов.
+    """
+    result = await db.execute(
+        delete(ServerSquadUserDelta).returning(ServerSquadUserDelta.server_squad_id, ServerSquadUserDelta.delta)
+    )
+    totals: dict[int, int] = {}
+    for server_id, delta in result.all():
+        totals[server_id] = totals.get(server_id, 0) + delta
+
+    changed = {server_id: delta for server_id, delta in totals.items() if delta}
+    # Блокировки строк в порядке id — как и раньше, без взаимоблокировок
+    for server_id in sorted(changed):
+        folded = func.coalesce(ServerSquad.current_users, 0) + changed[server_id]
+        await db.execute(
+            update(ServerSquad)
+            .where(ServerSquad.id == server_id)
+            .values(current_users=case((folded < 0, 0), else_=folded))
+        )
+    await db.commit()
+
+    if changed:
+        await content_cache.invalidate(ContentType.SERVERS)
+    return len(changed)
+
+
 async def get_server_ids_by_uuids(db: AsyncSession, squad_uuids: list[str]) -> list[int]:
     result = await db.execute(select(ServerSquad.id).where(ServerSquad.squad_uuid.in_(squad_uuids)))
     return [row[0] for row in result.fetchall()]
@@ -901,24 +970,34 @@ async def ensure_servers_synced(db: AsyncSession) -> None:
 
 
 async def sync_server_user_counts(db: AsyncSession) -> int:
+    """Пересчитывает ``current_users`` по подпискам — сверка для журнала изменений.
+
+    Несвёрнутые изменения отбрасываются: пересчёт их уже учитывает. Исключительная
+    блокировка журнала дожидается коммита транзакций, уже записавших изменения, и
+    не пускает новые до конца пересчёта — иначе изменение, закоммиченное между
+    удалением журнала и подсчётом, учлось бы дважды.
+    """
     try:
+        await _lock_user_deltas(db, shared=False)
+        await db.execute(delete(ServerSquadUserDelta))
+
         all_servers_result = await db.execute(select(ServerSquad.id, ServerSquad.squad_uuid))
         all_servers = all_servers_result.fetchall()
 
         logger.info('🔍 Найдено серверов для синхронизации', all_servers_count=len(all_servers))
 
+        # Один сгруппированный запрос по индексу subscription_squads вместо LIKE на каждый сервер
+        counts_result = await db.execute(
+            select(SubscriptionSquad.squad_uuid, func.count(SubscriptionSquad.subscription_id))
+            .join(Subscription, Subscription.id == SubscriptionSquad.subscription_id)
+            .where(Subscription.status.in_(ACTIVE_STATUSES))
+            .group_by(SubscriptionSquad.squad_uuid)
+        )
+        actual_by_uuid = dict(counts_result.all())
+
         updated_count = 0
         for server_id, squad_uuid in all_servers:
-            count_result = await db.execute(
-                text("""
-                    SELECT COUNT(s.id)
-                    FROM subscriptions s
-                    WHERE s.status IN ('active', 'trial')
-                    AND s.connected_squads::text LIKE :uuid_pattern
-                """),
-                {'uuid_pattern': f'%"{squad_uuid}"%'},
-            )
-            actual_users = count_result.scalar() or 0
+            actual_users = actual_by_uuid.get(squad_uuid, 0)
 
             logger.info(
                 '📊 Сервер пользователей', server_id=server_id, squad_uuid=squad_uuid[:8], actual_users=actual_users
@@ -928,6 +1007,7 @@ async def sync_server_user_counts(db: AsyncSession) -> int:
             updated_count += 1
 
         await db.commit()
+        await content_cache.invalidate(ContentType.SERVERS)
         logger.info('✅ Синхронизированы счетчики для серверов', updated_count=updated_count)
         return updated_count
 
@@ -0,0 +1,700 @@
+"""Дневные агрегаты статистики (stats_daily_*): чтение и сверка.
+
+Закрытый день, у которого есть строка в ``stats_daily_activity``, читается из
+агрегатов; остальное (текущий день, неполные дни на краях периода, ещё не
+сверенные дни) считается по исходным таблицам. Поэтому график за любой период
+читает несколько сотен строк агрегатов и сканирует исходные таблицы только
+за «живые» интервалы.
+
+День определяется как ``func.date(created_at)`` — так же, как в существующих
+запросах графиков; границы живых интервалов — полночь UTC.
+
+ORM-хуки на :class:`Transaction` переносят завершение и отмену платежей в
+``stats_daily_revenue`` в той же транзакции БД, поэтому поздно завершённый
+платёж сразу попадает в уже закрытый день. Изменения, которые инкрементом не
+выразить (удаление пользователей, подписок, платежей и начислений, переход
+подписки из триала в платную), снимают отметку сверки с затронутых закрытых
+дней: до следующей сверки они читаются по исходным таблицам.
+
+На PostgreSQL сверка берёт исключительные транзакционные блокировки дней
+(``pg_advisory_xact_lock``) до чтения исходных таблиц, а хуки — разделяемые,
+поэтому изменение закрытого дня, параллельное сверке, не теряется: оно либо
+попадает в пересчёт, либо применяется поверх него.
+"""
+
+from collections import defaultdict
+from collections.abc import Collection, Iterable, Sequence
+from dataclasses import dataclass, fields
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+import structlog
+from sqlalchemy import and_, delete, event, func, insert, inspect, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import settings
+from app.database.aggregates import count_if
+from app.database.models import (
+    ReferralEarning,
+    StatsDailyActivity,
+    StatsDailyReferral,
+    StatsDailyRevenue,
+    Subscription,
+    SubscriptionConversion,
+    Transaction,
+    User,
+)
+
+
+logger = structlog.get_logger(__name__)
+
+ONE_DAY = timedelta(days=1)
+
+# Пространство ключей транзакционных блокировок дней агрегатов
+_DAY_LOCK_NAMESPACE = 3090
+_EPOCH = date(1970, 1, 1)
+
+
+def day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=UTC)
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    # SQLite возвращает date() строкой
+    return date.fromisoformat(str(value))
+
+
+@dataclass(slots=True)
+class ActivityCounts:
+    registrations: int = 0
+    referred_registrations: int = 0
+    trials: int = 0
+    paid_subscriptions: int = 0
+    conversions: int = 0
+
+    def add(self, other: 'ActivityCounts') -> None:
+        for item in fields(self):
+            setattr(self, item.name, getattr(self, item.name) + getattr(other, item.name))
+
+
+@dataclass(frozen=True, slots=True)
+class RevenueRow:
+    day: date
+    type: str
+    payment_method: str | None
+    count: int
+    amount_kopeks: int
+    abs_amount_kopeks: int
+
+
+@dataclass(frozen=True, slots=True)
+class RangePlan:
+    rollup_days: tuple[date, ...] = ()
+    live_ranges: tuple[tuple[datetime, datetime], ...] = ()
+
+
+def _whole_days(start: datetime, end: datetime) -> tuple[date, date]:
+    """First and last day lying entirely inside ``[start, end)`` (first > last if none)."""
+    first = start.date() if start == day_start(start.date()) else start.date() + ONE_DAY
+    return first, end.date() - ONE_DAY
+
+
+def plan_range(start: datetime, end: datetime, reconciled: Collection[date]) -> RangePlan:
+    """Split ``[start, end)`` into reconciled whole days and live intervals."""
+    start, end = _to_utc(start), _to_utc(end)
+    if start >= end:
+        return RangePlan()
+
+    first, last = _whole_days(start, end)
+    rollup_days: list[date] = []
+    live_ranges: list[tuple[datetime, datetime]] = []
+    cursor = start
+    day = first
+    while day <= last:
+        if day in reconciled:
+            if cursor < day_start(day):
+                live_ranges.append((cursor, day_start(day)))
+            rollup_days.append(day)
+            cursor = day_start(day + ONE_DAY)
+        day += ONE_DAY
+    if cursor < end:
+        live_ranges.append((cursor, end))
+    return RangePlan(tuple(rollup_days), tuple(live_ranges))
+
+
+async def get_reconciled_days(db: AsyncSession, first_day: date, last_day: date) -> set[date]:
+    result = await db.execute(select(StatsDailyActivity.day).where(StatsDailyActivity.day.between(first_day, last_day)))
+    return {_as_date(day) for day in result.scalars()}
+
+
+async def _plan(db: AsyncSession, start: datetime, end: datetime) -> RangePlan:
+    start, end = _to_utc(start), _to_utc(end)
+    if start >= end:
+        return RangePlan()
+    first, last = _whole_days(start, end)
+    reconciled: set[date] = set()
+    if settings.STATS_ROLLUP_ENABLED and first <= last:
+        reconciled = await get_reconciled_days(db, first, last)
+    return plan_range(start, end, reconciled)
+
+
+def _within(column: Any, ranges: Iterable[tuple[datetime, datetime]]) -> ColumnElement:
+    return or_(*(and_(column >= range_start, column < range_end) for range_start, range_end in ranges))
+
+
+def _on_days(column: Any, days: Sequence[date]) -> ColumnElement:
+    """``column`` in ``days``, as a few ``BETWEEN`` spans of consecutive days."""
+    spans: list[tuple[date, date]] = []
+    for day in sorted(days):
+        if spans and spans[-1][1] + ONE_DAY == day:
+            spans[-1] = (spans[-1][0], day)
+        else:
+            spans.append((day, day))
+    return or_(*(column.between(span_start, span_end) for span_start, span_end in spans))
+
+
+# ---- Activity -------------------------------------------------------------
+
+
+async def _live_activity(
+    db: AsyncSession, ranges: Sequence[tuple[datetime, datetime]]
+) -> defaultdict[date, ActivityCounts]:
+    result: defaultdict[date, ActivityCounts] = defaultdict(ActivityCounts)
+
+    user_day = func.date(User.created_at)
+    users = await db.execute(
+        select(
+            user_day.label('day'),
+            func.count(User.id).label('registrations'),
+            count_if(User.referred_by_id.isnot(None)).label('referred'),
+        )
+        .where(_within(User.created_at, ranges))
+        .group_by(user_day)
+    )
+    for row in users:
+        counts = result[_as_date(row.day)]
+        counts.registrations += row.registrations
+        counts.referred_registrations += row.referred or 0
+
+    subscription_day = func.date(Subscription.created_at)
+    subscriptions = await db.execute(
+        select(
+            subscription_day.label('day'),
+            count_if(Subscription.is_trial == True).label('trials'),
+            count_if(Subscription.is_trial == False).label('paid'),
+        )
+        .where(_within(Subscription.created_at, ranges))
+        .group_by(subscription_day)
+    )
+    for row in subscriptions:
+        counts = result[_as_date(row.day)]
+        counts.trials += row.trials or 0
+        counts.paid_subscriptions += row.paid or 0
+
+    conversion_day = func.date(SubscriptionConversion.converted_at)
+    conversions = await db.execute(
+        select(conversion_day.label('day'), func.count(SubscriptionConversion.id).label('conversions'))
+        .where(_within(SubscriptionConversion.converted_at, ranges))
+        .group_by(conversion_day)
+    )
+    for row in conversions:
+        result[_as_date(row.day)].conversions += row.conversions
+
+    return result
+
+
+async def get_daily_activity(db: AsyncSession, start: datetime, end: datetime) -> dict[date, ActivityCounts]:
+    """Registrations, trials, paid subscriptions and conversions per day in ``[start, end)``."""
+    plan = await _plan(db, start, end)
+    result: defaultdict[date, ActivityCounts] = defaultdict(ActivityCounts)
+
+    if plan.rollup_days:
+        table = StatsDailyActivity.__table__
+        rows = await db.execute(select(table).where(_on_days(table.c.day, plan.rollup_days)))
+        for row in rows:
+            result[_as_date(row.day)].add(
+                ActivityCounts(
+                    registrations=row.registrations,
+                    referred_registrations=row.referred_registrations,
+                    trials=row.trials,
+                    paid_subscriptions=row.paid_subscriptions,
+                    conversions=row.conversions,
+                )
+            )
+
+    if plan.live_ranges:
+        for day, counts in (await _live_activity(db, plan.live_ranges)).items():
+            result[day].add(counts)
+
+    return dict(sorted(result.items()))
+
+
+def sum_activity(daily: dict[date, ActivityCounts]) -> ActivityCounts:
+    total = ActivityCounts()
+    for counts in daily.values():
+        total.add(counts)
+    return total
+
+
+# ---- Revenue --------------------------------------------------------------
+
+
+async def _live_revenue(
+    db: AsyncSession,
+    ranges: Sequence[tuple[datetime, datetime]],
+    *,
+    types: Collection[str] | None = None,
+    payment_methods: Collection[str] | None = None,
+) -> list[RevenueRow]:
+    transaction_day = func.date(Transaction.created_at)
+    query = select(
+        transaction_day.label('day'),
+        Transaction.type,
+        Transaction.payment_method,
+        func.count(Transaction.id).label('count'),
+        func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('amount'),
+        func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0).label('abs_amount'),
+    ).where(Transaction.is_completed == True, _within(Transaction.created_at, ranges))
+    if types is not None:
+        query = query.where(Transaction.type.in_(list(types)))
+    if payment_methods is not None:
+        query = query.where(Transaction.payment_method.in_(list(payment_methods)))
+
+    rows = await db.execute(query.group_by(transaction_day, Transaction.type, Transaction.payment_method))
+    return [
+        RevenueRow(
+            day=_as_date(row.day),
+            type=row.type,
+            payment_method=row.payment_method,
+            count=row.count,
+            amount_kopeks=int(row.amount),
+            abs_amount_kopeks=int(row.abs_amount),
+        )
+        for row in rows
+    ]
+
+
+async def get_daily_revenue(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    *,
+    types: Collection[str] | None = None,
+    payment_methods: Collection[str] | None = None,
+) -> list[RevenueRow]:
+    """Completed transactions in ``[start, end)`` per day, type and payment method."""
+    plan = await _plan(db, start, end)
+    totals: defaultdict[tuple[date, str, str | None], list[int]] = defaultdict(lambda: [0, 0, 0])
+
+    if plan.rollup_days:
+        table = StatsDailyRevenue.__table__
+        query = select(table).where(_on_days(table.c.day, plan.rollup_days))
+        if types is not None:
+            query = query.where(table.c.type.in_(list(types)))
+        if payment_methods is not None:
+            query = query.where(table.c.payment_method.in_(list(payment_methods)))
+        for row in await db.execute(query):
+            bucket = totals[(_as_date(row.day), row.type, row.payment_method or None)]
+            bucket[0] += row.count
+            bucket[1] += row.amount_kopeks
+            bucket[2] += row.abs_amount_kopeks
+
+    if plan.live_ranges:
+        for row in await _live_revenue(db, plan.live_ranges, types=types, payment_methods=payment_methods):
+            bucket = totals[(row.day, row.type, row.payment_method)]
+            bucket[0] += row.count
+            bucket[1] += row.amount_kopeks
+            bucket[2] += row.abs_amount_kopeks
+
+    return [
+        RevenueRow(
+            day=day,
+            type=transaction_type,
+            payment_method=method,
+            count=count,
+            amount_kopeks=amount,
+            abs_amount_kopeks=abs_amount,
+        )
+        for (day, transaction_type, method), (count, amount, abs_amount) in sorted(
+            totals.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or '')
+        )
+    ]
+
+
+def revenue_increment_statement(dialect_name: str, transaction_id: int, sign: int) -> Any | None:
+    """Upsert adding (``sign`` = 1) or removing (-1) one completed transaction to its day.
+
+    The day and amounts are read from the ``transactions`` row itself, so the
+    statement works inside a flush before ``created_at`` is loaded.
+    """
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        return None
+
+    source = select(
+        func.date(Transaction.created_at),
+        Transaction.type,
+        func.coalesce(Transaction.payment_method, ''),
+        literal(sign),
+        Transaction.amount_kopeks * sign,
+        func.abs(Transaction.amount_kopeks) * sign,
+    ).where(Transaction.id == transaction_id)
+
+    stmt = upsert(StatsDailyRevenue).from_select(
+        ['day', 'type', 'payment_method', 'count', 'amount_kopeks', 'abs_amount_kopeks'],
+        source,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['day', 'type', 'payment_method'],
+        set_={
+            'count': StatsDailyRevenue.count + stmt.excluded.count,
+            'amount_kopeks': StatsDailyRevenue.amount_kopeks + stmt.excluded.amount_kopeks,
+            'abs_amount_kopeks': StatsDailyRevenue.abs_amount_kopeks + stmt.excluded.abs_amount_kopeks,
+        },
+    )
+
+
+def _loaded_day(target: Any, key: str = 'created_at') -> date | None:
+    value = inspect(target).dict.get(key)
+    return _to_utc(value).date() if isinstance(value, datetime) else None
+
+
+def _closed_days(days: Iterable[date | None]) -> set[date]:
+    today = datetime.now(UTC).date()
+    return {day for day in days if day is not None and day < today}
+
+
+def day_lock_statement(dialect_name: str, days: Iterable[date], *, shared: bool) -> Any | None:
+    """Transaction-scoped advisory locks of rollup days (PostgreSQL only, in a stable order)."""
+    keys = sorted({(day - _EPOCH).days for day in days})
+    if dialect_name != 'postgresql' or not keys:
+        return None
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    return select(*(lock(_DAY_LOCK_NAMESPACE, key) for key in keys))
+
+
+def _lock_days(connection, days: Iterable[date]) -> None:
+    statement = day_lock_statement(connection.dialect.name, days, shared=True)
+    if statement is not None:
+        connection.execute(statement)
+
+
+def _apply_revenue_change(connection, target: Transaction, sign: int, day: date | None) -> None:
+    statement = revenue_increment_statement(connection.dialect.name, target.id, sign)
+    if statement is None:
+        return
+    try:
+        # Savepoint: ошибка агрегата не должна откатывать сам платёж — ночная сверка его поправит
+        with connection.begin_nested():
+            # Закрытый день может сверяться прямо сейчас — ждём окончания пересчёта
+            _lock_days(connection, _closed_days([day]))
+            connection.execute(statement)
+    except Exception as error:
+        logger.warning('Не удалось обновить дневной агрегат выручки', transaction_id=target.id, error=error)
+
+
+def _transaction_day(connection, target: Transaction) -> date | None:
+    day = _loaded_day(target)
+    if day is None and connection.dialect.name == 'postgresql':
+        value = connection.scalar(select(func.date(Transaction.created_at)).where(Transaction.id == target.id))
+        day = _as_date(value) if value is not None else None
+    return day
+
+
+@event.listens_for(Transaction, 'after_insert')
+def _on_transaction_insert(mapper, connection, target: Transaction) -> None:
+    if settings.STATS_ROLLUP_ENABLED and target.is_completed is not False:
+        # Без явного created_at платёж создан сегодня — закрытые дни не затрагиваются
+        _apply_revenue_change(connection, target, 1, _loaded_day(target))
+
+
+_COMPLETED_BEFORE_KEY = 'stats_rollup_completed_before'
+
+
+@event.listens_for(Transaction, 'before_update')
+def _remember_completion(mapper, connection, target: Transaction) -> None:
+    if not settings.STATS_ROLLUP_ENABLED:
+        return
+    state = inspect(target)
+    history = state.attrs.is_completed.history
+    if history.deleted:
+        state.info[_COMPLETED_BEFORE_KEY] = bool(history.deleted[0])
+    elif history.added:
+        # Атрибут был истёкшим при присваивании: прежнее значение ещё в строке БД
+        state.info[_COMPLETED_BEFORE_KEY] = bool(
+            connection.scalar(select(Transaction.is_completed).where(Transaction.id == target.id))
+        )
+
+
+@event.listens_for(Transaction, 'after_update')
+def _on_transaction_update(mapper, connection, target: Transaction) -> None:
+    was_completed = inspect(target).info.pop(_COMPLETED_BEFORE_KEY, None)
+    if was_completed is not None and was_completed != bool(target.is_completed):
+        sign = 1 if target.is_completed else -1
+        _apply_revenue_change(connection, target, sign, _transaction_day(connection, target))
+
+
+# ---- Invalidation ---------------------------------------------------------
+
+# Исходные таблицы агрегатов и колонка, определяющая день строки
+_SOURCE_DAY_COLUMNS: dict[type, Any] = {
+    User: User.created_at,
+    Subscription: Subscription.created_at,
+    Transaction: Transaction.created_at,
+    ReferralEarning: ReferralEarning.created_at,
+    SubscriptionConversion: SubscriptionConversion.converted_at,
+}
+
+
+def _invalidate_days(connection, days: Iterable[date | None]) -> None:
+    """Drop the reconciled mark of closed ``days``: they are read live until the next reconciliation."""
+    closed = _closed_days(days)
+    if not closed:
+        return
+    try:
+        with connection.begin_nested():
+            _lock_days(connection, closed)
+            connection.execute(delete(StatsDailyActivity).where(StatsDailyActivity.day.in_(sorted(closed))))
+    except Exception as error:
+        logger.warning('Не удалось снять отметку сверки дней статистики', days=sorted(closed), error=error)
+
+
+def _source_row_day(connection, model: type, target: Any) -> date | None:
+    day_column = _SOURCE_DAY_COLUMNS[model]
+    day = _loaded_day(target, day_column.key)
+    if day is None:
+        value = connection.scalar(select(func.date(day_column)).where(model.id == target.id))
+        day = _as_date(value) if value is not None else None
+    return day
+
+
+def _on_source_delete(mapper, connection, target: Any) -> None:
+    if settings.STATS_ROLLUP_ENABLED:
+        _invalidate_days(connection, [_source_row_day(connection, mapper.class_, target)])
+
+
+for _model in _SOURCE_DAY_COLUMNS:
+    event.listen(_model, 'before_delete', _on_source_delete)
+
+
+@event.listens_for(Subscription, 'after_update')
+def _on_trial_conversion(mapper, connection, target: Subscription) -> None:
+    if not settings.STATS_ROLLUP_ENABLED:
+        return
+    history = inspect(target).attrs.is_trial.history
+    if not history.added or (history.deleted and bool(history.deleted[0]) == bool(history.added[0])):
+        return
+    # Подписка переходит между trials и paid_subscriptions дня своего создания
+    _invalidate_days(connection, [_source_row_day(connection, Subscription, target)])
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _on_bulk_delete(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_delete and settings.STATS_ROLLUP_ENABLED):
+        return
+    mapper = orm_execute_state.bind_mapper
+    day_column = _SOURCE_DAY_COLUMNS.get(mapper.class_) if mapper is not None else None
+    if day_column is None:
+        return
+    # delete(Model).where(...) минует ORM-хуки: дни удаляемых строк читаем до удаления
+    query = select(func.date(day_column)).distinct()
+    if orm_execute_state.statement.whereclause is not None:
+        query = query.where(orm_execute_state.statement.whereclause)
+    connection = orm_execute_state.session.connection()
+    _invalidate_days(
+        connection, [_as_date(value) for value in connection.execute(query).scalars() if value is not None]
+    )
+
+
+# ---- Referrals ------------------------------------------------------------
+
+
+async def get_daily_referral_invites(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    *,
+    referrer_id: int | None = None,
+) -> dict[date, int]:
+    """Invited users per day (all referrers or one)."""
+    plan = await _plan(db, start, end)
+    result: defaultdict[date, int] = defaultdict(int)
+
+    if plan.rollup_days:
+        query = select(StatsDailyReferral.day, func.sum(StatsDailyReferral.invited_count).label('count')).where(
+            _on_days(StatsDailyReferral.day, plan.rollup_days)
+        )
+        if referrer_id is not None:
+            query = query.where(StatsDailyReferral.referrer_id == referrer_id)
+        for row in await db.execute(query.group_by(StatsDailyReferral.day)):
+            result[_as_date(row.day)] += int(row.count or 0)
+
+    if plan.live_ranges:
+        user_day = func.date(User.created_at)
+        referrer_filter = User.referred_by_id.isnot(None) if referrer_id is None else User.referred_by_id == referrer_id
+        rows = await db.execute(
+            select(user_day.label('day'), func.count(User.id).label('count'))
+            .where(referrer_filter, _within(User.created_at, plan.live_ranges))
+            .group_by(user_day)
+        )
+        for row in rows:
+            result[_as_date(row.day)] += row.count
+
+    return {day: count for day, count in sorted(result.items()) if count}
+
+
+async def get_daily_referral_earnings(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    *,
+    referrer_id: int | None = None,
+    campaign_id: int | None = None,
+) -> dict[date, int]:
+    """Referral earnings (kopeks) per day, optionally for one referrer and/or campaign."""
+    plan = await _plan(db, start, end)
+    result: defaultdict[date, int] = defaultdict(int)
+
+    if plan.rollup_days:
+        query = select(StatsDailyReferral.day, func.sum(StatsDailyReferral.earnings_kopeks).label('amount')).where(
+            _on_days(StatsDailyReferral.day, plan.rollup_days)
+        )
+        if referrer_id is not None:
+            query = query.where(StatsDailyReferral.referrer_id == referrer_id)
+        if campaign_id is not None:
+            query = query.where(StatsDailyReferral.campaign_id == campaign_id)
+        for row in await db.execute(query.group_by(StatsDailyReferral.day)):
+            result[_as_date(row.day)] += int(row.amount or 0)
+
+    if plan.live_ranges:
+        earning_day = func.date(ReferralEarning.created_at)
+        query = select(earning_day.label('day'), func.sum(ReferralEarning.amount_kopeks).label('amount')).where(
+            _within(ReferralEarning.created_at, plan.live_ranges)
+        )
+        if referrer_id is not None:
+            query = query.where(ReferralEarning.user_id == referrer_id)
+        if campaign_id is not None:
+            query = query.where(ReferralEarning.campaign_id == campaign_id)
+        for row in await db.execute(query.group_by(earning_day)):
+            result[_as_date(row.day)] += int(row.amount or 0)
+
+    return {day: amount for day, amount in sorted(result.items()) if amount}
+
+
+# ---- Reconciliation -------------------------------------------------------
+
+
+async def reconcile_rollup_days(db: AsyncSession, first_day: date, last_day: date) -> int:
+    """Recompute all rollups for ``first_day..last_day`` from the source tables and commit.
+
+    Returns the number of reconciled days.
+    """
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    # До чтения исходных таблиц: параллельные изменения этих дней ждут коммита пересчёта
+    lock = day_lock_statement(db.get_bind().dialect.name, days, shared=False)
+    if lock is not None:
+        await db.execute(lock)
+
+    ranges = [(day_start(first_day), day_start(last_day + ONE_DAY))]
+    activity = await _live_activity(db, ranges)
+    revenue = await _live_revenue(db, ranges)
+
+    referrals: defaultdict[tuple[date, int, int], list[int]] = defaultdict(lambda: [0, 0, 0])
+    user_day = func.date(User.created_at)
+    invites = await db.execute(
+        select(user_day.label('day'), User.referred_by_id, func.count(User.id).label('count'))
+        .where(User.referred_by_id.isnot(None), _within(User.created_at, ranges))
+        .group_by(user_day, User.referred_by_id)
+    )
+    for row in invites:
+        referrals[(_as_date(row.day), row.referred_by_id, 0)][0] += row.count
+
+    earning_day = func.date(ReferralEarning.created_at)
+    earnings = await db.execute(
+        select(
+            earning_day.label('day'),
+            ReferralEarning.user_id,
+            ReferralEarning.campaign_id,
+            func.count(ReferralEarning.id).label('count'),
+            func.coalesce(func.sum(ReferralEarning.amount_kopeks), 0).label('amount'),
+        )
+        .where(_within(ReferralEarning.created_at, ranges))
+        .group_by(earning_day, ReferralEarning.user_id, ReferralEarning.campaign_id)
+    )
+    for row in earnings:
+        bucket = referrals[(_as_date(row.day), row.user_id, row.campaign_id or 0)]
+        bucket[1] += row.count
+        bucket[2] += int(row.amount)
+
+    now = datetime.now(UTC)
+    activity_rows = []
+    for day in days:
+        counts = activity.get(day, ActivityCounts())
+        activity_rows.append(
+            {
+                'day': day,
+                'registrations': counts.registrations,
+                'referred_registrations': counts.referred_registrations,
+                'trials': counts.trials,
+                'paid_subscriptions': counts.paid_subscriptions,
+                'conversions': counts.conversions,
+                'reconciled_at': now,
+            }
+        )
+
+    # NULL и '' в payment_method попадают в одну строку агрегата
+    revenue_totals: defaultdict[tuple[date, str, str], list[int]] = defaultdict(lambda: [0, 0, 0])
+    for row in revenue:
+        bucket = revenue_totals[(row.day, row.type, row.payment_method or '')]
+        bucket[0] += row.count
+        bucket[1] += row.amount_kopeks
+        bucket[2] += row.abs_amount_kopeks
+    revenue_rows = [
+        {
+            'day': day,
+            'type': transaction_type,
+            'payment_method': method,
+            'count': count,
+            'amount_kopeks': amount,
+            'abs_amount_kopeks': abs_amount,
+        }
+        for (day, transaction_type, method), (count, amount, abs_amount) in revenue_totals.items()
+    ]
+    referral_rows = [
+        {
+            'day': day,
+            'referrer_id': referrer_id,
+            'campaign_id': campaign_id,
+            'invited_count': invited,
+            'earnings_count': earnings_count,
+            'earnings_kopeks': earnings_amount,
+        }
+        for (day, referrer_id, campaign_id), (invited, earnings_count, earnings_amount) in referrals.items()
+    ]
+
+    for model, rows in (
+        (StatsDailyActivity, activity_rows),
+        (StatsDailyRevenue, revenue_rows),
+        (StatsDailyReferral, referral_rows),
+    ):
+        await db.execute(delete(model).where(model.day.between(first_day, last_day)))
+        if rows:
+            await db.execute(insert(model), rows)
+
+    await db.commit()
+    return len(activity_rows)
@@ -3,13 +3,15 @@ from datetime import UTC, datetime, timedelta
 from typing import Optional
 
 import structlog
-from sqlalchemy import and_, delete, func, select
+from sqlalchemy import and_, delete, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.exc import StaleDataError
 
 from app.config import settings
+from app.database.aggregates import count_if
 from app.database.crud.notification import clear_notifications
+from app.database.crud.subscription_squads import squad_uuids_of  # noqa: F401 — регистрирует ORM-хуки индекса
 from app.database.models import (
     PromoGroup,
     Subscription,
@@ -764,10 +766,15 @@ async def get_expiring_subscriptions(db: AsyncSession, days_before: int = 3) ->
     return result.scalars().all()
 
 
-async def get_expired_subscriptions(db: AsyncSession) -> list[Subscription]:
+async def get_expired_subscriptions(db: AsyncSession, since: datetime | None = None) -> list[Subscription]:
+    """Активные подписки с наступившим ``end_date``.
+
+    С ``since`` — только те, что истекли или изменились после него, плюс
+    отложенные защитой от вебхука на прошлом проходе.
+    """
     from app.database.models import Tariff
 
-    result = await db.execute(
+    query = (
         select(Subscription)
         .join(User, Subscription.user_id == User.id)
         .outerjoin(Tariff, Subscription.tariff_id == Tariff.id)
@@ -785,9 +792,48 @@ async def get_expired_subscriptions(db: AsyncSession) -> list[Subscription]:
             )
         )
     )
+    if since is not None:
+        query = query.where(
+            or_(
+                Subscription.end_date > since,
+                Subscription.updated_at > since,
+                Subscription.last_webhook_update_at > since - timedelta(seconds=_WEBHOOK_GUARD_SECONDS),
+            )
+        )
+    result = await db.execute(query)
     return result.scalars().all()
 
 
+async def get_next_subscription_due_at(
+    db: AsyncSession, offsets: Iterable[timedelta], now: datetime | None = None
+) -> datetime | None:
+    """Ближайший момент ``end_date - offset`` в будущем среди активных подписок.
+
+    Для каждого смещения (0 — истечение, N дней — предупреждение) это один
+    поиск минимума по индексу (status, end_date); все смещения — один запрос.
+    """
+    now = now or datetime.now(UTC)
+    offsets = sorted(set(offsets))
+    if not offsets:
+        return None
+
+    result = await db.execute(
+        select(
+            *(
+                select(func.min(Subscription.end_date))
+                .where(
+                    Subscription.status == SubscriptionStatus.ACTIVE.value,
+                    Subscription.end_date > now + offset,
+                )
+                .scalar_subquery()
+                for offset in offsets
+            )
+        )
+    )
+    due_times = [end_date - offset for end_date, offset in zip(result.one(), offsets, strict=True) if end_date]
+    return min(due_times, default=None)
+
+
 async def get_subscriptions_for_autopay(db: AsyncSession) -> list[Subscription]:
     current_time = datetime.now(UTC)
 
@@ -825,20 +871,19 @@ async def get_subscriptions_for_autopay(db: AsyncSession) -> list[Subscription]:
 
 
 async def get_subscriptions_statistics(db: AsyncSession) -> dict:
-    total_result = await db.execute(select(func.count(Subscription.id)))
-    total_subscriptions = total_result.scalar()
-
-    active_result = await db.execute(
-        select(func.count(Subscription.id)).where(Subscription.status == SubscriptionStatus.ACTIVE.value)
-    )
-    active_subscriptions = active_result.scalar()
-
-    trial_result = await db.execute(
-        select(func.count(Subscription.id)).where(
-            and_(Subscription.is_trial == True, Subscription.status == SubscriptionStatus.ACTIVE.value)
+    is_active = Subscription.status == SubscriptionStatus.ACTIVE.value
+    counts = (
+        await db.execute(
+            select(
+                func.count(Subscription.id).label('total'),
+                count_if(is_active).label('active'),
+                count_if(and_(Subscription.is_trial == True, is_active)).label('trial'),
+            )
         )
-    )
-    trial_subscriptions = trial_result.scalar()
+    ).one()
+    total_subscriptions = counts.total
+    active_subscriptions = counts.active or 0
+    trial_subscriptions = counts.trial or 0
 
     paid_subscriptions = active_subscriptions - trial_subscriptions
 
@@ -847,38 +892,25 @@ async def get_subscriptions_statistics(db: AsyncSession) -> dict:
     week_ago = today_start - timedelta(days=7)
     month_ago = today_start - timedelta(days=30)
 
-    today_result = await db.execute(
-        select(func.count(Transaction.id)).where(
-            and_(
-                Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                Transaction.is_completed.is_(True),
-                Transaction.created_at >= today_start,
-            )
-        )
-    )
-    purchased_today = today_result.scalar() or 0
-
-    week_result = await db.execute(
-        select(func.count(Transaction.id)).where(
-            and_(
-                Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                Transaction.is_completed.is_(True),
-                Transaction.created_at >= week_ago,
-            )
-        )
-    )
-    purchased_week = week_result.scalar() or 0
-
-    month_result = await db.execute(
-        select(func.count(Transaction.id)).where(
-            and_(
-                Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                Transaction.is_completed.is_(True),
-                Transaction.created_at >= month_ago,
+    # Окна вложены друг в друга: один проход по платежам за месяц
+    purchases = (
+        await db.execute(
+            select(
+                count_if(Transaction.created_at >= today_start).label('today'),
+                count_if(Transaction.created_at >= week_ago).label('week'),
+                func.count(Transaction.id).label('month'),
+            ).where(
+                and_(
+                    Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
+                    Transaction.is_completed.is_(True),
+                    Transaction.created_at >= month_ago,
+                )
             )
         )
-    )
-    purchased_month = month_result.scalar() or 0
+    ).one()
+    purchased_today = purchases.today or 0
+    purchased_week = purchases.week or 0
+    purchased_month = purchases.month or 0
 
     try:
         from app.database.crud.subscription_conversion import get_conversion_statistics
@@ -1109,10 +1141,9 @@ async def get_servers_monthly_prices(
     user: Optional['User'] = None,
 ) -> list[int]:
     """Получает месячные цены серверов с проверкой доступности для промогруппы пользователя."""
-    from sqlalchemy.orm import selectinload
-
-    from app.database.models import ServerSquad
+    from app.services.catalog_service import catalog_service
 
+    catalog = await catalog_service.get(db)
     prices = []
 
     # Загружаем промогруппы пользователя если нужно
@@ -1131,13 +1162,7 @@ async def get_servers_monthly_prices(
             logger.warning('Не удалось получить промогруппу пользователя', error=e)
 
     for server_id in server_squad_ids:
-        # Загружаем сервер с промогруппами
-        result = await db.execute(
-            select(ServerSquad)
-            .options(selectinload(ServerSquad.allowed_promo_groups))
-            .where(ServerSquad.id == server_id)
-        )
-        server = result.scalar_one_or_none()
+        server = catalog.get_server(server_id)
 
         if not server:
             prices.append(0)
@@ -0,0 +1,135 @@
+"""Индекс сквадов подписок: таблица ``subscription_squads``.
+
+``Subscription.connected_squads`` остаётся источником истины (JSON-список
+UUID); таблица дублирует его построчно, чтобы «подписки на скваде X» искались
+по индексу ``squad_uuid`` вместо ``CAST(connected_squads AS TEXT) LIKE``.
+Строки подписки переписываются ORM-хуками в той же транзакции при вставке,
+изменении ``connected_squads`` и удалении. Изменения в обход ORM исправляет
+:func:`reconcile_subscription_squads` (``python -m app.database.crud.subscription_squads``).
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import structlog
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Subscription, SubscriptionSquad, SubscriptionStatus
+
+
+logger = structlog.get_logger(__name__)
+
+RECONCILE_BATCH_SIZE = 1000
+ACTIVE_STATUSES = (SubscriptionStatus.ACTIVE.value, SubscriptionStatus.TRIAL.value)
+
+
+def squad_uuids_of(connected_squads: Any) -> set[str]:
+    if not isinstance(connected_squads, list):
+        return set()
+    return {squad_uuid for squad_uuid in connected_squads if isinstance(squad_uuid, str) and squad_uuid}
+
+
+def subscription_ids_on_squads(squad_uuids: Iterable[Any]):
+    """Подзапрос id подписок, подключённых к любому из сквадов (значения или выражения)."""
+    return select(SubscriptionSquad.subscription_id).where(SubscriptionSquad.squad_uuid.in_(list(squad_uuids)))
+
+
+def on_squad(squad_uuid: Any):
+    """Условие для ``Subscription``: подписка подключена к скваду (значение или выражение)."""
+    return Subscription.id.in_(
+        select(SubscriptionSquad.subscription_id).where(SubscriptionSquad.squad_uuid == squad_uuid)
+    )
+
+
+def _replace_rows(connection, subscription_id: int, squad_uuids: set[str]) -> None:
+    connection.execute(delete(SubscriptionSquad).where(SubscriptionSquad.subscription_id == subscription_id))
+    if squad_uuids:
+        connection.execute(
+            insert(SubscriptionSquad),
+            [{'subscription_id': subscription_id, 'squad_uuid': squad_uuid} for squad_uuid in sorted(squad_uuids)],
+        )
+
+
+async def reconcile_subscription_squads(db: AsyncSession, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Сверяет таблицу с ``connected_squads`` пачками по id и коммитит; возвращает число исправленных подписок."""
+    fixed = 0
+    last_id = 0
+    while True:
+        rows = (
+            await db.execute(
+                select(Subscription.id, Subscription.connected_squads)
+                .where(Subscription.id > last_id)
+                .order_by(Subscription.id)
+                .limit(batch_size)
+            )
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        indexed: dict[int, set[str]] = {}
+        index_rows = await db.execute(
+            select(SubscriptionSquad.subscription_id, SubscriptionSquad.squad_uuid).where(
+                SubscriptionSquad.subscription_id.in_([row.id for row in rows])
+            )
+        )
+        for subscription_id, squad_uuid in index_rows:
+            indexed.setdefault(subscription_id, set()).add(squad_uuid)
+
+        for row in rows:
+            expected = squad_uuids_of(row.connected_squads)
+            if indexed.get(row.id, set()) == expected:
+                continue
+            await db.execute(delete(SubscriptionSquad).where(SubscriptionSquad.subscription_id == row.id))
+            if expected:
+                await db.execute(
+                    insert(SubscriptionSquad),
+                    [{'subscription_id': row.id, 'squad_uuid': squad_uuid} for squad_uuid in sorted(expected)],
+                )
+            fixed += 1
+        await db.commit()
+
+    if fixed:
+        logger.warning('Исправлен индекс сквадов подписок', fixed=fixed)
+    return fixed
+
+
+def _sync_subscription(connection, target: Subscription) -> None:
+    try:
+        # Savepoint: сбой индекса не должен откатывать саму подписку — его исправит сверка
+        with connection.begin_nested():
+            _replace_rows(connection, target.id, squad_uuids_of(target.connected_squads))
+    except Exception as error:
+        logger.warning('Не удалось обновить индекс сквадов подписки', subscription_id=target.id, error=error)
+
+
+@event.listens_for(Subscription, 'after_insert')
+def _on_subscription_insert(mapper, connection, target: Subscription) -> None:
+    if squad_uuids_of(target.connected_squads):
+        _sync_subscription(connection, target)
+
+
+@event.listens_for(Subscription, 'after_update')
+def _on_subscription_update(mapper, connection, target: Subscription) -> None:
+    if inspect(target).attrs.connected_squads.history.has_changes():
+        _sync_subscription(connection, target)
+
+
+@event.listens_for(Subscription, 'after_delete')
+def _on_subscription_delete(mapper, connection, target: Subscription) -> None:
+    # ON DELETE CASCADE есть в PostgreSQL; SQLite без PRAGMA foreign_keys его не выполняет
+    connection.execute(delete(SubscriptionSquad).where(SubscriptionSquad.subscription_id == target.id))
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    async def _main() -> None:
+        from app.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            fixed = await reconcile_subscription_squads(db)
+        logger.info('Сверка индекса сквадов подписок завершена', fixed=fixed)
+
+    asyncio.run(_main())
@@ -5,6 +5,8 @@ from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.database.aggregates import count_if, sum_if
+from app.database.crud.stats_rollup import get_daily_revenue
 from app.database.models import PaymentMethod, Transaction, TransactionType, User
 
 
@@ -149,16 +151,8 @@ async def get_user_transactions_count(
 
 
 async def get_user_total_spent_kopeks(db: AsyncSession, user_id: int) -> int:
-    result = await db.execute(
-        select(func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0)).where(
-            and_(
-                Transaction.user_id == user_id,
-                Transaction.is_completed.is_(True),
-                Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-            )
-        )
-    )
-    return int(result.scalar_one())
+    result = await db.execute(select(User.total_spent_kopeks).where(User.id == user_id))
+    return int(result.scalar_one_or_none() or 0)
 
 
 async def complete_transaction(db: AsyncSession, transaction: Transaction) -> Transaction:
@@ -202,103 +196,65 @@ async def get_transactions_statistics(
     if not end_date:
         end_date = datetime.now(UTC)
 
+    today = datetime.now(UTC).date()
+    in_period = and_(Transaction.created_at >= start_date, Transaction.created_at <= end_date)
+    in_today = Transaction.created_at >= today
     # Доход считаем только по реальным платежам (исключаем колесо, промокоды, админские пополнения)
-    income_result = await db.execute(
-        select(func.coalesce(func.sum(Transaction.amount_kopeks), 0)).where(
-            and_(
-                Transaction.type == TransactionType.DEPOSIT.value,
-                Transaction.is_completed == True,
-                Transaction.created_at >= start_date,
-                Transaction.created_at <= end_date,
-                Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
-            )
-        )
-    )
-    total_income = income_result.scalar()
-
-    expenses_result = await db.execute(
-        select(func.coalesce(func.sum(Transaction.amount_kopeks), 0)).where(
-            and_(
-                Transaction.type == TransactionType.WITHDRAWAL.value,
-                Transaction.is_completed == True,
-                Transaction.created_at >= start_date,
-                Transaction.created_at <= end_date,
-            )
-        )
+    is_real_income = and_(
+        Transaction.type == TransactionType.DEPOSIT.value,
+        Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
     )
-    total_expenses = expenses_result.scalar()
 
-    subscription_income_result = await db.execute(
-        select(func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0)).where(
-            and_(
-                Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                Transaction.is_completed == True,
-                Transaction.created_at >= start_date,
-                Transaction.created_at <= end_date,
+    # Итоги периода и сегодняшние счётчики — один проход по завершённым транзакциям
+    totals = (
+        await db.execute(
+            select(
+                sum_if(Transaction.amount_kopeks, and_(in_period, is_real_income)).label('income'),
+                sum_if(
+                    Transaction.amount_kopeks,
+                    and_(in_period, Transaction.type == TransactionType.WITHDRAWAL.value),
+                ).label('expenses'),
+                sum_if(
+                    func.abs(Transaction.amount_kopeks),
+                    and_(in_period, Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value),
+                ).label('subscription_income'),
+                count_if(in_today).label('today_count'),
+                sum_if(Transaction.amount_kopeks, and_(in_today, is_real_income)).label('today_income'),
+            ).where(
+                and_(
+                    Transaction.is_completed == True,
+                    or_(in_period, in_today),
+                )
             )
         )
-    )
-    subscription_income = subscription_income_result.scalar()
-
-    transactions_count_result = await db.execute(
+    ).one()
+    total_income = totals.income or 0
+    total_expenses = totals.expenses or 0
+    subscription_income = totals.subscription_income or 0
+    transactions_today = totals.today_count or 0
+    income_today = totals.today_income or 0
+
+    # Разбивка по типам и по способам оплаты пополнений — из одной группировки
+    breakdown_result = await db.execute(
         select(
             Transaction.type,
-            func.count(Transaction.id).label('count'),
-            func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('total_amount'),
-        )
-        .where(
-            and_(
-                Transaction.is_completed == True,
-                Transaction.created_at >= start_date,
-                Transaction.created_at <= end_date,
-            )
-        )
-        .group_by(Transaction.type)
-    )
-    transactions_by_type = {
-        row.type: {'count': row.count, 'amount': row.total_amount} for row in transactions_count_result
-    }
-
-    payment_methods_result = await db.execute(
-        select(
             Transaction.payment_method,
             func.count(Transaction.id).label('count'),
             func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('total_amount'),
         )
-        .where(
-            and_(
-                Transaction.type == TransactionType.DEPOSIT.value,
-                Transaction.is_completed == True,
-                Transaction.created_at >= start_date,
-                Transaction.created_at <= end_date,
-            )
-        )
-        .group_by(Transaction.payment_method)
+        .where(and_(Transaction.is_completed == True, in_period))
+        .group_by(Transaction.type, Transaction.payment_method)
     )
-    payment_methods = {
-        row.payment_method: {'count': row.count, 'amount': row.total_amount} for row in payment_methods_result
-    }
-
-    today = datetime.now(UTC).date()
-    today_result = await db.execute(
-        select(func.count(Transaction.id)).where(
-            and_(Transaction.is_completed == True, Transaction.created_at >= today)
-        )
-    )
-    transactions_today = today_result.scalar()
-
-    # Доход за сегодня - только реальные платежи
-    today_income_result = await db.execute(
-        select(func.coalesce(func.sum(Transaction.amount_kopeks), 0)).where(
-            and_(
-                Transaction.type == TransactionType.DEPOSIT.value,
-                Transaction.is_completed == True,
-                Transaction.created_at >= today,
-                Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
-            )
-        )
-    )
-    income_today = today_income_result.scalar()
+    transactions_by_type: dict = {}
+    payment_methods: dict = {}
+    for row in breakdown_result:
+        by_type = transactions_by_type.setdefault(row.type, {'count': 0, 'amount': 0})
+        by_type['count'] += row.count
+        by_type['amount'] += row.total_amount
+        if row.type == TransactionType.DEPOSIT.value:
+            by_method = payment_methods.setdefault(row.payment_method, {'count': 0, 'amount': 0})
+            by_method['count'] += row.count
+            by_method['amount'] += row.total_amount
 
     return {
         'period': {'start_date': start_date, 'end_date': end_date},
@@ -316,26 +272,19 @@ async def get_transactions_statistics(
 
 async def get_revenue_by_period(db: AsyncSession, days: int = 30) -> list[dict]:
     """Доход по дням - только реальные платежи."""
-    start_date = datetime.now(UTC) - timedelta(days=days)
-
-    result = await db.execute(
-        select(
-            func.date(Transaction.created_at).label('date'),
-            func.coalesce(func.sum(Transaction.amount_kopeks), 0).label('amount'),
-        )
-        .where(
-            and_(
-                Transaction.type == TransactionType.DEPOSIT.value,
-                Transaction.is_completed == True,
-                Transaction.created_at >= start_date,
-                Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
-            )
-        )
-        .group_by(func.date(Transaction.created_at))
-        .order_by(func.date(Transaction.created_at))
-    )
-
-    return [{'date': row.date, 'amount_kopeks': row.amount} for row in result]
+    now = datetime.now(UTC)
+
+    revenue_by_day: dict = {}
+    for row in await get_daily_revenue(
+        db,
+        now - timedelta(days=days),
+        now,
+        types=[TransactionType.DEPOSIT.value],
+        payment_methods=REAL_PAYMENT_METHODS,
+    ):
+        revenue_by_day[row.day] = revenue_by_day.get(row.day, 0) + row.amount_kopeks
+
+    return [{'date': day, 'amount_kopeks': amount} for day, amount in revenue_by_day.items()]
 
 
 async def find_tribute_transactions_by_payment_id(
@@ -1,9 +1,11 @@
+import base64
+import json
 import secrets
 import string
 from datetime import UTC, datetime, timedelta
 
 import structlog
-from sqlalchemy import and_, case, func, nullslast, or_, select, text
+from sqlalchemy import and_, func, nullslast, or_, select, text, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -11,17 +13,19 @@ from sqlalchemy.orm import selectinload
 from app.database.crud.discount_offer import get_latest_claimed_offer_for_user
 from app.database.crud.promo_group import get_default_promo_group
 from app.database.crud.promo_offer_log import log_promo_offer_action
+from app.database.crud.user_search import build_user_email_condition, build_user_search_condition
+from app.database.crud.user_spending import get_users_spending
 from app.database.models import (
     PaymentMethod,
     PromoGroup,
     Subscription,
     SubscriptionStatus,
-    Transaction,
     TransactionType,
     User,
     UserPromoGroup,
     UserStatus,
 )
+from app.utils.cache import cache, cache_key
 from app.utils.validators import sanitize_telegram_name
 
 
@@ -35,47 +39,6 @@ def _normalize_language_code(language: str | None, fallback: str = 'ru') -> str:
     return normalized or fallback
 
 
-def _build_spending_stats_select():
-    """
-    Возвращает базовый SELECT для статистики трат пользователей.
-
-    Используется в:
-    - get_users_list() для сортировки по тратам/покупкам
-    - get_users_spending_stats() для получения статистики
-
-    Returns:
-        Tuple колонок (user_id, total_spent, purchase_count)
-    """
-
-    return (
-        Transaction.user_id.label('user_id'),
-        func.coalesce(
-            func.sum(
-                case(
-                    (
-                        Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                        Transaction.amount_kopeks,
-                    ),
-                    else_=0,
-                )
-            ),
-            0,
-        ).label('total_spent'),
-        func.coalesce(
-            func.sum(
-                case(
-                    (
-                        Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
-                        1,
-                    ),
-                    else_=0,
-                )
-            ),
-            0,
-        ).label('purchase_count'),
-    )
-
-
 def generate_referral_code() -> str:
     alphabet = string.ascii_letters + string.digits
     code_suffix = ''.join(secrets.choice(alphabet) for _ in range(8))
@@ -705,51 +668,37 @@ async def cleanup_expired_promo_offer_discounts(db: AsyncSession) -> int:
     return len(users)
 
 
-async def get_users_list(
-    db: AsyncSession,
-    offset: int = 0,
-    limit: int = 50,
+def build_users_filters(
     search: str | None = None,
     email: str | None = None,
     status: UserStatus | None = None,
-    order_by_balance: bool = False,
-    order_by_traffic: bool = False,
-    order_by_last_activity: bool = False,
-    order_by_total_spent: bool = False,
-    order_by_purchase_count: bool = False,
-) -> list[User]:
-    query = select(User).options(
-        selectinload(User.subscription).selectinload(Subscription.tariff),
-        selectinload(User.promo_group),
-        selectinload(User.referrer),
-    )
+) -> list:
+    """Условия WHERE для списка, подсчёта и экспорта пользователей."""
+    filters = []
 
     if status:
-        query = query.where(User.status == status.value)
+        filters.append(User.status == status.value)
 
     if search:
-        search_term = f'%{search}%'
-        conditions = [
-            User.first_name.ilike(search_term),
-            User.last_name.ilike(search_term),
-            User.username.ilike(search_term),
-        ]
-
-        if search.isdigit():
-            try:
-                search_int = int(search)
-                # Добавляем условие поиска по telegram_id, который является BigInteger
-                # и может содержать большие значения, в отличие от User.id (INTEGER)
-                conditions.append(User.telegram_id == search_int)
-            except ValueError:
-                # Если не удалось преобразовать в int, просто ищем по текстовым полям
-                pass
-
-        query = query.where(or_(*conditions))
+        filters.append(build_user_search_condition(search))
 
     if email:
-        query = query.where(User.email.ilike(f'%{email}%'))
+        filters.append(build_user_email_condition(email))
+
+    return filters
+
+
+# Кеш точного количества для отфильтрованного списка (заголовок страницы)
+USERS_COUNT_CACHE_TTL = 60
+
 
+def _resolve_users_sort(
+    order_by_balance: bool = False,
+    order_by_traffic: bool = False,
+    order_by_last_activity: bool = False,
+    order_by_total_spent: bool = False,
+    order_by_purchase_count: bool = False,
+) -> str:
     sort_flags = [
         order_by_balance,
         order_by_traffic,
@@ -762,36 +711,144 @@ async def get_users_list(
             'Выбрано несколько сортировок пользователей — применяется приоритет: трафик > траты > покупки > баланс > активность'
         )
 
-    transactions_stats = None
-    if order_by_total_spent or order_by_purchase_count:
-        from app.database.models import Transaction
+    if order_by_traffic:
+        return 'traffic'
+    if order_by_total_spent:
+        return 'total_spent'
+    if order_by_purchase_count:
+        return 'purchase_count'
+    if order_by_balance:
+        return 'balance'
+    if order_by_last_activity:
+        return 'last_activity'
+    return 'created_at'
+
+
+def _users_sort_key(sort: str):
+    """Первичный ключ сортировки (по убыванию) или None для сортировки по дате регистрации."""
+    return {
+        'traffic': func.coalesce(Subscription.traffic_used_gb, 0.0),
+        'total_spent': User.total_spent_kopeks,
+        'purchase_count': User.purchase_count,
+        'balance': User.balance_kopeks,
+        'last_activity': User.last_activity,
+    }.get(sort)
+
+
+def _users_sort_value(user: User, sort: str):
+    if sort == 'traffic':
+        return float((user.subscription.traffic_used_gb if user.subscription else None) or 0.0)
+    if sort == 'total_spent':
+        return user.total_spent_kopeks
+    if sort == 'purchase_count':
+        return user.purchase_count
+    if sort == 'balance':
+        return user.balance_kopeks
+    if sort == 'last_activity':
+        return user.last_activity
+    return None
+
+
+def _encode_cursor_value(value):
+    return {'dt': value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _decode_cursor_value(value):
+    return datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+
+
+def encode_users_cursor(user: User, sort: str) -> str:
+    """Непрозрачный курсор на позицию после ``user``: ключ сортировки, дата регистрации и id."""
+    payload = [
+        sort,
+        _encode_cursor_value(_users_sort_value(user, sort)),
+        _encode_cursor_value(user.created_at),
+        user.id,
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
 
-        transactions_stats = (
-            select(*_build_spending_stats_select())
-            .where(Transaction.is_completed.is_(True))
-            .group_by(Transaction.user_id)
-            .subquery()
-        )
-        query = query.outerjoin(transactions_stats, transactions_stats.c.user_id == User.id)
 
-    if order_by_traffic:
-        traffic_sort = func.coalesce(Subscription.traffic_used_gb, 0.0)
+def decode_users_cursor(cursor: str, sort: str) -> tuple:
+    """Разбирает курсор; ValueError, если он повреждён или выдан для другой сортировки."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, value, created_at, user_id = json.loads(raw)
+        created_at = _decode_cursor_value(created_at)
+        value = _decode_cursor_value(value)
+    except Exception as error:
+        raise ValueError('Некорректный курсор списка пользователей') from error
+    if cursor_sort != sort or not isinstance(user_id, int) or not isinstance(created_at, datetime):
+        raise ValueError('Курсор выдан для другой сортировки')
+    return value, created_at, user_id
+
+
+def _users_keyset_filter(sort: str, cursor: str):
+    """Строки строго после курсора при сортировке (ключ DESC, created_at DESC, id DESC)."""
+    value, created_at, user_id = decode_users_cursor(cursor, sort)
+    after_tail = tuple_(User.created_at, User.id) < tuple_(created_at, user_id)
+    sort_key = _users_sort_key(sort)
+    if sort_key is None:
+        return after_tail
+    if sort == 'last_activity':
+        # NULLS LAST: пользователи без активности идут после всех остальных
+        if value is None:
+            return and_(sort_key.is_(None), after_tail)
+        return or_(sort_key < value, and_(sort_key == value, after_tail), sort_key.is_(None))
+    return tuple_(sort_key, User.created_at, User.id) < tuple_(value, created_at, user_id)
+
+
+async def get_users_list(
+    db: AsyncSession,
+    offset: int = 0,
+    limit: int = 50,
+    search: str | None = None,
+    email: str | None = None,
+    status: UserStatus | None = None,
+    order_by_balance: bool = False,
+    order_by_traffic: bool = False,
+    order_by_last_activity: bool = False,
+    order_by_total_spent: bool = False,
+    order_by_purchase_count: bool = False,
+    cursor: str | None = None,
+) -> list[User]:
+    """Страница пользователей.
+
+    С ``cursor`` (см. :func:`encode_users_cursor`) выборка идёт по ключу
+    сортировки вместо OFFSET и не замедляется на дальних страницах; ``offset``
+    при этом игнорируется.
+    """
+    query = select(User).options(
+        selectinload(User.subscription).selectinload(Subscription.tariff),
+        selectinload(User.promo_group),
+        selectinload(User.referrer),
+    )
+
+    query = query.where(*build_users_filters(search=search, email=email, status=status))
+
+    sort = _resolve_users_sort(
+        order_by_balance=order_by_balance,
+        order_by_traffic=order_by_traffic,
+        order_by_last_activity=order_by_last_activity,
+        order_by_total_spent=order_by_total_spent,
+        order_by_purchase_count=order_by_purchase_count,
+    )
+    sort_key = _users_sort_key(sort)
+
+    if sort == 'traffic':
         query = query.outerjoin(Subscription, Subscription.user_id == User.id)
-        query = query.order_by(traffic_sort.desc(), User.created_at.desc())
-    elif order_by_total_spent:
-        order_column = func.coalesce(transactions_stats.c.total_spent, 0)
-        query = query.order_by(order_column.desc(), User.created_at.desc())
-    elif order_by_purchase_count:
-        order_column = func.coalesce(transactions_stats.c.purchase_count, 0)
-        query = query.order_by(order_column.desc(), User.created_at.desc())
-    elif order_by_balance:
-        query = query.order_by(User.balance_kopeks.desc(), User.created_at.desc())
-    elif order_by_last_activity:
-        query = query.order_by(nullslast(User.last_activity.desc()), User.created_at.desc())
+    if sort == 'last_activity':
+        query = query.order_by(nullslast(sort_key.desc()))
+    elif sort_key is not None:
+        # total_spent / purchase_count идут по индексам ix_users_*_created
+        query = query.order_by(sort_key.desc())
+    query = query.order_by(User.created_at.desc(), User.id.desc())
+
+    if cursor:
+        query = query.where(_users_keyset_filter(sort, cursor))
     else:
-        query = query.order_by(User.created_at.desc())
-
-    query = query.offset(offset).limit(limit)
+        query = query.offset(offset)
+    query = query.limit(limit)
 
     result = await db.execute(query)
     users = result.scalars().all()
@@ -805,39 +862,70 @@ async def get_users_list(
     return users
 
 
+def get_users_next_cursor(
+    users: list[User],
+    limit: int,
+    order_by_balance: bool = False,
+    order_by_traffic: bool = False,
+    order_by_last_activity: bool = False,
+    order_by_total_spent: bool = False,
+    order_by_purchase_count: bool = False,
+) -> str | None:
+    """Курсор следующей страницы или None, если страница последняя.
+
+    ``users`` — выборка с ``limit + 1`` строками: лишняя строка показывает, что
+    следующая страница не пуста; вызывающий отдаёт только ``users[:limit]``.
+    """
+    if len(users) <= limit:
+        return None
+    sort = _resolve_users_sort(
+        order_by_balance=order_by_balance,
+        order_by_traffic=order_by_traffic,
+        order_by_last_activity=order_by_last_activity,
+        order_by_total_spent=order_by_total_spent,
+        order_by_purchase_count=order_by_purchase_count,
+    )
+    return encode_users_cursor(users[limit - 1], sort)
+
+
 async def get_users_count(
     db: AsyncSession, status: UserStatus | None = None, search: str | None = None, email: str | None = None
 ) -> int:
     query = select(func.count(User.id))
 
-    if status:
-        query = query.where(User.status == status.value)
+    query = query.where(*build_users_filters(search=search, email=email, status=status))
 
-    if search:
-        search_term = f'%{search}%'
-        conditions = [
-            User.first_name.ilike(search_term),
-            User.last_name.ilike(search_term),
-            User.username.ilike(search_term),
-        ]
-
-        if search.isdigit():
-            try:
-                search_int = int(search)
-                # Добавляем условие поиска по telegram_id, который является BigInteger
-                # и может содержать большие значения, в отличие от User.id (INTEGER)
-                conditions.append(User.telegram_id == search_int)
-            except ValueError:
-                # Если не удалось преобразовать в int, просто ищем по текстовым полям
-                pass
+    result = await db.execute(query)
+    return result.scalar()
 
-        query = query.where(or_(*conditions))
 
-    if email:
-        query = query.where(User.email.ilike(f'%{email}%'))
+async def get_users_count_estimate(
+    db: AsyncSession, status: UserStatus | None = None, search: str | None = None, email: str | None = None
+) -> int:
+    """Приблизительное количество для заголовка списка.
 
-    result = await db.execute(query)
-    return result.scalar()
+    Без фильтров — оценка планировщика PostgreSQL (``pg_class.reltuples``), с
+    фильтрами — точный COUNT, закешированный на ``USERS_COUNT_CACHE_TTL`` секунд.
+    """
+    if (
+        not build_users_filters(search=search, email=email, status=status)
+        and db.get_bind().dialect.name == 'postgresql'
+    ):
+        estimate = (
+            await db.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass"))
+        ).scalar()
+        # -1 или 0 — таблица ещё не анализировалась
+        if estimate and estimate > 0:
+            return int(estimate)
+
+    key = cache_key('users_count', status.value if status else '', search or '', email or '')
+    cached = await cache.get(key)
+    if cached is not None:
+        return int(cached)
+
+    count = await get_users_count(db, status=status, search=search, email=email)
+    await cache.set(key, count, USERS_COUNT_CACHE_TTL)
+    return count
 
 
 async def get_users_spending_stats(db: AsyncSession, user_ids: list[int]) -> dict[int, dict[str, int]]:
@@ -851,27 +939,10 @@ async def get_users_spending_stats(db: AsyncSession, user_ids: list[int]) -> dic
     Returns:
         Словарь {user_id: {"total_spent": int, "purchase_count": int}}
     """
-    if not user_ids:
-        return {}
-
-    stats_query = (
-        select(*_build_spending_stats_select())
-        .where(
-            Transaction.user_id.in_(user_ids),
-            Transaction.is_completed.is_(True),
-        )
-        .group_by(Transaction.user_id)
-    )
-
-    result = await db.execute(stats_query)
-    rows = result.all()
-
+    spending = await get_users_spending(db, user_ids)
     return {
-        row.user_id: {
-            'total_spent': int(row.total_spent or 0),
-            'purchase_count': int(row.purchase_count or 0),
-        }
-        for row in rows
+        user_id: {'total_spent': stats['total_spent'], 'purchase_count': stats['purchase_count']}
+        for user_id, stats in spending.items()
     }
 
 
@@ -0,0 +1,75 @@
+"""Условия поиска пользователей по подстроке для списка, подсчёта и экспорта.
+
+* Числовой запрос длиной от 5 цифр — Telegram ID: точное совпадение по
+  уникальному индексу, имена не сканируются (короткие числа ищутся и там,
+  и там).
+* Реферальный код (``ref`` + 8 символов, см. ``generate_referral_code``) —
+  точное совпадение по уникальному индексу.
+* Остальное — подстрока в имени, фамилии и username. На PostgreSQL это
+  ``ILIKE '%term%'``, который при длине запроса от 3 символов идёт по
+  trigram GIN-индексам (миграция 0019). На SQLite — FTS5-таблица
+  ``users_search_fts`` с trigram-токенизатором; более короткие запросы и
+  старые версии SQLite ищут через LIKE.
+"""
+
+import re
+import sqlite3
+from functools import cache
+
+from sqlalchemy import ColumnElement, literal_column, or_, select, table
+
+from app.config import settings
+from app.database.models import User
+
+
+TELEGRAM_ID_MIN_DIGITS = 5
+REFERRAL_CODE_PATTERN = re.compile(r'^ref[A-Za-z0-9]{8}$')
+# Trigram-токенизатор FTS5 и trigram-индексы не работают на запросах короче
+TRIGRAM_MIN_LENGTH = 3
+SQLITE_TRIGRAM_VERSION = (3, 34)
+
+_NAME_COLUMNS = ('first_name', 'last_name', 'username')
+_users_search_fts = table('users_search_fts')
+
+
+@cache
+def _sqlite_fts_enabled() -> bool:
+    return settings.is_sqlite() and sqlite3.sqlite_version_info >= SQLITE_TRIGRAM_VERSION
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _fts_match(columns: tuple[str, ...], term: str) -> ColumnElement[bool]:
+    query = '{' + ' '.join(columns) + '} : ' + _fts_phrase(term)
+    matched_ids = (
+        select(literal_column('rowid'))
+        .select_from(_users_search_fts)
+        .where(literal_column('users_search_fts').op('MATCH')(query))
+    )
+    return User.id.in_(matched_ids)
+
+
+def _substring_condition(columns: tuple[str, ...], term: str) -> ColumnElement[bool]:
+    if len(term) >= TRIGRAM_MIN_LENGTH and _sqlite_fts_enabled():
+        return _fts_match(columns, term)
+    pattern = f'%{term}%'
+    return or_(*(getattr(User, column).ilike(pattern) for column in columns))
+
+
+def build_user_search_condition(search: str) -> ColumnElement[bool]:
+    term = search.strip()
+    is_number = term.isascii() and term.isdigit()
+    if is_number and len(term) >= TELEGRAM_ID_MIN_DIGITS:
+        return User.telegram_id == int(term)
+    if REFERRAL_CODE_PATTERN.match(term):
+        return User.referral_code == term
+    condition = _substring_condition(_NAME_COLUMNS, term)
+    if is_number:
+        return or_(condition, User.telegram_id == int(term))
+    return condition
+
+
+def build_user_email_condition(email: str) -> ColumnElement[bool]:
+    return _substring_condition(('email',), email.strip())
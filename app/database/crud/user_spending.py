@@ -0,0 +1,178 @@
+"""Денормализованные траты пользователя: ``users.total_spent_kopeks``, ``purchase_count``, ``last_purchase_at``.
+
+Покупка — завершённая транзакция ``SUBSCRIPTION_PAYMENT`` (сумма берётся по
+модулю, как и для порогов промогрупп). Поля пересчитываются по транзакциям
+пользователя ORM-хуками на :class:`Transaction` в той же транзакции БД, так
+что сортировка списка пользователей и отображение трат читают готовые
+колонки. Массовые изменения в обход ORM исправляет :func:`reconcile_user_spending`
+(ночная сверка и ``python -m app.database.crud.user_spending``).
+
+Уже загруженный в сессию объект ``User`` не обновляется — актуальные значения
+читаются запросом по колонкам.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import structlog
+from sqlalchemy import and_, event, func, inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import Transaction, TransactionType, User
+
+
+logger = structlog.get_logger(__name__)
+
+RECONCILE_BATCH_SIZE = 1000
+
+
+def _purchases_of(user_id: Any) -> Any:
+    return and_(
+        Transaction.user_id == user_id,
+        Transaction.is_completed.is_(True),
+        Transaction.type == TransactionType.SUBSCRIPTION_PAYMENT.value,
+    )
+
+
+def _spending_values() -> dict[str, Any]:
+    """Коррелированные подзапросы с актуальными значениями для строки ``users``."""
+    purchases = _purchases_of(User.id)
+    return {
+        'total_spent_kopeks': select(func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0))
+        .where(purchases)
+        .scalar_subquery(),
+        'purchase_count': select(func.count(Transaction.id)).where(purchases).scalar_subquery(),
+        'last_purchase_at': select(func.max(Transaction.created_at)).where(purchases).scalar_subquery(),
+    }
+
+
+def refresh_user_spending_statement(user_ids: Iterable[int]):
+    """``UPDATE users`` с пересчётом трат для указанных пользователей."""
+    return update(User).where(User.id.in_(list(user_ids))).values(**_spending_values())
+
+
+async def get_users_spending(db: AsyncSession, user_ids: list[int]) -> dict[int, dict[str, Any]]:
+    if not user_ids:
+        return {}
+    result = await db.execute(
+        select(User.id, User.total_spent_kopeks, User.purchase_count, User.last_purchase_at).where(
+            User.id.in_(user_ids)
+        )
+    )
+    return {
+        row.id: {
+            'total_spent': int(row.total_spent_kopeks or 0),
+            'purchase_count': int(row.purchase_count or 0),
+            'last_purchase_at': row.last_purchase_at,
+        }
+        for row in result
+    }
+
+
+async def reconcile_user_spending(db: AsyncSession, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Пересчитывает траты всех пользователей пачками по id и коммитит; возвращает число исправленных строк."""
+    fixed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            (await db.execute(select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size))).scalars()
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        values = _spending_values()
+        result = await db.execute(
+            update(User)
+            .where(
+                User.id.in_(ids),
+                or_(
+                    User.total_spent_kopeks != values['total_spent_kopeks'],
+                    User.purchase_count != values['purchase_count'],
+                    User.last_purchase_at.is_distinct_from(values['last_purchase_at']),
+                ),
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        fixed += result.rowcount or 0
+
+    if fixed:
+        logger.warning('Исправлены денормализованные траты пользователей', fixed=fixed)
+    return fixed
+
+
+def _refresh_user(connection, user_id: int | None) -> None:
+    if user_id is None:
+        return
+    try:
+        # Savepoint: сбой пересчёта не должен откатывать сам платёж — его исправит сверка
+        with connection.begin_nested():
+            connection.execute(refresh_user_spending_statement([user_id]))
+    except Exception as error:
+        logger.warning('Не удалось пересчитать траты пользователя', user_id=user_id, error=error)
+
+
+def _is_purchase_type(value: Any) -> bool:
+    return value == TransactionType.SUBSCRIPTION_PAYMENT.value
+
+
+@event.listens_for(Transaction, 'after_insert')
+def _on_transaction_insert(mapper, connection, target: Transaction) -> None:
+    if _is_purchase_type(target.type) and target.is_completed is not False:
+        _refresh_user(connection, target.user_id)
+
+
+_PREVIOUS_OWNER_KEY = 'user_spending_previous_owner'
+_TRACKED_ATTRIBUTES = ('is_completed', 'amount_kopeks', 'type', 'user_id', 'created_at')
+
+
+@event.listens_for(Transaction, 'before_update')
+def _remember_owner(mapper, connection, target: Transaction) -> None:
+    attrs = inspect(target).attrs
+    if not (attrs.user_id.history.has_changes() or attrs.type.history.has_changes()):
+        return
+    previous_user_ids = attrs.user_id.history.deleted
+    previous_types = attrs.type.history.deleted
+    if (attrs.user_id.history.added and not previous_user_ids) or (attrs.type.history.added and not previous_types):
+        # Атрибут был истёкшим при присваивании: прежнее значение ещё в строке БД
+        row = connection.execute(
+            select(Transaction.user_id, Transaction.type).where(Transaction.id == target.id)
+        ).one_or_none()
+        if row is not None:
+            previous_user_ids, previous_types = [row.user_id], [row.type]
+    inspect(target).info[_PREVIOUS_OWNER_KEY] = (list(previous_user_ids), list(previous_types))
+
+
+@event.listens_for(Transaction, 'after_update')
+def _on_transaction_update(mapper, connection, target: Transaction) -> None:
+    state = inspect(target)
+    previous_user_ids, previous_types = state.info.pop(_PREVIOUS_OWNER_KEY, ([], []))
+    if not any(state.attrs[name].history.has_changes() for name in _TRACKED_ATTRIBUTES):
+        return
+    if not (_is_purchase_type(target.type) or any(_is_purchase_type(value) for value in previous_types)):
+        return
+    _refresh_user(connection, target.user_id)
+    for previous_user_id in previous_user_ids:
+        if previous_user_id != target.user_id:
+            _refresh_user(connection, previous_user_id)
+
+
+@event.listens_for(Transaction, 'after_delete')
+def _on_transaction_delete(mapper, connection, target: Transaction) -> None:
+    if _is_purchase_type(target.type):
+        _refresh_user(connection, target.user_id)
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    async def _main() -> None:
+        from app.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            fixed = await reconcile_user_spending(db)
+        logger.info('Сверка трат пользователей завершена', fixed=fixed)
+
+    asyncio.run(_main())
@@ -5,7 +5,7 @@ from __future__ import annotations
 from collections.abc import Iterable
 from datetime import UTC, datetime
 
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import WebApiToken
@@ -90,6 +90,27 @@ async def set_tokens_active_status(
     )
 
 
+async def record_tokens_usage(
+    db: AsyncSession,
+    usage: Iterable[tuple[int, datetime, str | None]],
+) -> None:
+    """Bulk-update ``last_used_at``/``last_used_ip``; a ``None`` IP keeps the stored one."""
+    params = [{'token_id': token_id, 'used_at': used_at, 'used_ip': used_ip} for token_id, used_at, used_ip in usage]
+    if not params:
+        return
+
+    table = WebApiToken.__table__
+    await db.execute(
+        update(table)
+        .where(table.c.id == bindparam('token_id'))
+        .values(
+            last_used_at=bindparam('used_at'),
+            last_used_ip=func.coalesce(bindparam('used_ip'), table.c.last_used_ip),
+        ),
+        params,
+    )
+
+
 async def delete_token(db: AsyncSession, token: WebApiToken) -> None:
     await db.delete(token)
 
@@ -100,6 +121,7 @@ __all__ = [
     'get_token_by_hash',
     'get_token_by_id',
     'list_tokens',
+    'record_tokens_usage',
     'set_tokens_active_status',
     'update_token',
 ]
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.database.models import Webhook, WebhookDelivery
 
@@ -149,3 +152,78 @@ async def update_webhook_stats(
     await db.commit()
     await db.refresh(webhook)
     return webhook
+
+
+async def enqueue_webhook_deliveries(
+    db: AsyncSession,
+    webhooks: Iterable[Webhook],
+    event_type: str,
+    payload: dict[str, Any],
+) -> list[WebhookDelivery]:
+    """Поставить доставку события в очередь (status=pending) для каждого webhook."""
+    now = datetime.now(UTC)
+    deliveries = [
+        WebhookDelivery(
+            webhook_id=webhook.id,
+            event_type=event_type,
+            payload=payload,
+            status='pending',
+            attempt_number=0,
+            next_retry_at=now,
+        )
+        for webhook in webhooks
+    ]
+    if not deliveries:
+        return []
+
+    db.add_all(deliveries)
+    await db.commit()
+    return deliveries
+
+
+async def claim_due_webhook_deliveries(
+    db: AsyncSession,
+    *,
+    limit: int,
+    lease_seconds: int,
+) -> list[WebhookDelivery]:
+    """Забрать готовые к отправке доставки и продлить им next_retry_at на время аренды.
+
+    Строки блокируются с SKIP LOCKED, поэтому несколько воркеров не возьмут одну
+    доставку; если воркер упадёт, доставка вернётся в очередь по истечении аренды.
+    """
+    now = datetime.now(UTC)
+    result = await db.execute(
+        select(WebhookDelivery)
+        .where(WebhookDelivery.status == 'pending', WebhookDelivery.next_retry_at <= now)
+        .order_by(WebhookDelivery.next_retry_at, WebhookDelivery.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .options(selectinload(WebhookDelivery.webhook))
+    )
+    deliveries = list(result.scalars().all())
+
+    lease_until = now + timedelta(seconds=lease_seconds)
+    for delivery in deliveries:
+        delivery.next_retry_at = lease_until
+    await db.flush()
+    return deliveries
+
+
+async def increment_webhook_stats(
+    db: AsyncSession,
+    webhook_id: int,
+    *,
+    successes: int = 0,
+    failures: int = 0,
+) -> None:
+    """Атомарно увеличить счётчики webhook на результаты пачки доставок."""
+    await db.execute(
+        update(Webhook)
+        .where(Webhook.id == webhook_id)
+        .values(
+            success_count=Webhook.success_count + successes,
+            failure_count=Webhook.failure_count + failures,
+            last_triggered_at=datetime.now(UTC),
+        )
+    )
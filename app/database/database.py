@@ -13,6 +13,8 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.config import settings
+from app.database.pool_admission import AdmissionQueuePool, pool_admission
+from app.database.query_profiler import profile_after_cursor_execute, profile_before_cursor_execute
 
 
 logger = structlog.get_logger(__name__)
@@ -67,7 +69,8 @@ _pg_connect_args = {
 
 engine = create_async_engine(
     DATABASE_URL,
-    poolclass=poolclass,
+    # Основной пул — с допуском по приоритетам (платежи > пользователи > фоновые задачи)
+    poolclass=poolclass if IS_SQLITE else AdmissionQueuePool,
     echo='debug' if settings.DEBUG else False,
     future=True,
     # Кеш скомпилированных запросов (правильное размещение)
@@ -78,6 +81,7 @@ engine = create_async_engine(
     },
     **pool_kwargs,
 )
+pool_admission.attach(engine)
 
 # ============================================================================
 # SESSION FACTORY WITH OPTIMIZATIONS
@@ -174,6 +178,10 @@ async def execute_with_retry(
 # QUERY PERFORMANCE MONITORING
 # ============================================================================
 
+if settings.QUERY_PROFILER_ENABLED:
+    event.listen(Engine, 'before_cursor_execute', profile_before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', profile_after_cursor_execute)
+
 if settings.DEBUG:
 
     @event.listens_for(Engine, 'before_cursor_execute')
@@ -194,6 +202,18 @@ if settings.DEBUG:
 # ============================================================================
 
 HEALTH_CHECK_TIMEOUT = 5.0  # секунды
+REPLICA_LAG_TIMEOUT = 2.0  # секунды
+
+# Отставание реплики PostgreSQL: 0, если всё проиграно (или это не standby)
+_REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
 
 
 def _validate_database_url(url: str | None) -> str | None:
@@ -245,13 +265,92 @@ class DatabaseManager:
             except Exception as e:
                 logger.error('Не удалось настроить read replica', e=e)
                 self.read_replica_engine = None
+                self._read_replica_session_factory = None
+
+        # Отставание реплики кешируется на DATABASE_READ_REPLICA_LAG_CHECK_INTERVAL_SECONDS
+        self._replica_lag: float | None = None
+        self._replica_lag_checked_at: float | None = None
+        self._replica_lag_lock = asyncio.Lock()
+        self._replica_degraded = False
+        self._read_routing = {'replica': 0, 'primary': 0, 'fallback': 0}
+
+    async def get_replica_lag(self, force: bool = False) -> float | None:
+        """Отставание реплики в секундах; ``None`` — реплика не настроена или недоступна."""
+        if self._read_replica_session_factory is None:
+            return None
+
+        interval = settings.DATABASE_READ_REPLICA_LAG_CHECK_INTERVAL_SECONDS
+        if not force and self._lag_is_fresh(interval):
+            return self._replica_lag
+
+        async with self._replica_lag_lock:
+            # Пока ждали блокировку, значение мог обновить другой запрос
+            if not force and self._lag_is_fresh(interval):
+                return self._replica_lag
+            self._replica_lag = await self._measure_replica_lag()
+            self._replica_lag_checked_at = time.monotonic()
+            return self._replica_lag
+
+    def _lag_is_fresh(self, interval: float) -> bool:
+        return self._replica_lag_checked_at is not None and time.monotonic() - self._replica_lag_checked_at < interval
+
+    async def _measure_replica_lag(self) -> float | None:
+        if self.read_replica_engine.dialect.name != 'postgresql':
+            return 0.0
+        try:
+            async with asyncio.timeout(REPLICA_LAG_TIMEOUT):
+                async with self._read_replica_session_factory() as session:
+                    lag = (await session.execute(_REPLICA_LAG_QUERY)).scalar()
+            return max(float(lag or 0), 0.0)
+        except Exception as e:
+            logger.warning('Не удалось получить отставание read replica', error=str(e)[:200])
+            return None
+
+    async def _read_only_session_factory(self) -> async_sessionmaker:
+        """Реплика, если она доступна и отстаёт не больше порога; иначе основная БД."""
+        if self._read_replica_session_factory is None:
+            self._read_routing['primary'] += 1
+            return AsyncSessionLocal
+
+        lag = await self.get_replica_lag()
+        max_lag = settings.DATABASE_READ_REPLICA_MAX_LAG_SECONDS
+        degraded = lag is None or lag > max_lag
+        if degraded != self._replica_degraded:
+            self._replica_degraded = degraded
+            if degraded:
+                logger.warning(
+                    'Read replica отстаёт или недоступна, чтение идёт в основную БД', lag=lag, max_lag=max_lag
+                )
+            else:
+                logger.info('Read replica догнала основную БД, чтение возвращено на реплику', lag=lag)
+
+        if degraded:
+            self._read_routing['fallback'] += 1
+            return AsyncSessionLocal
+        self._read_routing['replica'] += 1
+        return self._read_replica_session_factory
+
+    def get_replica_metrics(self) -> dict:
+        """Состояние маршрутизации read-only сессий."""
+        checked_at = self._replica_lag_checked_at
+        return {
+            'configured': self._read_replica_session_factory is not None,
+            'lag_seconds': round(self._replica_lag, 3) if self._replica_lag is not None else None,
+            'lag_checked_seconds_ago': round(time.monotonic() - checked_at, 1) if checked_at is not None else None,
+            'max_lag_seconds': settings.DATABASE_READ_REPLICA_MAX_LAG_SECONDS,
+            'degraded': self._replica_degraded,
+            'reads': dict(self._read_routing),
+        }
 
     @asynccontextmanager
     async def session(self, read_only: bool = False):
-        """Контекстный менеджер для работы с сессией БД."""
-        # Используем предсозданный sessionmaker вместо создания нового
-        if read_only and self._read_replica_session_factory:
-            session_factory = self._read_replica_session_factory
+        """Контекстный менеджер для работы с сессией БД.
+
+        ``read_only=True`` отдаёт сессию реплики (без commit), если она настроена
+        и её отставание не превышает ``DATABASE_READ_REPLICA_MAX_LAG_SECONDS``.
+        """
+        if read_only:
+            session_factory = await self._read_only_session_factory()
         else:
             session_factory = AsyncSessionLocal
 
@@ -316,10 +415,14 @@ class DatabaseManager:
         except Exception as e:
             logger.error('Read replica health check failed', e=e)
 
+        if status == 'healthy':
+            await self.get_replica_lag(force=True)
+
         return {
             'status': status,
             'latency_ms': round(latency, 2) if latency else None,
             'pool': _collect_health_pool_metrics(pool),
+            'routing': self.get_replica_metrics(),
         }
 
 
@@ -347,6 +450,24 @@ async def get_db_read_only() -> AsyncGenerator[AsyncSession]:
         yield session
 
 
+def with_read_only_db[**P, R](func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """
+    Декоратор: выполняет функцию с read-only сессией в аргументе ``db``.
+
+    Переданная сессия (например, от DB-middleware хендлера) подменяется
+    сессией реплики; при отставании реплики это сессия основной БД.
+    Только для кода, который ничего не пишет через ``db``.
+    """
+
+    @wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        async with db_manager.session(read_only=True) as session:
+            kwargs['db'] = session
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
 # ============================================================================
 # BATCH OPERATIONS FOR PERFORMANCE
 # ============================================================================
@@ -605,4 +726,5 @@ async def get_pool_metrics() -> dict:
         'total_connections': counters['total_connections'],
         'max_possible_connections': counters['total_connections'] + (getattr(pool, '_max_overflow', 0) or 0),
         'pool_utilization_percent': round(counters['utilization_percent'], 2),
+        'admission': pool_admission.get_metrics(),
     }
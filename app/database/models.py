@@ -1060,6 +1060,10 @@ class PartnerStatus(Enum):
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_total_spent_created', 'total_spent_kopeks', 'created_at'),
+        Index('ix_users_purchase_count_created', 'purchase_count', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     telegram_id = Column(BigInteger, unique=True, index=True, nullable=True)  # Nullable для email-only пользователей
@@ -1108,6 +1112,10 @@ class User(Base):
     lifetime_used_traffic_bytes = Column(BigInteger, default=0)
     auto_promo_group_assigned = Column(Boolean, nullable=False, default=False)
     auto_promo_group_threshold_kopeks = Column(BigInteger, nullable=False, default=0)
+    # Денормализованные траты (завершённые SUBSCRIPTION_PAYMENT), см. app.database.crud.user_spending
+    total_spent_kopeks = Column(BigInteger, nullable=False, default=0, server_default='0')
+    purchase_count = Column(Integer, nullable=False, default=0, server_default='0')
+    last_purchase_at = Column(AwareDateTime(), nullable=True)
     referral_commission_percent = Column(Integer, nullable=True)
     promo_offer_discount_percent = Column(Integer, nullable=False, default=0)
     promo_offer_discount_source = Column(String(100), nullable=True)
@@ -1216,6 +1224,7 @@ class Subscription(Base):
     __table_args__ = (
         Index('ix_subscriptions_status_trial', 'status', 'is_trial'),
         Index('ix_subscriptions_trial_created', 'is_trial', 'created_at'),
+        Index('ix_subscriptions_status_end_date', 'status', 'end_date'),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -2216,6 +2225,22 @@ class ServerSquad(Base):
         return 'Доступен'
 
 
+class ServerSquadUserDelta(Base):
+    """Журнал изменений ``server_squads.current_users``.
+
+    Покупки и смены серверов только дописывают строки (без блокировки горячих
+    строк серверов); сервис сворачивает журнал в ``current_users`` каждые
+    ``SERVER_USER_COUNTER_FOLD_INTERVAL_SECONDS`` (см. crud.server_squad).
+    """
+
+    __tablename__ = 'server_squad_user_deltas'
+
+    id = Column(Integer, primary_key=True)
+    server_squad_id = Column(Integer, ForeignKey('server_squads.id', ondelete='CASCADE'), nullable=False, index=True)
+    delta = Column(Integer, nullable=False)
+    created_at = Column(AwareDateTime(), default=func.now())
+
+
 class SubscriptionServer(Base):
     __tablename__ = 'subscription_servers'
 
@@ -2231,6 +2256,20 @@ class SubscriptionServer(Base):
     server_squad = relationship('ServerSquad', backref='subscription_servers')
 
 
+class SubscriptionSquad(Base):
+    """Нормализованный индекс ``Subscription.connected_squads``: строка на каждый сквад подписки.
+
+    Поддерживается ORM-хуками при любом изменении ``connected_squads``
+    (crud.subscription_squads) — поиск подписок по скваду идёт по индексу,
+    а не по LIKE над JSON.
+    """
+
+    __tablename__ = 'subscription_squads'
+
+    subscription_id = Column(Integer, ForeignKey('subscriptions.id', ondelete='CASCADE'), primary_key=True)
+    squad_uuid = Column(String(255), primary_key=True, index=True)
+
+
 class SupportAuditLog(Base):
     __tablename__ = 'support_audit_logs'
 
@@ -2617,6 +2656,7 @@ class WebhookDelivery(Base):
     __table_args__ = (
         Index('ix_webhook_deliveries_webhook_created', 'webhook_id', 'created_at'),
         Index('ix_webhook_deliveries_status', 'status'),
+        Index('ix_webhook_deliveries_status_next_retry', 'status', 'next_retry_at'),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -3041,3 +3081,60 @@ class AdminAuditLog(Base):
 
     def __repr__(self) -> str:
         return f'<AdminAuditLog id={self.id} action={self.action!r} status={self.status!r}>'
+
+
+# ==================== STATISTICS ROLLUPS ====================
+# Дневные агрегаты для графиков и отчётов; день = func.date(created_at), как в запросах графиков.
+
+
+class StatsDailyActivity(Base):
+    """Регистрации, триалы и конверсии за день. Строка есть только у сверенных (закрытых) дней."""
+
+    __tablename__ = 'stats_daily_activity'
+
+    day = Column(Date, primary_key=True)
+    registrations = Column(Integer, nullable=False, default=0)
+    referred_registrations = Column(Integer, nullable=False, default=0)
+    trials = Column(Integer, nullable=False, default=0)
+    paid_subscriptions = Column(Integer, nullable=False, default=0)
+    conversions = Column(Integer, nullable=False, default=0)
+    reconciled_at = Column(AwareDateTime(), nullable=False, default=func.now())
+
+    def __repr__(self) -> str:
+        return f'<StatsDailyActivity day={self.day} registrations={self.registrations}>'
+
+
+class StatsDailyRevenue(Base):
+    """Завершённые транзакции за день по типу и способу оплаты ('' — без способа оплаты)."""
+
+    __tablename__ = 'stats_daily_revenue'
+
+    day = Column(Date, primary_key=True)
+    type = Column(String(50), primary_key=True)
+    payment_method = Column(String(50), primary_key=True, default='')
+    count = Column(Integer, nullable=False, default=0)
+    amount_kopeks = Column(BigInteger, nullable=False, default=0)
+    abs_amount_kopeks = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f'<StatsDailyRevenue day={self.day} type={self.type!r} method={self.payment_method!r}>'
+
+
+class StatsDailyReferral(Base):
+    """Приглашённые и реферальные начисления за день по рефереру и кампании (0 — без кампании).
+
+    Приглашения хранятся в строке с campaign_id = 0.
+    """
+
+    __tablename__ = 'stats_daily_referrals'
+    __table_args__ = (Index('ix_stats_daily_referrals_referrer_day', 'referrer_id', 'day'),)
+
+    day = Column(Date, primary_key=True)
+    referrer_id = Column(Integer, primary_key=True)
+    campaign_id = Column(Integer, primary_key=True, default=0)
+    invited_count = Column(Integer, nullable=False, default=0)
+    earnings_count = Column(Integer, nullable=False, default=0)
+    earnings_kopeks = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f'<StatsDailyReferral day={self.day} referrer_id={self.referrer_id} campaign_id={self.campaign_id}>'
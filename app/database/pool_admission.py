@@ -0,0 +1,267 @@
+"""Priority-aware admission to the main connection pool.
+
+Every connection checkout is made on behalf of a priority carried through
+``contextvars`` (like the query profiler unit, it is visible in the pool
+because SQLAlchemy runs the sync pool code in the caller's context):
+
+* ``critical`` — payment provider webhooks, RemnaWave webhooks, Telegram
+  Stars pre-checkout and successful payments; may use the whole pool;
+* ``interactive`` — bot handlers, cabinet, miniapp and admin API (default);
+  ``DB_POOL_RESERVED_CRITICAL`` connections are kept out of its reach;
+* ``background`` — monitoring, counters, the expiry scheduler and exports;
+  additionally ``DB_POOL_RESERVED_INTERACTIVE`` connections are kept away.
+
+:class:`AdmissionQueuePool` enforces the limits on checkout: a request over
+its limit waits at most ``DB_POOL_ADMISSION_WAIT_SECONDS`` and then fails
+with :class:`PoolAdmissionRejected` (HTTP 503 with ``Retry-After``, "try
+later" in the bot) instead of stalling for the full ``pool_timeout``.
+Background loops call :meth:`PoolAdmission.background_backoff` before each
+pass: while pool utilization is at or above ``DB_POOL_BACKGROUND_BACKOFF_PERCENT``
+the pass is delayed with exponential backoff (at most ``BACKOFF_MAX_SECONDS``).
+Wait and hold times per priority are exposed by ``GET /metrics/pool``.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+import structlog
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from sqlalchemy.util import await_only
+
+from app.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+SAMPLE_SIZE = 512
+ADMISSION_POLL_SECONDS = 0.05
+BACKOFF_INITIAL_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_AFTER_SECONDS = 5
+
+_CONNECTION_INFO_KEY = 'pool_admission'
+
+
+class DbPriority(Enum):
+    CRITICAL = 'critical'
+    INTERACTIVE = 'interactive'
+    BACKGROUND = 'background'
+
+
+_current_priority: ContextVar[DbPriority] = ContextVar('db_pool_priority', default=DbPriority.INTERACTIVE)
+
+
+def current_priority() -> DbPriority:
+    return _current_priority.get()
+
+
+@contextmanager
+def db_priority(priority: DbPriority) -> Iterator[None]:
+    """Приоритет соединений с БД для кода внутри блока (и созданных в нём задач)."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class PoolAdmissionRejected(PoolTimeoutError):
+    """Пул занят выше лимита приоритета дольше ``DB_POOL_ADMISSION_WAIT_SECONDS``."""
+
+    def __init__(self, priority: DbPriority, checked_out: int, limit: int) -> None:
+        super().__init__(f'Пул соединений занят для приоритета {priority.value}: {checked_out} из {limit} соединений')
+        self.priority = priority
+
+
+@dataclass(slots=True)
+class PriorityStats:
+    checkouts: int = 0
+    rejected: int = 0
+    in_use: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    held_total: float = 0.0
+    held_max: float = 0.0
+    held_count: int = 0
+    wait_samples: deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_SIZE))
+    held_samples: deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_SIZE))
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _p95_ms(samples: deque[float]) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return _ms(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))])
+
+
+class PoolAdmission:
+    def __init__(self) -> None:
+        self._engine = None
+        self.reset()
+
+    def reset(self) -> None:
+        in_use = {priority: stats.in_use for priority, stats in getattr(self, '_stats', {}).items()}
+        self._stats = {priority: PriorityStats(in_use=in_use.get(priority, 0)) for priority in DbPriority}
+        self._backoffs: Counter[str] = Counter()
+        self._backoff_seconds = 0.0
+
+    def attach(self, engine) -> None:
+        """Пул этого движка — основной: по нему считаются загрузка и отказы фоновых задач."""
+        self._engine = engine
+
+    @property
+    def pool(self) -> Pool | None:
+        return self._engine.pool if self._engine is not None else None
+
+    @staticmethod
+    def capacity(pool: Pool) -> int:
+        max_overflow = getattr(pool, '_max_overflow', 0) or 0
+        return pool.size() + max(max_overflow, 0)
+
+    @staticmethod
+    def limit(priority: DbPriority, capacity: int) -> int:
+        """Сколько соединений пула может быть занято, чтобы выдать ещё одно запросу этого приоритета."""
+        if priority is DbPriority.CRITICAL:
+            return capacity
+        reserved = max(settings.DB_POOL_RESERVED_CRITICAL, 0)
+        if priority is DbPriority.BACKGROUND:
+            reserved += max(settings.DB_POOL_RESERVED_INTERACTIVE, 0)
+        return max(capacity - reserved, 1)
+
+    def utilization_percent(self) -> float:
+        pool = self.pool
+        checkedout = getattr(pool, 'checkedout', None)
+        if checkedout is None:
+            return 0.0
+        capacity = self.capacity(pool)
+        return checkedout() / capacity * 100 if capacity else 0.0
+
+    def record_wait(self, priority: DbPriority, seconds: float) -> None:
+        stats = self._stats[priority]
+        stats.wait_total += seconds
+        stats.wait_max = max(stats.wait_max, seconds)
+        stats.wait_samples.append(seconds)
+
+    def record_rejected(self, priority: DbPriority) -> None:
+        self._stats[priority].rejected += 1
+
+    def record_checkout(self, priority: DbPriority) -> None:
+        stats = self._stats[priority]
+        stats.checkouts += 1
+        stats.in_use += 1
+
+    def record_checkin(self, priority: DbPriority, held: float) -> None:
+        stats = self._stats[priority]
+        stats.in_use = max(stats.in_use - 1, 0)
+        stats.held_count += 1
+        stats.held_total += held
+        stats.held_max = max(stats.held_max, held)
+        stats.held_samples.append(held)
+
+    async def background_backoff(self, job: str) -> float:
+        """Откладывает проход фоновой задачи, пока пул загружен выше порога; возвращает время ожидания."""
+        threshold = settings.DB_POOL_BACKGROUND_BACKOFF_PERCENT
+        if not settings.DB_POOL_ADMISSION_ENABLED or threshold <= 0:
+            return 0.0
+
+        waited = 0.0
+        delay = BACKOFF_INITIAL_SECONDS
+        while waited < BACKOFF_MAX_SECONDS:
+            utilization = self.utilization_percent()
+            if utilization < threshold:
+                break
+            if not waited:
+                logger.info(
+                    'Пул соединений загружен, фоновая задача ждёт',
+                    job=job,
+                    utilization_percent=round(utilization, 1),
+                )
+            delay = min(delay, BACKOFF_MAX_SECONDS - waited)
+            await asyncio.sleep(delay)
+            waited += delay
+            delay *= 2
+
+        if waited:
+            self._backoffs[job] += 1
+            self._backoff_seconds += waited
+        return waited
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Лимиты, ожидание выдачи и время удержания соединений по приоритетам, в мс."""
+        pool = self.pool
+        capacity = self.capacity(pool) if isinstance(pool, AdmissionQueuePool) else None
+        priorities = {}
+        for priority, stats in self._stats.items():
+            priorities[priority.value] = {
+                'limit': self.limit(priority, capacity) if capacity else None,
+                'in_use': stats.in_use,
+                'checkouts': stats.checkouts,
+                'rejected': stats.rejected,
+                'wait_avg_ms': _ms(stats.wait_total / len(stats.wait_samples)) if stats.wait_samples else None,
+                'wait_p95_ms': _p95_ms(stats.wait_samples),
+                'wait_max_ms': _ms(stats.wait_max),
+                'held_avg_ms': _ms(stats.held_total / stats.held_count) if stats.held_count else None,
+                'held_p95_ms': _p95_ms(stats.held_samples),
+                'held_max_ms': _ms(stats.held_max),
+            }
+        return {
+            'enabled': settings.DB_POOL_ADMISSION_ENABLED and capacity is not None,
+            'capacity': capacity,
+            'wait_seconds': settings.DB_POOL_ADMISSION_WAIT_SECONDS,
+            'background_backoff_percent': settings.DB_POOL_BACKGROUND_BACKOFF_PERCENT,
+            'background_backoffs': dict(self._backoffs),
+            'background_backoff_seconds': round(self._backoff_seconds, 1),
+            'priorities': priorities,
+        }
+
+
+pool_admission = PoolAdmission()
+
+
+class AdmissionQueuePool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` с лимитами по приоритету текущего контекста."""
+
+    def _do_get(self):
+        priority = current_priority()
+        started_at = time.perf_counter()
+        try:
+            if settings.DB_POOL_ADMISSION_ENABLED and priority is not DbPriority.CRITICAL:
+                self._wait_for_admission(priority, started_at)
+            record = super()._do_get()
+        finally:
+            pool_admission.record_wait(priority, time.perf_counter() - started_at)
+        # record_info, а не info: info очищается при инвалидации соединения
+        record.record_info[_CONNECTION_INFO_KEY] = (priority, time.perf_counter())
+        pool_admission.record_checkout(priority)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        checked_out = record.record_info.pop(_CONNECTION_INFO_KEY, None)
+        if checked_out is not None:
+            priority, started_at = checked_out
+            pool_admission.record_checkin(priority, time.perf_counter() - started_at)
+        super()._do_return_conn(record)
+
+    def _wait_for_admission(self, priority: DbPriority, started_at: float) -> None:
+        limit = pool_admission.limit(priority, pool_admission.capacity(self))
+        deadline = started_at + max(settings.DB_POOL_ADMISSION_WAIT_SECONDS, 0)
+        while (checked_out := self.checkedout()) >= limit:
+            if time.perf_counter() >= deadline:
+                pool_admission.record_rejected(priority)
+                logger.warning(
+                    'Отказ в соединении с БД: пул занят', priority=priority.value, checked_out=checked_out, limit=limit
+                )
+                raise PoolAdmissionRejected(priority, checked_out, limit)
+            await_only(asyncio.sleep(ADMISSION_POLL_SECONDS))
@@ -0,0 +1,215 @@
+"""Always-on SQL profiler: statement fingerprints, attribution and N+1 detection.
+
+Every statement executed by any engine is normalized into a fingerprint
+(literals and bind parameters become ``?``, ``IN (?, ?, ...)`` and
+multi-row ``VALUES`` collapse to ``(...)``) and accounted per fingerprint:
+count, total, max and p95 over the latest samples.
+
+Time is attributed to the current *unit of work* — a bot handler, an HTTP
+route or a background job — opened with :meth:`QueryProfiler.unit_of_work`
+and carried through ``contextvars`` (SQLAlchemy runs the sync engine
+events in the caller's context, so async code sees the same unit). When
+a unit ends, a fingerprint executed more than
+``QUERY_PROFILER_N_PLUS_ONE_THRESHOLD`` times inside it is reported as a
+probable N+1. Statistics are exposed by ``GET /metrics/queries``.
+"""
+
+import re
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Any
+
+import structlog
+
+from app.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+SAMPLE_SIZE = 256
+MAX_FINGERPRINTS = 1000
+FINGERPRINT_LOG_LENGTH = 300
+UNATTRIBUTED = 'unattributed'
+OVERFLOW_FINGERPRINT = '<other statements>'
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r'\$\d+|%\(\w+\)s|%s|(?<![:\w]):[A-Za-z_]\w*|\?')
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_REPEATED_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Нормализованный вид запроса: одинаков для запросов, отличающихся только значениями."""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _PARAMETER_LIST.sub('(...)', normalized)
+    normalized = _REPEATED_LISTS.sub('(...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+@dataclass(slots=True)
+class FingerprintStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    n_plus_one: int = 0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_SIZE))
+    units: Counter[str] = field(default_factory=Counter)
+
+
+@dataclass(slots=True)
+class UnitStats:
+    runs: int = 0
+    queries: int = 0
+    total: float = 0.0
+    n_plus_one: int = 0
+
+
+@dataclass(slots=True)
+class UnitOfWork:
+    name: str
+    counts: Counter[str] = field(default_factory=Counter)
+    durations: Counter[str] = field(default_factory=Counter)
+
+
+_current_unit: ContextVar[UnitOfWork | None] = ContextVar('query_profiler_unit', default=None)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class QueryProfiler:
+    def __init__(self, *, max_fingerprints: int = MAX_FINGERPRINTS) -> None:
+        self.max_fingerprints = max_fingerprints
+        self.reset()
+
+    def reset(self) -> None:
+        self._fingerprints: dict[str, FingerprintStats] = {}
+        self._units: dict[str, UnitStats] = {}
+        self._since = datetime.now(UTC)
+
+    def record(self, statement: str, duration: float) -> None:
+        key = fingerprint(statement)
+        stats = self._fingerprints.get(key)
+        if stats is None:
+            if len(self._fingerprints) >= self.max_fingerprints:
+                key = OVERFLOW_FINGERPRINT
+            stats = self._fingerprints.setdefault(key, FingerprintStats())
+        stats.count += 1
+        stats.total += duration
+        stats.max = max(stats.max, duration)
+        stats.samples.append(duration)
+
+        unit = _current_unit.get()
+        if unit is None:
+            stats.units[UNATTRIBUTED] += duration
+            unit_stats = self._units.setdefault(UNATTRIBUTED, UnitStats())
+            unit_stats.queries += 1
+            unit_stats.total += duration
+            return
+        unit.counts[key] += 1
+        unit.durations[key] += duration
+
+    @contextmanager
+    def unit_of_work(self, name: str) -> Iterator[UnitOfWork]:
+        """Единица работы для атрибуции запросов; имя можно уточнить до выхода (например, шаблон маршрута)."""
+        unit = UnitOfWork(name)
+        token = _current_unit.set(unit)
+        try:
+            yield unit
+        finally:
+            _current_unit.reset(token)
+            self._close_unit(unit)
+
+    def _close_unit(self, unit: UnitOfWork) -> None:
+        if not unit.counts:
+            return
+        unit_stats = self._units.setdefault(unit.name, UnitStats())
+        unit_stats.runs += 1
+        unit_stats.queries += unit.counts.total()
+        unit_stats.total += sum(unit.durations.values())
+
+        threshold = settings.QUERY_PROFILER_N_PLUS_ONE_THRESHOLD
+        for key, count in unit.counts.items():
+            stats = self._fingerprints.get(key)
+            if stats is not None:
+                stats.units[unit.name] += unit.durations[key]
+            if threshold <= 0 or count <= threshold:
+                continue
+            unit_stats.n_plus_one += 1
+            if stats is not None:
+                stats.n_plus_one += 1
+            logger.warning(
+                'Вероятный N+1: один и тот же запрос повторён в единице работы',
+                unit=unit.name,
+                count=count,
+                fingerprint=key[:FINGERPRINT_LOG_LENGTH],
+            )
+
+    def get_metrics(self, limit: int = 20) -> dict[str, Any]:
+        """Самые затратные запросы и единицы работы по суммарному времени, в мс."""
+        queries = []
+        for key, stats in sorted(self._fingerprints.items(), key=lambda item: item[1].total, reverse=True)[:limit]:
+            samples = sorted(stats.samples)
+            queries.append(
+                {
+                    'fingerprint': key,
+                    'count': stats.count,
+                    'total_ms': _ms(stats.total),
+                    'avg_ms': _ms(stats.total / stats.count),
+                    'p95_ms': _ms(samples[min(len(samples) - 1, int(len(samples) * 0.95))]),
+                    'max_ms': _ms(stats.max),
+                    'n_plus_one': stats.n_plus_one,
+                    'units': [{'unit': unit, 'total_ms': _ms(total)} for unit, total in stats.units.most_common(5)],
+                }
+            )
+
+        units = [
+            {
+                'unit': name,
+                'runs': stats.runs,
+                'queries': stats.queries,
+                'total_ms': _ms(stats.total),
+                'avg_queries': round(stats.queries / stats.runs, 1) if stats.runs else None,
+                'n_plus_one': stats.n_plus_one,
+            }
+            for name, stats in sorted(self._units.items(), key=lambda item: item[1].total, reverse=True)[:limit]
+        ]
+
+        total_queries = sum(stats.count for stats in self._fingerprints.values())
+        total_time = sum(stats.total for stats in self._fingerprints.values())
+        return {
+            'since': self._since.isoformat(),
+            'enabled': settings.QUERY_PROFILER_ENABLED,
+            'n_plus_one_threshold': settings.QUERY_PROFILER_N_PLUS_ONE_THRESHOLD,
+            'fingerprints': len(self._fingerprints),
+            'queries_total': total_queries,
+            'total_ms': _ms(total_time),
+            'queries': queries,
+            'units': units,
+        }
+
+
+query_profiler = QueryProfiler()
+
+
+def profile_before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._query_profiler_started_at = time.perf_counter()
+
+
+def profile_after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = getattr(context, '_query_profiler_started_at', None)
+    if started_at is not None:
+        query_profiler.record(statement, time.perf_counter() - started_at)
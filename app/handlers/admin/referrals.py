@@ -13,6 +13,7 @@ from app.database.crud.referral import (
     get_top_referrers_by_period,
 )
 from app.database.crud.user import get_user_by_id, get_user_by_telegram_id
+from app.database.database import with_read_only_db
 from app.database.models import ReferralEarning, User, WithdrawalRequest, WithdrawalRequestStatus
 from app.localization.texts import get_texts
 from app.services.referral_withdrawal_service import referral_withdrawal_service
@@ -25,6 +26,7 @@ logger = structlog.get_logger(__name__)
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_referral_statistics(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     try:
         stats = await get_referral_statistics(db)
@@ -168,6 +170,7 @@ def _get_top_keyboard(period: str, sort_by: str) -> types.InlineKeyboardMarkup:
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_top_referrers(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     """Показывает топ рефереров (по умолчанию: неделя, по заработку)."""
     await _show_top_referrers_filtered(callback, db, period='week', sort_by='earnings')
@@ -175,6 +178,7 @@ async def show_top_referrers(callback: types.CallbackQuery, db_user: User, db: A
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_top_referrers_filtered(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     """Обрабатывает выбор периода и сортировки."""
     # Парсим callback_data: admin_top_ref:period:sort_by
@@ -805,6 +809,7 @@ async def _show_diagnostics_for_period(callback: types.CallbackQuery, db: AsyncS
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_referral_diagnostics(callback: types.CallbackQuery, db_user: User, db: AsyncSession, state: FSMContext):
     """Показывает диагностику реферальной системы по логам."""
     # Определяем период из callback_data или используем "today" по умолчанию
@@ -1018,6 +1023,7 @@ async def apply_referral_fixes(callback: types.CallbackQuery, db_user: User, db:
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def check_missing_bonuses(callback: types.CallbackQuery, db_user: User, db: AsyncSession, state: FSMContext):
     """Проверяет по БД — всем ли рефералам начислены бонусы."""
     from app.services.referral_diagnostics_service import (
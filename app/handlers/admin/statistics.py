@@ -8,6 +8,7 @@ from app.config import settings
 from app.database.crud.referral import get_referral_statistics
 from app.database.crud.subscription import get_subscriptions_statistics
 from app.database.crud.transaction import get_revenue_by_period, get_transactions_statistics
+from app.database.database import with_read_only_db
 from app.database.models import User
 from app.keyboards.admin import get_admin_statistics_keyboard
 from app.services.user_service import UserService
@@ -33,6 +34,7 @@ async def show_statistics_menu(callback: types.CallbackQuery, db_user: User, db:
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_users_statistics(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     user_service = UserService()
     stats = await user_service.get_user_statistics(db)
@@ -84,6 +86,7 @@ async def show_users_statistics(callback: types.CallbackQuery, db_user: User, db
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_subscriptions_statistics(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     stats = await get_subscriptions_statistics(db)
 
@@ -132,6 +135,7 @@ async def show_subscriptions_statistics(callback: types.CallbackQuery, db_user:
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_revenue_statistics(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     now = datetime.now(UTC)
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -187,6 +191,7 @@ async def show_revenue_statistics(callback: types.CallbackQuery, db_user: User,
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_referral_statistics(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     stats = await get_referral_statistics(db)
     current_time = format_datetime(datetime.now(UTC))
@@ -245,6 +250,7 @@ async def show_referral_statistics(callback: types.CallbackQuery, db_user: User,
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_summary_statistics(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     user_service = UserService()
     user_stats = await user_service.get_user_statistics(db)
@@ -308,6 +314,7 @@ async def show_summary_statistics(callback: types.CallbackQuery, db_user: User,
 
 @admin_required
 @error_handler
+@with_read_only_db
 async def show_revenue_by_period(callback: types.CallbackQuery, db_user: User, db: AsyncSession):
     period = callback.data.split('_')[-1]
 
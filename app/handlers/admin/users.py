@@ -173,6 +173,29 @@ def _build_user_button_text(
     return button_text
 
 
+# Курсоры страниц списков в FSM: {префикс пагинации: {номер страницы: курсор}}
+USERS_LIST_CURSORS_KEY = 'admin_users_list_cursors'
+
+
+async def _get_users_page_by_cursor(
+    state: FSMContext, user_service: UserService, pagination_prefix: str, page: int, **kwargs
+) -> dict[str, Any]:
+    """Страница списка пользователей с курсором, запомненным при показе предыдущей страницы.
+
+    Переход «вперёд/назад» идёт по ключу сортировки, прыжок на незнакомую
+    страницу — по OFFSET.
+    """
+    all_cursors = (await state.get_data()).get(USERS_LIST_CURSORS_KEY) or {}
+    cursors = {} if page <= 1 else dict(all_cursors.get(pagination_prefix) or {})
+
+    users_data = await user_service.get_users_page(page=page, cursor=cursors.get(str(page)), **kwargs)
+
+    if users_data.get('next_cursor'):
+        cursors[str(page + 1)] = users_data['next_cursor']
+    await state.update_data({USERS_LIST_CURSORS_KEY: {**all_cursors, pagination_prefix: cursors}})
+    return users_data
+
+
 async def _show_users_list_filtered(
     callback: types.CallbackQuery,
     db_user: User,
@@ -205,8 +228,8 @@ async def _show_users_list_filtered(
         users_data = await user_service.get_users_by_campaign_page(db, page=page, limit=10)
         extra_data = users_data.get('campaigns', {})
     else:
-        kwargs = {'db': db, 'page': page, 'limit': 10, config.order_param: True}
-        users_data = await user_service.get_users_page(**kwargs)
+        kwargs = {'db': db, 'limit': 10, config.order_param: True}
+        users_data = await _get_users_page_by_cursor(state, user_service, config.pagination_prefix, page, **kwargs)
 
     users = users_data.get('users', [])
 
@@ -296,7 +319,7 @@ async def show_users_list(
     await state.set_state(None)
 
     user_service = UserService()
-    users_data = await user_service.get_users_page(db, page=page, limit=10)
+    users_data = await _get_users_page_by_cursor(state, user_service, 'admin_users_list', page, db=db, limit=10)
 
     if not users_data['users']:
         await callback.message.edit_text(
@@ -171,14 +171,13 @@ async def get_quick_amount_buttons(language: str, user: User) -> list:
     tariff_prices = None
     tariff_periods = None
     if settings.is_tariffs_mode():
-        from app.database.crud.subscription import get_subscription_by_user_id
-        from app.database.crud.tariff import get_tariff_by_id
+        from app.database.crud.fast_read import get_subscription_row_by_user_id, get_tariff_row_by_id
         from app.database.database import AsyncSessionLocal
 
         async with AsyncSessionLocal() as db:
-            subscription = await get_subscription_by_user_id(db, user.id)
+            subscription = await get_subscription_row_by_user_id(db, user.id)
             if subscription and subscription.tariff_id:
-                tariff = await get_tariff_by_id(db, subscription.tariff_id)
+                tariff = await get_tariff_row_by_id(db, subscription.tariff_id)
                 if tariff and tariff.period_prices:
                     tariff_prices = {int(k): v for k, v in tariff.period_prices.items()}
                     tariff_periods = sorted(tariff_prices.keys())
@@ -498,9 +497,9 @@ async def handle_successful_topup_with_cart(user_id: int, amount_kopeks: int, bo
     from aiogram.fsm.storage.base import StorageKey
 
     from app.bot import dp
-    from app.database.crud.user import get_user_by_id
+    from app.database.crud.fast_read import get_user_row_by_id
 
-    user = await get_user_by_id(db, user_id)
+    user = await get_user_row_by_id(db, user_id)
     if not user:
         return
 
@@ -34,6 +34,7 @@ from app.services.subscription_checkout_service import (
 )
 from app.services.support_settings_service import SupportSettingsService
 from app.services.user_cart_service import user_cart_service
+from app.utils.content_cache import ContentType, content_cache, content_language
 from app.utils.photo_message import edit_or_answer_photo
 from app.utils.pricing_utils import format_period_description
 from app.utils.promo_offer import (
@@ -256,7 +257,14 @@ async def show_service_rules(callback: types.CallbackQuery, db_user: User, db: A
     from app.database.crud.rules import get_current_rules_content
 
     texts = get_texts(db_user.language)
-    rules_text = await get_current_rules_content(db, db_user.language)
+    rules_language = content_language(db_user.language)
+    rules_entry = await content_cache.get_or_load(
+        ContentType.RULES,
+        rules_language,
+        lambda: get_current_rules_content(db, rules_language),
+        variant='bot',
+    )
+    rules_text = rules_entry.payload
 
     if not rules_text:
         rules_text = await get_rules(db_user.language)
@@ -1174,11 +1182,11 @@ async def get_main_menu_text(user, texts, db: AsyncSession):
     subscription = getattr(user, 'subscription', None)
     if settings.is_tariffs_mode() and subscription and subscription.tariff_id:
         try:
-            from app.database.crud.tariff import get_tariff_by_id
+            from app.database.crud.fast_read import get_tariff_row_by_id
 
-            tariff = await get_tariff_by_id(db, subscription.tariff_id)
+            tariff = await get_tariff_row_by_id(db, subscription.tariff_id)
             if tariff:
-                is_daily_tariff = getattr(tariff, 'is_daily', False)
+                is_daily_tariff = tariff.is_daily
                 # Формируем краткий блок информации о тарифе для главного меню
                 tariff_info_block = f'\n📦 Тариф: {tariff.name}'
         except Exception as e:
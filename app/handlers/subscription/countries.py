@@ -548,8 +548,8 @@ async def countries_continue(callback: types.CallbackQuery, state: FSMContext, d
 
 
 async def _get_available_countries(promo_group_id: int | None = None):
-    from app.database.crud.server_squad import get_available_server_squads
     from app.database.database import AsyncSessionLocal
+    from app.services.catalog_service import catalog_service
     from app.utils.cache import cache, cache_key
 
     cache_key_value = cache_key('available_countries', promo_group_id or 'all')
@@ -559,7 +559,7 @@ async def _get_available_countries(promo_group_id: int | None = None):
 
     try:
         async with AsyncSessionLocal() as db:
-            available_servers = await get_available_server_squads(db, promo_group_id=promo_group_id)
+            available_servers = (await catalog_service.get(db)).get_available_servers(promo_group_id)
 
         if promo_group_id is not None and not available_servers:
             logger.info(
@@ -9,8 +9,8 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import InaccessibleMessage
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.crud.fast_read import get_user_row_by_id
 from app.database.crud.ticket import TicketCRUD, TicketMessageCRUD
-from app.database.crud.user import get_user_by_id
 from app.database.models import Ticket, TicketStatus, User
 from app.keyboards.inline import (
     get_my_tickets_keyboard,
@@ -1003,7 +1003,7 @@ async def notify_admins_about_new_ticket(ticket: Ticket, db: AsyncSession):
             title = title[:57] + '...'
 
         try:
-            user = await get_user_by_id(db, ticket.user_id)
+            user = await get_user_row_by_id(db, ticket.user_id)
         except Exception:
             user = None
         full_name = user.full_name if user else 'Unknown'
@@ -1073,7 +1073,7 @@ async def notify_admins_about_ticket_reply(
             title = title[:57] + '...'
 
         try:
-            user = await get_user_by_id(db, ticket.user_id)
+            user = await get_user_row_by_id(db, ticket.user_id)
         except Exception:
             user = None
         full_name = user.full_name if user else 'Unknown'
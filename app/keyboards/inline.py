@@ -5,7 +5,7 @@ from aiogram import types
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import PERIOD_PRICES, settings
+from app.config import settings
 from app.database.models import User
 from app.localization.loader import DEFAULT_LANGUAGE
 from app.localization.texts import get_texts
@@ -1226,19 +1226,20 @@ def get_subscription_period_keyboard(
     Returns:
         InlineKeyboardMarkup with period buttons showing personalized prices
     """
-    from app.utils.price_display import calculate_user_price
+    from app.services.price_matrix_service import price_matrix_service
+    from app.utils.promo_offer import get_user_active_promo_discount_percent
 
     texts = get_texts(language)
     keyboard = []
 
-    available_periods = settings.get_available_subscription_periods()
+    price_matrix = price_matrix_service.for_user(user)
+    promo_offer_percent = get_user_active_promo_discount_percent(user) if user else 0
 
-    for days in available_periods:
-        # Get base price for this period
-        base_price = PERIOD_PRICES.get(days, 0)
+    for period in price_matrix.periods:
+        days = period.period_days
 
-        # Calculate personalized price with user's discounts
-        price_info = calculate_user_price(user, base_price, days, 'period')
+        # Personalized price: precomputed promo group discount + active promo offer
+        price_info = period.base.with_promo_offer(promo_offer_percent)
 
         # Format period description
         period_display = format_period_description(days, language)
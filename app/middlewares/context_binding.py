@@ -4,12 +4,15 @@ from collections.abc import Awaitable, Callable
 from typing import Any
 
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram.types import Message, PreCheckoutQuery, TelegramObject
 from structlog.contextvars import bound_contextvars
 
+from app.database.pool_admission import DbPriority, db_priority
+from app.database.query_profiler import query_profiler
+
 
 class ContextVarsMiddleware(BaseMiddleware):
-    """Bind user/chat context to structlog contextvars for automatic log enrichment."""
+    """Bind user/chat context to structlog contextvars, open a query profiler unit and set the DB pool priority."""
 
     async def __call__(
         self,
@@ -23,5 +26,24 @@ class ContextVarsMiddleware(BaseMiddleware):
             ctx['username'] = event.from_user.username or ''
         if hasattr(event, 'chat') and event.chat:
             ctx['chat_id'] = event.chat.id
-        with bound_contextvars(**ctx):
+        with (
+            bound_contextvars(**ctx),
+            query_profiler.unit_of_work(_unit_name(event, data)),
+            db_priority(_db_priority(event)),
+        ):
             return await handler(event, data)
+
+
+def _db_priority(event: TelegramObject) -> DbPriority:
+    # Оплата Telegram Stars: pre-checkout ждёт ответа 10 секунд, успешный платёж нельзя потерять
+    if isinstance(event, PreCheckoutQuery) or (isinstance(event, Message) and event.successful_payment):
+        return DbPriority.CRITICAL
+    return DbPriority.INTERACTIVE
+
+
+def _unit_name(event: TelegramObject, data: dict[str, Any]) -> str:
+    handler_object = data.get('handler')
+    callback = getattr(handler_object, 'callback', None)
+    if callback is not None:
+        return f'bot:{callback.__module__}.{getattr(callback, "__qualname__", type(callback).__name__)}'
+    return f'bot:{type(event).__name__}'
@@ -7,10 +7,18 @@ import structlog
 from aiogram import BaseMiddleware, Bot
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.types import BufferedInputFile, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, TelegramObject
+from aiogram.types import (
+    BufferedInputFile,
+    CallbackQuery,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    Message,
+    TelegramObject,
+)
 from sqlalchemy.exc import InterfaceError, OperationalError
 
 from app.config import settings
+from app.database.pool_admission import PoolAdmissionRejected
 from app.services.startup_notification_service import _get_error_recommendations
 from app.utils.timezone import format_local_datetime
 
@@ -49,6 +57,7 @@ BOT_BLOCKED_PHRASE: Final[str] = 'bot was blocked'
 USER_DEACTIVATED_PHRASE: Final[str] = 'user is deactivated'
 CHAT_NOT_FOUND_PHRASE: Final[str] = 'chat not found'
 MESSAGE_NOT_FOUND_PHRASE: Final[str] = 'message not found'
+POOL_BUSY_TEXT: Final[str] = '⏳ Сервис сейчас перегружен. Попробуйте через несколько секунд.'
 
 # Троттлинг для предотвращения спама ошибками
 _last_error_notification: datetime | None = None
@@ -67,6 +76,8 @@ class GlobalErrorMiddleware(BaseMiddleware):
             return await handler(event, data)
         except TelegramBadRequest as e:
             return await self._handle_telegram_error(event, e, data)
+        except PoolAdmissionRejected as e:
+            return await self._handle_pool_busy(event, e)
         except (InterfaceError, OperationalError) as e:
             # Ошибки соединения с БД (таймаут после долгих операций) - логируем, но не спамим админам
             logger.warning('⚠️ Ошибка соединения с БД в GlobalErrorMiddleware', e=e)
@@ -107,6 +118,21 @@ class GlobalErrorMiddleware(BaseMiddleware):
     def _is_topic_required_error(self, error_message: str) -> bool:
         return any(phrase in error_message for phrase in TOPIC_ERROR_PHRASES)
 
+    async def _handle_pool_busy(self, event: TelegramObject, error: PoolAdmissionRejected):
+        # Пул БД перегружен — быстрый ответ пользователю вместо ожидания соединения
+        logger.warning(
+            '[GlobalErrorMiddleware] Пул БД занят, запрос отклонён',
+            user_info=self._get_user_info(event),
+            priority=error.priority.value,
+        )
+        try:
+            if isinstance(event, CallbackQuery):
+                await event.answer(POOL_BUSY_TEXT, show_alert=True)
+            elif isinstance(event, Message):
+                await event.answer(POOL_BUSY_TEXT)
+        except TelegramBadRequest as answer_error:
+            logger.debug('Не удалось ответить о перегрузке', answer_error=answer_error)
+
     async def _handle_old_query(self, event: TelegramObject, error: TelegramBadRequest):
         if isinstance(event, CallbackQuery):
             user_info = self._get_user_info(event)
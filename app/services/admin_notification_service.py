@@ -381,9 +381,9 @@ class AdminNotificationService:
             return None
 
         try:
-            from app.database.crud.tariff import get_tariff_by_id
+            from app.services.catalog_service import catalog_service
 
-            tariff = await get_tariff_by_id(db, subscription.tariff_id)
+            tariff = (await catalog_service.get(db)).get_tariff(subscription.tariff_id)
             if tariff:
                 return tariff.name
         except Exception:
@@ -1073,9 +1073,9 @@ class AdminNotificationService:
             tariff_name = None
             if campaign.is_tariff_bonus and campaign.tariff_id:
                 try:
-                    from app.database.crud.tariff import get_tariff_by_id
+                    from app.services.catalog_service import catalog_service
 
-                    tariff = await get_tariff_by_id(db, campaign.tariff_id)
+                    tariff = (await catalog_service.get(db)).get_tariff(campaign.tariff_id)
                     if tariff:
                         tariff_name = tariff.name
                 except Exception:
@@ -23,7 +23,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.database.database import AsyncSessionLocal, engine
+from app.database.database import AsyncSessionLocal, db_manager, engine
 from app.database.models import (
     AdvertisingCampaign,
     AdvertisingCampaignRegistration,
@@ -570,7 +570,8 @@ class BackupService:
         backup_data: dict[str, list[dict[str, Any]]] = {}
         total_records = 0
 
-        async with AsyncSessionLocal() as db:
+        # Экспорт только читает: при свежей реплике нагрузка уходит с основной БД
+        async with db_manager.session(read_only=True) as db:
             try:
                 for model in models_to_backup:
                     table_name = model.__tablename__
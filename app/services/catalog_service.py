@@ -0,0 +1,355 @@
+"""In-memory catalog of tariffs and server squads.
+
+Purchase, renewal and miniapp flows read the same tariffs and squads many
+times per request, while admins change them rarely. The catalog keeps an
+immutable snapshot of both tables (plus their promo-group permissions) indexed
+by id, squad UUID and promo group, so pricing code reads it without queries.
+
+Freshness follows the versioned content cache: admin edits and
+``sync_with_remnawave`` bump ``ContentType.TARIFFS``/``ContentType.SERVERS``
+(locally and in Redis), and the next :meth:`CatalogService.get` in any
+process rebuilds only the part whose version changed. ``current_users`` of
+squads is refreshed by the periodic user-count sync and by ``MAX_AGE_SECONDS``.
+"""
+
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import ServerSquad, Tariff, server_squad_promo_groups, tariff_promo_groups
+from app.utils.content_cache import ContentType, content_cache
+
+
+logger = structlog.get_logger(__name__)
+
+
+def _frozen_mapping(value: Any) -> Mapping:
+    return MappingProxyType(dict(value or {}))
+
+
+@dataclass(frozen=True, slots=True)
+class PromoGroupRef:
+    """Promo group reference with the ``.id`` that permission checks read."""
+
+    id: int
+
+
+@dataclass(frozen=True, slots=True)
+class TariffSnapshot:
+    """Read-only copy of :class:`Tariff` with the same pricing helpers."""
+
+    id: int
+    name: str
+    description: str | None
+    display_order: int
+    is_active: bool
+    traffic_limit_gb: int
+    device_limit: int
+    device_price_kopeks: int | None
+    max_device_limit: int | None
+    allowed_squads: tuple[str, ...]
+    server_traffic_limits: Mapping[str, Any]
+    period_prices: Mapping[str, int]
+    tier_level: int
+    is_trial_available: bool
+    allow_traffic_topup: bool
+    traffic_topup_enabled: bool
+    traffic_topup_packages: Mapping[str, int]
+    max_topup_traffic_gb: int
+    is_daily: bool
+    daily_price_kopeks: int
+    custom_days_enabled: bool
+    price_per_day_kopeks: int
+    min_days: int
+    max_days: int
+    custom_traffic_enabled: bool
+    traffic_price_per_gb_kopeks: int
+    min_traffic_gb: int
+    max_traffic_gb: int
+    traffic_reset_mode: str | None
+    allowed_promo_groups: tuple[PromoGroupRef, ...] = ()
+
+    # Те же методы, что и у ORM-модели: они читают только атрибуты
+    is_unlimited_traffic = Tariff.is_unlimited_traffic
+    get_price_for_period = Tariff.get_price_for_period
+    get_available_periods = Tariff.get_available_periods
+    get_price_rubles = Tariff.get_price_rubles
+    get_traffic_limit_for_server = Tariff.get_traffic_limit_for_server
+    is_available_for_promo_group = Tariff.is_available_for_promo_group
+    get_traffic_topup_packages = Tariff.get_traffic_topup_packages
+    get_traffic_topup_price = Tariff.get_traffic_topup_price
+    get_available_traffic_packages = Tariff.get_available_traffic_packages
+    can_topup_traffic = Tariff.can_topup_traffic
+    get_daily_price_rubles = Tariff.get_daily_price_rubles
+    get_price_for_custom_days = Tariff.get_price_for_custom_days
+    get_price_for_custom_traffic = Tariff.get_price_for_custom_traffic
+    can_purchase_custom_days = Tariff.can_purchase_custom_days
+    can_purchase_custom_traffic = Tariff.can_purchase_custom_traffic
+
+    @classmethod
+    def from_row(cls, row: Any, promo_group_ids: Iterable[int]) -> 'TariffSnapshot':
+        return cls(
+            id=row.id,
+            name=row.name,
+            description=row.description,
+            display_order=row.display_order or 0,
+            is_active=bool(row.is_active),
+            traffic_limit_gb=row.traffic_limit_gb or 0,
+            device_limit=row.device_limit or 0,
+            device_price_kopeks=row.device_price_kopeks,
+            max_device_limit=row.max_device_limit,
+            allowed_squads=tuple(row.allowed_squads or ()),
+            server_traffic_limits=_frozen_mapping(row.server_traffic_limits),
+            period_prices=_frozen_mapping(row.period_prices),
+            tier_level=row.tier_level or 1,
+            is_trial_available=bool(row.is_trial_available),
+            allow_traffic_topup=bool(row.allow_traffic_topup),
+            traffic_topup_enabled=bool(row.traffic_topup_enabled),
+            traffic_topup_packages=_frozen_mapping(row.traffic_topup_packages),
+            max_topup_traffic_gb=row.max_topup_traffic_gb or 0,
+            is_daily=bool(row.is_daily),
+            daily_price_kopeks=row.daily_price_kopeks or 0,
+            custom_days_enabled=bool(row.custom_days_enabled),
+            price_per_day_kopeks=row.price_per_day_kopeks or 0,
+            min_days=row.min_days,
+            max_days=row.max_days,
+            custom_traffic_enabled=bool(row.custom_traffic_enabled),
+            traffic_price_per_gb_kopeks=row.traffic_price_per_gb_kopeks or 0,
+            min_traffic_gb=row.min_traffic_gb,
+            max_traffic_gb=row.max_traffic_gb,
+            traffic_reset_mode=row.traffic_reset_mode,
+            allowed_promo_groups=tuple(PromoGroupRef(pg_id) for pg_id in sorted(promo_group_ids)),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ServerSnapshot:
+    """Read-only copy of :class:`ServerSquad`."""
+
+    id: int
+    squad_uuid: str
+    display_name: str
+    original_name: str | None
+    country_code: str | None
+    is_available: bool
+    is_trial_eligible: bool
+    price_kopeks: int
+    description: str | None
+    sort_order: int
+    max_users: int | None
+    current_users: int
+    allowed_promo_groups: tuple[PromoGroupRef, ...] = ()
+
+    price_rubles = ServerSquad.price_rubles
+    is_full = ServerSquad.is_full
+    availability_status = ServerSquad.availability_status
+
+    @property
+    def allowed_promo_group_ids(self) -> frozenset[int]:
+        return frozenset(pg.id for pg in self.allowed_promo_groups)
+
+    @classmethod
+    def from_row(cls, row: Any, promo_group_ids: Iterable[int]) -> 'ServerSnapshot':
+        return cls(
+            id=row.id,
+            squad_uuid=row.squad_uuid,
+            display_name=row.display_name,
+            original_name=row.original_name,
+            country_code=row.country_code,
+            is_available=bool(row.is_available),
+            is_trial_eligible=bool(row.is_trial_eligible),
+            price_kopeks=row.price_kopeks or 0,
+            description=row.description,
+            sort_order=row.sort_order or 0,
+            max_users=row.max_users,
+            current_users=row.current_users or 0,
+            allowed_promo_groups=tuple(PromoGroupRef(pg_id) for pg_id in sorted(promo_group_ids)),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TariffIndex:
+    version: int
+    loaded_at: float
+    tariffs: tuple[TariffSnapshot, ...] = ()
+    by_id: Mapping[int, TariffSnapshot] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class ServerIndex:
+    version: int
+    loaded_at: float
+    servers: tuple[ServerSnapshot, ...] = ()
+    by_id: Mapping[int, ServerSnapshot] = field(default_factory=dict)
+    by_uuid: Mapping[str, ServerSnapshot] = field(default_factory=dict)
+    available_by_promo_group: Mapping[int, tuple[ServerSnapshot, ...]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """Consistent view of tariffs and servers; never mutated after creation."""
+
+    tariff_index: TariffIndex
+    server_index: ServerIndex
+
+    # ---- Tariffs ----
+
+    @property
+    def tariffs(self) -> tuple[TariffSnapshot, ...]:
+        """All tariffs ordered like ``get_all_tariffs`` (display_order, id)."""
+        return self.tariff_index.tariffs
+
+    def get_tariff(self, tariff_id: int | None) -> TariffSnapshot | None:
+        if tariff_id is None:
+            return None
+        return self.tariff_index.by_id.get(tariff_id)
+
+    def get_tariffs_for_promo_group(
+        self,
+        promo_group_id: int | None,
+        *,
+        include_inactive: bool = False,
+    ) -> list[TariffSnapshot]:
+        return [
+            tariff
+            for tariff in self.tariff_index.tariffs
+            if (include_inactive or tariff.is_active) and tariff.is_available_for_promo_group(promo_group_id)
+        ]
+
+    # ---- Servers ----
+
+    @property
+    def servers(self) -> tuple[ServerSnapshot, ...]:
+        """All squads ordered like the admin list (sort_order, display_name)."""
+        return self.server_index.servers
+
+    def get_server(self, server_id: int | None) -> ServerSnapshot | None:
+        if server_id is None:
+            return None
+        return self.server_index.by_id.get(server_id)
+
+    def get_server_by_uuid(self, squad_uuid: str | None) -> ServerSnapshot | None:
+        if not squad_uuid:
+            return None
+        return self.server_index.by_uuid.get(squad_uuid)
+
+    def get_servers_by_uuids(self, squad_uuids: Iterable[str]) -> list[ServerSnapshot]:
+        by_uuid = self.server_index.by_uuid
+        return [by_uuid[squad_uuid] for squad_uuid in squad_uuids if squad_uuid in by_uuid]
+
+    def get_available_servers(
+        self,
+        promo_group_id: int | None = None,
+        *,
+        exclude_trial_only: bool = False,
+    ) -> list[ServerSnapshot]:
+        """Same result as ``get_available_server_squads`` without a query."""
+        if promo_group_id is None:
+            servers = [server for server in self.server_index.servers if server.is_available]
+        else:
+            servers = list(self.server_index.available_by_promo_group.get(promo_group_id, ()))
+
+        if exclude_trial_only:
+            servers = [server for server in servers if not server.is_trial_eligible]
+        return servers
+
+
+class CatalogService:
+    # Страховка на случай пропущенной инвалидации и для свежих current_users
+    MAX_AGE_SECONDS = 300
+
+    def __init__(self) -> None:
+        self._tariffs: TariffIndex | None = None
+        self._servers: ServerIndex | None = None
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """Return the current snapshot, rebuilding parts whose version changed."""
+        now = time.monotonic()
+
+        tariffs_version = await content_cache.get_version(ContentType.TARIFFS)
+        tariffs = self._tariffs
+        if tariffs is None or tariffs.version != tariffs_version or now - tariffs.loaded_at > self.MAX_AGE_SECONDS:
+            tariffs = await self._load_tariffs(db, tariffs_version)
+            self._tariffs = tariffs
+
+        servers_version = await content_cache.get_version(ContentType.SERVERS)
+        servers = self._servers
+        if servers is None or servers.version != servers_version or now - servers.loaded_at > self.MAX_AGE_SECONDS:
+            servers = await self._load_servers(db, servers_version)
+            self._servers = servers
+
+        return CatalogSnapshot(tariff_index=tariffs, server_index=servers)
+
+    async def invalidate_tariffs(self) -> None:
+        self._tariffs = None
+        await content_cache.invalidate(ContentType.TARIFFS)
+
+    async def invalidate_servers(self) -> None:
+        self._servers = None
+        await content_cache.invalidate(ContentType.SERVERS)
+
+    def clear(self) -> None:
+        self._tariffs = None
+        self._servers = None
+
+    async def _load_tariffs(self, db: AsyncSession, version: int) -> TariffIndex:
+        rows = (await db.execute(select(Tariff.__table__).order_by(Tariff.display_order, Tariff.id))).all()
+        links = (await db.execute(select(tariff_promo_groups.c.tariff_id, tariff_promo_groups.c.promo_group_id))).all()
+
+        promo_groups: dict[int, list[int]] = defaultdict(list)
+        for tariff_id, promo_group_id in links:
+            promo_groups[tariff_id].append(promo_group_id)
+
+        tariffs = tuple(TariffSnapshot.from_row(row, promo_groups.get(row.id, ())) for row in rows)
+        logger.debug('Каталог тарифов перестроен', version=version, tariffs=len(tariffs))
+        return TariffIndex(
+            version=version,
+            loaded_at=time.monotonic(),
+            tariffs=tariffs,
+            by_id=MappingProxyType({tariff.id: tariff for tariff in tariffs}),
+        )
+
+    async def _load_servers(self, db: AsyncSession, version: int) -> ServerIndex:
+        rows = (
+            await db.execute(select(ServerSquad.__table__).order_by(ServerSquad.sort_order, ServerSquad.display_name))
+        ).all()
+        links = (
+            await db.execute(
+                select(server_squad_promo_groups.c.server_squad_id, server_squad_promo_groups.c.promo_group_id)
+            )
+        ).all()
+
+        promo_groups: dict[int, list[int]] = defaultdict(list)
+        for server_id, promo_group_id in links:
+            promo_groups[server_id].append(promo_group_id)
+
+        servers = tuple(ServerSnapshot.from_row(row, promo_groups.get(row.id, ())) for row in rows)
+
+        available_by_promo_group: dict[int, list[ServerSnapshot]] = defaultdict(list)
+        for server in servers:
+            if not server.is_available:
+                continue
+            for promo_group in server.allowed_promo_groups:
+                available_by_promo_group[promo_group.id].append(server)
+
+        logger.debug('Каталог серверов перестроен', version=version, servers=len(servers))
+        return ServerIndex(
+            version=version,
+            loaded_at=time.monotonic(),
+            servers=servers,
+            by_id=MappingProxyType({server.id: server for server in servers}),
+            by_uuid=MappingProxyType({server.squad_uuid: server for server in servers}),
+            available_by_promo_group=MappingProxyType(
+                {promo_group_id: tuple(items) for promo_group_id, items in available_by_promo_group.items()}
+            ),
+        )
+
+
+catalog_service = CatalogService()
@@ -14,11 +14,8 @@ from aiogram import Bot
 from aiogram.enums import ChatMemberStatus
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
 
-from app.database.crud.required_channel import (
-    get_active_channels,
-    get_user_channel_subs,
-    upsert_user_channel_sub,
-)
+from app.database.crud.fast_read import get_user_channel_sub_rows
+from app.database.crud.required_channel import get_active_channels, upsert_user_channel_sub
 from app.database.database import AsyncSessionLocal
 from app.utils.cache import ChannelSubCache
 
@@ -126,7 +123,7 @@ class ChannelSubscriptionService:
         channels_needing_api: list[dict] = []
         if channels_needing_db:
             async with AsyncSessionLocal() as db:
-                subs = await get_user_channel_subs(db, telegram_id)
+                subs = await get_user_channel_sub_rows(db, telegram_id)
                 sub_map = {s.channel_id: s for s in subs}
 
                 for ch in channels_needing_db:
@@ -359,9 +359,9 @@ class DailySubscriptionService:
 
         # Получаем базовый лимит из тарифа для проверки
         if subscription.tariff_id:
-            from app.database.crud.tariff import get_tariff_by_id
+            from app.services.catalog_service import catalog_service
 
-            tariff = await get_tariff_by_id(db, subscription.tariff_id)
+            tariff = (await catalog_service.get(db)).get_tariff(subscription.tariff_id)
             if tariff:
                 tariff_base_limit = tariff.traffic_limit_gb or 0
                 # Проверяем, что базовый лимит не отрицательный
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
@@ -10,17 +9,77 @@ import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.webhook_service import webhook_service
+from app.services.ws_backplane import ws_backplane
+from app.utils.cache import cache
 
 
 logger = structlog.get_logger(__name__)
 
+EVENTS_WS_TOPIC = 'events'
+
+
+class WebSocketOutbox:
+    """Bounded outbound queue of one WebSocket, drained by its own writer task.
+
+    A slow client only fills its own queue; when it overflows, the emitter
+    disconnects it instead of delaying everyone else.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        *,
+        maxsize: int,
+        send_timeout: float,
+        on_failure: Callable[[Any], None],
+    ) -> None:
+        self.websocket = websocket
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self._send_timeout = send_timeout
+        self._on_failure = on_failure
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def offer(self, message: str) -> bool:
+        """Queue a serialized message; returns False when the queue is full."""
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _writer(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(message), timeout=self._send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning('Failed to send WebSocket message', error=error)
+                self._on_failure(self.websocket)
+                return
+
+    def cancel(self) -> None:
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
 
 class EventEmitter:
     """Event emitter для отслеживания и распространения событий системы."""
 
+    # Сообщений в очереди одного WebSocket, после переполнения клиент отключается
+    WEBSOCKET_QUEUE_SIZE = 100
+    WEBSOCKET_SEND_TIMEOUT = 10.0
+    # Код закрытия «Try Again Later»: клиент переподключится
+    SLOW_CONSUMER_CLOSE_CODE = 1013
+
     def __init__(self) -> None:
         self._listeners: dict[str, list[Callable]] = {}
-        self._websocket_connections: set[Any] = set()
+        self._websocket_connections: dict[Any, WebSocketOutbox] = {}
+        self._background_tasks: set[asyncio.Task] = set()
 
     def on(self, event_type: str, callback: Callable) -> None:
         """Подписаться на событие."""
@@ -38,18 +97,54 @@ class EventEmitter:
 
     def register_websocket(self, websocket: Any) -> None:
         """Зарегистрировать WebSocket подключение."""
-        self._websocket_connections.add(websocket)
+        ws_backplane.ensure_listening()
+        if websocket in self._websocket_connections:
+            return
+
+        outbox = WebSocketOutbox(
+            websocket,
+            maxsize=self.WEBSOCKET_QUEUE_SIZE,
+            send_timeout=self.WEBSOCKET_SEND_TIMEOUT,
+            on_failure=self.unregister_websocket,
+        )
+        self._websocket_connections[websocket] = outbox
+        outbox.start()
         logger.debug(
             'WebSocket connection registered. Total', websocket_connections_count=len(self._websocket_connections)
         )
 
     def unregister_websocket(self, websocket: Any) -> None:
         """Отменить регистрацию WebSocket подключения."""
-        self._websocket_connections.discard(websocket)
+        outbox = self._websocket_connections.pop(websocket, None)
+        if outbox is not None:
+            outbox.cancel()
         logger.debug(
             'WebSocket connection unregistered. Total', websocket_connections_count=len(self._websocket_connections)
         )
 
+    def send_to_websocket(self, websocket: Any, message: dict[str, Any]) -> bool:
+        """Поставить сообщение в очередь конкретного подключения (ответы на ping и т.п.)."""
+        outbox = self._websocket_connections.get(websocket)
+        if outbox is None:
+            return False
+        return outbox.offer(self._serialize(message))
+
+    @staticmethod
+    def _serialize(message: dict[str, Any]) -> str:
+        # Тот же сериализатор, что и у backplane: все реплики отправляют одинаковый JSON
+        return cache.serializer.dumps(message).decode('utf-8')
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _close_slow_consumer(self, websocket: Any) -> None:
+        try:
+            await websocket.close(code=self.SLOW_CONSUMER_CLOSE_CODE, reason='Slow consumer')
+        except Exception as error:
+            logger.debug('Failed to close slow WebSocket consumer', error=error)
+
     async def emit(
         self,
         event_type: str,
@@ -60,7 +155,7 @@ class EventEmitter:
         event_data = {
             'type': event_type,
             'payload': payload,
-            'timestamp': str(datetime.now(UTC)),
+            'timestamp': datetime.now(UTC).isoformat(),
         }
 
         # Вызываем локальные слушатели
@@ -77,29 +172,32 @@ class EventEmitter:
         # Отправляем через WebSocket
         await self._broadcast_to_websockets(event_data)
 
-        # Отправляем webhooks
+        # Ставим webhooks в очередь доставки (HTTP отправляет фоновый воркер)
         if db:
-            await webhook_service.send_webhook(db, event_type, payload)
+            await webhook_service.enqueue_webhook(db, event_type, payload)
 
     async def _broadcast_to_websockets(self, event_data: dict[str, Any]) -> None:
-        """Отправить событие всем подключенным WebSocket клиентам."""
-        if not self._websocket_connections:
-            return
+        """Отправить событие WebSocket клиентам всех реплик через backplane, не дожидаясь сети.
 
-        disconnected = set()
-        message = json.dumps(event_data, default=str, ensure_ascii=False)
+        Событие сериализуется один раз, и этот же текст получают сокеты всех реплик.
+        """
+        await ws_backplane.publish(EVENTS_WS_TOPIC, self._serialize(event_data), wait=False)
 
-        for ws in self._websocket_connections:
-            try:
-                await ws.send_text(message)
-            except Exception as error:
-                logger.warning('Failed to send WebSocket message', error=error)
-                disconnected.add(ws)
+    async def deliver_to_websockets(self, message: str) -> None:
+        """Поставить сериализованное событие в очереди WebSocket клиентов этого процесса.
+
+        Отправку выполняют writer-задачи подключений.
+        """
+        if not self._websocket_connections:
+            return
 
-        # Удаляем отключенные соединения
-        for ws in disconnected:
-            self.unregister_websocket(ws)
+        for ws, outbox in list(self._websocket_connections.items()):
+            if not outbox.offer(message):
+                logger.warning('WebSocket client is too slow, disconnecting', queue_size=self.WEBSOCKET_QUEUE_SIZE)
+                self.unregister_websocket(ws)
+                self._spawn(self._close_slow_consumer(ws))
 
 
 # Глобальный экземпляр event emitter
 event_emitter = EventEmitter()
+ws_backplane.register_topic(EVENTS_WS_TOPIC, event_emitter.deliver_to_websockets)
@@ -0,0 +1,284 @@
+"""Прокси медиафайлов Telegram с локальным дисковым кешем.
+
+Вложения тикетов отдаются кабинету и Web API по ``file_id``. Файл скачивается
+из Telegram один раз через общий ``Bot`` и сохраняется на диск под именем
+``file_unique_id`` (он не меняется между ботами и перевыпусками ``file_id``).
+Кеш ограничен по размеру: при превышении лимита удаляются давно не
+запрашивавшиеся файлы; файлы, запрошенные за последние
+``EVICTION_GRACE_SECONDS``, не удаляются, пока их может отдавать ответ. Ответ отдаётся потоково через ``FileResponse``
+с поддержкой ``Range`` и ``ETag``/``If-None-Match``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import mimetypes
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+import structlog
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramBadRequest
+from fastapi import Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.utils.content_cache import etag_matches
+
+
+logger = structlog.get_logger(__name__)
+
+
+PARTIAL_SUFFIX = '.part'
+_SUFFIX_RE = re.compile(r'^\.[A-Za-z0-9]{1,10}$')
+
+
+class MediaNotFoundError(Exception):
+    """Файл не найден в Telegram или у него нет ``file_path``."""
+
+
+@dataclass(frozen=True, slots=True)
+class CachedMedia:
+    path: Path
+    file_unique_id: str
+    filename: str
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.file_unique_id}"'
+
+    @property
+    def media_type(self) -> str:
+        return mimetypes.guess_type(self.filename)[0] or 'application/octet-stream'
+
+
+class MediaProxy:
+    # Сколько соответствий file_id -> файл в кеше держать в памяти
+    MAX_KNOWN_FILE_IDS = 10_000
+    DOWNLOAD_TIMEOUT_SECONDS = 120
+    # Запрошенный недавно файл может ещё передаваться клиенту через FileResponse
+    EVICTION_GRACE_SECONDS = 300
+
+    def __init__(self, cache_dir: Path | str | None = None, max_size_bytes: int | None = None) -> None:
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._max_size_bytes = max_size_bytes
+        self._bot: Bot | None = None
+        # file_id -> (имя файла в кеше, file_unique_id, исходное имя файла)
+        self._known_file_ids: OrderedDict[str, tuple[str, str, str]] = OrderedDict()
+        # имя файла в кеше -> размер; порядок = давность последнего запроса
+        self._index: OrderedDict[str, int] = OrderedDict()
+        # имя файла в кеше -> время последней выдачи (monotonic) в этом процессе
+        self._served_at: dict[str, float] = {}
+        self._total_size = 0
+        self._index_loaded = False
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @property
+    def cache_dir(self) -> Path:
+        if self._cache_dir is not None:
+            return self._cache_dir
+        return Path(settings.MEDIA_CACHE_DIR)
+
+    @property
+    def max_size_bytes(self) -> int:
+        if self._max_size_bytes is not None:
+            return self._max_size_bytes
+        return max(1, settings.MEDIA_CACHE_MAX_SIZE_MB) * 1024 * 1024
+
+    @property
+    def total_size(self) -> int:
+        return self._total_size
+
+    def _get_bot(self) -> Bot:
+        if self._bot is None:
+            self._bot = Bot(
+                token=settings.BOT_TOKEN,
+                default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+            )
+        return self._bot
+
+    async def close(self) -> None:
+        """Закрыть HTTP сессию общего бота."""
+        if self._bot is not None:
+            await self._bot.session.close()
+            self._bot = None
+
+    async def get(self, file_id: str) -> CachedMedia:
+        """Вернуть файл из кеша, при промахе скачав его из Telegram."""
+        self._ensure_index()
+
+        cached = self._lookup(file_id)
+        if cached is not None:
+            return cached
+
+        lock = self._locks.setdefault(file_id, asyncio.Lock())
+        try:
+            async with lock:
+                # Пока ждали блокировку, файл мог скачать параллельный запрос
+                cached = self._lookup(file_id)
+                if cached is not None:
+                    return cached
+                return await self._fetch(file_id)
+        finally:
+            if not lock.locked():
+                self._locks.pop(file_id, None)
+
+    def _lookup(self, file_id: str) -> CachedMedia | None:
+        known = self._known_file_ids.get(file_id)
+        if known is None:
+            return None
+
+        cache_name, file_unique_id, filename = known
+        if cache_name not in self._index:
+            return None
+
+        path = self.cache_dir / cache_name
+        if not path.is_file():
+            self._forget(cache_name)
+            return None
+
+        self._known_file_ids.move_to_end(file_id)
+        self._touch(cache_name)
+        self._served_at[cache_name] = time.monotonic()
+        return CachedMedia(path=path, file_unique_id=file_unique_id, filename=filename)
+
+    async def _fetch(self, file_id: str) -> CachedMedia:
+        bot = self._get_bot()
+        try:
+            file = await bot.get_file(file_id)
+        except TelegramBadRequest as error:
+            raise MediaNotFoundError(file_id) from error
+
+        if not file.file_path:
+            raise MediaNotFoundError(file_id)
+
+        filename = file.file_path.rsplit('/', 1)[-1]
+        cache_name = self._cache_name(file.file_unique_id, filename)
+        self._remember(file_id, cache_name, file.file_unique_id, filename)
+
+        path = self.cache_dir / cache_name
+        if cache_name in self._index and path.is_file():
+            # Тот же файл уже скачан по другому file_id
+            self._touch(cache_name)
+        else:
+            await self._download(bot, file.file_path, path)
+            self._add(cache_name, path.stat().st_size)
+        self._served_at[cache_name] = time.monotonic()
+        self._evict()
+
+        return CachedMedia(path=path, file_unique_id=file.file_unique_id, filename=filename)
+
+    async def _download(self, bot: Bot, file_path: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f'{path.name}.{uuid4().hex}{PARTIAL_SUFFIX}')
+        try:
+            await bot.download_file(file_path, destination=partial, timeout=self.DOWNLOAD_TIMEOUT_SECONDS)
+            partial.replace(path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        logger.debug('Медиафайл сохранён в кеш', path=str(path))
+
+    @staticmethod
+    def _cache_name(file_unique_id: str, filename: str) -> str:
+        suffix = Path(filename).suffix
+        if not _SUFFIX_RE.match(suffix):
+            suffix = ''
+        return f'{file_unique_id}{suffix.lower()}'
+
+    def _remember(self, file_id: str, cache_name: str, file_unique_id: str, filename: str) -> None:
+        self._known_file_ids[file_id] = (cache_name, file_unique_id, filename)
+        self._known_file_ids.move_to_end(file_id)
+        while len(self._known_file_ids) > self.MAX_KNOWN_FILE_IDS:
+            self._known_file_ids.popitem(last=False)
+
+    # ---- LRU индекс на диске ----------------------------------------------
+
+    def _ensure_index(self) -> None:
+        if self._index_loaded:
+            return
+
+        self._index_loaded = True
+        directory = self.cache_dir
+        if not directory.is_dir():
+            return
+
+        entries: list[tuple[float, str, int]] = []
+        for path in directory.iterdir():
+            if not path.is_file():
+                continue
+            if path.name.endswith(PARTIAL_SUFFIX):
+                # Недокачанный файл после перезапуска
+                path.unlink(missing_ok=True)
+                continue
+            stat_result = path.stat()
+            entries.append((stat_result.st_mtime, path.name, stat_result.st_size))
+
+        for _mtime, name, size in sorted(entries):
+            self._add(name, size)
+
+        self._evict()
+        logger.info('Загружен индекс кеша медиафайлов', files=len(self._index), size_bytes=self._total_size)
+
+    def _add(self, cache_name: str, size: int) -> None:
+        previous = self._index.pop(cache_name, None)
+        if previous is not None:
+            self._total_size -= previous
+        self._index[cache_name] = size
+        self._total_size += size
+
+    def _touch(self, cache_name: str) -> None:
+        self._index.move_to_end(cache_name)
+        # mtime хранит порядок LRU между перезапусками
+        with suppress(OSError):
+            os.utime(self.cache_dir / cache_name)
+
+    def _forget(self, cache_name: str) -> None:
+        size = self._index.pop(cache_name, None)
+        self._served_at.pop(cache_name, None)
+        if size is not None:
+            self._total_size -= size
+
+    def _evict(self) -> None:
+        # Самый свежий файл не удаляем, даже если он один больше лимита
+        grace_started_at = time.monotonic() - self.EVICTION_GRACE_SECONDS
+        while self._total_size > self.max_size_bytes and len(self._index) > 1:
+            cache_name = next(iter(self._index))
+            if self._served_at.get(cache_name, float('-inf')) > grace_started_at:
+                # Индекс упорядочен по давности запроса: дальше только недавно выданные файлы.
+                # Кеш временно превышает лимит, их удалит следующая очистка
+                break
+            size = self._index.pop(cache_name)
+            self._served_at.pop(cache_name, None)
+            self._total_size -= size
+            with suppress(OSError):
+                (self.cache_dir / cache_name).unlink(missing_ok=True)
+            logger.debug('Медиафайл удалён из кеша', cache_name=cache_name, size=size)
+
+
+media_proxy = MediaProxy()
+
+
+def build_media_response(request: Request, media: CachedMedia, *, cache_control: str) -> Response:
+    """Потоковый ответ с файлом из кеша; ``If-None-Match`` даёт 304, ``Range`` — 206."""
+    headers = {'ETag': media.etag, 'Cache-Control': cache_control}
+
+    if etag_matches(request.headers.get('if-none-match'), media.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(
+        media.path,
+        media_type=media.media_type,
+        headers=headers,
+        filename=media.filename,
+        content_disposition_type='inline',
+    )
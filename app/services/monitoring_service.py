@@ -17,6 +17,7 @@ from app.database.crud.discount_offer import (
 )
 from app.database.crud.notification import (
     clear_notification_by_type,
+    get_sent_notification_keys,
     notification_sent,
     record_notification,
 )
@@ -46,6 +47,8 @@ from app.database.models import (
     UserPromoGroup,
     UserStatus,
 )
+from app.database.pool_admission import DbPriority, db_priority, pool_admission
+from app.database.query_profiler import query_profiler
 from app.external.remnawave_api import (
     RemnaWaveAPIError,
     RemnaWaveUser,
@@ -58,6 +61,7 @@ from app.services.notification_delivery_service import (
 )
 from app.services.notification_settings_service import NotificationSettingsService
 from app.services.promo_offer_service import promo_offer_service
+from app.services.subscription_expiry_scheduler import subscription_expiry_scheduler
 from app.services.subscription_service import SubscriptionService
 from app.utils.cache import cache
 from app.utils.miniapp_buttons import build_miniapp_or_callback_button
@@ -74,6 +78,9 @@ AUTOPAY_INSUFFICIENT_BALANCE_COOLDOWN_SECONDS: int = 21600
 # Размер батча для проверки подписок на каналы (keyset pagination)
 _CHANNEL_CHECK_BATCH_SIZE: int = 100
 
+# За сколько до окончания тестовой подписки отправляется предупреждение
+TRIAL_ENDING_NOTICE: timedelta = timedelta(hours=2)
+
 
 logger = structlog.get_logger(__name__)
 
@@ -180,7 +187,9 @@ class MonitoringService:
 
         while self.is_running:
             try:
-                await self._monitoring_cycle()
+                await pool_admission.background_backoff('job:monitoring_cycle')
+                with db_priority(DbPriority.BACKGROUND), query_profiler.unit_of_work('job:monitoring_cycle'):
+                    await self._monitoring_cycle()
                 await asyncio.sleep(settings.MONITORING_INTERVAL * 60)
 
             except Exception as e:
@@ -218,9 +227,9 @@ class MonitoringService:
                         '🧹 Отозвано истекших тестовых доступов к сквадам', cleaned_test_access=cleaned_test_access
                     )
 
-                await self._check_expired_subscriptions(db)
-                await self._check_expiring_subscriptions(db)
-                await self._check_trial_expiring_soon(db)
+                # При работающем планировщике истечения эти проверки идут по ближайшему сроку, а не раз в цикл
+                if not subscription_expiry_scheduler.is_running():
+                    await self.process_due_subscriptions(db)
                 await self._check_trial_channel_subscriptions(db)
                 await self._check_expired_subscription_followups(db)
                 if settings.ENABLE_AUTOPAY:
@@ -259,11 +268,30 @@ class MonitoringService:
             self._last_cleanup = current_time
             logger.info('🧹 Очищен кеш уведомлений ( записей)', old_count=old_count)
 
-    async def _check_expired_subscriptions(self, db: AsyncSession):
+    def get_due_offsets(self) -> list[timedelta]:
+        """Смещения от ``end_date``, в которые срабатывают проверки :meth:`process_due_subscriptions`."""
+        return [
+            timedelta(0),
+            TRIAL_ENDING_NOTICE,
+            *(timedelta(days=days) for days in settings.get_autopay_warning_days()),
+        ]
+
+    async def process_due_subscriptions(self, db: AsyncSession, since: datetime | None = None):
+        """Истечения, предупреждения и уведомления о конце теста, чьи сроки наступили.
+
+        С ``since`` проверяются только подписки, у которых срок (``end_date``
+        минус смещение) попал в ``(since, now]`` или которые изменились после
+        ``since``; без него — все активные подписки.
+        """
+        await self._check_expired_subscriptions(db, since)
+        await self._check_expiring_subscriptions(db, since)
+        await self._check_trial_expiring_soon(db, since)
+
+    async def _check_expired_subscriptions(self, db: AsyncSession, since: datetime | None = None):
         try:
             from app.database.crud.subscription import is_recently_updated_by_webhook
 
-            expired_subscriptions = await get_expired_subscriptions(db)
+            expired_subscriptions = await get_expired_subscriptions(db, since)
 
             for subscription in expired_subscriptions:
                 if is_recently_updated_by_webhook(subscription):
@@ -276,7 +304,7 @@ class MonitoringService:
 
                 await expire_subscription(db, subscription)
 
-                user = await get_user_by_id(db, subscription.user_id)
+                user = subscription.user
                 if user and self.bot:
                     await self._send_subscription_expired_notification(user)
 
@@ -379,102 +407,105 @@ class MonitoringService:
             logger.error('Ошибка обновления RemnaWave пользователя', error=e)
             return None
 
-    async def _check_expiring_subscriptions(self, db: AsyncSession):
+    async def _check_expiring_subscriptions(self, db: AsyncSession, since: datetime | None = None):
         try:
             warning_days = settings.get_autopay_warning_days()
+            expiring_subscriptions = await self._get_expiring_paid_subscriptions(db, warning_days, since)
+            sent_keys = await get_sent_notification_keys(
+                db, [subscription.id for subscription in expiring_subscriptions], 'expiring'
+            )
+
+            # Каждой подписке — только самое срочное из наступивших предупреждений
+            current_time = datetime.now(UTC)
+            due_days: dict[int, int] = {}
+            urgent_days: dict[int, int] = {}
+            for subscription in expiring_subscriptions:
+                days = min(
+                    (days for days in warning_days if subscription.end_date <= current_time + timedelta(days=days)),
+                    default=max(warning_days),
+                )
+                due_days[subscription.id] = days
+                urgent_days[subscription.user_id] = min(days, urgent_days.get(subscription.user_id, days))
+
             all_processed_users = set()
+            sent_counts: dict[int, int] = {}
 
-            for days in warning_days:
-                expiring_subscriptions = await self._get_expiring_paid_subscriptions(db, days)
-                sent_count = 0
-
-                for subscription in expiring_subscriptions:
-                    user = await get_user_by_id(db, subscription.user_id)
-                    if not user:
-                        continue
-
-                    # Use user.id for key to support both Telegram and email users
-                    user_key = f'user_{user.id}_today'
-                    user_identifier = user.telegram_id or f'email:{user.id}'
-
-                    if (
-                        await notification_sent(db, user.id, subscription.id, 'expiring', days)
-                        or user_key in all_processed_users
-                    ):
-                        logger.debug(
-                            'Уведомление уже отправлено, пропускаем',
-                            user_identifier=user_identifier,
-                            days=days,
-                        )
-                        continue
-
-                    should_send = True
-                    for other_days in warning_days:
-                        if other_days < days:
-                            other_subs = await self._get_expiring_paid_subscriptions(db, other_days)
-                            if any(s.user_id == user.id for s in other_subs):
-                                should_send = False
-                                logger.debug(
-                                    '🎯 Пропускаем уведомление на дней для пользователя есть более срочное на дней',
-                                    days=days,
-                                    user_identifier=user_identifier,
-                                    other_days=other_days,
-                                )
-                                break
+            for subscription in expiring_subscriptions:
+                user = subscription.user
+                if not user:
+                    continue
 
-                    if not should_send:
-                        continue
+                days = due_days[subscription.id]
+                # Use user.id for key to support both Telegram and email users
+                user_key = f'user_{user.id}_today'
+                user_identifier = user.telegram_id or f'email:{user.id}'
 
-                    # Handle email-only users via notification delivery service
-                    if not user.telegram_id:
-                        success = await notification_delivery_service.notify_subscription_expiring(
-                            user=user,
-                            days_left=days,
-                            expires_at=subscription.end_date,
-                        )
-                        if success:
-                            await record_notification(db, user.id, subscription.id, 'expiring', days)
-                            all_processed_users.add(user_key)
-                            sent_count += 1
-                            logger.info(
-                                '✅ Email-пользователю отправлено уведомление об истечении подписки через дней',
-                                user_id=user.id,
-                                days=days,
-                            )
-                        continue
+                if (subscription.id, days) in sent_keys or user_key in all_processed_users:
+                    logger.debug(
+                        'Уведомление уже отправлено, пропускаем',
+                        user_identifier=user_identifier,
+                        days=days,
+                    )
+                    continue
 
-                    if self.bot:
-                        success = await self._send_subscription_expiring_notification(user, subscription, days)
-                        if success:
-                            await record_notification(db, user.id, subscription.id, 'expiring', days)
-                            all_processed_users.add(user_key)
-                            sent_count += 1
-                            logger.info(
-                                '✅ Пользователю отправлено уведомление об истечении подписки через дней',
-                                telegram_id=user.telegram_id,
-                                days=days,
-                            )
-                        else:
-                            logger.warning(
-                                '❌ Не удалось отправить уведомление пользователю', telegram_id=user.telegram_id
-                            )
+                if urgent_days[subscription.user_id] < days:
+                    logger.debug(
+                        '🎯 Пропускаем уведомление на дней для пользователя есть более срочное на дней',
+                        days=days,
+                        user_identifier=user_identifier,
+                        other_days=urgent_days[subscription.user_id],
+                    )
+                    continue
 
-                if sent_count > 0:
-                    await self._log_monitoring_event(
-                        db,
-                        'expiring_notifications_sent',
-                        f'Отправлено {sent_count} уведомлений об истечении через {days} дней',
-                        {'days': days, 'count': sent_count},
+                # Handle email-only users via notification delivery service
+                if not user.telegram_id:
+                    success = await notification_delivery_service.notify_subscription_expiring(
+                        user=user,
+                        days_left=days,
+                        expires_at=subscription.end_date,
                     )
+                    if success:
+                        await record_notification(db, user.id, subscription.id, 'expiring', days)
+                        all_processed_users.add(user_key)
+                        sent_counts[days] = sent_counts.get(days, 0) + 1
+                        logger.info(
+                            '✅ Email-пользователю отправлено уведомление об истечении подписки через дней',
+                            user_id=user.id,
+                            days=days,
+                        )
+                    continue
+
+                if self.bot:
+                    success = await self._send_subscription_expiring_notification(user, subscription, days)
+                    if success:
+                        await record_notification(db, user.id, subscription.id, 'expiring', days)
+                        all_processed_users.add(user_key)
+                        sent_counts[days] = sent_counts.get(days, 0) + 1
+                        logger.info(
+                            '✅ Пользователю отправлено уведомление об истечении подписки через дней',
+                            telegram_id=user.telegram_id,
+                            days=days,
+                        )
+                    else:
+                        logger.warning('❌ Не удалось отправить уведомление пользователю', telegram_id=user.telegram_id)
+
+            for days, sent_count in sent_counts.items():
+                await self._log_monitoring_event(
+                    db,
+                    'expiring_notifications_sent',
+                    f'Отправлено {sent_count} уведомлений об истечении через {days} дней',
+                    {'days': days, 'count': sent_count},
+                )
 
         except Exception as e:
             logger.error('Ошибка проверки истекающих подписок', error=e)
 
-    async def _check_trial_expiring_soon(self, db: AsyncSession):
+    async def _check_trial_expiring_soon(self, db: AsyncSession, since: datetime | None = None):
         try:
-            threshold_time = datetime.now(UTC) + timedelta(hours=2)
+            current_time = datetime.now(UTC)
+            threshold_time = current_time + TRIAL_ENDING_NOTICE
 
-            result = await db.execute(
+            query = (
                 select(Subscription)
                 .join(Subscription.user)
                 .options(
@@ -488,19 +519,27 @@ class MonitoringService:
                         Subscription.status == SubscriptionStatus.ACTIVE.value,
                         Subscription.is_trial == True,
                         Subscription.end_date <= threshold_time,
-                        Subscription.end_date > datetime.now(UTC),
+                        Subscription.end_date > current_time,
                         User.status == UserStatus.ACTIVE.value,
                     )
                 )
             )
+            if since is not None:
+                query = query.where(
+                    or_(Subscription.end_date > since + TRIAL_ENDING_NOTICE, Subscription.updated_at > since)
+                )
+            result = await db.execute(query)
             trial_expiring = result.scalars().all()
+            sent_keys = await get_sent_notification_keys(
+                db, [subscription.id for subscription in trial_expiring], 'trial_2h'
+            )
 
             for subscription in trial_expiring:
                 user = subscription.user
                 if not user:
                     continue
 
-                if await notification_sent(db, user.id, subscription.id, 'trial_2h'):
+                if (subscription.id, None) in sent_keys:
                     continue
 
                 if self.bot:
@@ -889,11 +928,21 @@ class MonitoringService:
         except Exception as e:
             logger.error('Ошибка проверки напоминаний об истекшей подписке', error=e)
 
-    async def _get_expiring_paid_subscriptions(self, db: AsyncSession, days_before: int) -> list[Subscription]:
+    async def _get_expiring_paid_subscriptions(
+        self, db: AsyncSession, warning_days: list[int], since: datetime | None = None
+    ) -> list[Subscription]:
+        """Платные подписки, истекающие в пределах самого дальнего из ``warning_days``.
+
+        С ``since`` — только те, у которых порог одного из предупреждений
+        (``end_date`` минус дни) попал в ``(since, now]``, или изменённые после ``since``.
+        """
+        if not warning_days:
+            return []
         current_time = datetime.now(UTC)
+        days_before = max(warning_days)
         threshold_date = current_time + timedelta(days=days_before)
 
-        result = await db.execute(
+        query = (
             select(Subscription)
             .options(
                 selectinload(Subscription.user),
@@ -907,7 +956,22 @@ class MonitoringService:
                     Subscription.end_date <= threshold_date,
                 )
             )
+            .order_by(Subscription.end_date)
         )
+        if since is not None:
+            query = query.where(
+                or_(
+                    Subscription.updated_at > since,
+                    *(
+                        and_(
+                            Subscription.end_date > since + timedelta(days=days),
+                            Subscription.end_date <= current_time + timedelta(days=days),
+                        )
+                        for days in warning_days
+                    ),
+                )
+            )
+        result = await db.execute(query)
 
         logger.debug('🔍 Поиск платных подписок, истекающих в ближайшие дней', days_before=days_before)
         logger.debug('📅 Текущее время', current_time=current_time)
@@ -9,6 +9,7 @@ import structlog
 from sqlalchemy import and_, case, desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.crud.stats_rollup import get_daily_referral_earnings, get_daily_referral_invites
 from app.database.models import (
     AdvertisingCampaignRegistration,
     ReferralEarning,
@@ -158,38 +159,15 @@ class PartnerStatsService:
         now = datetime.now(UTC)
         start_date = now - timedelta(days=days)
 
-        # Рефералы по дням
-        referrals_by_day = await db.execute(
-            select(
-                func.date(User.created_at).label('date'),
-                func.count(User.id).label('referrals_count'),
-            )
-            .where(
-                and_(
-                    User.referred_by_id == user_id,
-                    User.created_at >= start_date,
-                )
-            )
-            .group_by(func.date(User.created_at))
-            .order_by(func.date(User.created_at))
-        )
-        referrals_dict = {str(row.date): row.referrals_count for row in referrals_by_day.all()}
-
-        # Заработки по дням (из ReferralEarning)
-        earnings_by_day = await db.execute(
-            select(
-                func.date(ReferralEarning.created_at).label('date'),
-                func.sum(ReferralEarning.amount_kopeks).label('earnings'),
-            )
-            .where(
-                and_(
-                    ReferralEarning.user_id == user_id,
-                    ReferralEarning.created_at >= start_date,
-                )
-            )
-            .group_by(func.date(ReferralEarning.created_at))
-        )
-        earnings_dict = {str(row.date): int(row.earnings or 0) for row in earnings_by_day.all()}
+        # Закрытые дни — из дневных агрегатов, остальное — по исходным таблицам
+        referrals_dict = {
+            str(day): count
+            for day, count in (await get_daily_referral_invites(db, start_date, now, referrer_id=user_id)).items()
+        }
+        earnings_dict = {
+            str(day): amount
+            for day, amount in (await get_daily_referral_earnings(db, start_date, now, referrer_id=user_id)).items()
+        }
 
         # Формируем массив за все дни
         result = []
@@ -469,32 +447,12 @@ class PartnerStatsService:
         now = datetime.now(UTC)
         start_date = now - timedelta(days=days)
 
-        # Рефералы по дням
-        referrals_by_day = await db.execute(
-            select(
-                func.date(User.created_at).label('date'),
-                func.count(User.id).label('referrals_count'),
-            )
-            .where(
-                and_(
-                    User.referred_by_id.isnot(None),
-                    User.created_at >= start_date,
-                )
-            )
-            .group_by(func.date(User.created_at))
-        )
-        referrals_dict = {str(row.date): row.referrals_count for row in referrals_by_day.all()}
-
-        # Выплаты по дням
-        earnings_by_day = await db.execute(
-            select(
-                func.date(ReferralEarning.created_at).label('date'),
-                func.sum(ReferralEarning.amount_kopeks).label('earnings'),
-            )
-            .where(ReferralEarning.created_at >= start_date)
-            .group_by(func.date(ReferralEarning.created_at))
-        )
-        earnings_dict = {str(row.date): int(row.earnings or 0) for row in earnings_by_day.all()}
+        referrals_dict = {
+            str(day): count for day, count in (await get_daily_referral_invites(db, start_date, now)).items()
+        }
+        earnings_dict = {
+            str(day): amount for day, amount in (await get_daily_referral_earnings(db, start_date, now)).items()
+        }
 
         result = []
         for i in range(days):
@@ -720,21 +678,12 @@ class PartnerStatsService:
         )
         referrals_dict = {str(row.date): int(row.count) for row in referrals_by_day.all()}
 
-        earnings_by_day = await db.execute(
-            select(
-                func.date(ReferralEarning.created_at).label('date'),
-                func.sum(ReferralEarning.amount_kopeks).label('earnings'),
-            )
-            .where(
-                and_(
-                    ReferralEarning.user_id == user_id,
-                    ReferralEarning.campaign_id == campaign_id,
-                    ReferralEarning.created_at >= start_date,
-                )
-            )
-            .group_by(func.date(ReferralEarning.created_at))
-        )
-        earnings_dict = {str(row.date): int(row.earnings or 0) for row in earnings_by_day.all()}
+        earnings_dict = {
+            str(day): amount
+            for day, amount in (
+                await get_daily_referral_earnings(db, start_date, now, referrer_id=user_id, campaign_id=campaign_id)
+            ).items()
+        }
 
         daily_stats = []
         for i in range(DAILY_STATS_DAYS):
@@ -19,6 +19,7 @@ from app.database.crud.rbac import AccessPolicyCRUD, AuditLogCRUD, UserRoleCRUD
 
 
 if TYPE_CHECKING:
+    from app.cabinet.auth.principal_cache import CabinetPrincipal
     from app.database.models import AccessPolicy, User
 
 
@@ -28,7 +29,7 @@ SUPERADMIN_LEVEL = 999
 logger = structlog.get_logger(__name__)
 
 
-def _is_legacy_admin(user: User) -> bool:
+def _is_legacy_admin(user: User | CabinetPrincipal) -> bool:
     """Check if user is a legacy config-based admin (ADMIN_IDS / ADMIN_EMAILS)."""
     return settings.is_admin(
         telegram_id=user.telegram_id,
@@ -52,6 +53,7 @@ PERMISSION_REGISTRY: dict[str, list[str]] = {
         'subscription',
         'send_offer',
         'referral',
+        'export',
     ],
     'tickets': ['read', 'reply', 'close', 'settings'],
     'stats': ['read', 'export'],
@@ -205,7 +207,7 @@ class PermissionService:
     @staticmethod
     async def check_permission(
         db: AsyncSession,
-        user: User,
+        user: User | CabinetPrincipal,
         required_permission: str,
         *,
         ip_address: str | None = None,
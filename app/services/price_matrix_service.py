@@ -0,0 +1,322 @@
+"""Precomputed price matrix for subscription price screens.
+
+Period, traffic and device buttons used to redo the same promo-group discount
+math for every button and every click. A :class:`PriceMatrix` holds, for one
+discount profile (promo group), every period × traffic package base price
+with its discount already applied, plus the server and device discount
+percents, so rendering a pricing screen is a dictionary lookup.
+
+Matrices are keyed by the promo group's discount fields and by a fingerprint of
+the pricing settings, so an edited promo group or changed price setting simply
+maps to a new entry. ``SystemSettingsService`` additionally calls
+:meth:`PriceMatrixService.invalidate` on every runtime settings change.
+
+The arithmetic mirrors ``calculate_user_price``,
+``calculate_subscription_total_cost`` and
+``SubscriptionService.calculate_subscription_price_with_months``; the tests
+check the matrix against those functions on random inputs.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from app.config import PERIOD_PRICES, settings
+from app.utils.price_display import PriceInfo
+from app.utils.pricing_utils import calculate_months_from_days
+
+
+# Профиль без пользователя: базовые скидки по периодам из настроек (как calculate_user_price(None, ...))
+BASE_PROFILE = ('base',)
+# Пользователь без промогруппы или расчёт без пользователя и группы
+EMPTY_PROFILE = ('none',)
+
+
+@dataclass(frozen=True, slots=True)
+class DiscountedPrice:
+    original: int
+    discount_percent: int
+    final: int
+
+    @property
+    def discount_value(self) -> int:
+        return self.original - self.final
+
+    @classmethod
+    def apply(cls, amount: int, percent: int) -> 'DiscountedPrice':
+        """Floor the discount, as the subscription cost functions do."""
+        return cls(original=amount, discount_percent=percent, final=amount - amount * percent // 100)
+
+    def with_promo_offer(self, offer_percent: int) -> PriceInfo:
+        """Stack a personal promo-offer discount on top (same steps as ``calculate_user_price``)."""
+        if not self.original or self.original <= 0:
+            return PriceInfo(base_price=self.original or 0, final_price=self.original or 0, discount_percent=0)
+
+        final_price = self.final
+        if offer_percent > 0:
+            final_price = final_price - (final_price * offer_percent) // 100
+
+        discount_percent = 0
+        if final_price < self.original:
+            discount_percent = round((self.original - final_price) * 100 / self.original)
+
+        return PriceInfo(base_price=self.original, final_price=final_price, discount_percent=discount_percent)
+
+
+def resolve_traffic_price(packages: Iterable[tuple[int, int]], gb: int | None) -> int:
+    """Same package resolution as ``settings.get_traffic_price`` over pre-parsed enabled packages."""
+    packages = list(packages)
+    if not packages:
+        return 0
+
+    gb = gb or 0
+    for package_gb, price in packages:
+        if package_gb == gb:
+            return price
+
+    unlimited_price = next((price for package_gb, price in packages if package_gb == 0), None)
+    if gb <= 0:
+        return unlimited_price or 0
+
+    finite = [(package_gb, price) for package_gb, price in packages if package_gb > 0]
+    if not finite:
+        return unlimited_price or 0
+
+    max_gb, max_price = max(finite, key=lambda item: item[0])
+    if gb >= max_gb:
+        return unlimited_price if unlimited_price is not None else max_price
+
+    suitable = [(package_gb, price) for package_gb, price in finite if package_gb >= gb]
+    if suitable:
+        return min(suitable, key=lambda item: item[0])[1]
+
+    return unlimited_price or 0
+
+
+@dataclass(frozen=True, slots=True)
+class PeriodPrices:
+    """All prices of one period for one discount profile."""
+
+    period_days: int
+    months: int
+    base: DiscountedPrice
+    traffic_discount_percent: int
+    servers_discount_percent: int
+    devices_discount_percent: int
+    traffic_packages: tuple[tuple[int, int], ...]
+    # gb -> цена пакета в месяц со скидкой
+    traffic: Mapping[int, DiscountedPrice]
+    device_unit_price: int
+    default_device_limit: int
+
+    def discount_percent(self, category: str) -> int:
+        return {
+            'period': self.base.discount_percent,
+            'traffic': self.traffic_discount_percent,
+            'servers': self.servers_discount_percent,
+            'devices': self.devices_discount_percent,
+        }.get(category, 0)
+
+    def traffic_price(self, traffic_gb: int | None) -> DiscountedPrice:
+        """Monthly traffic price; packages are precomputed, other values resolve like settings."""
+        cached = self.traffic.get(traffic_gb or 0)
+        if cached is not None:
+            return cached
+        return DiscountedPrice.apply(
+            resolve_traffic_price(self.traffic_packages, traffic_gb), self.traffic_discount_percent
+        )
+
+    def devices_price(self, devices: int) -> DiscountedPrice:
+        """Monthly price of devices above ``DEFAULT_DEVICE_LIMIT``."""
+        additional = max(0, devices - self.default_device_limit)
+        return DiscountedPrice.apply(additional * self.device_unit_price, self.devices_discount_percent)
+
+    def servers_price(self, monthly_prices: Iterable[int]) -> DiscountedPrice:
+        """Monthly price of the selected servers, discounted as one sum."""
+        return DiscountedPrice.apply(sum(monthly_prices), self.servers_discount_percent)
+
+    def total(self, traffic_gb: int | None, server_monthly_prices: Iterable[int], devices: int) -> int:
+        """Full period cost, equal to ``calculate_subscription_total_cost``."""
+        months = self.months
+        return (
+            self.base.final
+            + self.traffic_price(traffic_gb).final * months
+            + self.servers_price(server_monthly_prices).final * months
+            + self.devices_price(devices).final * months
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class PriceMatrix:
+    profile: tuple
+    periods: tuple[PeriodPrices, ...]
+    by_period: Mapping[int, PeriodPrices]
+    discount_for: Callable[[str, int | None], int]
+
+    def period(self, period_days: int) -> PeriodPrices:
+        row = self.by_period.get(period_days)
+        if row is None:
+            # Период вне настроек (например, из старой корзины) — считаем без кеша
+            row = _build_period(period_days, self.discount_for)
+        return row
+
+
+@dataclass(frozen=True, slots=True)
+class TariffPeriodPrice:
+    period_days: int
+    price: DiscountedPrice
+
+
+def _settings_key() -> tuple:
+    return (
+        tuple(sorted(PERIOD_PRICES.items())),
+        settings.AVAILABLE_SUBSCRIPTION_PERIODS,
+        settings.TRAFFIC_PACKAGES_CONFIG,
+        settings.PRICE_PER_DEVICE,
+        settings.DEFAULT_DEVICE_LIMIT,
+        settings.BASE_PROMO_GROUP_PERIOD_DISCOUNTS_ENABLED,
+        settings.BASE_PROMO_GROUP_PERIOD_DISCOUNTS,
+    )
+
+
+def _enabled_traffic_packages() -> tuple[tuple[int, int], ...]:
+    return tuple(
+        (int(package['gb']), int(package['price'])) for package in settings.get_traffic_packages() if package['enabled']
+    )
+
+
+def _build_period(
+    period_days: int,
+    discount_for: Callable[[str, int | None], int],
+    traffic_packages: tuple[tuple[int, int], ...] | None = None,
+) -> PeriodPrices:
+    if traffic_packages is None:
+        traffic_packages = _enabled_traffic_packages()
+
+    traffic_percent = discount_for('traffic', period_days)
+    traffic: dict[int, DiscountedPrice] = {}
+    for package_gb, _price in traffic_packages:
+        traffic.setdefault(
+            package_gb,
+            DiscountedPrice.apply(resolve_traffic_price(traffic_packages, package_gb), traffic_percent),
+        )
+
+    return PeriodPrices(
+        period_days=period_days,
+        months=calculate_months_from_days(period_days),
+        base=DiscountedPrice.apply(PERIOD_PRICES.get(period_days, 0), discount_for('period', period_days)),
+        traffic_discount_percent=traffic_percent,
+        servers_discount_percent=discount_for('servers', period_days),
+        devices_discount_percent=discount_for('devices', period_days),
+        traffic_packages=traffic_packages,
+        traffic=MappingProxyType(traffic),
+        device_unit_price=settings.PRICE_PER_DEVICE,
+        default_device_limit=settings.DEFAULT_DEVICE_LIMIT,
+    )
+
+
+def _promo_group_profile(promo_group: Any) -> tuple:
+    if promo_group is None:
+        return EMPTY_PROFILE
+    period_discounts = promo_group.period_discounts if isinstance(promo_group.period_discounts, dict) else {}
+    return (
+        'group',
+        promo_group.id,
+        promo_group.server_discount_percent,
+        promo_group.traffic_discount_percent,
+        promo_group.device_discount_percent,
+        bool(promo_group.is_default),
+        tuple(sorted((str(key), str(value)) for key, value in period_discounts.items())),
+    )
+
+
+class PriceMatrixService:
+    MAX_MATRICES = 256
+
+    def __init__(self) -> None:
+        self._matrices: OrderedDict[tuple, PriceMatrix] = OrderedDict()
+        self._tariffs: OrderedDict[tuple, tuple[TariffPeriodPrice, ...]] = OrderedDict()
+
+    def invalidate(self) -> None:
+        self._matrices.clear()
+        self._tariffs.clear()
+
+    def for_user(self, user: Any) -> PriceMatrix:
+        """Matrix for the user's primary promo group; ``None`` uses base settings discounts."""
+        if user is None:
+            return self._get(BASE_PROFILE, lambda _category, period_days: _base_period_discount(period_days))
+        return self.for_promo_group(user.get_primary_promo_group())
+
+    def for_promo_group(self, promo_group: Any) -> PriceMatrix:
+        if promo_group is None:
+            return self._get(EMPTY_PROFILE, lambda _category, _period_days: 0)
+        return self._get(_promo_group_profile(promo_group), promo_group.get_discount_percent)
+
+    def tariff_periods(self, tariff: Any, promo_group: Any) -> tuple[TariffPeriodPrice, ...]:
+        """Tariff period prices (disabled periods skipped) with the group's period discount."""
+        raw_prices = tariff.period_prices or {}
+        key = (
+            tariff.id,
+            tuple(sorted((str(period), int(price)) for period, price in raw_prices.items())),
+            _promo_group_profile(promo_group),
+            settings.BASE_PROMO_GROUP_PERIOD_DISCOUNTS_ENABLED,
+            settings.BASE_PROMO_GROUP_PERIOD_DISCOUNTS,
+        )
+        cached = self._tariffs.get(key)
+        if cached is not None:
+            self._tariffs.move_to_end(key)
+            return cached
+
+        rows = []
+        for period_str, price in sorted(raw_prices.items(), key=lambda item: int(item[0])):
+            price = int(price)
+            if price < 0:
+                continue
+            period_days = int(period_str)
+            percent = promo_group.get_discount_percent('period', period_days) if promo_group else 0
+            rows.append(TariffPeriodPrice(period_days=period_days, price=DiscountedPrice.apply(price, percent)))
+
+        result = tuple(rows)
+        self._store(self._tariffs, key, result)
+        return result
+
+    def _get(self, profile: tuple, discount_for: Callable[[str, int | None], int]) -> PriceMatrix:
+        settings_key = _settings_key()
+        key = (profile, settings_key)
+        matrix = self._matrices.get(key)
+        if matrix is not None:
+            self._matrices.move_to_end(key)
+            return matrix
+
+        traffic_packages = _enabled_traffic_packages()
+        periods = tuple(
+            _build_period(period_days, discount_for, traffic_packages)
+            for period_days in settings.get_available_subscription_periods()
+        )
+        by_period = {row.period_days: row for row in periods}
+        for period_days in PERIOD_PRICES:
+            if period_days not in by_period:
+                by_period[period_days] = _build_period(period_days, discount_for, traffic_packages)
+
+        matrix = PriceMatrix(
+            profile=profile,
+            periods=periods,
+            by_period=MappingProxyType(by_period),
+            discount_for=discount_for,
+        )
+        self._store(self._matrices, key, matrix)
+        return matrix
+
+    def _store(self, storage: OrderedDict, key: tuple, value: Any) -> None:
+        storage[key] = value
+        while len(storage) > self.MAX_MATRICES:
+            storage.popitem(last=False)
+
+
+def _base_period_discount(period_days: int | None) -> int:
+    return settings.get_base_promo_group_period_discount(period_days)
+
+
+price_matrix_service = PriceMatrixService()
@@ -7,22 +7,22 @@ from typing import Any, Optional
 from zoneinfo import ZoneInfo
 
 import structlog
-from sqlalchemy import String, and_, cast, delete, func, select, update
+from sqlalchemy import and_, delete, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.database.crud.server_squad import get_server_squad_by_uuid
+from app.database.crud.server_squad import get_server_squad_by_uuid, record_server_user_deltas
 from app.database.crud.subscription import (
     decrement_subscription_server_counts,
 )
+from app.database.crud.subscription_squads import on_squad
 from app.database.crud.user import (
     create_user_no_commit,
     get_user_by_telegram_id,
 )
 from app.database.models import (
-    ServerSquad,
     Subscription,
     SubscriptionServer,
     SubscriptionStatus,
@@ -471,6 +471,26 @@ class RemnaWaveService:
         )
         return first_name, last_name, username
 
+    def _panel_user_names(self, panel_user: dict[str, Any]) -> tuple[str, str | None, str | None]:
+        """Имя, фамилия и username нового пользователя бота по данным панели."""
+
+        # Извлекаем настоящее имя пользователя из описания
+        description = panel_user.get('description') or ''
+        first_name_from_desc, last_name_from_desc, username_from_desc = self._extract_user_data_from_description(
+            description
+        )
+
+        # Используем извлеченное имя или дефолтное значение
+        full_first_name = f'User {panel_user.get("telegramId")}'
+        full_last_name = None
+
+        if first_name_from_desc:
+            full_first_name = first_name_from_desc
+            full_last_name = last_name_from_desc
+
+        username = username_from_desc or panel_user.get('username')
+        return full_first_name, full_last_name, username
+
     async def _get_or_create_bot_user_from_panel(
         self,
         db: AsyncSession,
@@ -486,22 +506,7 @@ class RemnaWaveService:
         if telegram_id is None:
             return None, False
 
-        # Извлекаем настоящее имя пользователя из описания
-        description = panel_user.get('description') or ''
-        first_name_from_desc, last_name_from_desc, username_from_desc = self._extract_user_data_from_description(
-            description
-        )
-
-        # Используем извлеченное имя или дефолтное значение
-        fallback_first_name = f'User {telegram_id}'
-        full_first_name = fallback_first_name
-        full_last_name = None
-
-        if (first_name_from_desc and last_name_from_desc) or first_name_from_desc:
-            full_first_name = first_name_from_desc
-            full_last_name = last_name_from_desc
-
-        username = username_from_desc or panel_user.get('username')
+        full_first_name, full_last_name, username = self._panel_user_names(panel_user)
 
         try:
             create_kwargs = dict(
@@ -974,7 +979,7 @@ class RemnaWaveService:
                         SubscriptionStatus.TRIAL.value,
                     ]
                 ),
-                cast(Subscription.connected_squads, String).like(f'%"{source_uuid}"%'),
+                on_squad(source_uuid),
             )
         )
 
@@ -1087,16 +1092,9 @@ class RemnaWaveService:
                     )
 
             if updated_subscriptions:
-                # Update in consistent ID order to prevent deadlocks
-                counter_updates = {}
-                if source_decrement:
-                    counter_updates[source_server.id] = func.greatest(ServerSquad.current_users - source_decrement, 0)
-                if target_increment:
-                    counter_updates[target_server.id] = ServerSquad.current_users + target_increment
-                for sid in sorted(counter_updates):
-                    await db.execute(
-                        update(ServerSquad).where(ServerSquad.id == sid).values(current_users=counter_updates[sid])
-                    )
+                await record_server_user_deltas(
+                    db, {source_server.id: -source_decrement, target_server.id: target_increment}
+                )
 
                 await db.commit()
             else:
@@ -1249,6 +1247,24 @@ class RemnaWaveService:
             batch_size = 50
             pending_uuid_mutations: list[_UUIDMapMutation] = []
 
+            # Новых пользователей много (первичный импорт панели) — пакетные upsert'ы вместо ORM по одному
+            if sync_type in ['new_only', 'all']:
+                missing_panel_users = [
+                    panel_user
+                    for telegram_id, panel_user in unique_panel_users_map.items()
+                    if telegram_id not in bot_users_by_telegram_id
+                ]
+                if len(missing_panel_users) >= settings.REMNAWAVE_BULK_IMPORT_MIN_USERS:
+                    imported_telegram_ids = await self._bulk_import_panel_users(
+                        db, missing_panel_users, bot_users_by_uuid, stats
+                    )
+                    if imported_telegram_ids:
+                        unique_panel_users = [
+                            panel_user
+                            for panel_user in unique_panel_users
+                            if panel_user.get('telegramId') not in imported_telegram_ids
+                        ]
+
             for i, panel_user in enumerate(unique_panel_users):
                 uuid_mutation: _UUIDMapMutation | None = None
                 try:
@@ -1644,56 +1660,110 @@ class RemnaWaveService:
             logger.error('❌ Критическая ошибка синхронизации пользователей', error=e)
             return {'created': 0, 'updated': 0, 'errors': 1, 'deleted': 0}
 
-    async def _create_subscription_from_panel_data(self, db: AsyncSession, user, panel_user):
-        try:
-            from app.database.crud.subscription import create_subscription_no_commit
-            from app.database.models import SubscriptionStatus
+    def _panel_subscription_values(self, panel_user: dict[str, Any]) -> dict[str, Any]:
+        """Поля новой подписки бота по данным пользователя панели."""
+        from app.database.models import SubscriptionStatus
 
-            expire_at_str = panel_user.get('expireAt', '')
-            expire_at = self._parse_remnawave_date(expire_at_str)
+        expire_at_str = panel_user.get('expireAt', '')
+        expire_at = self._parse_remnawave_date(expire_at_str)
 
-            panel_status = panel_user.get('status', 'ACTIVE')
-            current_time = self._now_utc()
+        panel_status = panel_user.get('status', 'ACTIVE')
+        current_time = self._now_utc()
 
-            if panel_status == 'ACTIVE' and expire_at > current_time:
-                status = SubscriptionStatus.ACTIVE
-            elif expire_at <= current_time:
-                status = SubscriptionStatus.EXPIRED
-            else:
-                status = SubscriptionStatus.DISABLED
+        if panel_status == 'ACTIVE' and expire_at > current_time:
+            status = SubscriptionStatus.ACTIVE
+        elif expire_at <= current_time:
+            status = SubscriptionStatus.EXPIRED
+        else:
+            status = SubscriptionStatus.DISABLED
 
-            traffic_limit_bytes = panel_user.get('trafficLimitBytes', 0)
-            traffic_limit_gb = traffic_limit_bytes // (1024**3) if traffic_limit_bytes > 0 else 0
+        traffic_limit_bytes = panel_user.get('trafficLimitBytes', 0)
+        traffic_limit_gb = traffic_limit_bytes // (1024**3) if traffic_limit_bytes > 0 else 0
 
-            used_traffic_bytes = _get_user_traffic_bytes(panel_user)
-            traffic_used_gb = used_traffic_bytes / (1024**3)
+        used_traffic_bytes = _get_user_traffic_bytes(panel_user)
+        traffic_used_gb = used_traffic_bytes / (1024**3)
 
-            active_squads = panel_user.get('activeInternalSquads', [])
-            squad_uuids = []
-            if isinstance(active_squads, list):
-                for squad in active_squads:
-                    if isinstance(squad, dict) and 'uuid' in squad:
-                        squad_uuids.append(squad['uuid'])
-                    elif isinstance(squad, str):
-                        squad_uuids.append(squad)
+        active_squads = panel_user.get('activeInternalSquads', [])
+        squad_uuids = []
+        if isinstance(active_squads, list):
+            for squad in active_squads:
+                if isinstance(squad, dict) and 'uuid' in squad:
+                    squad_uuids.append(squad['uuid'])
+                elif isinstance(squad, str):
+                    squad_uuids.append(squad)
 
-            subscription_data = {
-                'user_id': user.id,
-                'status': status.value,
-                'is_trial': False,
-                'end_date': expire_at,
-                'traffic_limit_gb': traffic_limit_gb,
-                'traffic_used_gb': traffic_used_gb,
-                'device_limit': panel_user.get('hwidDeviceLimit', 1) or 1,
-                'connected_squads': squad_uuids,
-                'remnawave_short_uuid': panel_user.get('shortUuid'),
-                'subscription_url': panel_user.get('subscriptionUrl', ''),
-                'subscription_crypto_link': (
-                    panel_user.get('subscriptionCryptoLink') or (panel_user.get('happ') or {}).get('cryptoLink', '')
-                ),
-            }
+        return {
+            'status': status.value,
+            'is_trial': False,
+            'end_date': expire_at,
+            'traffic_limit_gb': traffic_limit_gb,
+            'traffic_used_gb': traffic_used_gb,
+            'device_limit': panel_user.get('hwidDeviceLimit', 1) or 1,
+            'connected_squads': squad_uuids,
+            'remnawave_short_uuid': panel_user.get('shortUuid'),
+            'subscription_url': panel_user.get('subscriptionUrl', ''),
+            'subscription_crypto_link': (
+                panel_user.get('subscriptionCryptoLink') or (panel_user.get('happ') or {}).get('cryptoLink', '')
+            ),
+        }
+
+    async def _bulk_import_panel_users(
+        self,
+        db: AsyncSession,
+        panel_users: list[dict[str, Any]],
+        bot_users_by_uuid: dict[str, Any],
+        stats: dict[str, int],
+    ) -> set[int]:
+        """Пакетно импортирует отсутствующих в боте пользователей панели.
+
+        Возвращает telegram_id импортированных; при ошибке — пустое множество,
+        и пользователи обрабатываются поштучно.
+        """
+        from app.database.crud.panel_import import PanelImportRow, import_panel_users
+
+        rows = []
+        for panel_user in panel_users:
+            panel_uuid = panel_user.get('uuid')
+            # UUID уже закреплён за другим пользователем бота — разбирается поштучной синхронизацией
+            if panel_uuid and panel_uuid in bot_users_by_uuid:
+                continue
+            first_name, last_name, username = self._panel_user_names(panel_user)
+            rows.append(
+                PanelImportRow(
+                    telegram_id=panel_user['telegramId'],
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    remnawave_uuid=panel_uuid,
+                    subscription=self._panel_subscription_values(panel_user),
+                )
+            )
+        if not rows:
+            return set()
+
+        try:
+            async with db.begin_nested():
+                result = await import_panel_users(db, rows, settings.REMNAWAVE_BULK_IMPORT_CHUNK_SIZE)
+        except Exception as error:
+            # Точка сохранения уже откатилась — внешняя транзакция не тронута
+            logger.error('❌ Ошибка пакетного импорта, переходим к поштучной синхронизации', error=error)
+            return set()
+        await db.commit()
+
+        stats['created'] += result.users_created
+        stats['updated'] += result.users_existing
+        stats['bulk_imported'] = result.rows
+        stats['bulk_rows_per_second'] = round(result.rows_per_second)
+        return {row.telegram_id for row in rows}
+
+    async def _create_subscription_from_panel_data(self, db: AsyncSession, user, panel_user):
+        try:
+            from app.database.crud.subscription import create_subscription_no_commit
+
+            subscription_data = self._panel_subscription_values(panel_user)
+            expire_at = subscription_data['end_date']
 
-            await create_subscription_no_commit(db, **subscription_data)
+            await create_subscription_no_commit(db, user_id=user.id, **subscription_data)
             logger.info(
                 '✅ Подготовлена подписка для пользователя до', telegram_id=user.telegram_id, expire_at=expire_at
             )
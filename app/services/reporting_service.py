@@ -8,21 +8,20 @@ from zoneinfo import ZoneInfo
 import structlog
 from aiogram import Bot
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
-from sqlalchemy import cast, func, not_, or_, select
+from sqlalchemy import cast, func, or_, select
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.sql import false, true
+from sqlalchemy.sql import false
 
 from app.config import settings
+from app.database.crud.stats_rollup import get_daily_activity, get_daily_revenue, sum_activity
 from app.database.crud.subscription import get_subscriptions_statistics
 from app.database.crud.transaction import REAL_PAYMENT_METHODS
-from app.database.database import AsyncSessionLocal
+from app.database.database import db_manager
 from app.database.models import (
     Subscription,
-    SubscriptionConversion,
     SubscriptionStatus,
     Ticket,
     TicketStatus,
-    Transaction,
     TransactionType,
     User,
 )
@@ -174,58 +173,6 @@ class ReportingService:
             logger.error('Не удалось отправить отчет', exc=exc)
             raise ReportingServiceError('Не удалось отправить отчет в чат') from exc
 
-    # ---------- referral helpers ----------
-
-    def _referral_markers(self) -> list:
-        """
-        Набор условий, по которым операция помечается как реферальная (если вдруг записана типом DEPOSIT).
-        """
-        clauses = []
-
-        # Явные флаги
-        if hasattr(Transaction, 'is_referral_bonus'):
-            clauses.append(Transaction.is_referral_bonus == true())
-        if hasattr(Transaction, 'is_bonus'):
-            clauses.append(Transaction.is_bonus == true())
-
-        # Источник/причина
-        if hasattr(Transaction, 'source'):
-            clauses.append(Transaction.source == 'referral')
-            clauses.append(Transaction.source == 'referral_bonus')
-        if hasattr(Transaction, 'reason'):
-            clauses.append(Transaction.reason == 'referral')
-            clauses.append(Transaction.reason == 'referral_bonus')
-            clauses.append(Transaction.reason == 'referral_reward')
-
-        # Текстовые поля
-        like_patterns = ['%реферал%', '%реферальн%', '%referral%']
-        if hasattr(Transaction, 'description'):
-            for pattern in like_patterns:
-                try:
-                    clauses.append(Transaction.description.ilike(pattern))
-                except Exception:
-                    pass
-        if hasattr(Transaction, 'comment'):
-            for pattern in like_patterns:
-                try:
-                    clauses.append(Transaction.comment.ilike(pattern))
-                except Exception:
-                    pass
-
-        return [clause for clause in clauses if clause is not None]
-
-    def _exclude_referral_deposits_condition(self):
-        """
-        Условие «это НЕ реферальный бонус».
-        Если нет ни одного маркера — ничего не исключаем.
-        """
-        markers = self._referral_markers()
-        if not markers:
-            return true()
-        return not_(or_(*markers))
-
-    # --------------------------------------
-
     async def _build_report(
         self,
         period: ReportPeriod,
@@ -235,7 +182,7 @@ class ReportingService:
         start_utc = period_range.start_msk.astimezone(UTC)
         end_utc = period_range.end_msk.astimezone(UTC)
 
-        async with AsyncSessionLocal() as session:
+        async with db_manager.session(read_only=True) as session:
             totals = await self._collect_current_totals(session)
             stats = await self._collect_period_stats(session, start_utc, end_utc)
             top_referrers = await self._get_top_referrers(session, start_utc, end_utc, limit=5)
@@ -370,70 +317,24 @@ class ReportingService:
         start_utc: datetime,
         end_utc: datetime,
     ) -> dict:
-        new_users = int(
-            (
-                await session.execute(
-                    select(func.count(User.id)).where(
-                        User.created_at >= start_utc,
-                        User.created_at < end_utc,
-                    )
-                )
-            ).scalar()
-            or 0
+        # Закрытые дни читаются из дневных агрегатов, края периода и текущий день — по исходным таблицам
+        activity = sum_activity(await get_daily_activity(session, start_utc, end_utc))
+
+        subscription_payments = await get_daily_revenue(
+            session,
+            start_utc,
+            end_utc,
+            types=[TransactionType.SUBSCRIPTION_PAYMENT.value],
         )
-
-        new_trials = int(
-            (
-                await session.execute(
-                    select(func.count(Subscription.id)).where(
-                        Subscription.created_at >= start_utc,
-                        Subscription.created_at < end_utc,
-                        Subscription.is_trial == true(),
-                    )
-                )
-            ).scalar()
-            or 0
+        # Только реальные платежи (исключаем колесо, промокоды, админские, баланс, реферальные бонусы)
+        deposits = await get_daily_revenue(
+            session,
+            start_utc,
+            end_utc,
+            types=[TransactionType.DEPOSIT.value],
+            payment_methods=REAL_PAYMENT_METHODS,
         )
 
-        direct_paid = int(
-            (
-                await session.execute(
-                    select(func.count(Subscription.id)).where(
-                        Subscription.created_at >= start_utc,
-                        Subscription.created_at < end_utc,
-                        Subscription.is_trial == false(),
-                    )
-                )
-            ).scalar()
-            or 0
-        )
-
-        trial_to_paid_conversions = int(
-            (
-                await session.execute(
-                    select(func.count(SubscriptionConversion.id)).where(
-                        SubscriptionConversion.converted_at >= start_utc,
-                        SubscriptionConversion.converted_at < end_utc,
-                    )
-                )
-            ).scalar()
-            or 0
-        )
-
-        subscription_payments_count, subscription_payments_amount = (
-            await session.execute(
-                self._txn_query_base(
-                    TransactionType.SUBSCRIPTION_PAYMENT.value,
-                    start_utc,
-                    end_utc,
-                )
-            )
-        ).one()
-
-        deposits_count, deposits_amount = (
-            await session.execute(self._deposit_query_excluding_referrals(start_utc, end_utc))
-        ).one()
-
         new_tickets = int(
             (
                 await session.execute(
@@ -447,46 +348,17 @@ class ReportingService:
         )
 
         return {
-            'new_users': new_users,
-            'new_trials': new_trials,
-            'new_paid_subscriptions': direct_paid + trial_to_paid_conversions,
-            'trial_to_paid_conversions': trial_to_paid_conversions,
-            'subscription_payments_count': int(subscription_payments_count or 0),
-            'subscription_payments_amount': int(subscription_payments_amount or 0),
-            'deposits_count': int(deposits_count or 0),
-            'deposits_amount': int(deposits_amount or 0),
+            'new_users': activity.registrations,
+            'new_trials': activity.trials,
+            'new_paid_subscriptions': activity.paid_subscriptions + activity.conversions,
+            'trial_to_paid_conversions': activity.conversions,
+            'subscription_payments_count': sum(row.count for row in subscription_payments),
+            'subscription_payments_amount': sum(row.abs_amount_kopeks for row in subscription_payments),
+            'deposits_count': sum(row.count for row in deposits),
+            'deposits_amount': sum(row.amount_kopeks for row in deposits),
             'new_tickets': new_tickets,
         }
 
-    def _txn_query_base(self, txn_type: str, start_utc: datetime, end_utc: datetime):
-        return select(
-            func.count(Transaction.id),
-            func.coalesce(func.sum(func.abs(Transaction.amount_kopeks)), 0),
-        ).where(
-            Transaction.type == txn_type,
-            Transaction.is_completed == true(),
-            Transaction.created_at >= start_utc,
-            Transaction.created_at < end_utc,
-        )
-
-    def _deposit_query_excluding_referrals(self, start_utc: datetime, end_utc: datetime):
-        """Запрос депозитов только по реальным платежам.
-
-        Исключаются: колесо удачи, промокоды, админские пополнения, оплата с баланса.
-        """
-        return select(
-            func.count(Transaction.id),
-            func.coalesce(func.sum(Transaction.amount_kopeks), 0),
-        ).where(
-            Transaction.type == TransactionType.DEPOSIT.value,
-            Transaction.is_completed == true(),
-            Transaction.created_at >= start_utc,
-            Transaction.created_at < end_utc,
-            self._exclude_referral_deposits_condition(),
-            # Только реальные платежи (исключаем колесо, промокоды, админские, баланс)
-            Transaction.payment_method.in_(REAL_PAYMENT_METHODS),
-        )
-
     async def _get_top_referrers(
         self,
         session,
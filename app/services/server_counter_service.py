@@ -0,0 +1,74 @@
+"""Folding of the server user counter delta log.
+
+Purchases, renewals and country changes append ``±1`` rows to
+``server_squad_user_deltas`` instead of updating the hot ``server_squads``
+rows (:func:`app.database.crud.server_squad.record_server_user_deltas`).
+This service folds the log into ``server_squads.current_users`` every
+``SERVER_USER_COUNTER_FOLD_INTERVAL_SECONDS``; capacity checks add the
+pending deltas on read, so they never wait for the fold. Full
+reconciliation against subscriptions stays in ``sync_server_user_counts``.
+"""
+
+import asyncio
+
+import structlog
+
+from app.config import settings
+from app.database.crud.server_squad import fold_server_user_deltas
+from app.database.pool_admission import DbPriority, db_priority, pool_admission
+from app.database.query_profiler import query_profiler
+
+
+logger = structlog.get_logger(__name__)
+
+
+class ServerCounterService:
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._task = asyncio.create_task(self._fold_loop())
+        logger.info('Свёртка счётчиков серверов запущена')
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Остаток журнала — сразу в current_users, чтобы админка после остановки видела точные числа
+        try:
+            await self.fold()
+        except Exception as error:
+            logger.warning('Не удалось свернуть журнал счётчиков серверов при остановке', error=error)
+
+    async def fold(self) -> int:
+        from app.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await fold_server_user_deltas(db)
+
+    async def _fold_loop(self) -> None:
+        interval = max(settings.SERVER_USER_COUNTER_FOLD_INTERVAL_SECONDS, 1)
+        while True:
+            try:
+                await pool_admission.background_backoff('job:server_counter_fold')
+                with db_priority(DbPriority.BACKGROUND), query_profiler.unit_of_work('job:server_counter_fold'):
+                    folded = await self.fold()
+                if folded:
+                    logger.debug('Журнал счётчиков серверов свёрнут', servers=folded)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error('Ошибка свёртки счётчиков серверов', error=error, exc_info=True)
+            await asyncio.sleep(interval)
+
+
+server_counter_service = ServerCounterService()
@@ -0,0 +1,150 @@
+"""Upkeep of the daily statistics rollups (``stats_daily_*``).
+
+Registrations, trials, conversions and referral earnings only ever land in the
+current day, which readers compute live, so they need nothing until the day
+closes. Transactions are different: a payment created yesterday may complete
+today and change an already closed day. Completion is therefore applied to
+``stats_daily_revenue`` incrementally, in the same database transaction, by
+ORM hooks on :class:`Transaction` registered in
+:mod:`app.database.crud.stats_rollup` (insert as completed, or a change of
+``is_completed``). Changes that cannot be applied as an increment — deleted
+users, subscriptions, payments or referral earnings, a trial converted to a
+paid subscription — drop the reconciled mark of the affected closed days
+instead, so they are read live until the next run recomputes them.
+
+A nightly job (and one run at startup) recomputes the last
+``STATS_ROLLUP_RECONCILE_DAYS`` closed days from the source tables and
+backfills missing days up to ``STATS_ROLLUP_BACKFILL_DAYS`` back, healing any
+drift and marking the days as readable from the rollups. A separate nightly
+task, enabled by ``USER_SPENDING_RECONCILE_ENABLED`` independently of the
+rollups, reconciles the denormalized per-user spending columns
+(:mod:`app.database.crud.user_spending`).
+"""
+
+import asyncio
+from datetime import UTC, date, datetime, time, timedelta
+
+import structlog
+
+from app.config import settings
+from app.database.crud.stats_rollup import (
+    ONE_DAY,
+    get_reconciled_days,
+    reconcile_rollup_days,
+)
+from app.database.crud.user_spending import reconcile_user_spending
+
+
+logger = structlog.get_logger(__name__)
+
+
+class StatsRollupService:
+    # Сверка после закрытия дня (UTC)
+    RECONCILE_AT = time(0, 10)
+    # Дней в одной пачке сверки (одна транзакция БД)
+    CHUNK_DAYS = 31
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._spending_task: asyncio.Task | None = None
+
+    def is_running(self) -> bool:
+        return any(task is not None and not task.done() for task in (self._task, self._spending_task))
+
+    def start(self) -> None:
+        if settings.STATS_ROLLUP_ENABLED:
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._reconcile_loop())
+                logger.info('Сверка агрегатов статистики запущена')
+        else:
+            logger.info('Агрегаты статистики отключены настройками')
+
+        if settings.USER_SPENDING_RECONCILE_ENABLED:
+            if self._spending_task is None or self._spending_task.done():
+                self._spending_task = asyncio.create_task(self._spending_loop())
+                logger.info('Сверка трат пользователей запущена')
+
+    async def stop(self) -> None:
+        for task in (self._task, self._spending_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._spending_task = None
+
+    async def run_reconciliation(self, *, today: date | None = None) -> int:
+        """Reconcile recent closed days and backfill missing ones; returns the number of days."""
+        from app.database.database import AsyncSessionLocal
+
+        today = today or datetime.now(UTC).date()
+        last_day = today - ONE_DAY
+        first_day = today - timedelta(days=max(settings.STATS_ROLLUP_BACKFILL_DAYS, 1))
+        recent_from = today - timedelta(days=max(settings.STATS_ROLLUP_RECONCILE_DAYS, 1))
+
+        async with AsyncSessionLocal() as db:
+            reconciled = await get_reconciled_days(db, first_day, last_day)
+            pending = []
+            day = first_day
+            while day <= last_day:
+                if day >= recent_from or day not in reconciled:
+                    pending.append(day)
+                day += ONE_DAY
+
+            total = 0
+            for chunk_start, chunk_end in _chunks(pending, self.CHUNK_DAYS):
+                total += await reconcile_rollup_days(db, chunk_start, chunk_end)
+
+        if total:
+            logger.info('📊 Агрегаты статистики сверены', days=total, first_day=str(pending[0]))
+        return total
+
+    async def run_spending_reconciliation(self) -> int:
+        """Recompute users.total_spent_kopeks / purchase_count / last_purchase_at; returns fixed rows."""
+        from app.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await reconcile_user_spending(db)
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                await self.run_reconciliation()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error('Ошибка сверки агрегатов статистики', error=error, exc_info=True)
+
+            await self._sleep_until_next_run()
+
+    async def _spending_loop(self) -> None:
+        while True:
+            # Траты пользователей заполнены миграцией — при старте сверка не нужна
+            await self._sleep_until_next_run()
+            try:
+                await self.run_spending_reconciliation()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error('Ошибка сверки трат пользователей', error=error, exc_info=True)
+
+    async def _sleep_until_next_run(self) -> None:
+        now = datetime.now(UTC)
+        next_run = datetime.combine(now.date() + ONE_DAY, self.RECONCILE_AT, tzinfo=UTC)
+        await asyncio.sleep((next_run - now).total_seconds())
+
+
+def _chunks(days: list[date], size: int) -> list[tuple[date, date]]:
+    """Group sorted days into spans of consecutive days, at most ``size`` long."""
+    spans: list[tuple[date, date]] = []
+    for day in days:
+        if spans and spans[-1][1] + ONE_DAY == day and (day - spans[-1][0]).days < size:
+            spans[-1] = (spans[-1][0], day)
+        else:
+            spans.append((day, day))
+    return spans
+
+
+stats_rollup_service = StatsRollupService()
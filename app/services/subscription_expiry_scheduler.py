@@ -0,0 +1,155 @@
+"""Planning of subscription expirations and expiry warnings by due time.
+
+Instead of scanning subscriptions once per ``MONITORING_INTERVAL``, the
+scheduler sleeps until the nearest moment something becomes due: an
+``end_date`` (expiration) or ``end_date`` minus a warning offset (paid
+expiry warnings, trial ending notice). The queue is the
+``(status, end_date)`` index itself — the nearest due time is one index
+seek per offset (:func:`get_next_subscription_due_at`), so there is no
+separate structure to keep in sync on extend/expire. ORM hooks on
+``end_date``/``status`` changes pull the wakeup earlier when a subscription
+becomes due sooner than the current plan (applied after commit, so the
+scheduler's own session sees the row); changes made by other processes
+are picked up at the latest after ``SUBSCRIPTION_EXPIRY_MAX_SLEEP_SECONDS``.
+
+Each pass only checks subscriptions that became due since the previous
+successful pass (or changed since then); a full pass runs on start and
+every ``FULL_SCAN_INTERVAL`` to retry notifications that failed to send.
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import structlog
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.crud.subscription import get_next_subscription_due_at
+from app.database.models import Subscription, SubscriptionStatus
+from app.database.pool_admission import DbPriority, db_priority, pool_admission
+from app.database.query_profiler import query_profiler
+
+
+logger = structlog.get_logger(__name__)
+
+
+class SubscriptionExpiryScheduler:
+    FULL_SCAN_INTERVAL = timedelta(hours=1)
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._offsets: list[timedelta] = [timedelta(0)]
+        self._next_due_at: datetime | None = None
+        self._last_run_at: datetime | None = None
+        self._last_full_scan_at: datetime | None = None
+
+    @property
+    def next_due_at(self) -> datetime | None:
+        return self._next_due_at
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._task = asyncio.create_task(self._schedule_loop())
+        logger.info('Планировщик истечения подписок запущен')
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reschedule(self, end_date: datetime | None) -> None:
+        """Переносит пробуждение раньше, если подписка с таким ``end_date`` станет «должной» раньше плана."""
+        if not self.is_running() or end_date is None:
+            return
+        if end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=UTC)
+        # Самое раннее из смещений; уже наступившее — обработать сейчас
+        due_at = max(datetime.now(UTC), end_date - max(self._offsets))
+        if self._next_due_at is None or due_at < self._next_due_at:
+            self._next_due_at = due_at
+            self._wakeup.set()
+
+    async def run_due(self) -> None:
+        from app.database.database import AsyncSessionLocal
+        from app.services.monitoring_service import monitoring_service
+
+        started_at = datetime.now(UTC)
+        full_scan = self._last_full_scan_at is None or started_at - self._last_full_scan_at >= self.FULL_SCAN_INTERVAL
+        async with AsyncSessionLocal() as db:
+            await monitoring_service.process_due_subscriptions(db, None if full_scan else self._last_run_at)
+            await db.commit()
+            self._last_run_at = started_at
+            if full_scan:
+                self._last_full_scan_at = started_at
+            self._offsets = monitoring_service.get_due_offsets()
+            self._next_due_at = await get_next_subscription_due_at(db, self._offsets)
+
+    async def _sleep_until_due(self) -> None:
+        max_sleep = timedelta(seconds=max(settings.SUBSCRIPTION_EXPIRY_MAX_SLEEP_SECONDS, 1))
+        deadline = datetime.now(UTC) + max_sleep
+        while True:
+            self._wakeup.clear()
+            wake_at = min(deadline, self._next_due_at or deadline)
+            timeout = (wake_at - datetime.now(UTC)).total_seconds()
+            if timeout <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                return
+
+    async def _schedule_loop(self) -> None:
+        while True:
+            try:
+                await pool_admission.background_backoff('job:subscription_expiry')
+                with db_priority(DbPriority.BACKGROUND), query_profiler.unit_of_work('job:subscription_expiry'):
+                    await self.run_due()
+                logger.debug('Ближайший срок подписок', next_due_at=self._next_due_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.error('Ошибка обработки истекающих подписок', error=error, exc_info=True)
+                self._next_due_at = None
+            await self._sleep_until_due()
+
+
+subscription_expiry_scheduler = SubscriptionExpiryScheduler()
+
+
+_PENDING_DUE_KEY = 'subscription_expiry_due_dates'
+
+
+@event.listens_for(Subscription, 'after_insert')
+@event.listens_for(Subscription, 'after_update')
+def _on_subscription_due_change(mapper, connection, target: Subscription) -> None:
+    state = inspect(target)
+    if not (state.attrs.end_date.history.has_changes() or state.attrs.status.history.has_changes()):
+        return
+    if target.status != SubscriptionStatus.ACTIVE.value or state.session is None:
+        return
+    # Планировщик читает другой сессией — будим его только после коммита
+    state.session.info.setdefault(_PENDING_DUE_KEY, []).append(target.end_date)
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_session_commit(session: Session) -> None:
+    for end_date in session.info.pop(_PENDING_DUE_KEY, ()):
+        try:
+            subscription_expiry_scheduler.reschedule(end_date)
+        except Exception as error:
+            logger.warning('Не удалось перепланировать истечение подписки', error=error)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_session_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_DUE_KEY, None)
@@ -7,13 +7,8 @@ import structlog
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import PERIOD_PRICES, settings
-from app.database.crud.server_squad import (
-    add_user_to_servers,
-    get_available_server_squads,
-    get_server_ids_by_uuids,
-    get_server_squad_by_uuid,
-)
+from app.config import settings
+from app.database.crud.server_squad import add_user_to_servers
 from app.database.crud.subscription import (
     add_subscription_servers,
     create_paid_subscription,
@@ -23,11 +18,12 @@ from app.database.crud.subscription_conversion import (
 )
 from app.database.crud.transaction import create_transaction
 from app.database.crud.user import subtract_user_balance
-from app.database.models import ServerSquad, Subscription, SubscriptionStatus, TransactionType, User
+from app.database.models import Subscription, SubscriptionStatus, TransactionType, User
 from app.localization.texts import get_texts
+from app.services.catalog_service import ServerSnapshot, catalog_service
+from app.services.price_matrix_service import PeriodPrices, price_matrix_service
 from app.services.subscription_service import SubscriptionService
 from app.utils.pricing_utils import (
-    calculate_months_from_days,
     format_period_description,
     validate_pricing_calculation,
 )
@@ -305,7 +301,7 @@ def _apply_promo_offer_discount(user: User | None, amount: int) -> tuple[int, in
 
 
 def _build_server_option(
-    server: ServerSquad,
+    server: ServerSnapshot,
     discount_percent: int,
     texts,
 ) -> PurchaseServerOption:
@@ -334,23 +330,20 @@ class MiniAppSubscriptionPurchaseService:
         currency = (getattr(user, 'balance_currency', None) or 'RUB').upper()
         texts = get_texts(getattr(user, 'language', None))
 
+        catalog = await catalog_service.get(db)
+
         # Exclude trial-only servers from purchase options
-        available_servers = await get_available_server_squads(
-            db,
-            promo_group_id=getattr(user, 'promo_group_id', None),
+        available_servers = catalog.get_available_servers(
+            getattr(user, 'promo_group_id', None),
             exclude_trial_only=True,
         )
-        server_catalog: dict[str, ServerSquad] = {server.squad_uuid: server for server in available_servers}
+        server_catalog: dict[str, ServerSnapshot] = {server.squad_uuid: server for server in available_servers}
 
         if subscription and subscription.connected_squads:
             for uuid in subscription.connected_squads:
                 if uuid in server_catalog:
                     continue
-                try:
-                    existing = await get_server_squad_by_uuid(db, uuid)
-                except Exception as error:  # pragma: no cover - defensive logging
-                    logger.warning('Failed to load server squad', uuid=uuid, error=error)
-                    existing = None
+                existing = catalog.get_server_by_uuid(uuid)
                 if existing:
                     server_catalog[uuid] = existing
 
@@ -386,14 +379,16 @@ class MiniAppSubscriptionPurchaseService:
             fixed_traffic_value = subscription.traffic_limit_gb
 
         default_period_days = available_periods[0] if available_periods else 30
+        price_matrix = price_matrix_service.for_user(user)
 
         for period_days in available_periods:
-            months = calculate_months_from_days(period_days)
+            prices = price_matrix.period(period_days)
+            months = prices.months
             period_id = f'days:{period_days}'
             label = format_period_description(period_days, getattr(user, 'language', 'ru'))
 
-            base_price_original = PERIOD_PRICES.get(period_days, 0)
-            period_discount_percent = user.get_promo_discount('period', period_days)
+            base_price_original = prices.base.original
+            period_discount_percent = prices.base.discount_percent
             base_price, base_discount_total = _apply_percentage_discount(base_price_original, period_discount_percent)
             base_price_label = texts.format_price(base_price)
             base_price_original_label = (
@@ -406,23 +401,19 @@ class MiniAppSubscriptionPurchaseService:
             per_month_price_label = texts.format_price(per_month_price)
 
             traffic_config = self._build_traffic_config(
-                user,
+                prices,
                 texts,
-                period_days,
-                months,
                 fixed_traffic_value,
             )
             servers_config = self._build_servers_config(
-                user,
+                prices,
                 texts,
-                period_days,
                 server_catalog,
                 default_connected,
             )
             devices_config = self._build_devices_config(
-                user,
+                prices,
                 texts,
-                period_days,
                 default_devices,
             )
 
@@ -501,10 +492,8 @@ class MiniAppSubscriptionPurchaseService:
 
     def _build_traffic_config(
         self,
-        user: User,
+        prices: PeriodPrices,
         texts,
-        period_days: int,
-        months: int,
         fixed_traffic_value: int | None,
     ) -> PurchaseTrafficConfig:
         if settings.is_traffic_fixed():
@@ -520,13 +509,10 @@ class MiniAppSubscriptionPurchaseService:
                 hint=None,
             )
 
-        packages = [package for package in settings.get_traffic_packages() if package.get('enabled', True)]
-        discount_percent = user.get_promo_discount('traffic', period_days)
+        discount_percent = prices.traffic_discount_percent
         options: list[PurchaseTrafficOption] = []
 
-        for package in packages:
-            value = int(package.get('gb') or 0)
-            price_per_month = int(package.get('price') or 0)
+        for value, price_per_month in prices.traffic_packages:
             discounted_per_month, discount_value = _apply_percentage_discount(price_per_month, discount_percent)
             label = texts.format_traffic(value if value else 0)
             options.append(
@@ -568,13 +554,12 @@ class MiniAppSubscriptionPurchaseService:
 
     def _build_servers_config(
         self,
-        user: User,
+        prices: PeriodPrices,
         texts,
-        period_days: int,
-        server_catalog: dict[str, ServerSquad],
+        server_catalog: dict[str, ServerSnapshot],
         default_selection: list[str],
     ) -> PurchaseServersConfig:
-        discount_percent = user.get_promo_discount('servers', period_days)
+        discount_percent = prices.servers_discount_percent
         options: list[PurchaseServerOption] = []
 
         for server in server_catalog.values():
@@ -594,13 +579,12 @@ class MiniAppSubscriptionPurchaseService:
 
     def _build_devices_config(
         self,
-        user: User,
+        prices: PeriodPrices,
         texts,
-        period_days: int,
         default_devices: int,
     ) -> PurchaseDevicesConfig:
-        discount_percent = user.get_promo_discount('devices', period_days)
-        unit_price = settings.PRICE_PER_DEVICE
+        discount_percent = prices.devices_discount_percent
+        unit_price = prices.device_unit_price
         discounted_unit_price, unit_discount_value = _apply_percentage_discount(unit_price, discount_percent)
         price_label = texts.format_price(discounted_unit_price)
         original_label = (
@@ -724,7 +708,8 @@ class MiniAppSubscriptionPurchaseService:
         get_texts(getattr(context.user, 'language', None))
         months = selection.period.months
 
-        server_ids = await get_server_ids_by_uuids(db, selection.servers)
+        catalog = await catalog_service.get(db)
+        server_ids = [server.id for server in catalog.get_servers_by_uuids(selection.servers)]
         if len(server_ids) != len(selection.servers):
             raise PurchaseValidationError('Some selected servers are not available', code='invalid_servers')
 
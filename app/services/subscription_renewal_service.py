@@ -13,7 +13,6 @@ from aiogram import Bot
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database.crud.server_squad import get_server_ids_by_uuids, get_server_squads_by_uuids
 from app.database.crud.subscription import (
     add_subscription_servers,
     calculate_subscription_total_cost,
@@ -23,6 +22,7 @@ from app.database.crud.transaction import create_transaction
 from app.database.crud.user import subtract_user_balance
 from app.database.models import PaymentMethod, Subscription, Transaction, TransactionType, User
 from app.services.admin_notification_service import AdminNotificationService
+from app.services.catalog_service import catalog_service
 from app.services.remnawave_service import RemnaWaveConfigurationError
 from app.services.subscription_service import SubscriptionService
 from app.utils.pricing_utils import (
@@ -319,7 +319,8 @@ class SubscriptionRenewalService:
         connected_uuids = [str(uuid) for uuid in list(subscription.connected_squads or [])]
         server_ids: list[int] = []
         if connected_uuids:
-            server_ids = await get_server_ids_by_uuids(db, connected_uuids)
+            catalog = await catalog_service.get(db)
+            server_ids = [server.id for server in catalog.get_servers_by_uuids(connected_uuids)]
 
             # Валидация: проверяем доступность серверов для промогруппы пользователя
             await self._validate_servers_for_user_promo_group(db, user, connected_uuids)
@@ -604,7 +605,8 @@ class SubscriptionRenewalService:
         if not user_promo_group:
             return
 
-        servers = await get_server_squads_by_uuids(db, server_uuids)
+        catalog = await catalog_service.get(db)
+        servers = catalog.get_servers_by_uuids(server_uuids)
         unavailable_servers = []
 
         for server in servers:
@@ -1640,6 +1640,11 @@ class BotConfigurationService:
                     remnawave_sync_service.refresh_configuration()
                 except Exception as error:
                     logger.error('Не удалось обновить конфигурацию сервиса автосинхронизации RemnaWave', error=error)
+
+            # Цены и скидки зависят от многих настроек — матрицу проще сбросить целиком
+            from app.services.price_matrix_service import price_matrix_service
+
+            price_matrix_service.invalidate()
         except Exception as error:
             logger.error('Не удалось применить значение', key=key, setting_value=value, error=error)
 
@@ -17,7 +17,9 @@ from app.database.crud.user import (
     get_referrals,
     get_user_by_id,
     get_users_count,
+    get_users_count_estimate,
     get_users_list,
+    get_users_next_cursor,
     get_users_spending_stats,
     get_users_statistics,
     subtract_user_balance,
@@ -253,32 +255,48 @@ class UserService:
         order_by_last_activity: bool = False,
         order_by_total_spent: bool = False,
         order_by_purchase_count: bool = False,
+        cursor: str | None = None,
     ) -> dict[str, Any]:
+        """Страница списка пользователей.
+
+        ``cursor`` — значение ``next_cursor`` предыдущей страницы: с ним выборка
+        идёт по ключу сортировки вместо OFFSET. Количество в заголовке
+        приблизительное (:func:`get_users_count_estimate`).
+        """
+        sort_flags = {
+            'order_by_balance': order_by_balance,
+            'order_by_traffic': order_by_traffic,
+            'order_by_last_activity': order_by_last_activity,
+            'order_by_total_spent': order_by_total_spent,
+            'order_by_purchase_count': order_by_purchase_count,
+        }
         try:
             offset = (page - 1) * limit
 
-            users = await get_users_list(
-                db,
-                offset=offset,
-                limit=limit,
-                status=status,
-                order_by_balance=order_by_balance,
-                order_by_traffic=order_by_traffic,
-                order_by_last_activity=order_by_last_activity,
-                order_by_total_spent=order_by_total_spent,
-                order_by_purchase_count=order_by_purchase_count,
-            )
-            total_count = await get_users_count(db, status=status)
+            # Лишняя строка — признак следующей страницы
+            try:
+                users = await get_users_list(
+                    db, offset=offset, limit=limit + 1, status=status, cursor=cursor, **sort_flags
+                )
+            except ValueError as error:
+                # Курсор от другой сортировки или повреждён — откатываемся на OFFSET
+                logger.warning('Некорректный курсор списка пользователей', error=error)
+                users = await get_users_list(db, offset=offset, limit=limit + 1, status=status, **sort_flags)
+            next_cursor = get_users_next_cursor(users, limit, **sort_flags)
+            users = users[:limit]
+            total_count = await get_users_count_estimate(db, status=status)
 
-            total_pages = (total_count + limit - 1) // limit
+            # Оценка может отставать от реального числа строк
+            total_pages = max((total_count + limit - 1) // limit, page + 1 if next_cursor else page)
 
             return {
                 'users': users,
                 'current_page': page,
                 'total_pages': total_pages,
                 'total_count': total_count,
-                'has_next': page < total_pages,
+                'has_next': next_cursor is not None,
                 'has_prev': page > 1,
+                'next_cursor': next_cursor,
             }
 
         except Exception as e:
@@ -290,6 +308,7 @@ class UserService:
                 'total_count': 0,
                 'has_next': False,
                 'has_prev': False,
+                'next_cursor': None,
             }
 
     async def get_users_ready_to_renew(
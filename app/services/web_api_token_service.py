@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import secrets
+import time
 from datetime import UTC, datetime
 
 import structlog
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.database.crud import web_api_token as crud
@@ -15,6 +18,8 @@ from app.utils.security import generate_api_token, hash_api_token
 
 logger = structlog.get_logger(__name__)
 
+_PENDING_INVALIDATION_KEY = 'web_api_token_invalidations'
+
 
 async def ensure_default_web_api_token() -> bool:
     """Ensure the bootstrap web API token from config exists in the DB."""
@@ -44,6 +49,7 @@ async def ensure_default_web_api_token() -> bool:
                     existing.token_hash = token_hash
                     existing.updated_at = datetime.now(UTC)
                     await session.commit()
+                    web_api_token_service.invalidate(token_hash)
                     logger.info('Дефолтный токен перехеширован на HMAC')
                     return True
 
@@ -61,6 +67,7 @@ async def ensure_default_web_api_token() -> bool:
                 if updated:
                     existing.updated_at = datetime.now(UTC)
                     await session.commit()
+                    web_api_token_service.invalidate(token_hash)
                 return True
 
             token = WebApiToken(
@@ -82,11 +89,23 @@ async def ensure_default_web_api_token() -> bool:
 
 
 class WebApiTokenService:
-    """Сервис для управления токенами административного веб-API."""
+    """Сервис для управления токенами административного веб-API.
+
+    Проверенные токены кешируются в памяти по хешу (снимок без привязки к сессии),
+    поэтому запросы интеграций не обращаются к БД. Отметки использования
+    (``last_used_at``/``last_used_ip``) накапливаются и записываются пачкой
+    фоновой задачей раз в ``WEB_API_TOKEN_USAGE_FLUSH_INTERVAL_SECONDS``.
+
+    Изменения токена сбрасывают кеш этого процесса после коммита транзакции;
+    другие процессы увидят их не позже чем через ``WEB_API_TOKEN_CACHE_TTL_SECONDS``.
+    """
 
     def __init__(self):
         self.algorithm = settings.WEB_API_TOKEN_HASH_ALGORITHM or 'sha256'
         self.hmac_secret = settings.WEB_API_TOKEN_HMAC_SECRET
+        self._tokens: dict[str, tuple[float, WebApiToken]] = {}
+        self._pending_usage: dict[int, tuple[datetime, str | None]] = {}
+        self._flush_task: asyncio.Task | None = None
 
     def hash_token(self, token: str) -> str:
         return hash_api_token(token, self.algorithm, hmac_secret=self.hmac_secret)  # type: ignore[arg-type]
@@ -116,6 +135,42 @@ class WebApiTokenService:
 
         return token
 
+    # ---- Кеш токенов ------------------------------------------------------
+
+    @staticmethod
+    def _snapshot(token: WebApiToken) -> WebApiToken:
+        """Detached copy of the token, safe to share between requests and sessions."""
+        return WebApiToken(**{column.key: getattr(token, column.key) for column in WebApiToken.__table__.columns})
+
+    def _get_cached(self, token_hash: str) -> WebApiToken | None:
+        cached = self._tokens.get(token_hash)
+        if cached is None:
+            return None
+
+        expires_at, token = cached
+        if expires_at <= time.monotonic():
+            self._tokens.pop(token_hash, None)
+            return None
+        return token
+
+    def _cache_token(self, token: WebApiToken) -> WebApiToken:
+        snapshot = self._snapshot(token)
+        ttl = settings.WEB_API_TOKEN_CACHE_TTL_SECONDS
+        if ttl > 0:
+            self._tokens[snapshot.token_hash] = (time.monotonic() + ttl, snapshot)
+        return snapshot
+
+    def invalidate(self, token_hash: str | None = None) -> None:
+        """Drop a cached token (or the whole cache) after it was changed in the DB."""
+        if token_hash is None:
+            self._tokens.clear()
+        else:
+            self._tokens.pop(token_hash, None)
+
+    def invalidate_after_commit(self, db: AsyncSession, token_hash: str) -> None:
+        """Сбрасывает токен из кеша после коммита сессии (при откате — не трогает)."""
+        db.info.setdefault(_PENDING_INVALIDATION_KEY, set()).add((self, token_hash))
+
     async def authenticate(
         self,
         db: AsyncSession,
@@ -127,26 +182,83 @@ class WebApiTokenService:
         if not normalized_value:
             return None
 
-        token = await self._load_token_with_fallback(db, normalized_value)
+        token = self._get_cached(self.hash_token(normalized_value))
+
+        if token is None:
+            token = await self._load_token_with_fallback(db, normalized_value)
+
+            if not token:
+                default_token = (settings.WEB_API_DEFAULT_TOKEN or '').strip()
+                if default_token and secrets.compare_digest(default_token, normalized_value):
+                    await ensure_default_web_api_token()
+                    token = await self._load_token_with_fallback(db, default_token)
 
-        if not token:
-            default_token = (settings.WEB_API_DEFAULT_TOKEN or '').strip()
-            if default_token and secrets.compare_digest(default_token, normalized_value):
-                await ensure_default_web_api_token()
-                token = await self._load_token_with_fallback(db, default_token)
+            if not token:
+                return None
 
-        if not token or not token.is_active:
+            token = self._cache_token(token)
+
+        if not token.is_active:
             return None
 
         if token.expires_at and token.expires_at < datetime.now(UTC):
             return None
 
-        token.last_used_at = datetime.now(UTC)
-        if remote_ip:
-            token.last_used_ip = remote_ip
-        await db.flush()
+        self.record_usage(token.id, remote_ip)
         return token
 
+    # ---- Отметки использования --------------------------------------------
+
+    def record_usage(self, token_id: int, remote_ip: str | None = None) -> None:
+        previous = self._pending_usage.get(token_id)
+        if not remote_ip and previous is not None:
+            remote_ip = previous[1]
+        self._pending_usage[token_id] = (datetime.now(UTC), remote_ip)
+
+    async def flush_usage(self) -> int:
+        """Write accumulated usage stamps in one statement, returns the number of tokens."""
+        if not self._pending_usage:
+            return 0
+
+        from app.database.database import AsyncSessionLocal
+
+        pending, self._pending_usage = self._pending_usage, {}
+        try:
+            async with AsyncSessionLocal() as session:
+                await crud.record_tokens_usage(
+                    session,
+                    [(token_id, used_at, used_ip) for token_id, (used_at, used_ip) in pending.items()],
+                )
+                await session.commit()
+        except Exception as error:
+            logger.warning('Не удалось сохранить отметки использования API токенов', error=error)
+            # Newer stamps recorded during the flush take precedence
+            for token_id, usage in pending.items():
+                self._pending_usage.setdefault(token_id, usage)
+            return 0
+
+        return len(pending)
+
+    async def _flush_usage_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(1, settings.WEB_API_TOKEN_USAGE_FLUSH_INTERVAL_SECONDS))
+            await self.flush_usage()
+
+    def start_usage_flusher(self) -> None:
+        if self._flush_task and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(self._flush_usage_loop())
+
+    async def stop_usage_flusher(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_usage()
+
     async def create_token(
         self,
         db: AsyncSession,
@@ -177,6 +289,7 @@ class WebApiTokenService:
         token.updated_at = datetime.now(UTC)
         await db.flush()
         await db.refresh(token)
+        self.invalidate_after_commit(db, token.token_hash)
         return token
 
     async def activate_token(self, db: AsyncSession, token: WebApiToken) -> WebApiToken:
@@ -184,7 +297,26 @@ class WebApiTokenService:
         token.updated_at = datetime.now(UTC)
         await db.flush()
         await db.refresh(token)
+        self.invalidate_after_commit(db, token.token_hash)
         return token
 
+    async def delete_token(self, db: AsyncSession, token: WebApiToken) -> None:
+        token_hash = token.token_hash
+        await crud.delete_token(db, token)
+        self._pending_usage.pop(token.id, None)
+        self.invalidate_after_commit(db, token_hash)
+
 
 web_api_token_service = WebApiTokenService()
+
+
+@event.listens_for(Session, 'after_commit')
+def _on_session_commit(session: Session) -> None:
+    # До коммита другой запрос мог бы заново закешировать старую версию токена
+    for service, token_hash in session.info.pop(_PENDING_INVALIDATION_KEY, ()):
+        service.invalidate(token_hash)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _on_session_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATION_KEY, None)
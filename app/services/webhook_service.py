@@ -1,44 +1,86 @@
+"""Доставка исходящих webhooks.
+
+События не отправляются в момент ``emit``: для каждого активного webhook в
+``webhook_deliveries`` создаётся запись со статусом ``pending``, и запрос
+платит только за эту вставку. Фоновый воркер забирает готовые доставки,
+отправляет их с ограничением параллельности на каждый endpoint (при
+``OUTBOUND_WEBHOOK_BATCH_SIZE > 1`` — пачками в одном POST) и при неудаче
+планирует повтор с экспоненциальной задержкой и случайным разбросом.
+"""
+
 from __future__ import annotations
 
 import asyncio
 import hashlib
 import hmac
 import json
+import random
+from collections import defaultdict
 from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import aiohttp
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database.crud.webhook import (
+    claim_due_webhook_deliveries,
+    enqueue_webhook_deliveries,
     get_active_webhooks_for_event,
-    record_webhook_delivery,
-    update_webhook_stats,
+    increment_webhook_stats,
 )
 
 
 logger = structlog.get_logger(__name__)
 
 
+# 4xx ответы, после которых повтор имеет смысл
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 409, 425, 429})
+
+
 @dataclass
 class DeliveryResult:
-    """Результат доставки webhook."""
+    """Результат HTTP доставки webhook."""
 
-    webhook: Any
-    event_type: str
-    payload: dict[str, Any]
     status: str
     response_status: int | None = None
     response_body: str | None = None
     error_message: str | None = None
 
+    @property
+    def is_success(self) -> bool:
+        return self.status == 'success'
+
+    @property
+    def is_retryable(self) -> bool:
+        if self.is_success:
+            return False
+        if self.response_status is None:
+            return True
+        return self.response_status >= 500 or self.response_status in RETRYABLE_CLIENT_STATUSES
+
+
+def compute_retry_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Экспоненциальная задержка перед повтором с разбросом (equal jitter)."""
+    delay = min(max_seconds, base_seconds * (2 ** max(0, attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
 
 class WebhookService:
     """Сервис для отправки webhooks."""
 
+    # Сколько доставок воркер забирает за один проход
+    CLAIM_LIMIT = 200
+    # На сколько доставка «арендуется» воркером; по истечении её подхватит другой
+    LEASE_SECONDS = 120
+
     def __init__(self) -> None:
         self._session: aiohttp.ClientSession | None = None
+        self._worker_task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._endpoint_semaphores: dict[int, asyncio.Semaphore] = {}
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Получить или создать HTTP сессию."""
@@ -60,36 +102,201 @@ class WebhookService:
             hashlib.sha256,
         ).hexdigest()
 
-    async def send_webhook(
+    async def enqueue_webhook(
         self,
         db: AsyncSession,
         event_type: str,
         payload: dict[str, Any],
-    ) -> None:
-        """Отправить webhook для события."""
+    ) -> int:
+        """Поставить событие в очередь доставки, возвращает число созданных доставок."""
         webhooks = await get_active_webhooks_for_event(db, event_type)
 
         if not webhooks:
             logger.debug('No active webhooks for event type', event_type=event_type)
+            return 0
+
+        deliveries = await enqueue_webhook_deliveries(db, webhooks, event_type, payload)
+        self._wakeup.set()
+        return len(deliveries)
+
+    # ---- Воркер доставки --------------------------------------------------
+
+    def is_worker_running(self) -> bool:
+        return self._worker_task is not None and not self._worker_task.done()
+
+    def start_delivery_worker(self) -> None:
+        if self.is_worker_running():
             return
+        self._wakeup = asyncio.Event()
+        self._worker_task = asyncio.create_task(self._delivery_loop())
+        logger.info('Воркер доставки webhooks запущен')
 
-        # Выполняем HTTP запросы параллельно (без операций с БД)
-        tasks = [self._deliver_webhook_http(webhook, event_type, payload) for webhook in webhooks]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def stop_delivery_worker(self) -> None:
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+        await self.close()
 
-        # Записываем результаты в БД последовательно (избегаем concurrent session access)
-        for result in results:
-            if isinstance(result, Exception):
-                logger.exception('Unexpected error during webhook delivery', result=result)
+    async def _delivery_loop(self) -> None:
+        while True:
+            try:
+                processed = await self.process_due_deliveries()
+            except Exception as error:
+                logger.exception('Ошибка обработки очереди webhooks', error=error)
+                processed = 0
+
+            # Есть ещё работа — берём следующую пачку сразу
+            if processed >= self.CLAIM_LIMIT:
                 continue
-            if isinstance(result, DeliveryResult):
-                await self._record_result(db, result)
+
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=max(1, settings.OUTBOUND_WEBHOOK_POLL_INTERVAL_SECONDS),
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_due_deliveries(self) -> int:
+        """Отправить все доставки, срок которых наступил. Возвращает их количество."""
+        from app.database.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            deliveries = await claim_due_webhook_deliveries(
+                db,
+                limit=self.CLAIM_LIMIT,
+                lease_seconds=self.LEASE_SECONDS,
+            )
+            await db.commit()
+
+            if not deliveries:
+                return 0
+
+            by_webhook: dict[int, list[Any]] = defaultdict(list)
+            for delivery in deliveries:
+                by_webhook[delivery.webhook_id].append(delivery)
+
+            results = await asyncio.gather(
+                *(self._deliver_to_endpoint(items[0].webhook, items) for items in by_webhook.values()),
+                return_exceptions=True,
+            )
+
+            for webhook_id, endpoint_results in zip(by_webhook, results, strict=True):
+                if isinstance(endpoint_results, BaseException):
+                    logger.error(
+                        'Unexpected error during webhook delivery', webhook_id=webhook_id, error=endpoint_results
+                    )
+                    continue
+
+                successes = failures = 0
+                for delivery, result in endpoint_results:
+                    self._apply_result(delivery, result)
+                    if result.is_success:
+                        successes += 1
+                    else:
+                        failures += 1
+                await increment_webhook_stats(db, webhook_id, successes=successes, failures=failures)
+
+            await db.commit()
+            return len(deliveries)
+
+    def _endpoint_semaphore(self, webhook_id: int) -> asyncio.Semaphore:
+        semaphore = self._endpoint_semaphores.get(webhook_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, settings.OUTBOUND_WEBHOOK_CONCURRENCY_PER_ENDPOINT))
+            self._endpoint_semaphores[webhook_id] = semaphore
+        return semaphore
+
+    async def _deliver_to_endpoint(self, webhook: Any, deliveries: list[Any]) -> list[tuple[Any, DeliveryResult]]:
+        """Отправить доставки одного webhook с ограничением параллельности."""
+        if webhook is None or not webhook.is_active:
+            disabled = DeliveryResult(status='failed', error_message='Webhook is disabled')
+            return [(delivery, disabled) for delivery in deliveries]
+
+        batch_size = max(1, settings.OUTBOUND_WEBHOOK_BATCH_SIZE)
+        chunks = [deliveries[index : index + batch_size] for index in range(0, len(deliveries), batch_size)]
+        semaphore = self._endpoint_semaphore(webhook.id)
+
+        async def send_chunk(chunk: list[Any]) -> list[tuple[Any, DeliveryResult]]:
+            async with semaphore:
+                if batch_size > 1:
+                    body = {
+                        'events': [
+                            {
+                                'delivery_id': delivery.id,
+                                'event': delivery.event_type,
+                                'payload': delivery.payload,
+                            }
+                            for delivery in chunk
+                        ]
+                    }
+                    result = await self._deliver_webhook_http(webhook, 'batch', body, batch_size=len(chunk))
+                else:
+                    delivery = chunk[0]
+                    result = await self._deliver_webhook_http(
+                        webhook, delivery.event_type, delivery.payload, delivery_id=delivery.id
+                    )
+            return [(delivery, result) for delivery in chunk]
+
+        chunk_results = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        return [item for chunk_result in chunk_results for item in chunk_result]
+
+    def _apply_result(self, delivery: Any, result: DeliveryResult) -> None:
+        """Записать результат попытки и запланировать повтор при необходимости."""
+        now = datetime.now(UTC)
+        delivery.attempt_number = (delivery.attempt_number or 0) + 1
+        delivery.response_status = result.response_status
+        delivery.response_body = result.response_body
+        delivery.error_message = result.error_message
+
+        if result.is_success:
+            delivery.status = 'success'
+            delivery.delivered_at = now
+            delivery.next_retry_at = None
+            logger.info('Webhook delivered successfully to', id=delivery.webhook_id, delivery_id=delivery.id)
+            return
+
+        if result.is_retryable and delivery.attempt_number < settings.OUTBOUND_WEBHOOK_MAX_ATTEMPTS:
+            delay = compute_retry_delay(
+                delivery.attempt_number,
+                settings.OUTBOUND_WEBHOOK_RETRY_BASE_SECONDS,
+                settings.OUTBOUND_WEBHOOK_RETRY_MAX_SECONDS,
+            )
+            delivery.status = 'pending'
+            delivery.next_retry_at = now + timedelta(seconds=delay)
+            logger.info(
+                'Webhook delivery failed, retry scheduled',
+                id=delivery.webhook_id,
+                delivery_id=delivery.id,
+                attempt=delivery.attempt_number,
+                retry_in=round(delay, 1),
+                error_message=result.error_message,
+            )
+            return
+
+        delivery.status = 'failed'
+        delivery.next_retry_at = None
+        logger.warning(
+            'Webhook delivery failed',
+            id=delivery.webhook_id,
+            delivery_id=delivery.id,
+            attempt=delivery.attempt_number,
+            error_message=result.error_message,
+        )
 
     async def _deliver_webhook_http(
         self,
         webhook: Any,
         event_type: str,
         payload: dict[str, Any],
+        *,
+        delivery_id: int | None = None,
+        batch_size: int | None = None,
     ) -> DeliveryResult:
         """Выполнить HTTP доставку webhook (без операций с БД)."""
         payload_json = json.dumps(payload, default=str, ensure_ascii=False)
@@ -98,6 +305,10 @@ class WebhookService:
             'X-Webhook-Event': event_type,
             'X-Webhook-Id': str(webhook.id),
         }
+        if delivery_id is not None:
+            headers['X-Webhook-Delivery-Id'] = str(delivery_id)
+        if batch_size is not None:
+            headers['X-Webhook-Batch-Size'] = str(batch_size)
 
         # Добавляем подпись, если есть секрет
         if webhook.secret:
@@ -122,9 +333,6 @@ class WebhookService:
                     error_message = f'HTTP {response.status}: {response_body[:500]}'
 
                 return DeliveryResult(
-                    webhook=webhook,
-                    event_type=event_type,
-                    payload=payload,
                     status=status,
                     response_status=response.status,
                     response_body=response_body,
@@ -132,45 +340,10 @@ class WebhookService:
                 )
 
         except TimeoutError:
-            return DeliveryResult(
-                webhook=webhook,
-                event_type=event_type,
-                payload=payload,
-                status='failed',
-                error_message='Request timeout',
-            )
-
-        except Exception as error:
-            return DeliveryResult(
-                webhook=webhook,
-                event_type=event_type,
-                payload=payload,
-                status='failed',
-                error_message=str(error),
-            )
-
-    async def _record_result(self, db: AsyncSession, result: DeliveryResult) -> None:
-        """Записать результат доставки в БД (последовательно)."""
-        try:
-            await record_webhook_delivery(
-                db,
-                webhook_id=result.webhook.id,
-                event_type=result.event_type,
-                payload=result.payload,
-                status=result.status,
-                response_status=result.response_status,
-                response_body=result.response_body,
-                error_message=result.error_message,
-            )
-
-            await update_webhook_stats(db, result.webhook, result.status == 'success')
+            return DeliveryResult(status='failed', error_message='Request timeout')
 
-            if result.status == 'success':
-                logger.info('Webhook delivered successfully to', id=result.webhook.id, url=result.webhook.url)
-            else:
-                logger.warning('Webhook delivery failed', id=result.webhook.id, error_message=result.error_message)
         except Exception as error:
-            logger.exception('Failed to record webhook delivery result for', id=result.webhook.id, error=error)
+            return DeliveryResult(status='failed', error_message=str(error))
 
 
 # Глобальный экземпляр сервиса
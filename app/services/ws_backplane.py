@@ -0,0 +1,164 @@
+"""Pub/Sub backplane for WebSocket notifications across web replicas.
+
+Sockets live in the process that accepted them, while notifications are
+produced anywhere (bot handlers, webhooks, other replicas). A publisher hands
+the message to the local handler of the topic right away and also publishes it
+to the Redis channel ``ws_backplane:<topic>``; every other process listening
+on the backplane delivers it to its own sockets. Without Redis only the local
+delivery happens, which matches the single-process behaviour.
+
+A message is either a dict or JSON text that is already serialized for the
+sockets; publishing the text makes every replica send the same bytes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+import structlog
+
+from app.utils.cache import cache, cache_key
+
+
+logger = structlog.get_logger(__name__)
+
+
+BackplaneMessage = dict[str, Any] | str
+BackplaneHandler = Callable[[BackplaneMessage], Awaitable[None]]
+
+
+class WebSocketBackplane:
+    """Routes WebSocket messages by topic to the replicas holding the sockets."""
+
+    CHANNEL_PREFIX = 'ws_backplane'
+    RECONNECT_DELAY = 5.0
+
+    def __init__(self) -> None:
+        # Messages published by this process are delivered locally, not via Redis
+        self.instance_id = uuid4().hex
+        self._handlers: dict[str, BackplaneHandler] = {}
+        self._listener_task: asyncio.Task | None = None
+        self._publish_tasks: set[asyncio.Task] = set()
+
+    def register_topic(self, topic: str, handler: BackplaneHandler) -> None:
+        """Set the local delivery handler for ``topic``."""
+        self._handlers[topic] = handler
+
+    def _channel(self, topic: str) -> str:
+        return cache_key(self.CHANNEL_PREFIX, topic)
+
+    async def publish(self, topic: str, message: BackplaneMessage, *, wait: bool = True) -> None:
+        """Deliver ``message`` to sockets of ``topic`` on every replica.
+
+        With ``wait=False`` the Redis publish runs in the background, so the
+        caller only waits for the local handler.
+        """
+        await self._dispatch(topic, message)
+
+        publish = cache.publish(self._channel(topic), {'origin': self.instance_id, 'message': message})
+        if wait:
+            await publish
+            return
+
+        task = asyncio.create_task(publish)
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+
+    async def _dispatch(self, topic: str, message: BackplaneMessage) -> None:
+        handler = self._handlers.get(topic)
+        if handler is None:
+            return
+
+        try:
+            await handler(message)
+        except Exception as error:
+            logger.exception('Ошибка доставки WebSocket сообщения', topic=topic, error=error)
+
+    async def handle_raw_message(self, raw: dict[str, Any]) -> None:
+        """Handle a Redis ``pmessage`` and deliver it unless it came from this process."""
+        if raw.get('type') != 'pmessage':
+            return
+
+        channel = raw.get('channel')
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        topic = str(channel).removeprefix(f'{self.CHANNEL_PREFIX}:')
+
+        try:
+            envelope = cache.serializer.loads(raw.get('data'))
+        except (TypeError, ValueError) as error:
+            logger.warning('Некорректное сообщение в WebSocket backplane', channel=channel, error=error)
+            return
+
+        if not isinstance(envelope, dict) or envelope.get('origin') == self.instance_id:
+            return
+
+        message = envelope.get('message')
+        if isinstance(message, dict | str):
+            await self._dispatch(topic, message)
+
+    def _listener_alive(self) -> bool:
+        task = self._listener_task
+        if task is None or task.done():
+            return False
+        # A task left over from another (closed) event loop cannot be reused
+        return task.get_loop() is asyncio.get_running_loop()
+
+    @property
+    def is_listening(self) -> bool:
+        try:
+            return self._listener_alive()
+        except RuntimeError:
+            return False
+
+    def ensure_listening(self) -> None:
+        """Start the Redis listener; called when the first socket connects."""
+        if self.is_listening:
+            return
+        self._listener_task = asyncio.create_task(self._listen_loop())
+
+    async def _listen_loop(self) -> None:
+        pattern = self._channel('*')
+
+        while True:
+            if not cache.is_connected or cache.redis_client is None:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+
+            pubsub = cache.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(pattern)
+                logger.info('WebSocket backplane подписан на Redis', pattern=pattern)
+                async for raw in pubsub.listen():
+                    await self.handle_raw_message(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning('WebSocket backplane потерял соединение с Redis', error=error)
+                await asyncio.sleep(self.RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def stop(self) -> None:
+        if self._listener_task is None:
+            return
+
+        if not self._listener_alive():
+            self._listener_task = None
+            return
+
+        self._listener_task.cancel()
+        try:
+            await self._listener_task
+        except asyncio.CancelledError:
+            pass
+        self._listener_task = None
+
+
+ws_backplane = WebSocketBackplane()
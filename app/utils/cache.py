@@ -1,4 +1,3 @@
-import json
 from datetime import timedelta
 from typing import Any
 
@@ -6,15 +5,20 @@ import redis.asyncio as redis
 import structlog
 
 from app.config import settings
+from app.utils.serialization import JsonSerializer, get_json_serializer
 
 
 logger = structlog.get_logger(__name__)
 
 
 class CacheService:
-    def __init__(self):
+    def __init__(self, serializer: JsonSerializer | None = None):
         self.redis_client: redis.Redis | None = None
         self._connected = False
+        self.serializer: JsonSerializer = serializer or get_json_serializer()
+
+    def set_serializer(self, serializer: JsonSerializer) -> None:
+        self.serializer = serializer
 
     async def connect(self):
         try:
@@ -31,6 +35,10 @@ class CacheService:
             await self.redis_client.close()
             self._connected = False
 
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
     async def get(self, key: str) -> Any | None:
         if not self._connected:
             return None
@@ -38,7 +46,7 @@ class CacheService:
         try:
             value = await self.redis_client.get(key)
             if value:
-                return json.loads(value)
+                return self.serializer.loads(value)
             return None
         except Exception as e:
             logger.error('Ошибка получения из кеша', key=key, error=e)
@@ -49,7 +57,7 @@ class CacheService:
             return False
 
         try:
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = self.serializer.dumps(value)
 
             if isinstance(expire, timedelta):
                 expire = int(expire.total_seconds())
@@ -70,7 +78,7 @@ class CacheService:
             return False
 
         try:
-            serialized_value = json.dumps(value, default=str)
+            serialized_value = self.serializer.dumps(value)
 
             if isinstance(expire, timedelta):
                 expire = int(expire.total_seconds())
@@ -93,7 +101,7 @@ class CacheService:
         try:
             value = await self.redis_client.getdel(key)
             if value:
-                return json.loads(value)
+                return self.serializer.loads(value)
             return None
         except Exception as e:
             logger.error('Ошибка атомарного getdel из кеша', key=key, error=e)
@@ -211,7 +219,7 @@ class CacheService:
             return False
 
         try:
-            serialized = json.dumps(value, default=str)
+            serialized = self.serializer.dumps(value)
             await self.redis_client.lpush(key, serialized)
             return True
         except Exception as e:
@@ -226,7 +234,7 @@ class CacheService:
         try:
             value = await self.redis_client.rpop(key)
             if value:
-                return json.loads(value)
+                return self.serializer.loads(value)
             return None
         except Exception as e:
             logger.error('Ошибка извлечения из очереди', key=key, error=e)
@@ -250,11 +258,23 @@ class CacheService:
 
         try:
             items = await self.redis_client.lrange(key, start, end)
-            return [json.loads(item) for item in items]
+            return [self.serializer.loads(item) for item in items]
         except Exception as e:
             logger.error('Ошибка чтения очереди', key=key, error=e)
             return []
 
+    async def publish(self, channel: str, message: Any) -> bool:
+        """Опубликовать сообщение в Pub/Sub канал."""
+        if not self._connected:
+            return False
+
+        try:
+            await self.redis_client.publish(channel, self.serializer.dumps(message))
+            return True
+        except Exception as e:
+            logger.error('Ошибка публикации в канал', channel=channel, error=e)
+            return False
+
 
 cache = CacheService()
 
@@ -410,7 +430,7 @@ class ChannelSubCache:
                 statuses[ch_id] = None
             else:
                 try:
-                    parsed = json.loads(raw)
+                    parsed = cache.serializer.loads(raw)
                     statuses[ch_id] = parsed == 1
                 except (ValueError, TypeError):
                     statuses[ch_id] = None
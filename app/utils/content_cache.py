@@ -0,0 +1,192 @@
+"""Versioned in-process cache for near-static content.
+
+FAQ pages, legal documents, service rules, tariffs and branding change only
+when an admin edits them, yet they are loaded on every miniapp/cabinet visit.
+Entries are keyed by ``(content type, language)`` and keep the serialized JSON
+body together with a strong ETag, so a hit skips both the DB and serialization.
+Languages outside ``AVAILABLE_LANGUAGES`` share the default language's entry,
+and the number of entries is capped (least recently used ones are dropped),
+so public routes cannot grow the cache with arbitrary keys.
+
+Each content type has a version counter. Admin edits call
+:meth:`ContentCache.invalidate`, which bumps the counter locally and in Redis;
+other processes notice the new version on their next check and reload.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+import structlog
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+from app.utils.cache import cache, cache_key
+
+
+logger = structlog.get_logger(__name__)
+
+
+class ContentType(StrEnum):
+    FAQ = 'faq'
+    RULES = 'rules'
+    PRIVACY_POLICY = 'privacy_policy'
+    PUBLIC_OFFER = 'public_offer'
+    TARIFFS = 'tariffs'
+    BRANDING = 'branding'
+    SERVERS = 'servers'
+
+
+@dataclass(frozen=True, slots=True)
+class ContentCacheEntry:
+    version: int
+    payload: Any
+    body: bytes
+    etag: str
+
+
+def serialize_content(payload: Any) -> bytes:
+    """Serialize payload to compact JSON (pydantic models are supported)."""
+    return cache.serializer.dumps(jsonable_encoder(payload))
+
+
+def build_etag(body: bytes) -> str:
+    """Strong ETag derived from the body, identical on every replica."""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an ``If-None-Match`` header value against ``etag`` (RFC 9110 weak comparison)."""
+    if not if_none_match:
+        return False
+
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    if '*' in candidates:
+        return True
+
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def content_language(language: str | None) -> str:
+    """Base language code; unsupported languages map to ``DEFAULT_LANGUAGE``."""
+    normalized = (language or '').split('-')[0].lower()
+    if not normalized or normalized in settings.get_available_languages():
+        return normalized
+    return (settings.DEFAULT_LANGUAGE or 'ru').split('-')[0].lower()
+
+
+class ContentCache:
+    VERSION_KEY_PREFIX = 'content_version'
+    # How often a process re-reads the shared version counter from Redis
+    VERSION_CHECK_INTERVAL = 5.0
+    MAX_ENTRIES = 512
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple[str, str, str], ContentCacheEntry] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._checked_at: dict[str, float] = {}
+
+    def _version_key(self, content_type: ContentType) -> str:
+        return cache_key(self.VERSION_KEY_PREFIX, content_type.value)
+
+    async def get_version(self, content_type: ContentType) -> int:
+        now = time.monotonic()
+        last_check = self._checked_at.get(content_type)
+        if last_check is not None and now - last_check < self.VERSION_CHECK_INTERVAL:
+            return self._versions.get(content_type, 0)
+
+        remote_version = await cache.get(self._version_key(content_type))
+        if remote_version is not None:
+            try:
+                self._versions[content_type] = int(remote_version)
+            except (TypeError, ValueError):
+                logger.warning('Некорректная версия контента в Redis', content_type=content_type, value=remote_version)
+
+        self._checked_at[content_type] = now
+        return self._versions.get(content_type, 0)
+
+    async def invalidate(self, content_type: ContentType) -> int:
+        """Bump the version of ``content_type`` and drop its local entries."""
+        local_version = self._versions.get(content_type, 0) + 1
+        remote_version = await cache.increment(self._version_key(content_type))
+        version = max(local_version, remote_version or 0)
+
+        self._versions[content_type] = version
+        self._checked_at[content_type] = time.monotonic()
+        for key in [key for key in self._entries if key[0] == content_type]:
+            self._entries.pop(key, None)
+
+        logger.debug('Версия контента увеличена', content_type=content_type, version=version)
+        return version
+
+    async def get_or_load(
+        self,
+        content_type: ContentType,
+        language: str | None,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        variant: str = '',
+        cache_missing: bool = True,
+    ) -> ContentCacheEntry:
+        """Return the cached entry, calling ``loader`` only when the version changed.
+
+        ``variant`` separates differently shaped payloads of the same content
+        (e.g. the cabinet response model and the plain bot text). With
+        ``cache_missing=False`` a ``None`` payload is returned but not stored —
+        for per-id variants, where unknown ids would otherwise fill the cache.
+        """
+        key = (content_type.value, content_language(language), variant)
+        version = await self.get_version(content_type)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self._entries.move_to_end(key)
+            return entry
+
+        payload = await loader()
+        body = serialize_content(payload)
+        entry = ContentCacheEntry(version=version, payload=payload, body=body, etag=build_etag(body))
+        if payload is None and not cache_missing:
+            self._entries.pop(key, None)
+            return entry
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions.clear()
+        self._checked_at.clear()
+
+
+content_cache = ContentCache()
+
+
+def cached_content_response(
+    request: Request,
+    entry: ContentCacheEntry,
+    *,
+    public: bool = True,
+) -> Response:
+    """Build a JSON response for ``entry`` honouring ``If-None-Match``.
+
+    ``no-cache`` lets browsers and shared caches keep the body but forces a
+    revalidation, which is answered with an empty 304 while the ETag holds.
+    """
+    headers = {
+        'ETag': entry.etag,
+        'Cache-Control': f'{"public" if public else "private"}, no-cache',
+    }
+
+    if etag_matches(request.headers.get('if-none-match'), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=entry.body, media_type='application/json', headers=headers)
@@ -0,0 +1,107 @@
+"""JSON serialization layer with an optional orjson backend.
+
+The stdlib serializer is used by default. Setting ``FAST_JSON_ENABLED=true``
+switches FastAPI responses and ``CacheService`` values to orjson when the
+package is installed; both backends produce the same JSON for datetimes,
+Decimals, enums and UUIDs, so cached values stay readable after switching.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Protocol
+from uuid import UUID
+
+import structlog
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+logger = structlog.get_logger(__name__)
+
+
+def json_default(value: Any) -> Any:
+    """Fallback encoder for types the JSON backends do not know natively."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime | date | time):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, set | frozenset):
+        return list(value)
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json')
+    return str(value)
+
+
+class JsonSerializer(Protocol):
+    name: str
+
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes | str) -> Any: ...
+
+
+class StdlibJsonSerializer:
+    name = 'json'
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    name = 'orjson'
+
+    # Non-str dict keys are allowed by stdlib json, keep parity
+    OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=json_default, option=self.OPTIONS)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+def is_orjson_available() -> bool:
+    return orjson is not None
+
+
+def get_json_serializer(fast: bool | None = None) -> JsonSerializer:
+    """Return the configured serializer, falling back to stdlib if orjson is missing."""
+    if fast is None:
+        fast = settings.FAST_JSON_ENABLED
+
+    if fast:
+        if is_orjson_available():
+            return OrjsonSerializer()
+        logger.warning('FAST_JSON_ENABLED включен, но пакет orjson не установлен — используется стандартный json')
+
+    return StdlibJsonSerializer()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; Decimals and enums go through ``json_default``."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=OrjsonSerializer.OPTIONS)
+
+
+def get_default_response_class() -> type[JSONResponse]:
+    """Response class for FastAPI apps and routers: orjson-backed when enabled."""
+    if settings.FAST_JSON_ENABLED and is_orjson_available():
+        return FastJSONResponse
+    return JSONResponse
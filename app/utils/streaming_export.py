@@ -0,0 +1,352 @@
+"""Streaming CSV/NDJSON exports for admin data.
+
+Rows are read with keyset pagination (``WHERE key > last ORDER BY key LIMIT n``),
+each batch in its own short read-only session, so a slow download never pins a
+pooled connection or an open transaction. Batches are encoded incrementally
+(optionally gzip-compressed) and sent as a ``StreamingResponse``: memory use
+depends on the batch size, not on the number of exported rows.
+
+Every export gets an id (``X-Export-Id`` header, or chosen by the client via
+``export_id`` so it can be known without reading response headers) with a
+progress counter the admin can poll while a long export is downloading.
+Progress is kept in the process that serves the download.
+"""
+
+import asyncio
+import csv
+import io
+import zlib
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from enum import StrEnum
+from typing import Any
+from uuid import uuid4
+
+import structlog
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.database.pool_admission import DbPriority, db_priority
+from app.utils.serialization import get_json_serializer
+
+
+logger = structlog.get_logger(__name__)
+
+
+DEFAULT_BATCH_SIZE = 1000
+# Client-chosen export ids (query parameter ``export_id``)
+EXPORT_ID_PATTERN = r'^[A-Za-z0-9_-]{8,64}$'
+
+
+class ExportFormat(StrEnum):
+    CSV = 'csv'
+    NDJSON = 'ndjson'
+
+
+@dataclass(frozen=True, slots=True)
+class ExportColumn:
+    """Output column: header/key name and a getter applied to each source row."""
+
+    name: str
+    getter: Callable[[Any], Any]
+
+
+def column(name: str, attribute: str | None = None) -> ExportColumn:
+    """Column that reads ``row.<attribute>`` (defaults to ``name``)."""
+    key = attribute or name
+    return ExportColumn(name, lambda row: getattr(row, key))
+
+
+# ---- Progress -------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class ExportProgress:
+    export_id: str
+    name: str
+    owner_id: int | None = None
+    total_rows: int | None = None
+    rows_written: int = 0
+    bytes_written: int = 0
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    finished_at: datetime | None = None
+    error: str | None = None
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return 'failed'
+        if self.finished_at is not None:
+            return 'finished'
+        return 'running'
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'export_id': self.export_id,
+            'name': self.name,
+            'status': self.status,
+            'total_rows': self.total_rows,
+            'rows_written': self.rows_written,
+            'bytes_written': self.bytes_written,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+
+class ExportProgressRegistry:
+    MAX_ENTRIES = 200
+    # Finished exports stay visible for this long
+    KEEP_FINISHED_SECONDS = 3600
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, ExportProgress] = OrderedDict()
+
+    def start(
+        self,
+        name: str,
+        *,
+        export_id: str | None = None,
+        owner_id: int | None = None,
+        total_rows: int | None = None,
+    ) -> ExportProgress:
+        self._prune()
+        progress = ExportProgress(
+            export_id=export_id or uuid4().hex,
+            name=name,
+            owner_id=owner_id,
+            total_rows=total_rows,
+        )
+        self._entries.pop(progress.export_id, None)
+        self._entries[progress.export_id] = progress
+        return progress
+
+    def get(self, export_id: str) -> ExportProgress | None:
+        return self._entries.get(export_id)
+
+    def _prune(self) -> None:
+        # Срок хранения — от окончания: долгий экспорт не пропадает сразу после завершения
+        finished_before = datetime.now(UTC) - timedelta(seconds=self.KEEP_FINISHED_SECONDS)
+        for export_id, progress in list(self._entries.items()):
+            if progress.finished_at is not None and progress.finished_at < finished_before:
+                self._entries.pop(export_id)
+        while len(self._entries) >= self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+export_progress = ExportProgressRegistry()
+
+
+# ---- Reading --------------------------------------------------------------
+
+
+async def iter_keyset_rows(
+    stmt: Select,
+    key_column: ColumnElement,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    descending: bool = False,
+    limit: int | None = None,
+) -> AsyncIterator[Any]:
+    """Yield rows of ``stmt`` ordered by the unique ``key_column``, one batch per session.
+
+    ``stmt`` must select plain columns including ``key_column``; its own
+    ``ORDER BY``/``LIMIT`` are replaced.
+    """
+    from app.database.database import db_manager
+
+    ordered = stmt.order_by(None).order_by(key_column.desc() if descending else key_column.asc())
+    last_key: Any = None
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        query = ordered.limit(size)
+        if last_key is not None:
+            query = query.where(key_column < last_key if descending else key_column > last_key)
+
+        # Выгрузки — фоновый приоритет: не отнимают соединения у платежей и пользователей
+        with db_priority(DbPriority.BACKGROUND):
+            async with db_manager.session(read_only=True) as db:
+                rows = (await db.execute(query)).all()
+
+        for row in rows:
+            yield row
+
+        if len(rows) < size:
+            return
+
+        last_key = rows[-1]._mapping[key_column]
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+# ---- Encoding -------------------------------------------------------------
+
+
+def sanitize_csv_cell(value: str) -> str:
+    """Prevent CSV formula injection by prefixing dangerous leading characters."""
+    if value and value[0] in ('=', '+', '-', '@', '\t', '\r'):
+        return f"'{value}"
+    return value
+
+
+def _csv_cell(value: Any, serializer: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, bool | int | float):
+        return value
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, dict | list):
+        value = serializer.dumps(value).decode('utf-8')
+    return sanitize_csv_cell(str(value))
+
+
+class CsvEncoder:
+    media_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self, columns: Sequence[ExportColumn], *, bom: bool = True) -> None:
+        self._columns = columns
+        self._bom = bom
+        self._serializer = get_json_serializer()
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode('utf-8')
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer.writerow([col.name for col in self._columns])
+        data = self._drain()
+        # BOM lets Excel detect UTF-8 (Cyrillic names, emails)
+        return (b'\xef\xbb\xbf' + data) if self._bom else data
+
+    def encode(self, rows: Iterable[Any]) -> bytes:
+        serializer = self._serializer
+        self._writer.writerows([_csv_cell(col.getter(row), serializer) for col in self._columns] for row in rows)
+        return self._drain()
+
+
+class NdjsonEncoder:
+    media_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def __init__(self, columns: Sequence[ExportColumn]) -> None:
+        self._columns = columns
+        self._serializer = get_json_serializer()
+
+    def header(self) -> bytes:
+        return b''
+
+    def encode(self, rows: Iterable[Any]) -> bytes:
+        dumps = self._serializer.dumps
+        return b''.join(dumps({col.name: col.getter(row) for col in self._columns}) + b'\n' for row in rows)
+
+
+def get_encoder(export_format: ExportFormat, columns: Sequence[ExportColumn]) -> CsvEncoder | NdjsonEncoder:
+    if export_format == ExportFormat.NDJSON:
+        return NdjsonEncoder(columns)
+    return CsvEncoder(columns)
+
+
+async def encode_rows(
+    rows: AsyncIterator[Any],
+    encoder: CsvEncoder | NdjsonEncoder,
+    *,
+    gzip: bool = False,
+    progress: ExportProgress | None = None,
+    chunk_rows: int = 500,
+) -> AsyncIterator[bytes]:
+    """Encode ``rows`` into byte chunks of about ``chunk_rows`` rows each."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    def emit(data: bytes) -> bytes:
+        if progress is not None:
+            progress.bytes_written += len(data)
+        if compressor is None:
+            return data
+        # Sync flush per chunk: bytes keep flowing to the client during long exports
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    try:
+        chunk = emit(encoder.header())
+        if chunk:
+            yield chunk
+
+        pending: list[Any] = []
+        async for row in rows:
+            pending.append(row)
+            if len(pending) >= chunk_rows:
+                chunk = emit(encoder.encode(pending))
+                if progress is not None:
+                    progress.rows_written += len(pending)
+                pending.clear()
+                if chunk:
+                    yield chunk
+
+        if pending:
+            chunk = emit(encoder.encode(pending))
+            if progress is not None:
+                progress.rows_written += len(pending)
+            if chunk:
+                yield chunk
+
+        if compressor is not None:
+            yield compressor.flush()
+    except (GeneratorExit, asyncio.CancelledError):
+        # Клиент оборвал загрузку — экспорт не завершён
+        if progress is not None:
+            progress.error = 'cancelled'
+        raise
+    except Exception as error:
+        if progress is not None:
+            progress.error = str(error) or error.__class__.__name__
+        logger.error('Ошибка потокового экспорта', export=progress.name if progress else None, error=error)
+        raise
+    finally:
+        if progress is not None:
+            progress.finished_at = datetime.now(UTC)
+
+
+def export_response(
+    name: str,
+    rows: AsyncIterator[Any],
+    columns: Sequence[ExportColumn],
+    *,
+    export_format: ExportFormat = ExportFormat.CSV,
+    gzip: bool = False,
+    export_id: str | None = None,
+    owner_id: int | None = None,
+    total_rows: int | None = None,
+) -> StreamingResponse:
+    """Stream ``rows`` as a downloadable file named ``<name>_<timestamp>.<ext>[.gz]``."""
+    encoder = get_encoder(export_format, columns)
+    progress = export_progress.start(name, export_id=export_id, owner_id=owner_id, total_rows=total_rows)
+
+    timestamp = datetime.now(UTC).strftime('%Y%m%d_%H%M%S')
+    filename = f'{name}_{timestamp}.{encoder.extension}'
+    media_type = encoder.media_type
+    if gzip:
+        filename += '.gz'
+        media_type = 'application/gzip'
+
+    return StreamingResponse(
+        encode_rows(rows, encoder, gzip=gzip, progress=progress),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Export-Id': progress.export_id,
+            'Cache-Control': 'no-store',
+        },
+    )
@@ -4,11 +4,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Cabinet (Personal Account) routes
+from app.cabinet.auth.password_utils import password_hasher
 from app.cabinet.routes import router as cabinet_router
 from app.config import settings
+from app.services.media_proxy_service import media_proxy
+from app.services.web_api_token_service import web_api_token_service
+from app.services.ws_backplane import ws_backplane
+from app.utils.serialization import get_default_response_class
 from app.webapi.docs import add_redoc_endpoint
 
-from .middleware import RequestLoggingMiddleware
+from .middleware import QueryProfilingMiddleware, RequestLoggingMiddleware, install_database_admission
 from .routes import (
     backups,
     ban_notifications,
@@ -182,6 +187,7 @@ def create_web_api_app() -> FastAPI:
         redoc_url=None,
         openapi_url=docs_config.get('openapi_url'),
         swagger_ui_parameters={'persistAuthorization': True},
+        default_response_class=get_default_response_class(),
     )
 
     add_redoc_endpoint(
@@ -206,6 +212,31 @@ def create_web_api_app() -> FastAPI:
     if settings.WEB_API_REQUEST_LOGGING:
         app.add_middleware(RequestLoggingMiddleware)
 
+    if settings.QUERY_PROFILER_ENABLED:
+        app.add_middleware(QueryProfilingMiddleware)
+
+    install_database_admission(app)
+
+    @app.on_event('startup')
+    async def start_token_usage_flusher() -> None:  # pragma: no cover - event hook
+        web_api_token_service.start_usage_flusher()
+
+    @app.on_event('shutdown')
+    async def stop_token_usage_flusher() -> None:  # pragma: no cover - event hook
+        await web_api_token_service.stop_usage_flusher()
+
+    @app.on_event('shutdown')
+    async def stop_ws_backplane() -> None:  # pragma: no cover - event hook
+        await ws_backplane.stop()
+
+    @app.on_event('shutdown')
+    async def close_media_proxy() -> None:  # pragma: no cover - event hook
+        await media_proxy.close()
+
+    @app.on_event('shutdown')
+    async def stop_password_hasher() -> None:  # pragma: no cover - event hook
+        password_hasher.shutdown()
+
     app.include_router(health.router)
     app.include_router(stats.router, prefix='/stats', tags=['stats'])
     app.include_router(config.router, prefix='/settings', tags=['settings'])
@@ -6,7 +6,7 @@ from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.database import AsyncSessionLocal
+from app.database.database import AsyncSessionLocal, db_manager
 from app.database.models import WebApiToken
 from app.services.web_api_token_service import web_api_token_service
 
@@ -22,6 +22,11 @@ async def get_db_session() -> AsyncGenerator[AsyncSession]:
             await session.close()
 
 
+async def get_read_db_session() -> AsyncGenerator[AsyncSession]:
+    async with db_manager.session(read_only=True) as session:
+        yield session
+
+
 async def require_api_token(
     request: Request,
     api_key_header: str | None = Security(api_key_header_scheme),
@@ -55,5 +60,6 @@ async def require_api_token(
             detail='Invalid or expired API key',
         )
 
+    # Persists an HMAC rehash on a cache miss; a no-op for cached tokens
     await db.commit()
     return token
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from time import monotonic
 
 import structlog
+from fastapi import FastAPI
+from fastapi.exception_handlers import http_exception_handler
 from sqlalchemy.exc import InterfaceError, OperationalError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog.contextvars import bound_contextvars
 
+from app.database.pool_admission import RETRY_AFTER_SECONDS, DbPriority, PoolAdmissionRejected, db_priority
+from app.database.query_profiler import query_profiler
+
 
 logger = structlog.get_logger('web_api')
 
+CRITICAL_ROUTES_STATE = 'db_critical_routes'
+
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """Логирование входящих запросов в административный API."""
@@ -38,3 +49,113 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 logger.debug(
                     '-> (ms)', method=request.method, path=request.url.path, status=status, duration_ms=duration_ms
                 )
+
+
+class QueryProfilingMiddleware:
+    """Единица работы профилировщика SQL на каждый HTTP-запрос, названная по шаблону маршрута."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with query_profiler.unit_of_work(f'http:{scope["method"]} unmatched') as unit:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # Маршрут известен только после роутинга; шаблон вместо пути — без id в имени
+                route = scope.get('route')
+                if route is not None:
+                    unit.name = f'http:{scope["method"]} {getattr(route, "path", route)}'
+
+
+class DatabaseAdmissionMiddleware:
+    """Приоритет пула БД для HTTP-запроса и быстрый 503 при отказе в соединении.
+
+    Маршруты из :func:`add_critical_routes` (вебхуки платежей и RemnaWave) получают
+    критический приоритет, остальные — интерактивный. Сопоставление — ``route.matches``,
+    так что шаблоны с параметрами пути тоже работают.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _priority(scope: Scope) -> DbPriority:
+        state = getattr(scope.get('app'), 'state', None)
+        for route in getattr(state, CRITICAL_ROUTES_STATE, ()):
+            match, _ = route.matches(scope)
+            if match is not Match.NONE:
+                return DbPriority.CRITICAL
+        return DbPriority.INTERACTIVE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        priority = self._priority(scope)
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
+
+        try:
+            with db_priority(priority):
+                await self.app(scope, receive, send_wrapper)
+        except PoolAdmissionRejected:
+            if response_started:
+                raise
+            logger.warning('Пул БД занят, запрос отклонён', method=scope['method'], path=scope['path'])
+            await _pool_busy_response()(scope, receive, send)
+
+
+def _pool_busy_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={'detail': 'Service temporarily unavailable. Please try again later.'},
+        headers={'Retry-After': str(RETRY_AFTER_SECONDS)},
+    )
+
+
+def _is_pool_rejection(error: BaseException | None) -> bool:
+    seen: set[int] = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, PoolAdmissionRejected):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+async def _pool_rejected_handler(request: Request, exc: Exception) -> Response:
+    logger.warning('Пул БД занят, запрос отклонён', method=request.method, path=request.url.path)
+    return _pool_busy_response()
+
+
+async def _http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    # Маршруты с ``except Exception`` превращают отказ пула в 500 — отвечаем 503, как и без перехвата
+    if exc.status_code >= 500 and _is_pool_rejection(exc.__cause__ or exc.__context__):
+        return await _pool_rejected_handler(request, exc)
+    return await http_exception_handler(request, exc)
+
+
+def install_database_admission(app: FastAPI) -> None:
+    """Ставит :class:`DatabaseAdmissionMiddleware` и ответ 503 на отказ пула, в том числе перехваченный."""
+    app.add_middleware(DatabaseAdmissionMiddleware)
+    app.add_exception_handler(PoolAdmissionRejected, _pool_rejected_handler)
+    app.add_exception_handler(StarletteHTTPException, _http_exception_handler)
+
+
+def add_critical_routes(app: FastAPI, routes: Iterable[BaseRoute]) -> None:
+    """Маршруты, запросы к которым получают критический приоритет пула БД.
+
+    Маршруты сопоставляются со своими путями, поэтому роутер должен быть подключён без ``prefix``.
+    """
+    setattr(app.state, CRITICAL_ROUTES_STATE, [*getattr(app.state, CRITICAL_ROUTES_STATE, ()), *routes])
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Security
+from fastapi import APIRouter, Query, Security
 
+from app.cabinet.auth.password_utils import password_hasher
 from app.config import settings
 from app.database import db_manager, get_pool_metrics
+from app.database.query_profiler import query_profiler
 from app.services.version_service import version_service
 
 from ..dependencies import require_api_token
@@ -32,11 +34,46 @@ async def health_check(_: object = Security(require_api_token)) -> HealthCheckRe
 async def database_health(_: object = Security(require_api_token)) -> dict:
     """Детальная информация о состоянии базы данных."""
 
-    return await db_manager.health_check()
+    health = await db_manager.health_check()
+    health['read_replica'] = await db_manager.health_check_replica()
+    return health
 
 
 @router.get('/metrics/pool', tags=['health'])
 async def pool_metrics(_: object = Security(require_api_token)) -> dict:
-    """Метрики пула подключений к базе данных."""
+    """Метрики пула подключений к базе данных, включая ожидание и удержание соединений по приоритетам."""
 
     return await get_pool_metrics()
+
+
+@router.get('/metrics/read-replica', tags=['health'])
+async def read_replica_metrics(_: object = Security(require_api_token)) -> dict:
+    """Отставание read replica и распределение read-only сессий между репликой и основной БД."""
+
+    await db_manager.get_replica_lag()
+    return db_manager.get_replica_metrics()
+
+
+@router.get('/metrics/queries', tags=['health'])
+async def query_metrics(
+    _: object = Security(require_api_token),
+    limit: int = Query(20, ge=1, le=200),
+) -> dict:
+    """Отпечатки SQL-запросов (count/total/p95), время по обработчикам и маршрутам, найденные N+1."""
+
+    return query_profiler.get_metrics(limit=limit)
+
+
+@router.delete('/metrics/queries', tags=['health'])
+async def reset_query_metrics(_: object = Security(require_api_token)) -> dict:
+    """Сброс накопленной статистики запросов (например, перед замером)."""
+
+    query_profiler.reset()
+    return {'status': 'ok'}
+
+
+@router.get('/metrics/password-hashing', tags=['health'])
+async def password_hashing_metrics(_: object = Security(require_api_token)) -> dict:
+    """Состояние пула bcrypt кабинета и задержка хеширования паролей."""
+
+    return password_hasher.get_metrics()
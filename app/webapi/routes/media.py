@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import mimetypes
 from typing import Any
 
 import structlog
@@ -21,6 +20,7 @@ from fastapi import (
 )
 
 from app.config import settings
+from app.services.media_proxy_service import MediaNotFoundError, build_media_response, media_proxy
 
 from ..dependencies import require_api_token
 from ..schemas.media import MediaUploadResponse
@@ -118,40 +118,16 @@ async def upload_media(
 
 @router.get('/media/{file_id}', name='download_media', tags=['media'])
 async def download_media(
+    request: Request,
     file_id: str,
     _: Any = Security(require_api_token),
 ) -> Response:
-    bot = Bot(
-        token=settings.BOT_TOKEN,
-        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
-    )
-
     try:
-        file = await bot.get_file(file_id)
-        if not file.file_path:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, 'Media file not found')
-
-        buffer = await bot.download_file(file.file_path)
-
-        if hasattr(buffer, 'seek'):
-            buffer.seek(0)
-
-        content = buffer.read() if hasattr(buffer, 'read') else bytes(buffer)
-        filename = file.file_path.split('/')[-1]
-
-        media_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
-
-        return Response(
-            content=content,
-            media_type=media_type,
-            headers={
-                'Content-Disposition': f'inline; filename={filename}',
-            },
-        )
-    except HTTPException:
-        raise
+        media = await media_proxy.get(file_id)
+    except MediaNotFoundError as error:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, 'Media file not found') from error
     except Exception as error:  # pragma: no cover - неожиданные ошибки загрузки файла
         logger.error('Failed to download media', file_id=file_id, error=error)
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Failed to download media') from error
-    finally:
-        await bot.session.close()
+
+    return build_media_response(request, media, cache_control='private, max-age=86400')
@@ -23,6 +23,7 @@ from app.database.crud.discount_offer import (
     list_active_discount_offers_for_user,
     mark_offer_claimed,
 )
+from app.database.crud.fast_read import get_tariff_row_by_id, get_user_row_by_telegram_id
 from app.database.crud.promo_group import get_auto_assign_promo_groups
 from app.database.crud.promo_offer_template import get_promo_offer_template_by_id
 from app.database.crud.rules import get_rules_by_language
@@ -94,6 +95,7 @@ from app.services.trial_activation_service import (
     rollback_trial_subscription_activation,
 )
 from app.services.tribute_service import TributeService
+from app.utils.content_cache import ContentType, content_cache, content_language
 from app.utils.currency_converter import currency_converter
 from app.utils.pricing_utils import (
     apply_percentage_discount,
@@ -3128,6 +3130,124 @@ async def _build_referral_info(
     )
 
 
+def _normalize_content_language(language: str | None) -> str:
+    base_language = language or settings.DEFAULT_LANGUAGE or 'ru'
+    return base_language.split('-')[0].lower()
+
+
+async def _build_miniapp_faq(db: AsyncSession, requested_language: str) -> MiniAppFaq | None:
+    faq_pages = await FaqService.get_pages(
+        db,
+        requested_language,
+        include_inactive=False,
+        fallback=True,
+    )
+    if not faq_pages:
+        return None
+
+    faq_setting = await FaqService.get_setting(
+        db,
+        requested_language,
+        fallback=True,
+    )
+    is_enabled = bool(faq_setting.is_enabled) if faq_setting else True
+    if not is_enabled:
+        return None
+
+    ordered_pages = sorted(
+        faq_pages,
+        key=lambda page: (
+            (page.display_order or 0),
+            page.id,
+        ),
+    )
+    faq_items: list[MiniAppFaqItem] = []
+    for page in ordered_pages:
+        raw_content = (page.content or '').strip()
+        if not raw_content:
+            continue
+        if not re.sub(r'<[^>]+>', '', raw_content).strip():
+            continue
+        faq_items.append(
+            MiniAppFaqItem(
+                id=page.id,
+                title=page.title or None,
+                content=page.content or '',
+                display_order=getattr(page, 'display_order', None),
+            )
+        )
+
+    if not faq_items:
+        return None
+
+    resolved_language = faq_setting.language if faq_setting and faq_setting.language else ordered_pages[0].language
+    return MiniAppFaq(
+        requested_language=requested_language,
+        language=resolved_language or requested_language,
+        is_enabled=is_enabled,
+        total=len(faq_items),
+        items=faq_items,
+    )
+
+
+async def _build_miniapp_public_offer(db: AsyncSession, requested_language: str) -> MiniAppRichTextDocument | None:
+    public_offer = await PublicOfferService.get_active_offer(
+        db,
+        requested_language,
+    )
+    if not public_offer or not (public_offer.content or '').strip():
+        return None
+
+    return MiniAppRichTextDocument(
+        requested_language=requested_language,
+        language=public_offer.language,
+        title=None,
+        is_enabled=bool(public_offer.is_enabled),
+        content=public_offer.content or '',
+        created_at=public_offer.created_at,
+        updated_at=public_offer.updated_at,
+    )
+
+
+async def _build_miniapp_privacy_policy(db: AsyncSession, requested_language: str) -> MiniAppRichTextDocument | None:
+    privacy_policy = await PrivacyPolicyService.get_active_policy(
+        db,
+        requested_language,
+    )
+    if not privacy_policy or not (privacy_policy.content or '').strip():
+        return None
+
+    return MiniAppRichTextDocument(
+        requested_language=requested_language,
+        language=privacy_policy.language,
+        title=None,
+        is_enabled=bool(privacy_policy.is_enabled),
+        content=privacy_policy.content or '',
+        created_at=privacy_policy.created_at,
+        updated_at=privacy_policy.updated_at,
+    )
+
+
+async def _build_miniapp_service_rules(db: AsyncSession, requested_language: str) -> MiniAppRichTextDocument | None:
+    default_rules_language = _normalize_content_language(settings.DEFAULT_LANGUAGE)
+    service_rules = await get_rules_by_language(db, requested_language)
+    if not service_rules and requested_language != default_rules_language:
+        service_rules = await get_rules_by_language(db, default_rules_language)
+
+    if not service_rules or not (service_rules.content or '').strip():
+        return None
+
+    return MiniAppRichTextDocument(
+        requested_language=requested_language,
+        language=service_rules.language,
+        title=getattr(service_rules, 'title', None),
+        is_enabled=bool(getattr(service_rules, 'is_active', True)),
+        content=service_rules.content or '',
+        created_at=getattr(service_rules, 'created_at', None),
+        updated_at=getattr(service_rules, 'updated_at', None),
+    )
+
+
 def _is_trial_available_for_user(user: User) -> bool:
     if settings.TRIAL_DURATION_DAYS <= 0:
         return False
@@ -3319,118 +3439,51 @@ async def get_subscription_details(
         user=user,
     )
 
-    content_language_preference = user.language or settings.DEFAULT_LANGUAGE or 'ru'
-
-    def _normalize_language_code(language: str | None) -> str:
-        base_language = language or settings.DEFAULT_LANGUAGE or 'ru'
-        return base_language.split('-')[0].lower()
+    content_language_preference = content_language(user.language or settings.DEFAULT_LANGUAGE or 'ru')
 
-    faq_payload: MiniAppFaq | None = None
     requested_faq_language = FaqService.normalize_language(content_language_preference)
-    faq_pages = await FaqService.get_pages(
-        db,
+    faq_entry = await content_cache.get_or_load(
+        ContentType.FAQ,
         requested_faq_language,
-        include_inactive=False,
-        fallback=True,
+        lambda: _build_miniapp_faq(db, requested_faq_language),
+        variant='miniapp',
     )
-
-    if faq_pages:
-        faq_setting = await FaqService.get_setting(
-            db,
-            requested_faq_language,
-            fallback=True,
-        )
-        is_enabled = bool(faq_setting.is_enabled) if faq_setting else True
-
-        if is_enabled:
-            ordered_pages = sorted(
-                faq_pages,
-                key=lambda page: (
-                    (page.display_order or 0),
-                    page.id,
-                ),
-            )
-            faq_items: list[MiniAppFaqItem] = []
-            for page in ordered_pages:
-                raw_content = (page.content or '').strip()
-                if not raw_content:
-                    continue
-                if not re.sub(r'<[^>]+>', '', raw_content).strip():
-                    continue
-                faq_items.append(
-                    MiniAppFaqItem(
-                        id=page.id,
-                        title=page.title or None,
-                        content=page.content or '',
-                        display_order=getattr(page, 'display_order', None),
-                    )
-                )
-
-            if faq_items:
-                resolved_language = (
-                    faq_setting.language if faq_setting and faq_setting.language else ordered_pages[0].language
-                )
-                faq_payload = MiniAppFaq(
-                    requested_language=requested_faq_language,
-                    language=resolved_language or requested_faq_language,
-                    is_enabled=is_enabled,
-                    total=len(faq_items),
-                    items=faq_items,
-                )
+    faq_payload: MiniAppFaq | None = faq_entry.payload
 
     legal_documents_payload: MiniAppLegalDocuments | None = None
 
     requested_offer_language = PublicOfferService.normalize_language(content_language_preference)
-    public_offer = await PublicOfferService.get_active_offer(
-        db,
+    public_offer_entry = await content_cache.get_or_load(
+        ContentType.PUBLIC_OFFER,
         requested_offer_language,
+        lambda: _build_miniapp_public_offer(db, requested_offer_language),
+        variant='miniapp',
     )
-    if public_offer and (public_offer.content or '').strip():
+    if public_offer_entry.payload:
         legal_documents_payload = legal_documents_payload or MiniAppLegalDocuments()
-        legal_documents_payload.public_offer = MiniAppRichTextDocument(
-            requested_language=requested_offer_language,
-            language=public_offer.language,
-            title=None,
-            is_enabled=bool(public_offer.is_enabled),
-            content=public_offer.content or '',
-            created_at=public_offer.created_at,
-            updated_at=public_offer.updated_at,
-        )
+        legal_documents_payload.public_offer = public_offer_entry.payload
 
     requested_policy_language = PrivacyPolicyService.normalize_language(content_language_preference)
-    privacy_policy = await PrivacyPolicyService.get_active_policy(
-        db,
+    privacy_policy_entry = await content_cache.get_or_load(
+        ContentType.PRIVACY_POLICY,
         requested_policy_language,
+        lambda: _build_miniapp_privacy_policy(db, requested_policy_language),
+        variant='miniapp',
     )
-    if privacy_policy and (privacy_policy.content or '').strip():
+    if privacy_policy_entry.payload:
         legal_documents_payload = legal_documents_payload or MiniAppLegalDocuments()
-        legal_documents_payload.privacy_policy = MiniAppRichTextDocument(
-            requested_language=requested_policy_language,
-            language=privacy_policy.language,
-            title=None,
-            is_enabled=bool(privacy_policy.is_enabled),
-            content=privacy_policy.content or '',
-            created_at=privacy_policy.created_at,
-            updated_at=privacy_policy.updated_at,
-        )
-
-    requested_rules_language = _normalize_language_code(content_language_preference)
-    default_rules_language = _normalize_language_code(settings.DEFAULT_LANGUAGE)
-    service_rules = await get_rules_by_language(db, requested_rules_language)
-    if not service_rules and requested_rules_language != default_rules_language:
-        service_rules = await get_rules_by_language(db, default_rules_language)
-
-    if service_rules and (service_rules.content or '').strip():
+        legal_documents_payload.privacy_policy = privacy_policy_entry.payload
+
+    requested_rules_language = _normalize_content_language(content_language_preference)
+    service_rules_entry = await content_cache.get_or_load(
+        ContentType.RULES,
+        requested_rules_language,
+        lambda: _build_miniapp_service_rules(db, requested_rules_language),
+        variant='miniapp',
+    )
+    if service_rules_entry.payload:
         legal_documents_payload = legal_documents_payload or MiniAppLegalDocuments()
-        legal_documents_payload.service_rules = MiniAppRichTextDocument(
-            requested_language=requested_rules_language,
-            language=service_rules.language,
-            title=getattr(service_rules, 'title', None),
-            is_enabled=bool(getattr(service_rules, 'is_active', True)),
-            content=service_rules.content or '',
-            created_at=getattr(service_rules, 'created_at', None),
-            updated_at=getattr(service_rules, 'updated_at', None),
-        )
+        legal_documents_payload.service_rules = service_rules_entry.payload
 
     links_payload: dict[str, Any] = {}
     connected_squads: list[str] = []
@@ -3489,7 +3542,7 @@ async def get_subscription_details(
     daily_next_charge_at = None
 
     if subscription and getattr(subscription, 'tariff_id', None):
-        tariff = await get_tariff_by_id(db, subscription.tariff_id)
+        tariff = await get_tariff_row_by_id(db, subscription.tariff_id)
         if tariff and getattr(tariff, 'is_daily', False):
             is_daily_tariff = True
             is_daily_paused = getattr(subscription, 'is_daily_paused', False)
@@ -4443,7 +4496,7 @@ async def remove_connected_device(
             detail={'code': 'invalid_user', 'message': 'Invalid Telegram user identifier'},
         ) from None
 
-    user = await get_user_by_telegram_id(db, telegram_id)
+    user = await get_user_row_by_telegram_id(db, telegram_id)
     if not user:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
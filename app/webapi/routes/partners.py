@@ -21,7 +21,7 @@ from app.utils.user_utils import (
     get_effective_referral_commission_percent,
 )
 
-from ..dependencies import get_db_session, require_api_token
+from ..dependencies import get_db_session, get_read_db_session, require_api_token
 from ..schemas.partners import (
     ChangeData,
     DailyStats,
@@ -227,7 +227,7 @@ async def update_referrer_commission(
 async def get_global_partner_stats(
     days: int = Query(30, ge=1, le=365),
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> GlobalPartnerStats:
     """Глобальная статистика партнёрской программы."""
     data = await PartnerStatsService.get_global_partner_stats(db, days)
@@ -243,7 +243,7 @@ async def get_global_partner_stats(
 async def get_global_daily_stats(
     days: int = Query(30, ge=1, le=365),
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> DailyStatsResponse:
     """Глобальная статистика по дням."""
     data = await PartnerStatsService.get_global_daily_stats(db, days)
@@ -260,7 +260,7 @@ async def get_top_referrers(
     limit: int = Query(10, ge=1, le=100),
     days: int | None = Query(None, ge=1, le=365),
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> TopReferrersResponse:
     """Топ рефереров по заработку."""
     data = await PartnerStatsService.get_top_referrers(db, limit, days)
@@ -275,7 +275,7 @@ async def get_top_referrers(
 async def get_referrer_detailed_stats(
     user_id: int,
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> ReferrerDetailedStats:
     """Детальная статистика реферера."""
     user = await get_user_by_telegram_id(db, user_id)
@@ -300,7 +300,7 @@ async def get_referrer_daily_stats(
     user_id: int,
     days: int = Query(30, ge=1, le=365),
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> DailyStatsResponse:
     """Статистика реферера по дням."""
     user = await get_user_by_telegram_id(db, user_id)
@@ -324,7 +324,7 @@ async def get_referrer_top_referrals(
     user_id: int,
     limit: int = Query(10, ge=1, le=100),
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> TopReferralsResponse:
     """Топ рефералов реферера по принесённому доходу."""
     user = await get_user_by_telegram_id(db, user_id)
@@ -348,7 +348,7 @@ async def get_referrer_period_comparison(
     current_days: int = Query(7, ge=1, le=365),
     previous_days: int = Query(7, ge=1, le=365),
     _: Any = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> PeriodComparisonResponse:
     """Сравнение периодов для реферера."""
     user = await get_user_by_telegram_id(db, user_id)
@@ -21,7 +21,7 @@ from app.database.models import (
     UserStatus,
 )
 
-from ..dependencies import get_db_session, require_api_token
+from ..dependencies import get_read_db_session, require_api_token
 
 
 router = APIRouter()
@@ -141,7 +141,7 @@ async def _get_overview(db: AsyncSession) -> dict[str, object]:
 )
 async def stats_overview(
     _: object = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> dict[str, object]:
     return await _get_overview(db)
 
@@ -255,7 +255,7 @@ async def stats_overview(
 )
 async def stats_full(
     _: object = Security(require_api_token),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_read_db_session),
 ) -> dict[str, object]:
     overview = await _get_overview(db)
 
@@ -3,11 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Response, Security, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.crud.web_api_token import (
-    delete_token,
-    get_token_by_id,
-    list_tokens,
-)
+from app.database.crud.web_api_token import get_token_by_id, list_tokens
 from app.database.models import WebApiToken
 from app.services.web_api_token_service import web_api_token_service
 
@@ -103,6 +99,6 @@ async def delete_token_endpoint(
     if not token:
         raise HTTPException(status.HTTP_404_NOT_FOUND, 'Token not found')
 
-    await delete_token(db, token)
+    await web_api_token_service.delete_token(db, token)
     await db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -82,13 +82,14 @@ async def websocket_endpoint(websocket: WebSocket):
     event_emitter.register_websocket(websocket)
 
     try:
-        # Отправляем приветственное сообщение
-        await websocket.send_json(
+        # Отправляем приветственное сообщение (через очередь подключения, как и события)
+        event_emitter.send_to_websocket(
+            websocket,
             {
                 'type': 'connection',
                 'status': 'connected',
                 'message': 'WebSocket connection established',
-            }
+            },
         )
 
         # Обрабатываем входящие сообщения (ping/pong для keepalive)
@@ -99,7 +100,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
                 # Обработка ping
                 if message.get('type') == 'ping':
-                    await websocket.send_json({'type': 'pong'})
+                    event_emitter.send_to_websocket(websocket, {'type': 'pong'})
                 # Можно добавить другие типы сообщений (подписки на конкретные события и т.д.)
 
             except json.JSONDecodeError:
@@ -8,12 +8,15 @@ from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.cabinet.auth.password_utils import password_hasher
 from app.cabinet.routes import router as cabinet_router
 from app.config import settings
 from app.services.disposable_email_service import disposable_email_service
+from app.services.media_proxy_service import media_proxy
 from app.services.payment_service import PaymentService
 from app.webapi.app import create_web_api_app
 from app.webapi.docs import add_redoc_endpoint
+from app.webapi.middleware import add_critical_routes, install_database_admission
 
 from . import payments, telegram
 
@@ -60,6 +63,7 @@ def _create_base_app() -> FastAPI:
             openapi_url=docs_config.get('openapi_url'),
             title='Bedolaga Unified Server',
         )
+        install_database_admission(app)
 
         # Add cabinet routes even when web API is disabled
         if settings.is_cabinet_enabled():
@@ -75,6 +79,14 @@ def _create_base_app() -> FastAPI:
             )
             app.include_router(cabinet_router)
 
+            @app.on_event('shutdown')
+            async def close_media_proxy() -> None:  # pragma: no cover - event hook
+                await media_proxy.close()
+
+            @app.on_event('shutdown')
+            async def stop_password_hasher() -> None:  # pragma: no cover - event hook
+                password_hasher.shutdown()
+
     _attach_docs_alias(app, app.docs_url)
     return app
 
@@ -108,9 +120,11 @@ def create_unified_app(
     app.state.dispatcher = dispatcher
     app.state.payment_service = payment_service
 
+    # Вебхуки платежей и RemnaWave — критический приоритет в пуле БД
     payments_router = payments.create_payment_router(bot, payment_service)
     if payments_router:
         app.include_router(payments_router)
+        add_critical_routes(app, payments_router.routes)
 
     # Mount RemnaWave incoming webhook router
     remnawave_webhook_enabled = settings.is_remnawave_webhook_enabled()
@@ -119,6 +133,7 @@ def create_unified_app(
 
         remnawave_router = create_remnawave_webhook_router(bot)
         app.include_router(remnawave_router)
+        add_critical_routes(app, remnawave_router.routes)
         logger.info('RemnaWave webhook router mounted at', REMNAWAVE_WEBHOOK_PATH=settings.REMNAWAVE_WEBHOOK_PATH)
 
     payment_providers_state = {
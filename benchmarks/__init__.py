@@ -0,0 +1 @@
+"""Микробенчмарки горячих путей бота (запуск: ``python -m benchmarks.<name>``)."""
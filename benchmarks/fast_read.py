@@ -0,0 +1,173 @@
+"""Горячие чтения: ORM-геттеры против Core-строк из ``app.database.crud.fast_read``.
+
+Запуск::
+
+    python -m benchmarks.fast_read [--users 2000] [--repeat 2000]
+
+Создаёт временную SQLite-базу (aiosqlite) с нужными таблицами, пользователями,
+подписками, тарифами и статусами подписки на каналы, затем замеряет среднее
+время вызова каждой пары функций через ``AsyncSession`` — так же, как их
+вызывают обработчики. На PostgreSQL разница в абсолютных цифрах меньше из-за
+сетевой задержки, но затраты CPU на материализацию ORM-графа те же.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+
+os.environ.setdefault('BOT_TOKEN', 'benchmark-token')
+
+import structlog
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database.crud import fast_read
+from app.database.crud.required_channel import get_user_channel_subs
+from app.database.crud.subscription import get_subscription_by_user_id
+from app.database.crud.tariff import get_tariff_by_id
+from app.database.crud.user import get_user_by_id, get_user_by_telegram_id
+from app.database.models import Base, PromoGroup, Subscription, Tariff, User, UserChannelSubscription
+
+
+TELEGRAM_ID_OFFSET = 10_000_000
+TARIFFS = 5
+CHANNELS = ('-1001000000001', '-1001000000002', '-1001000000003')
+# Таблицы, которые затрагивают ORM-геттеры со своими selectinload (полная схема использует типы PostgreSQL)
+TABLES = list(
+    dict.fromkeys(
+        [
+            table
+            for model in (User, Subscription, Tariff, PromoGroup)
+            for relationship in model.__mapper__.relationships
+            for table in (relationship.mapper.local_table, relationship.secondary)
+            if table is not None
+        ]
+        + [User.__table__, Subscription.__table__, Tariff.__table__, UserChannelSubscription.__table__]
+    )
+)
+
+
+def _fill(connection, users: int, rng: random.Random) -> None:
+    now = datetime.now(UTC)
+    connection.execute(
+        insert(Tariff),
+        [
+            {
+                'id': tariff_id,
+                'name': f'Tariff {tariff_id}',
+                'allowed_squads': [f'squad-{tariff_id}'],
+                'period_prices': {'30': 10_000 * tariff_id, '90': 27_000 * tariff_id},
+            }
+            for tariff_id in range(1, TARIFFS + 1)
+        ],
+    )
+    connection.execute(
+        insert(User),
+        [
+            {
+                'id': user_id,
+                'telegram_id': TELEGRAM_ID_OFFSET + user_id,
+                'first_name': f'User {user_id}',
+                'username': f'user_{user_id}',
+                'referral_code': f'ref{user_id:08d}',
+                'balance_kopeks': rng.randrange(0, 100_000),
+            }
+            for user_id in range(1, users + 1)
+        ],
+    )
+    connection.execute(
+        insert(Subscription),
+        [
+            {
+                'user_id': user_id,
+                'status': 'active',
+                'is_trial': False,
+                'end_date': now + timedelta(days=rng.randrange(1, 90)),
+                'connected_squads': ['squad-1'],
+                'tariff_id': rng.randrange(1, TARIFFS + 1),
+            }
+            for user_id in range(1, users + 1)
+        ],
+    )
+    connection.execute(
+        insert(UserChannelSubscription),
+        [
+            {
+                'telegram_id': TELEGRAM_ID_OFFSET + user_id,
+                'channel_id': channel_id,
+                'is_member': rng.random() < 0.9,
+                'checked_at': now,
+            }
+            for user_id in range(1, users + 1)
+            for channel_id in CHANNELS
+        ],
+    )
+
+
+async def _per_call_us(session_factory, call, keys: list[int]) -> float:
+    """Среднее время вызова в мкс; каждый вызов — в новой сессии, как в обработчиках."""
+    started_at = time.perf_counter()
+    for key in keys:
+        async with session_factory() as db:
+            await call(db, key)
+    return (time.perf_counter() - started_at) / len(keys) * 1_000_000
+
+
+async def _run(users: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f'sqlite+aiosqlite:///{Path(directory) / "bench.db"}')
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, tables=TABLES)
+            await connection.run_sync(_fill, users, random.Random(49))
+
+        def session_factory():
+            return AsyncSession(engine, expire_on_commit=False)
+
+        rng = random.Random(7)
+        user_ids = [rng.randrange(1, users + 1) for _ in range(repeat)]
+        telegram_ids = [TELEGRAM_ID_OFFSET + user_id for user_id in user_ids]
+        tariff_ids = [rng.randrange(1, TARIFFS + 1) for _ in range(repeat)]
+
+        pairs = (
+            ('user by telegram_id', get_user_by_telegram_id, fast_read.get_user_row_by_telegram_id, telegram_ids),
+            ('user by id', get_user_by_id, fast_read.get_user_row_by_id, user_ids),
+            (
+                'subscription by user_id',
+                get_subscription_by_user_id,
+                fast_read.get_subscription_row_by_user_id,
+                user_ids,
+            ),
+            ('tariff by id', get_tariff_by_id, fast_read.get_tariff_row_by_id, tariff_ids),
+            ('channel subs', get_user_channel_subs, fast_read.get_user_channel_sub_rows, telegram_ids),
+        )
+
+        print(f'users={users} repeat={repeat} (мкс на вызов, включая открытие сессии)')
+        for label, orm_call, core_call, keys in pairs:
+            # Прогрев: кэш скомпилированных запросов и пул соединений
+            await _per_call_us(session_factory, orm_call, keys[:20])
+            await _per_call_us(session_factory, core_call, keys[:20])
+            orm_us = await _per_call_us(session_factory, orm_call, keys)
+            core_us = await _per_call_us(session_factory, core_call, keys)
+            print(f'{label:<24} ORM {orm_us:9.1f}  Core {core_us:9.1f}  x{orm_us / core_us:.1f}')
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+    # Информационные логи ORM-геттеров искажают замер
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(_run(args.users, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Сравнение скорости JSON-сериализации: stdlib json против orjson.
+
+Запуск::
+
+    python -m benchmarks.json_serialization [--rows 500] [--repeat 200]
+
+Полезная нагрузка имитирует список пользователей админки и значения
+``CacheService``: даты, Decimal, перечисления и вложенные структуры.
+"""
+
+import argparse
+import os
+import timeit
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+
+os.environ.setdefault('BOT_TOKEN', 'benchmark-token')
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.database.models import SubscriptionStatus, TransactionType
+from app.utils.serialization import (
+    FastJSONResponse,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+    is_orjson_available,
+)
+
+
+def build_payload(rows: int) -> dict:
+    now = datetime.now(UTC)
+    users = [
+        {
+            'id': index,
+            'telegram_id': 100_000_000 + index,
+            'username': f'user_{index}',
+            'first_name': 'Иван',
+            'balance_kopeks': index * 1_000,
+            'balance_rubles': Decimal(index * 10) / Decimal(3),
+            'created_at': now - timedelta(days=index),
+            'subscription': {
+                'status': SubscriptionStatus.ACTIVE,
+                'end_date': now + timedelta(days=30),
+                'traffic_used_gb': index * 0.37,
+                'connected_squads': [f'squad-{index % 7}', f'squad-{index % 11}'],
+            },
+            'transactions': [
+                {'type': TransactionType.DEPOSIT, 'amount_kopeks': 10_000, 'created_at': now},
+                {'type': TransactionType.SUBSCRIPTION_PAYMENT, 'amount_kopeks': -9_900, 'created_at': now},
+            ],
+        }
+        for index in range(rows)
+    ]
+    return {'users': users, 'total': rows, 'generated_at': now}
+
+
+def _report(label: str, seconds: float, repeat: int, baseline: float | None = None) -> None:
+    per_call_ms = seconds / repeat * 1000
+    suffix = f'  x{baseline / seconds:.1f}' if baseline else ''
+    print(f'{label:<40} {per_call_ms:8.3f} ms/call{suffix}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    encoded = jsonable_encoder(payload)
+    stdlib = StdlibJsonSerializer()
+
+    print(f'rows={args.rows} repeat={args.repeat} body={len(stdlib.dumps(payload)) / 1024:.1f} KiB')
+
+    cache_json = timeit.timeit(lambda: stdlib.dumps(payload), number=args.repeat)
+    response_json = timeit.timeit(lambda: JSONResponse(encoded), number=args.repeat)
+    _report('CacheService dumps (json)', cache_json, args.repeat)
+    _report('JSONResponse render', response_json, args.repeat)
+
+    if not is_orjson_available():
+        print('orjson не установлен — сравнение пропущено')
+        return
+
+    fast = OrjsonSerializer()
+    if fast.loads(fast.dumps(payload)) != stdlib.loads(stdlib.dumps(payload)):
+        raise SystemExit('orjson и json дают разный результат')
+
+    cache_orjson = timeit.timeit(lambda: fast.dumps(payload), number=args.repeat)
+    response_orjson = timeit.timeit(lambda: FastJSONResponse(encoded), number=args.repeat)
+    _report('CacheService dumps (orjson)', cache_orjson, args.repeat, cache_json)
+    _report('FastJSONResponse render', response_orjson, args.repeat, response_json)
+
+
+if __name__ == '__main__':
+    main()
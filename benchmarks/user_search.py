@@ -0,0 +1,104 @@
+"""Поиск пользователей по подстроке: LIKE-скан против индекса (FTS5 trigram на SQLite).
+
+Запуск::
+
+    python -m benchmarks.user_search [--users 200000] [--repeat 20]
+
+Создаёт временную SQLite-базу с таблицей ``users`` и FTS-индексом из миграции
+0019, затем сравнивает запросы админского поиска (``build_users_filters``) с
+индексом и без него. На PostgreSQL trigram GIN-индексы дают сравнимый выигрыш —
+проверить можно через ``EXPLAIN ANALYZE`` того же запроса.
+"""
+
+import argparse
+import importlib
+import os
+import random
+import string
+import tempfile
+import timeit
+from pathlib import Path
+
+
+os.environ.setdefault('BOT_TOKEN', 'benchmark-token')
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.database.crud import user_search
+from app.database.crud.user import build_users_filters
+from app.database.models import User
+
+
+QUERIES = ('ivan', 'petrov', 'user_1234', 'zz', '12345678')
+NAMES = ('Ivan', 'Petr', 'Anna', 'Maria', 'Alex', 'Olga', 'Dmitry', 'Elena')
+SURNAMES = ('Petrov', 'Ivanova', 'Smirnov', 'Kuznetsova', 'Popov', None)
+
+
+def _fill(connection, users: int, rng: random.Random) -> None:
+    batch = []
+    for index in range(1, users + 1):
+        suffix = ''.join(rng.choices(string.ascii_lowercase, k=4))
+        batch.append(
+            {
+                'id': index,
+                'telegram_id': 10_000_000 + index,
+                'first_name': rng.choice(NAMES),
+                'last_name': rng.choice(SURNAMES),
+                'username': f'user_{index}{suffix}' if rng.random() < 0.7 else None,
+                'referral_code': f'ref{index:08d}',
+            }
+        )
+        if len(batch) == 10_000:
+            connection.execute(insert(User), batch)
+            batch.clear()
+    if batch:
+        connection.execute(insert(User), batch)
+
+
+def _count_query(term: str, *, fts: bool):
+    original = user_search._sqlite_fts_enabled
+    user_search._sqlite_fts_enabled = lambda: fts
+    try:
+        return select(func.count(User.id)).where(*build_users_filters(search=term))
+    finally:
+        user_search._sqlite_fts_enabled = original
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    migration = importlib.import_module('migrations.alembic.versions.0019_add_user_search_indexes')
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f'sqlite:///{Path(directory) / "bench.db"}')
+        User.__table__.create(engine)
+        with engine.begin() as connection:
+            _fill(connection, args.users, random.Random(42))
+            for statement in migration.SQLITE_FTS_STATEMENTS:
+                connection.execute(text(statement))
+
+        print(f'users={args.users} repeat={args.repeat}')
+        with engine.connect() as connection:
+            for term in QUERIES:
+                timings = {}
+                counts = {}
+                for label, enabled in (('LIKE', False), ('FTS5', True)):
+                    query = _count_query(term, fts=enabled)
+                    counts[label] = connection.execute(query).scalar_one()
+                    timings[label] = timeit.timeit(lambda query=query: connection.execute(query), number=args.repeat)
+                if counts['LIKE'] != counts['FTS5']:
+                    raise SystemExit(f'Разные результаты для {term!r}: {counts}')
+                like_ms = timings['LIKE'] / args.repeat * 1000
+                fts_ms = timings['FTS5'] / args.repeat * 1000
+                print(
+                    f'{term!r:<14} rows={counts["LIKE"]:<7} LIKE {like_ms:8.3f} ms  '
+                    f'index {fts_ms:8.3f} ms  x{like_ms / fts_ms:.1f}'
+                )
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -38,10 +38,14 @@ from app.services.payment_verification_service import (
 from app.services.referral_contest_service import referral_contest_service
 from app.services.remnawave_sync_service import remnawave_sync_service
 from app.services.reporting_service import reporting_service
+from app.services.server_counter_service import server_counter_service
+from app.services.stats_rollup_service import stats_rollup_service
+from app.services.subscription_expiry_scheduler import subscription_expiry_scheduler
 from app.services.system_settings_service import bot_configuration_service
 from app.services.traffic_monitoring_service import traffic_monitoring_scheduler
 from app.services.version_service import version_service
 from app.services.web_api_token_service import ensure_default_web_api_token
+from app.services.webhook_service import webhook_service
 from app.utils.log_handlers import ExcludePaymentFilter, LevelFilterHandler
 from app.utils.payment_logger import configure_payment_logger
 from app.utils.startup_timeline import StartupTimeline
@@ -511,6 +515,29 @@ async def main():
             else:
                 stage.skip('NaloGO отключен настройками')
 
+        async with timeline.stage(
+            'Очередь исходящих webhooks',
+            '📤',
+            success_message='Воркер доставки webhooks запущен',
+        ):
+            webhook_service.start_delivery_worker()
+
+        async with timeline.stage(
+            'Агрегаты статистики',
+            '📊',
+            success_message='Сверка агрегатов статистики запущена',
+        ) as stage:
+            stats_rollup_service.start()
+            if not stats_rollup_service.is_running():
+                stage.skip('Агрегаты статистики отключены настройками')
+
+        async with timeline.stage(
+            'Счётчики серверов',
+            '🧮',
+            success_message='Свёртка журнала счётчиков серверов запущена',
+        ):
+            server_counter_service.start()
+
         async with timeline.stage(
             'Внешняя админка',
             '🛡️',
@@ -617,8 +644,10 @@ async def main():
             '📈',
             success_message='Служба мониторинга запущена',
         ) as stage:
+            subscription_expiry_scheduler.start()
             monitoring_task = asyncio.create_task(monitoring_service.start_monitoring())
             stage.log(f'Интервал опроса: {settings.MONITORING_INTERVAL}с')
+            stage.log('Истечение подписок и предупреждения — по ближайшему сроку')
 
         async with timeline.stage(
             'Служба техработ',
@@ -836,6 +865,12 @@ async def main():
             except asyncio.CancelledError:
                 pass
 
+        logger.info('ℹ️ Остановка планировщика истечения подписок...')
+        try:
+            await subscription_expiry_scheduler.stop()
+        except Exception as e:
+            logger.error('Ошибка остановки планировщика истечения подписок', error=e)
+
         if maintenance_task and not maintenance_task.done():
             logger.info('ℹ️ Остановка службы техработ...')
             await maintenance_service.stop_monitoring()
@@ -908,6 +943,24 @@ async def main():
         except Exception as e:
             logger.error('Ошибка остановки очереди чеков NaloGO', error=e)
 
+        logger.info('ℹ️ Остановка очереди исходящих webhooks...')
+        try:
+            await webhook_service.stop_delivery_worker()
+        except Exception as e:
+            logger.error('Ошибка остановки очереди исходящих webhooks', error=e)
+
+        logger.info('ℹ️ Остановка сверки агрегатов статистики...')
+        try:
+            await stats_rollup_service.stop()
+        except Exception as e:
+            logger.error('Ошибка остановки сверки агрегатов статистики', error=e)
+
+        logger.info('ℹ️ Остановка свёртки счётчиков серверов...')
+        try:
+            await server_counter_service.stop()
+        except Exception as e:
+            logger.error('Ошибка остановки свёртки счётчиков серверов', error=e)
+
         logger.info('ℹ️ Остановка сервиса бекапов...')
         try:
             await backup_service.stop_auto_backup()
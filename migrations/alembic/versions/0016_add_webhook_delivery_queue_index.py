@@ -0,0 +1,28 @@
+"""add webhook delivery queue index, merge 0014 and 0015 heads
+
+Revision ID: 0016
+Revises: 0014, 0015
+Create Date: 2026-10-19
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '0016'
+down_revision: Union[str, Sequence[str], None] = ('0014', '0015')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_webhook_deliveries_status_next_retry',
+        'webhook_deliveries',
+        ['status', 'next_retry_at'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_deliveries_status_next_retry', table_name='webhook_deliveries')
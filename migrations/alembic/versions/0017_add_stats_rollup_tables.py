@@ -0,0 +1,67 @@
+"""add daily statistics rollup tables
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19
+
+Tables are filled by the nightly reconciliation in StatsRollupService
+(the first run backfills history); completed transactions also update
+stats_daily_revenue incrementally.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0017'
+down_revision: Union[str, None] = '0016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stats_daily_activity',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('registrations', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('referred_registrations', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('trials', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('paid_subscriptions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('conversions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reconciled_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    op.create_table(
+        'stats_daily_revenue',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('payment_method', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount_kopeks', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('abs_amount_kopeks', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'type', 'payment_method'),
+    )
+    op.create_table(
+        'stats_daily_referrals',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('referrer_id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('invited_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('earnings_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('earnings_kopeks', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'referrer_id', 'campaign_id'),
+    )
+    op.create_index(
+        'ix_stats_daily_referrals_referrer_day',
+        'stats_daily_referrals',
+        ['referrer_id', 'day'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stats_daily_referrals_referrer_day', table_name='stats_daily_referrals')
+    op.drop_table('stats_daily_referrals')
+    op.drop_table('stats_daily_revenue')
+    op.drop_table('stats_daily_activity')
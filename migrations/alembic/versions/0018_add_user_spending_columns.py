@@ -0,0 +1,56 @@
+"""add denormalized spending columns to users
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-19
+
+users.total_spent_kopeks / purchase_count / last_purchase_at aggregate
+completed subscription payments (absolute amounts). They are backfilled
+here in one statement and then kept current by ORM hooks on transactions
+(app.database.crud.user_spending); reconcile_user_spending fixes drift.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0018'
+down_revision: Union[str, None] = '0017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('total_spent_kopeks', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column('purchase_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column('last_purchase_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.execute("""
+        UPDATE users
+        SET total_spent_kopeks = spending.total_spent,
+            purchase_count = spending.purchase_count,
+            last_purchase_at = spending.last_purchase_at
+        FROM (
+            SELECT user_id,
+                   COALESCE(SUM(ABS(amount_kopeks)), 0) AS total_spent,
+                   COUNT(id) AS purchase_count,
+                   MAX(created_at) AS last_purchase_at
+            FROM transactions
+            WHERE type = 'subscription_payment' AND is_completed = TRUE
+            GROUP BY user_id
+        ) AS spending
+        WHERE users.id = spending.user_id
+    """)
+
+    op.create_index('ix_users_total_spent_created', 'users', ['total_spent_kopeks', 'created_at'])
+    op.create_index('ix_users_purchase_count_created', 'users', ['purchase_count', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_purchase_count_created', table_name='users')
+    op.drop_index('ix_users_total_spent_created', table_name='users')
+    op.drop_column('users', 'last_purchase_at')
+    op.drop_column('users', 'purchase_count')
+    op.drop_column('users', 'total_spent_kopeks')
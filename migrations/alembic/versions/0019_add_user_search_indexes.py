@@ -0,0 +1,90 @@
+"""add indexes for user substring search
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-19
+
+PostgreSQL: pg_trgm GIN indexes on users.first_name / last_name / username /
+email, so ``ILIKE '%term%'`` (term of 3+ characters) is answered from the
+index instead of a sequential scan.
+
+SQLite: an external-content FTS5 table with the trigram tokenizer
+(SQLite 3.34+) kept in sync by triggers; app.database.crud.user_search
+queries it with MATCH.
+"""
+
+import sqlite3
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0019'
+down_revision: Union[str, None] = '0018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRGM_COLUMNS = ('first_name', 'last_name', 'username', 'email')
+
+SQLITE_FTS_STATEMENTS = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_search_fts USING fts5(
+        first_name, last_name, username, email,
+        content='users', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_search_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_search_fts(rowid, first_name, last_name, username, email)
+        VALUES (new.id, new.first_name, new.last_name, new.username, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_search_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_search_fts(users_search_fts, rowid, first_name, last_name, username, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.username, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_search_fts_au
+    AFTER UPDATE OF first_name, last_name, username, email ON users BEGIN
+        INSERT INTO users_search_fts(users_search_fts, rowid, first_name, last_name, username, email)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.username, old.email);
+        INSERT INTO users_search_fts(rowid, first_name, last_name, username, email)
+        VALUES (new.id, new.first_name, new.last_name, new.username, new.email);
+    END
+    """,
+    "INSERT INTO users_search_fts(users_search_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in TRGM_COLUMNS:
+            op.create_index(
+                f'ix_users_{column}_trgm',
+                'users',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                if_not_exists=True,
+            )
+    elif dialect == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34):
+        for statement in SQLITE_FTS_STATEMENTS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        for column in TRGM_COLUMNS:
+            op.drop_index(f'ix_users_{column}_trgm', table_name='users', if_exists=True)
+    elif dialect == 'sqlite':
+        for trigger in ('users_search_fts_ai', 'users_search_fts_ad', 'users_search_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS users_search_fts')
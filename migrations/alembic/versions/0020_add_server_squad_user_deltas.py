@@ -0,0 +1,38 @@
+"""add server squad user delta log
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-19
+
+Purchases append +1/-1 rows here instead of updating server_squads rows;
+ServerCounterService folds them into server_squads.current_users.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0020'
+down_revision: Union[str, None] = '0019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'server_squad_user_deltas',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('server_squad_id', sa.Integer(), nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['server_squad_id'], ['server_squads.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_server_squad_user_deltas_server_squad_id', 'server_squad_user_deltas', ['server_squad_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_server_squad_user_deltas_server_squad_id', table_name='server_squad_user_deltas')
+    op.drop_table('server_squad_user_deltas')
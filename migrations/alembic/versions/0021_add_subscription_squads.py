@@ -0,0 +1,62 @@
+"""add subscription_squads index table
+
+Revision ID: 0021
+Revises: 0020
+Create Date: 2026-10-19
+
+One row per (subscription, squad UUID) mirroring subscriptions.connected_squads,
+backfilled here and then maintained by ORM hooks
+(app.database.crud.subscription_squads). Lookups of subscriptions on a squad
+use ix_subscription_squads_squad_uuid instead of LIKE over the JSON text.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '0021'
+down_revision: Union[str, None] = '0020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'subscription_squads',
+        sa.Column('subscription_id', sa.Integer(), nullable=False),
+        sa.Column('squad_uuid', sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('subscription_id', 'squad_uuid'),
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("""
+            INSERT INTO subscription_squads (subscription_id, squad_uuid)
+            SELECT DISTINCT s.id, squad.value
+            FROM subscriptions s
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(s.connected_squads::json) = 'array'
+                     THEN s.connected_squads::json ELSE '[]'::json END
+            ) AS squad(value)
+            WHERE squad.value <> ''
+        """)
+    elif dialect == 'sqlite':
+        op.execute("""
+            INSERT INTO subscription_squads (subscription_id, squad_uuid)
+            SELECT DISTINCT s.id, squad.value
+            FROM subscriptions s, json_each(
+                CASE WHEN json_valid(s.connected_squads) AND json_type(s.connected_squads) = 'array'
+                     THEN s.connected_squads ELSE '[]' END
+            ) AS squad
+            WHERE squad.type = 'text' AND squad.value <> ''
+        """)
+
+    op.create_index('ix_subscription_squads_squad_uuid', 'subscription_squads', ['squad_uuid'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_subscription_squads_squad_uuid', table_name='subscription_squads')
+    op.drop_table('subscription_squads')
@@ -0,0 +1,32 @@
+"""add subscriptions (status, end_date) index
+
+Revision ID: 0022
+Revises: 0021
+Create Date: 2026-10-19
+
+Backs the expiry scheduler: expired/expiring scans and the "next due
+end_date" lookup are range seeks on status = 'active' ordered by end_date.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0022'
+down_revision: Union[str, None] = '0021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_subscriptions_status_end_date',
+        'subscriptions',
+        ['status', 'end_date'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_subscriptions_status_end_date', table_name='subscriptions')
@@ -0,0 +1,45 @@
+"""In-memory SQLite сессия для тестов запросов: настоящий SQL без aiosqlite."""
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Table, create_engine
+from sqlalchemy.orm import Session
+
+from app.database.models import Base
+
+
+class SyncSessionAdapter:
+    """Асинхронный интерфейс ``AsyncSession`` поверх синхронной сессии."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.queries = 0
+
+    async def execute(self, statement, params=None):
+        self.queries += 1
+        return self.session.execute(statement, params)
+
+    async def flush(self) -> None:
+        self.session.flush()
+
+    async def commit(self) -> None:
+        self.session.commit()
+
+    def add(self, instance) -> None:
+        self.session.add(instance)
+
+    def get_bind(self):
+        return self.session.get_bind()
+
+
+@contextmanager
+def sqlite_session(tables: Iterable[type | Table], **session_kwargs) -> Iterator[Session]:
+    """Сессия с пустой базой, в которой созданы только таблицы ``tables`` (модели или ``Table``)."""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=list(dict.fromkeys(getattr(table, '__table__', table) for table in tables)))
+    try:
+        with Session(engine, **session_kwargs) as session:
+            yield session
+    finally:
+        engine.dispose()
@@ -0,0 +1,318 @@
+"""Однопроходные агрегаты статистики админки против наивного подсчёта (SQLite)."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.cabinet.routes import admin_stats
+from app.database.aggregates import count_if, sum_if
+from app.database.crud import server_squad as server_squad_crud, transaction as transaction_crud
+from app.database.crud.subscription import get_subscriptions_statistics
+from app.database.models import (
+    ReferralEarning,
+    ServerSquad,
+    Subscription,
+    SubscriptionConversion,
+    SubscriptionServer,
+    SubscriptionSquad,
+    SubscriptionStatus,
+    Tariff,
+    Transaction,
+    TransactionType,
+    User,
+)
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+TABLES = (
+    User,
+    Tariff,
+    Subscription,
+    Transaction,
+    ReferralEarning,
+    ServerSquad,
+    SubscriptionServer,
+    SubscriptionConversion,
+    SubscriptionSquad,
+)
+STATUSES = [status.value for status in SubscriptionStatus]
+TYPES = [transaction_type.value for transaction_type in TransactionType]
+METHODS = [*transaction_crud.REAL_PAYMENT_METHODS[:3], 'manual', None]
+
+
+def _fill(session: Session, rng: random.Random, now: datetime) -> dict:
+    def moment() -> datetime:
+        return now - timedelta(days=rng.uniform(0, 45))
+
+    users = [{'id': index, 'first_name': f'User {index}', 'created_at': moment()} for index in range(1, 31)]
+    for user in users[5:]:
+        if rng.random() < 0.7:
+            user['referred_by_id'] = rng.randrange(1, 6)
+    tariffs = [{'id': index, 'name': f'Tariff {index}', 'display_order': index} for index in range(1, 5)]
+    servers = [
+        {
+            'id': index,
+            'squad_uuid': f'sq-{index}',
+            'display_name': f'Server {index}',
+            'is_available': rng.random() < 0.7,
+        }
+        for index in range(1, 6)
+    ]
+    subscriptions = [
+        {
+            'id': index,
+            'user_id': index,
+            'end_date': now + timedelta(days=30),
+            'status': rng.choice(STATUSES),
+            'is_trial': rng.random() < 0.3,
+            'tariff_id': rng.choice([None, *range(1, 4)]),
+            'created_at': moment(),
+            'connected_squads': rng.sample([server['squad_uuid'] for server in servers[:4]], k=rng.randrange(0, 3)),
+        }
+        for index in range(1, 31)
+    ]
+    transactions = [
+        {
+            'user_id': rng.randrange(1, 31),
+            'type': rng.choice(TYPES),
+            'amount_kopeks': rng.randrange(-50_000, 100_000),
+            'payment_method': rng.choice(METHODS),
+            'is_completed': rng.random() < 0.8,
+            'created_at': moment(),
+        }
+        for _ in range(200)
+    ]
+    earnings = [
+        {
+            'user_id': rng.randrange(1, 6),
+            'referral_id': rng.randrange(6, 31),
+            'amount_kopeks': rng.randrange(0, 10_000),
+            'reason': 'test',
+            'created_at': moment(),
+        }
+        for _ in range(40)
+    ]
+    subscription_servers = [
+        {'subscription_id': rng.randrange(1, 31), 'server_squad_id': rng.randrange(1, 6), 'paid_price_kopeks': 100}
+        for _ in range(10)
+    ]
+
+    for model, rows in (
+        (User, users),
+        (Tariff, tariffs),
+        (ServerSquad, servers),
+        (Subscription, subscriptions),
+        (Transaction, transactions),
+        (ReferralEarning, earnings),
+        (SubscriptionServer, subscription_servers),
+    ):
+        session.execute(insert(model), rows)
+    # Bulk insert обходит ORM-хуки — индекс сквадов заполняется как в миграции
+    session.execute(
+        insert(SubscriptionSquad),
+        [
+            {'subscription_id': subscription['id'], 'squad_uuid': squad_uuid}
+            for subscription in subscriptions
+            for squad_uuid in subscription['connected_squads']
+        ],
+    )
+    return {
+        'users': users,
+        'subscriptions': subscriptions,
+        'transactions': transactions,
+        'earnings': earnings,
+        'servers': servers,
+        'tariffs': tariffs,
+    }
+
+
+@pytest.fixture
+def dataset(request):
+    now = datetime.now(UTC)
+    with sqlite_session(TABLES) as session:
+        data = _fill(session, random.Random(request.param), now)
+        session.commit()
+        yield SyncSessionAdapter(session), data, now
+
+
+def _windows(now: datetime) -> tuple[datetime, datetime, datetime]:
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return today_start, now - timedelta(days=7), now - timedelta(days=30)
+
+
+def test_conditional_aggregates_render_per_dialect() -> None:
+    stmt = select(
+        count_if(Transaction.is_completed == True),
+        sum_if(Transaction.amount_kopeks, Transaction.is_completed == True),
+    )
+
+    assert 'FILTER (WHERE' in str(stmt.compile(dialect=postgresql.dialect()))
+    sqlite_sql = str(stmt.compile(dialect=sqlite.dialect()))
+    assert 'FILTER' not in sqlite_sql
+    assert 'CASE WHEN' in sqlite_sql
+
+
+@pytest.mark.parametrize('dataset', range(5), indirect=True)
+async def test_tariff_stats_match_naive_counts(dataset) -> None:
+    db, data, now = dataset
+    today_start, week_ago, month_ago = _windows(now)
+
+    stats = await admin_stats._get_tariff_stats(db)
+
+    assert db.queries == 2
+    for item in stats.tariffs:
+        subs = [sub for sub in data['subscriptions'] if sub['tariff_id'] == item.tariff_id]
+        active = [sub for sub in subs if sub['status'] == 'active']
+        paid = [sub for sub in subs if not sub['is_trial']]
+        assert item.active_subscriptions == len(active)
+        assert item.trial_subscriptions == sum(sub['is_trial'] for sub in active)
+        assert item.purchased_today == sum(sub['created_at'] >= today_start for sub in paid)
+        assert item.purchased_week == sum(sub['created_at'] >= week_ago for sub in paid)
+        assert item.purchased_month == sum(sub['created_at'] >= month_ago for sub in paid)
+    assert stats.total_tariff_subscriptions == sum(item.active_subscriptions for item in stats.tariffs)
+
+
+@pytest.mark.parametrize('dataset', range(5), indirect=True)
+async def test_subscription_and_server_stats_match_naive_counts(dataset) -> None:
+    db, data, now = dataset
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    stats = await get_subscriptions_statistics(db)
+
+    subs = data['subscriptions']
+    active = [sub for sub in subs if sub['status'] == 'active']
+    purchases = [
+        tx['created_at']
+        for tx in data['transactions']
+        if tx['type'] == 'subscription_payment'
+        and tx['is_completed']
+        and tx['created_at'] >= today_start - timedelta(30)
+    ]
+    assert stats['total_subscriptions'] == len(subs)
+    assert stats['active_subscriptions'] == len(active)
+    assert stats['trial_subscriptions'] == sum(sub['is_trial'] for sub in active)
+    assert stats['purchased_today'] == sum(created >= today_start for created in purchases)
+    assert stats['purchased_week'] == sum(created >= today_start - timedelta(7) for created in purchases)
+    assert stats['purchased_month'] == len(purchases)
+
+    servers = await server_squad_crud.get_server_statistics(db)
+
+    connected = {squad for sub in subs if sub['status'] in ('active', 'trial') for squad in sub['connected_squads']}
+    assert servers['total_servers'] == len(data['servers'])
+    assert servers['available_servers'] == sum(server['is_available'] for server in data['servers'])
+    assert servers['servers_with_connections'] == len(connected)
+    assert servers['total_revenue_kopeks'] == 1000
+
+
+@pytest.mark.parametrize('dataset', range(5), indirect=True)
+async def test_transaction_stats_match_naive_sums(dataset) -> None:
+    db, data, now = dataset
+    month_start = now - timedelta(days=20)
+    today = datetime.combine(now.date(), datetime.min.time(), tzinfo=UTC)
+
+    stats = await transaction_crud.get_transactions_statistics(db, month_start, now)
+
+    completed = [tx for tx in data['transactions'] if tx['is_completed']]
+    in_period = [tx for tx in completed if month_start <= tx['created_at'] <= now]
+    real_methods = transaction_crud.REAL_PAYMENT_METHODS
+
+    def is_income(tx: dict) -> bool:
+        return tx['type'] == 'deposit' and tx['payment_method'] in real_methods
+
+    income = sum(tx['amount_kopeks'] for tx in in_period if is_income(tx))
+    expenses = sum(tx['amount_kopeks'] for tx in in_period if tx['type'] == 'withdrawal')
+    assert stats['totals'] == {
+        'income_kopeks': income,
+        'expenses_kopeks': expenses,
+        'profit_kopeks': income - expenses,
+        'subscription_income_kopeks': sum(
+            abs(tx['amount_kopeks']) for tx in in_period if tx['type'] == 'subscription_payment'
+        ),
+    }
+    todays = [tx for tx in completed if tx['created_at'] >= today]
+    assert stats['today'] == {
+        'transactions_count': len(todays),
+        'income_kopeks': sum(tx['amount_kopeks'] for tx in todays if is_income(tx)),
+    }
+
+    for transaction_type, entry in stats['by_type'].items():
+        rows = [tx['amount_kopeks'] for tx in in_period if tx['type'] == transaction_type]
+        assert entry == {'count': len(rows), 'amount': sum(rows)}
+    assert sum(entry['count'] for entry in stats['by_type'].values()) == len(in_period)
+    for method, entry in stats['by_payment_method'].items():
+        rows = [tx['amount_kopeks'] for tx in in_period if tx['type'] == 'deposit' and tx['payment_method'] == method]
+        assert entry == {'count': len(rows), 'amount': sum(rows)}
+
+
+@pytest.mark.parametrize('dataset', range(5), indirect=True)
+async def test_referrer_and_payment_totals_match_naive_sums(dataset) -> None:
+    db, data, now = dataset
+    today_start, week_ago, month_ago = _windows(now)
+
+    referrers = await admin_stats.get_top_referrers(limit=100, admin=None, db=db)
+
+    assert db.queries == 3
+    for item in referrers.by_invited:
+        invited = [user['created_at'] for user in data['users'] if user.get('referred_by_id') == item.user_id]
+        earned = [
+            (row['created_at'], row['amount_kopeks']) for row in data['earnings'] if row['user_id'] == item.user_id
+        ]
+        assert item.invited_count == len(invited)
+        assert item.invited_today == sum(created >= today_start for created in invited)
+        assert item.invited_week == sum(created >= week_ago for created in invited)
+        assert item.invited_month == sum(created >= month_ago for created in invited)
+        assert item.earnings_total_kopeks == sum(amount for _, amount in earned)
+        assert item.earnings_week_kopeks == sum(amount for created, amount in earned if created >= week_ago)
+        assert item.earnings_month_kopeks == sum(amount for created, amount in earned if created >= month_ago)
+
+    payments = await admin_stats.get_recent_payments(limit=10, admin=None, db=db)
+
+    deposits = [tx for tx in data['transactions'] if tx['type'] == 'deposit' and tx['is_completed']]
+    assert payments.total_count == sum(tx['type'] in ('deposit', 'subscription_payment') for tx in data['transactions'])
+    assert payments.total_today_kopeks == sum(tx['amount_kopeks'] for tx in deposits if tx['created_at'] >= today_start)
+    assert payments.total_week_kopeks == sum(tx['amount_kopeks'] for tx in deposits if tx['created_at'] >= week_ago)
+
+
+async def test_dashboard_is_served_from_cache(monkeypatch) -> None:
+    stored = {}
+    calls = []
+
+    async def cache_get(key):
+        return stored.get(key)
+
+    async def cache_set(key, value, expire=None):
+        stored[key] = value
+        return True
+
+    async def fake_nodes():
+        calls.append('nodes')
+        return admin_stats.NodesOverview(total=0, online=0, offline=0, disabled=0, total_users_online=0, nodes=[])
+
+    async def fake_stats(*args, **kwargs):
+        calls.append('stats')
+        return {}
+
+    async def fake_revenue(*args, **kwargs):
+        return []
+
+    async def fake_tariffs(db):
+        return None
+
+    monkeypatch.setattr(admin_stats.cache, 'get', cache_get)
+    monkeypatch.setattr(admin_stats.cache, 'set', cache_set)
+    monkeypatch.setattr(admin_stats, '_get_nodes_overview', fake_nodes)
+    monkeypatch.setattr(admin_stats, 'get_subscriptions_statistics', fake_stats)
+    monkeypatch.setattr(admin_stats, 'get_transactions_statistics', fake_stats)
+    monkeypatch.setattr(admin_stats, 'get_server_statistics', fake_stats)
+    monkeypatch.setattr(admin_stats, 'get_revenue_by_period', fake_revenue)
+    monkeypatch.setattr(admin_stats, '_get_tariff_stats', fake_tariffs)
+
+    first = await admin_stats.get_dashboard_stats(admin=None, db=None)
+    second = await admin_stats.get_dashboard_stats(admin=None, db=None)
+
+    assert second == first
+    assert calls.count('nodes') == 1
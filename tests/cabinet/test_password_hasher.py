@@ -0,0 +1,42 @@
+"""Тесты ограниченного пула хеширования паролей кабинета."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.cabinet.auth.password_utils import PasswordHasher, PasswordHasherBusyError
+
+
+async def test_hash_and_verify_run_in_pool() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    try:
+        password_hash = await hasher.hash('correct horse')
+
+        assert await hasher.verify('correct horse', password_hash)
+        assert not await hasher.verify('wrong', password_hash)
+
+        metrics = hasher.get_metrics()
+        assert metrics['completed'] == 3
+        assert metrics['in_flight'] == 0
+        assert metrics['latency_ms']['max'] > 0
+    finally:
+        hasher.shutdown()
+
+
+async def test_saturated_pool_rejects_immediately() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=0)
+    release = threading.Event()
+    try:
+        blocked = asyncio.create_task(hasher._run(release.wait, 5))
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher.hash('password')
+
+        release.set()
+        assert await blocked is True
+        assert hasher.get_metrics()['rejected'] == 1
+    finally:
+        release.set()
+        hasher.shutdown()
@@ -0,0 +1,155 @@
+"""Тесты кеша принципалов кабинета и мемоизации проверки initData."""
+
+import pytest
+
+from app.cabinet.auth import principal_cache as principal_cache_module
+from app.cabinet.auth.principal_cache import (
+    CabinetPrincipal,
+    InitDataCache,
+    PrincipalCache,
+    get_token_cache_id,
+)
+from app.database.models import User
+from tests._sqlite_session import sqlite_session
+
+
+def _principal(user_id: int = 1, **overrides) -> CabinetPrincipal:
+    values = {
+        'id': user_id,
+        'telegram_id': 1000 + user_id,
+        'status': 'active',
+        'username': 'user',
+        'email': 'user@example.com',
+        'email_verified': False,
+    }
+    values.update(overrides)
+    return CabinetPrincipal(**values)
+
+
+def test_principal_cache_returns_entry_per_token() -> None:
+    cache = PrincipalCache(ttl_seconds=60)
+    principal = _principal()
+
+    cache.set(principal, 'jti-1')
+
+    assert cache.get(1, 'jti-1') is principal
+    assert cache.get(1, 'jti-2') is None
+    assert cache.get(2, 'jti-1') is None
+
+
+def test_principal_cache_expires_entries(monkeypatch) -> None:
+    cache = PrincipalCache(ttl_seconds=10)
+    now = 1000.0
+    monkeypatch.setattr(principal_cache_module.time, 'monotonic', lambda: now)
+
+    cache.set(_principal(), 'jti')
+    now += 11
+
+    assert cache.get(1, 'jti') is None
+
+
+def test_principal_cache_disabled_with_zero_ttl() -> None:
+    cache = PrincipalCache(ttl_seconds=0)
+    cache.set(_principal(), 'jti')
+
+    assert cache.get(1, 'jti') is None
+
+
+def test_invalidate_user_drops_all_tokens_of_user() -> None:
+    cache = PrincipalCache(ttl_seconds=60)
+    cache.set(_principal(1), 'a')
+    cache.set(_principal(1), 'b')
+    cache.set(_principal(2), 'a')
+
+    cache.invalidate_user(1)
+
+    assert cache.get(1, 'a') is None
+    assert cache.get(1, 'b') is None
+    assert cache.get(2, 'a') is not None
+
+
+@pytest.fixture
+def session():
+    with sqlite_session([User]) as session:
+        yield session
+
+
+def test_user_change_invalidates_global_cache_after_commit(monkeypatch, session) -> None:
+    cache = PrincipalCache(ttl_seconds=60)
+    monkeypatch.setattr(principal_cache_module, 'principal_cache', cache)
+    session.add_all([User(id=5, telegram_id=105, status='active'), User(id=6, telegram_id=106, status='active')])
+    session.commit()
+    cache.set(_principal(5), 'jti')
+    cache.set(_principal(6), 'jti')
+
+    session.get(User, 5).status = 'blocked'
+    session.get(User, 6).balance_kopeks = 100
+    session.flush()
+    # До коммита параллельный читатель всё равно видит старую строку — сбрасывать рано
+    assert cache.get(5, 'jti') is not None
+
+    session.commit()
+    assert cache.get(5, 'jti') is None
+    # Поля, которых нет в принципале, кеш не трогают
+    assert cache.get(6, 'jti') is not None
+
+
+def test_rolled_back_change_keeps_cache(monkeypatch, session) -> None:
+    cache = PrincipalCache(ttl_seconds=60)
+    monkeypatch.setattr(principal_cache_module, 'principal_cache', cache)
+    session.add(User(id=5, telegram_id=105, status='active'))
+    session.commit()
+    cache.set(_principal(5), 'jti')
+
+    session.get(User, 5).status = 'blocked'
+    session.flush()
+    session.rollback()
+    session.commit()
+
+    assert cache.get(5, 'jti') is not None
+
+
+def test_verified_email_requires_verification() -> None:
+    assert _principal(email_verified=False).verified_email is None
+    assert _principal(email_verified=True).verified_email == 'user@example.com'
+
+
+def test_token_cache_id_prefers_jti() -> None:
+    assert get_token_cache_id('token', {'jti': 'abc'}) == 'abc'
+    assert get_token_cache_id('token', {}) == get_token_cache_id('token', {})
+    assert get_token_cache_id('token', {}) != get_token_cache_id('other', {})
+
+
+def test_init_data_cache_memoizes_validation(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def fake_validate(init_data: str, max_age_seconds: int = 86400):
+        calls.append(init_data)
+        return {'id': 42} if init_data == 'valid' else None
+
+    monkeypatch.setattr(principal_cache_module, 'validate_telegram_init_data', fake_validate)
+    cache = InitDataCache()
+
+    assert cache.validate('valid', max_age_seconds=60) == {'id': 42}
+    assert cache.validate('valid', max_age_seconds=60) == {'id': 42}
+    assert cache.validate('invalid', max_age_seconds=60) is None
+    assert cache.validate('invalid', max_age_seconds=60) is None
+
+    assert calls == ['valid', 'invalid']
+
+
+async def test_admin_dependency_uses_principal(monkeypatch) -> None:
+    from fastapi import HTTPException
+
+    from app.cabinet.dependencies import get_current_admin_user
+    from app.config import settings
+
+    monkeypatch.setattr(settings, 'ADMIN_IDS', '1001')
+
+    legacy_admin = _principal(1)
+    assert await get_current_admin_user(legacy_admin) is legacy_admin
+    role_admin = _principal(2, role_level=10)
+    assert await get_current_admin_user(role_admin) is role_admin
+    with pytest.raises(HTTPException) as denied:
+        await get_current_admin_user(_principal(3))
+    assert denied.value.status_code == 403
@@ -0,0 +1,92 @@
+"""Core-строки горячих чтений совпадают с ORM-объектами (SQLite)."""
+
+from dataclasses import FrozenInstanceError, fields
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.database.crud.fast_read import (
+    get_subscription_row_by_user_id,
+    get_tariff_row_by_id,
+    get_user_channel_sub_rows,
+    get_user_row_by_id,
+    get_user_row_by_telegram_id,
+)
+from app.database.models import Subscription, Tariff, User, UserChannelSubscription
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+TABLES = [User.__table__, Subscription.__table__, Tariff.__table__, UserChannelSubscription.__table__]
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES, expire_on_commit=False) as session:
+        yield session
+
+
+def _assert_matches(row, orm_object) -> None:
+    for field in fields(row):
+        assert getattr(row, field.name) == getattr(orm_object, field.name), field.name
+
+
+async def test_rows_match_orm_objects(session) -> None:
+    now = datetime.now(UTC)
+    tariff = Tariff(id=3, name='Pro', is_daily=True, daily_price_kopeks=1500, period_prices={'30': 29900})
+    users = [
+        User(id=1, telegram_id=101, first_name='Anna', last_name='Petrova', referral_code='ref1', balance_kopeks=500),
+        User(id=2, telegram_id=None, email='mail@example.com', referral_code='ref2'),
+        User(id=3, telegram_id=103, username='nick', referral_code='ref3'),
+    ]
+    subscription = Subscription(
+        user_id=1, status='active', end_date=now + timedelta(days=3), connected_squads=['sq-a'], tariff_id=3
+    )
+    session.add_all([tariff, *users, subscription])
+    session.add_all(
+        UserChannelSubscription(telegram_id=101, channel_id=channel_id, is_member=is_member, checked_at=now)
+        for channel_id, is_member in (('-1001', True), ('-1002', False))
+    )
+    session.commit()
+    db = SyncSessionAdapter(session)
+
+    for user in users:
+        row = await get_user_row_by_id(db, user.id)
+        _assert_matches(row, user)
+        assert row.full_name == user.full_name
+    assert await get_user_row_by_telegram_id(db, 101) == await get_user_row_by_id(db, 1)
+    assert await get_user_row_by_telegram_id(db, 999) is None
+
+    subscription_row = await get_subscription_row_by_user_id(db, 1)
+    _assert_matches(subscription_row, subscription)
+    assert subscription_row.is_active
+    assert await get_subscription_row_by_user_id(db, 3) is None
+
+    _assert_matches(await get_tariff_row_by_id(db, 3), tariff)
+    assert {(row.channel_id, row.is_member) for row in await get_user_channel_sub_rows(db, 101)} == {
+        ('-1001', True),
+        ('-1002', False),
+    }
+    assert await get_user_channel_sub_rows(db, 103) == []
+
+    with pytest.raises(FrozenInstanceError):
+        subscription_row.status = 'disabled'
+    assert not hasattr(subscription_row, '__dict__')
+
+
+async def test_overdue_active_subscription_reads_as_expired(session) -> None:
+    past = datetime.now(UTC) - timedelta(hours=1)
+    session.add_all(
+        [
+            Subscription(user_id=1, status='active', end_date=past),
+            Subscription(user_id=2, status='active', end_date=past, is_daily_paused=True),
+        ]
+    )
+    session.commit()
+    db = SyncSessionAdapter(session)
+
+    expired = await get_subscription_row_by_user_id(db, 1)
+    assert expired.status == 'expired'
+    assert not expired.is_active
+    # Суточная подписка на паузе не истекает; в базе статус не меняется
+    assert (await get_subscription_row_by_user_id(db, 2)).status == 'active'
+    assert session.get(Subscription, expired.id).status == 'active'
@@ -0,0 +1,126 @@
+"""Пакетный импорт пользователей панели: upsert пользователей, подписок и сквадов (SQLite)."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.database.crud.panel_import import PanelImportRow, import_panel_users
+from app.database.models import PromoGroup, Subscription, SubscriptionSquad, User
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+# Вместе со связями: поиск группы по умолчанию подгружает её сквады
+TABLES = [
+    table
+    for model in (User, Subscription, PromoGroup)
+    for relationship in model.__mapper__.relationships
+    for table in (relationship.mapper.local_table, relationship.secondary)
+    if table is not None
+] + [User.__table__, Subscription.__table__, SubscriptionSquad.__table__, PromoGroup.__table__]
+SQUADS = ('sq-a', 'sq-b', 'sq-c')
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES) as session:
+        yield session
+
+
+def _row(telegram_id: int, end_date: datetime, squads: list[str]) -> PanelImportRow:
+    return PanelImportRow(
+        telegram_id=telegram_id,
+        username=f'user{telegram_id}',
+        first_name=f'User {telegram_id}',
+        last_name=None,
+        remnawave_uuid=f'uuid-{telegram_id}',
+        subscription={
+            'status': 'active',
+            'is_trial': False,
+            'end_date': end_date,
+            'traffic_limit_gb': 100,
+            'traffic_used_gb': 1.5,
+            'device_limit': 3,
+            'connected_squads': squads,
+            'remnawave_short_uuid': f'short-{telegram_id}',
+            'subscription_url': f'https://sub.example/{telegram_id}',
+            'subscription_crypto_link': '',
+        },
+    )
+
+
+async def test_import_creates_users_subscriptions_and_squads(session) -> None:
+    rng = random.Random(48)
+    now = datetime(2026, 6, 1, tzinfo=UTC)
+    rows = [
+        _row(telegram_id, now + timedelta(days=rng.randrange(1, 60)), rng.sample(SQUADS, rng.randrange(0, 3)))
+        for telegram_id in range(1000, 1037)
+    ]
+    # Дубликат telegram_id в одном импорте — берётся последняя запись
+    rows.append(_row(1000, now + timedelta(days=90), ['sq-c']))
+
+    result = await import_panel_users(SyncSessionAdapter(session), rows, chunk_size=10)
+    session.commit()
+
+    assert (result.users_created, result.users_existing, result.subscriptions) == (37, 0, 37)
+    users = session.execute(select(User)).scalars().all()
+    assert len(users) == 37
+    assert len({user.referral_code for user in users}) == 37
+    default_group = session.execute(select(PromoGroup).where(PromoGroup.is_default.is_(True))).scalar_one()
+    assert {user.promo_group_id for user in users} == {default_group.id}
+
+    expected = {row.telegram_id: row for row in rows}
+    subscriptions = session.execute(select(User.telegram_id, Subscription).join(Subscription.user)).all()
+    squads: dict[int, set[str]] = {}
+    for subscription_id, squad_uuid in session.execute(
+        select(SubscriptionSquad.subscription_id, SubscriptionSquad.squad_uuid)
+    ):
+        squads.setdefault(subscription_id, set()).add(squad_uuid)
+    for telegram_id, subscription in subscriptions:
+        row = expected[telegram_id]
+        assert subscription.end_date.replace(tzinfo=UTC) == row.subscription['end_date']
+        assert squads.get(subscription.id, set()) == set(row.subscription['connected_squads'])
+
+
+async def test_reimport_updates_panel_fields_and_keeps_later_end_date(session) -> None:
+    now = datetime(2026, 6, 1, tzinfo=UTC)
+    db = SyncSessionAdapter(session)
+    expired = _row(2, now, ['sq-a'])
+    expired.subscription['status'] = 'expired'
+    await import_panel_users(db, [_row(1, now + timedelta(days=30), ['sq-a']), expired])
+    session.commit()
+    codes = dict(session.execute(select(User.telegram_id, User.referral_code)).all())
+
+    later = _row(1, now + timedelta(days=5), ['sq-b'])
+    later.subscription['traffic_limit_gb'] = 200
+    later.subscription['status'] = 'expired'
+    result = await import_panel_users(
+        db, [later, _row(2, now + timedelta(days=10), []), _row(3, now + timedelta(days=1), ['sq-c'])]
+    )
+    session.commit()
+    session.expire_all()
+
+    assert (result.users_created, result.users_existing, result.subscriptions) == (1, 2, 3)
+    assert session.execute(select(User.telegram_id, User.referral_code).where(User.telegram_id < 3)).all() == sorted(
+        codes.items()
+    )
+    by_telegram_id = {
+        telegram_id: subscription
+        for telegram_id, subscription in session.execute(select(User.telegram_id, Subscription).join(Subscription.user))
+    }
+    # end_date панели раньше текущего — не откатываем продление из бота
+    assert by_telegram_id[1].end_date.replace(tzinfo=UTC) == now + timedelta(days=30)
+    assert by_telegram_id[1].traffic_limit_gb == 200
+    # Активную подписку панель не гасит, истёкшую — продлевает
+    assert by_telegram_id[1].status == 'active'
+    assert by_telegram_id[2].end_date.replace(tzinfo=UTC) == now + timedelta(days=10)
+    assert by_telegram_id[2].status == 'active'
+    assert set(
+        session.execute(
+            select(SubscriptionSquad.squad_uuid).where(SubscriptionSquad.subscription_id == by_telegram_id[1].id)
+        ).scalars()
+    ) == {'sq-b'}
+    assert not session.execute(
+        select(SubscriptionSquad).where(SubscriptionSquad.subscription_id == by_telegram_id[2].id)
+    ).first()
@@ -0,0 +1,90 @@
+"""Счётчики пользователей серверов через журнал изменений (SQLite)."""
+
+import pytest
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.database.crud import server_squad as server_squad_crud
+from app.database.crud.server_squad import (
+    add_user_to_servers,
+    fold_server_user_deltas,
+    get_server_user_counts,
+    remove_user_from_servers,
+    update_server_user_counts,
+)
+from app.database.models import ServerSquad, ServerSquadUserDelta
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+@pytest.fixture
+def session(monkeypatch):
+    invalidated = []
+
+    async def fake_invalidate(content_type):
+        invalidated.append(content_type)
+
+    monkeypatch.setattr(server_squad_crud.content_cache, 'invalidate', fake_invalidate)
+
+    with sqlite_session([ServerSquad, ServerSquadUserDelta]) as session:
+        session.execute(
+            insert(ServerSquad),
+            [
+                {'id': 1, 'squad_uuid': 'a', 'display_name': 'A', 'current_users': 10, 'max_users': 12},
+                {'id': 2, 'squad_uuid': 'b', 'display_name': 'B', 'current_users': 0},
+                {'id': 3, 'squad_uuid': 'c', 'display_name': 'C', 'current_users': 5},
+            ],
+        )
+        session.commit()
+        session.info['invalidated'] = invalidated
+        yield session
+
+
+def _stored_counts(session: Session) -> dict[int, int]:
+    return dict(session.execute(select(ServerSquad.id, ServerSquad.current_users)).all())
+
+
+async def test_purchases_append_deltas_without_touching_server_rows(session) -> None:
+    db = SyncSessionAdapter(session)
+    statements = []
+    event.listen(session.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    await add_user_to_servers(db, [1, 2])
+    await add_user_to_servers(db, [1])
+    await remove_user_from_servers(db, [2, 3])
+    await update_server_user_counts(db, add_ids=[3, 2], remove_ids=[2, 1])
+    session.commit()
+
+    assert not [statement for statement in statements if 'UPDATE server_squads' in statement]
+    assert _stored_counts(session) == {1: 10, 2: 0, 3: 5}
+    assert await get_server_user_counts(db) == {1: 11, 2: 0, 3: 5}
+    assert await get_server_user_counts(db, [3]) == {3: 5}
+    assert await get_server_user_counts(db, []) == {}
+
+
+async def test_fold_moves_deltas_into_current_users(session) -> None:
+    db = SyncSessionAdapter(session)
+    await add_user_to_servers(db, [1, 1, 2])
+    await remove_user_from_servers(db, [3])
+    await remove_user_from_servers(db, [2])
+    await remove_user_from_servers(db, [2])
+    session.commit()
+    before = await get_server_user_counts(db)
+
+    assert await fold_server_user_deltas(db) == 3
+    # Счётчик не уходит в минус, даже если уменьшений больше, чем было пользователей
+    assert _stored_counts(session) == before == {1: 12, 2: 0, 3: 4}
+    assert session.execute(select(ServerSquadUserDelta)).first() is None
+    assert session.info['invalidated']
+
+    assert await fold_server_user_deltas(db) == 0
+    assert _stored_counts(session) == before
+
+
+def test_delta_log_lock_is_shared_for_writers_and_exclusive_for_sync() -> None:
+    assert server_squad_crud.user_deltas_lock_statement('sqlite', shared=True) is None
+
+    writer = server_squad_crud.user_deltas_lock_statement('postgresql', shared=True)
+    sync = server_squad_crud.user_deltas_lock_statement('postgresql', shared=False)
+    assert 'pg_advisory_xact_lock_shared(' in str(writer.compile(dialect=postgresql.dialect()))
+    assert 'pg_advisory_xact_lock(' in str(sync.compile(dialect=postgresql.dialect()))
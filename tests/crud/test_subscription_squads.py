@@ -0,0 +1,106 @@
+"""Индекс сквадов подписок: ORM-хуки, сверка и выборка по скваду (SQLite)."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.database.crud.subscription_squads import on_squad, reconcile_subscription_squads, subscription_ids_on_squads
+from app.database.models import Subscription, SubscriptionSquad
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+TABLES = dict.fromkeys(
+    (
+        Subscription,
+        SubscriptionSquad,
+        *(relationship.mapper.class_ for relationship in Subscription.__mapper__.relationships),
+    )
+)
+SQUADS = ('sq-a', 'sq-b', 'sq-c', 'sq-d')
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES) as session:
+        yield session
+
+
+def _subscription(user_id: int, squads) -> Subscription:
+    return Subscription(
+        user_id=user_id, status='active', end_date=datetime.now(UTC) + timedelta(days=30), connected_squads=squads
+    )
+
+
+def _indexed(session: Session) -> dict[int, set[str]]:
+    indexed: dict[int, set[str]] = {}
+    for subscription_id, squad_uuid in session.execute(
+        select(SubscriptionSquad.subscription_id, SubscriptionSquad.squad_uuid)
+    ):
+        indexed.setdefault(subscription_id, set()).add(squad_uuid)
+    return indexed
+
+
+def _on_squad(session: Session, squad_uuid: str) -> set[int]:
+    return set(session.execute(select(Subscription.id).where(on_squad(squad_uuid))).scalars())
+
+
+def test_hooks_follow_connected_squads(session) -> None:
+    first = _subscription(1, ['sq-a', 'sq-b', 'sq-a', '', None])
+    second = _subscription(2, [])
+    session.add_all([first, second])
+    session.commit()
+    assert _indexed(session) == {first.id: {'sq-a', 'sq-b'}}
+
+    # Переприсваивание списка и изменение других полей
+    first.connected_squads = ['sq-c']
+    second.connected_squads = [*second.connected_squads, 'sq-a']
+    second.device_limit = 3
+    session.commit()
+    first.device_limit = 5
+    session.commit()
+    assert _indexed(session) == {first.id: {'sq-c'}, second.id: {'sq-a'}}
+    assert _on_squad(session, 'sq-a') == {second.id}
+    assert _on_squad(session, 'sq-b') == set()
+
+    session.delete(first)
+    session.commit()
+    assert _indexed(session) == {second.id: {'sq-a'}}
+
+
+async def test_reconcile_repairs_bulk_changes(session) -> None:
+    rng = random.Random(11)
+    expected = {}
+    for user_id in range(1, 41):
+        squads = rng.sample(SQUADS, rng.randint(0, 3))
+        subscription = _subscription(user_id, squads)
+        session.add(subscription)
+        session.flush()
+        expected[subscription.id] = set(squads)
+    session.commit()
+
+    # Изменения в обход ORM-объектов хуки не видят
+    session.execute(update(Subscription).where(Subscription.id <= 5).values(connected_squads=['sq-d']))
+    session.execute(delete(SubscriptionSquad).where(SubscriptionSquad.subscription_id.in_([6, 7])))
+    session.execute(insert(SubscriptionSquad), [{'subscription_id': 8, 'squad_uuid': 'stale'}])
+    session.commit()
+    expected.update({subscription_id: {'sq-d'} for subscription_id in range(1, 6)})
+    drifted = {
+        subscription_id
+        for subscription_id in range(1, 9)
+        if _indexed(session).get(subscription_id, set()) != expected[subscription_id]
+    }
+
+    fixed = await reconcile_subscription_squads(SyncSessionAdapter(session), batch_size=7)
+
+    assert fixed == len(drifted)
+    assert _indexed(session) == {subscription_id: squads for subscription_id, squads in expected.items() if squads}
+    for squad_uuid in SQUADS:
+        assert _on_squad(session, squad_uuid) == {
+            subscription_id for subscription_id, squads in expected.items() if squad_uuid in squads
+        }
+    on_any = set(session.execute(subscription_ids_on_squads(['sq-a', 'sq-b'])).scalars())
+    assert on_any == {subscription_id for subscription_id, squads in expected.items() if squads & {'sq-a', 'sq-b'}}
+    assert await reconcile_subscription_squads(SyncSessionAdapter(session)) == 0
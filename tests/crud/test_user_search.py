@@ -0,0 +1,90 @@
+"""Поиск пользователей: FTS5-индекс SQLite из миграции 0019 и точные совпадения."""
+
+import importlib
+import random
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from app.database.crud import user_search
+from app.database.crud.user import build_users_filters
+from app.database.models import User
+
+
+pytestmark = pytest.mark.skipif(
+    sqlite3.sqlite_version_info < user_search.SQLITE_TRIGRAM_VERSION, reason='нет trigram-токенизатора FTS5'
+)
+
+migration = importlib.import_module('migrations.alembic.versions.0019_add_user_search_indexes')
+
+WORDS = ('Иван', 'ivan', 'Petrov', 'Анна', 'maria', 'O"Neil', 'user_42', 'Kuznetsova', None)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(user_search, '_sqlite_fts_enabled', lambda: True)
+    engine = create_engine('sqlite://')
+    User.__table__.create(engine)
+    with engine.begin() as connection:
+        for statement in migration.SQLITE_FTS_STATEMENTS:
+            connection.execute(text(statement))
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _search(session: Session, **filters) -> set[int]:
+    return set(session.execute(select(User.id).where(*build_users_filters(**filters))).scalars())
+
+
+def _expected(session: Session, term: str, columns=('first_name', 'last_name', 'username')) -> set[int]:
+    rows = session.execute(select(User.id, *(getattr(User, column) for column in columns))).all()
+    return {row[0] for row in rows if any(value and term.casefold() in value.casefold() for value in row[1:])}
+
+
+async def test_fts_search_matches_substring_scan(session) -> None:
+    rng = random.Random(7)
+    session.execute(
+        insert(User),
+        [
+            {
+                'id': index,
+                'telegram_id': 1_000_000 + index,
+                'first_name': rng.choice(WORDS) or 'Имя',
+                'last_name': rng.choice(WORDS),
+                'username': rng.choice(WORDS),
+                'email': f'{rng.choice(["ivan", "anna"])}{index}@example.com',
+            }
+            for index in range(1, 61)
+        ],
+    )
+    # Триггеры: переименование и удаление видны в индексе
+    session.execute(update(User).where(User.id == 1).values(first_name='Переименован', last_name=None, username=None))
+    session.execute(delete(User).where(User.id == 2))
+    session.commit()
+
+    for term in ('иван', 'IVAN', 'trov', 'o"ne', 'ser_4', 'Переим', 'nothing'):
+        assert _search(session, search=term) == _expected(session, term), term
+    assert _search(session, email='anna1') == _expected(session, 'anna1', columns=('email',))
+    assert _search(session, search='Переим') == {1}
+    assert _search(session, search='ivan')
+
+
+def test_exact_fast_paths_skip_substring_search() -> None:
+    telegram_id = user_search.build_user_search_condition('123456789')
+    referral = user_search.build_user_search_condition(' refAbC12345 ')
+    short_number = user_search.build_user_search_condition('42')
+
+    assert str(telegram_id) == 'users.telegram_id = :telegram_id_1'
+    assert str(referral) == 'users.referral_code = :referral_code_1'
+    assert 'users.telegram_id' in str(short_number)
+    assert 'lower(users.first_name)' in str(short_number)
+
+
+def test_short_terms_fall_back_to_like(monkeypatch) -> None:
+    monkeypatch.setattr(user_search, '_sqlite_fts_enabled', lambda: True)
+
+    assert 'MATCH' not in str(user_search.build_user_search_condition('ab'))
+    assert 'MATCH' in str(user_search.build_user_search_condition('abc'))
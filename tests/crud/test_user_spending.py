@@ -0,0 +1,122 @@
+"""Денормализованные траты пользователя совпадают с подсчётом по транзакциям (SQLite)."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.database.crud.user_spending import get_users_spending, reconcile_user_spending
+from app.database.models import (
+    StatsDailyActivity,
+    StatsDailyReferral,
+    StatsDailyRevenue,
+    Transaction,
+    TransactionType,
+    User,
+)
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+# Удаление транзакции подгружает связанные платежи — их таблицы тоже нужны
+TABLES = dict.fromkeys(
+    (
+        User,
+        Transaction,
+        StatsDailyActivity,
+        StatsDailyRevenue,
+        StatsDailyReferral,
+        *(relationship.mapper.class_ for relationship in Transaction.__mapper__.relationships),
+    )
+)
+TYPES = [TransactionType.DEPOSIT.value, TransactionType.SUBSCRIPTION_PAYMENT.value]
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES) as session:
+        yield session
+
+
+def _expected(session: Session) -> dict[int, dict]:
+    expected = {
+        user_id: {'total_spent': 0, 'purchase_count': 0, 'last_purchase_at': None}
+        for user_id in session.execute(select(User.id)).scalars()
+    }
+    for transaction in session.execute(select(Transaction)).scalars():
+        if not transaction.is_completed or transaction.type != TransactionType.SUBSCRIPTION_PAYMENT.value:
+            continue
+        stats = expected[transaction.user_id]
+        stats['total_spent'] += abs(transaction.amount_kopeks)
+        stats['purchase_count'] += 1
+        last = stats['last_purchase_at']
+        stats['last_purchase_at'] = transaction.created_at if last is None else max(last, transaction.created_at)
+    return expected
+
+
+def _normalize(spending: dict[int, dict]) -> dict[int, dict]:
+    # SQLite теряет tzinfo — сравниваем наивные значения
+    return {
+        user_id: {
+            **stats,
+            'last_purchase_at': stats['last_purchase_at'] and stats['last_purchase_at'].replace(tzinfo=None),
+        }
+        for user_id, stats in spending.items()
+    }
+
+
+@pytest.mark.parametrize('seed', range(3))
+async def test_hooks_keep_spending_in_sync(session, seed) -> None:
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+    session.add_all(User(id=index, first_name=f'User {index}') for index in range(1, 11))
+    session.commit()
+
+    transactions: list[Transaction] = []
+    for _ in range(80):
+        action = rng.random()
+        if action < 0.6 or not transactions:
+            transaction = Transaction(
+                user_id=rng.randrange(1, 11),
+                type=rng.choice(TYPES),
+                amount_kopeks=rng.randrange(-50_000, 50_000),
+                is_completed=rng.random() < 0.7,
+                created_at=now - timedelta(hours=rng.randrange(0, 500)),
+            )
+            session.add(transaction)
+            transactions.append(transaction)
+        elif action < 0.8:
+            rng.choice(transactions).is_completed = rng.random() < 0.5
+        elif action < 0.9:
+            transaction = rng.choice(transactions)
+            transaction.user_id = rng.randrange(1, 11)
+            transaction.amount_kopeks = rng.randrange(-50_000, 50_000)
+        else:
+            transaction = transactions.pop(rng.randrange(len(transactions)))
+            session.delete(transaction)
+        session.commit()
+
+    db = SyncSessionAdapter(session)
+    spending = await get_users_spending(db, list(range(1, 11)))
+    assert _normalize(spending) == _normalize(_expected(session))
+    assert await reconcile_user_spending(db) == 0
+
+
+async def test_reconcile_fixes_drift(session) -> None:
+    session.add_all([User(id=1, first_name='A'), User(id=2, first_name='B'), User(id=3, first_name='C')])
+    session.add(
+        Transaction(user_id=1, type=TransactionType.SUBSCRIPTION_PAYMENT.value, amount_kopeks=-9_900, is_completed=True)
+    )
+    session.commit()
+    # Массовое изменение в обход ORM-хуков
+    session.execute(update(User).values(total_spent_kopeks=123, purchase_count=7))
+    session.commit()
+
+    db = SyncSessionAdapter(session)
+    assert await reconcile_user_spending(db, batch_size=2) == 3
+    spending = await get_users_spending(db, [1, 2, 3])
+    assert spending[1]['total_spent'] == 9_900
+    assert spending[1]['purchase_count'] == 1
+    assert spending[2] == {'total_spent': 0, 'purchase_count': 0, 'last_purchase_at': None}
+    assert session.execute(select(func.sum(User.purchase_count))).scalar_one() == 1
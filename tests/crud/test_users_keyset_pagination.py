@@ -0,0 +1,143 @@
+"""Курсорная пагинация списка пользователей совпадает с OFFSET-пагинацией (SQLite)."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.database.crud import user as user_crud
+from app.database.crud.user import (
+    decode_users_cursor,
+    get_users_count_estimate,
+    get_users_list,
+    get_users_next_cursor,
+)
+from app.database.models import PromoGroup, Subscription, Tariff, User, UserStatus
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+TABLES = (User, Subscription, Tariff, PromoGroup)
+SORTS = [
+    {},
+    {'order_by_balance': True},
+    {'order_by_traffic': True},
+    {'order_by_last_activity': True},
+    {'order_by_total_spent': True},
+    {'order_by_purchase_count': True},
+]
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES) as session:
+        yield session
+
+
+def _fill(session: Session, rng: random.Random) -> None:
+    now = datetime.now(UTC)
+    # Малые диапазоны значений — много одинаковых ключей сортировки
+    created = [now - timedelta(days=rng.randrange(0, 5)) for _ in range(5)]
+    users = [
+        {
+            'id': index,
+            'first_name': f'User {index}',
+            'status': rng.choice([UserStatus.ACTIVE.value, UserStatus.BLOCKED.value]),
+            'balance_kopeks': rng.choice([0, 100, 500]),
+            'total_spent_kopeks': rng.choice([0, 1_000, 5_000]),
+            'purchase_count': rng.randrange(0, 3),
+            'last_activity': rng.choice([None, *created]),
+            'created_at': rng.choice(created),
+        }
+        for index in range(1, 74)
+    ]
+    subscriptions = [
+        {'user_id': index, 'end_date': now, 'traffic_used_gb': rng.choice([0.0, 1.5, 7.25])}
+        for index in range(1, 74)
+        if rng.random() < 0.7
+    ]
+    session.execute(insert(User), users)
+    # None в insert заменяется значением по умолчанию (func.now())
+    inactive = [user['id'] for user in users if user['last_activity'] is None]
+    session.execute(update(User).where(User.id.in_(inactive)).values(last_activity=None))
+    session.execute(insert(Subscription), subscriptions)
+    session.commit()
+
+
+@pytest.mark.parametrize('sort', SORTS)
+@pytest.mark.parametrize('status', [None, UserStatus.ACTIVE])
+async def test_cursor_pages_match_offset_pages(session, sort, status) -> None:
+    _fill(session, random.Random(SORTS.index(sort)))
+    db = SyncSessionAdapter(session)
+    limit = 7
+
+    everything = await get_users_list(db, offset=0, limit=1_000, status=status, **sort)
+    assert len({user.id for user in everything}) == len(everything)
+
+    pages = []
+    cursor = None
+    while True:
+        page = await get_users_list(db, limit=limit + 1, status=status, cursor=cursor, **sort)
+        cursor = get_users_next_cursor(page, limit, **sort)
+        page = page[:limit]
+        assert page
+        pages.extend(user.id for user in page)
+        if cursor is None:
+            break
+        # OFFSET с номером страницы даёт ту же страницу
+        offset_page = await get_users_list(db, offset=len(pages) - limit, limit=limit, status=status, **sort)
+        assert [user.id for user in offset_page] == [user.id for user in page]
+
+    assert pages == [user.id for user in everything]
+
+
+async def test_cursor_is_bound_to_sort_mode(session) -> None:
+    _fill(session, random.Random(1))
+    db = SyncSessionAdapter(session)
+    page = await get_users_list(db, limit=6, order_by_balance=True)
+    cursor = get_users_next_cursor(page, 5, order_by_balance=True)
+
+    assert decode_users_cursor(cursor, 'balance')[2] == page[4].id
+    with pytest.raises(ValueError):
+        await get_users_list(db, limit=5, cursor=cursor)
+    with pytest.raises(ValueError):
+        decode_users_cursor('not-a-cursor', 'balance')
+
+
+async def test_last_full_page_has_no_cursor(session) -> None:
+    _fill(session, random.Random(2))
+    db = SyncSessionAdapter(session)
+    total = len(await get_users_list(db, limit=1_000))
+
+    # Пользователей ровно на одну страницу — пустой следующей страницы нет
+    assert get_users_next_cursor(await get_users_list(db, limit=total + 1), total) is None
+
+    first = await get_users_list(db, limit=total)
+    cursor = get_users_next_cursor(first, total - 1)
+    assert cursor is not None
+    last = await get_users_list(db, limit=total, cursor=cursor)
+    assert len(last) == 1
+    assert get_users_next_cursor(last, total - 1) is None
+
+
+async def test_count_estimate_caches_exact_count_outside_postgres(session, monkeypatch) -> None:
+    _fill(session, random.Random(2))
+    db = SyncSessionAdapter(session)
+    stored = {}
+
+    async def fake_get(key):
+        return stored.get(key)
+
+    async def fake_set(key, value, expire=None):
+        stored[key] = value
+        return True
+
+    monkeypatch.setattr(user_crud.cache, 'get', fake_get)
+    monkeypatch.setattr(user_crud.cache, 'set', fake_set)
+
+    assert await get_users_count_estimate(db) == 73
+    session.execute(insert(User), [{'id': 100, 'first_name': 'Late'}])
+    # До истечения кеша заголовок показывает прежнее значение
+    assert await get_users_count_estimate(db) == 73
+    assert list(stored) == ['users_count:::']
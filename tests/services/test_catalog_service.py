@@ -0,0 +1,143 @@
+"""Тесты in-memory каталога тарифов и серверов."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.sql import Select
+
+from app.database.models import ServerSquad, Tariff, server_squad_promo_groups, tariff_promo_groups
+from app.services import catalog_service as catalog_module
+from app.services.catalog_service import CatalogService
+from app.utils.content_cache import ContentType
+
+
+def _tariff_row(tariff_id: int, **overrides) -> SimpleNamespace:
+    values = {column.name: None for column in Tariff.__table__.columns}
+    values.update(
+        id=tariff_id,
+        name=f'Tariff {tariff_id}',
+        display_order=tariff_id,
+        is_active=True,
+        traffic_limit_gb=100,
+        device_limit=1,
+        allowed_squads=['sq-1'],
+        server_traffic_limits={'sq-1': {'traffic_limit_gb': 50}},
+        period_prices={'30': 10000, '90': 27000},
+        tier_level=1,
+        min_days=1,
+        max_days=365,
+        min_traffic_gb=1,
+        max_traffic_gb=1000,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _server_row(server_id: int, **overrides) -> SimpleNamespace:
+    values = {column.name: None for column in ServerSquad.__table__.columns}
+    values.update(
+        id=server_id,
+        squad_uuid=f'sq-{server_id}',
+        display_name=f'Server {server_id}',
+        is_available=True,
+        is_trial_eligible=False,
+        price_kopeks=server_id * 1000,
+        sort_order=server_id,
+        current_users=0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.tariffs = [_tariff_row(1), _tariff_row(2, is_active=False)]
+        self.tariff_links = [(1, 10)]
+        self.servers = [
+            _server_row(1),
+            _server_row(2, is_trial_eligible=True),
+            _server_row(3, is_available=False),
+            _server_row(4, max_users=5, current_users=5),
+        ]
+        self.server_links = [(1, 10), (2, 10), (3, 10), (4, 20)]
+        self.queries = 0
+
+    async def execute(self, query: Select) -> FakeResult:
+        self.queries += 1
+        table = query.get_final_froms()[0]
+        rows = {
+            Tariff.__table__: self.tariffs,
+            tariff_promo_groups: self.tariff_links,
+            ServerSquad.__table__: self.servers,
+            server_squad_promo_groups: self.server_links,
+        }[table]
+        return FakeResult(rows)
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    current = {ContentType.TARIFFS: 1, ContentType.SERVERS: 1}
+
+    async def get_version(content_type):
+        return current[content_type]
+
+    monkeypatch.setattr(catalog_module.content_cache, 'get_version', get_version)
+    return current
+
+
+async def test_snapshot_lookups_match_crud_semantics(versions) -> None:
+    catalog = await CatalogService().get(FakeSession())
+
+    tariff = catalog.get_tariff(1)
+    assert tariff.get_price_for_period(30) == 10000
+    assert tariff.get_available_periods() == [30, 90]
+    assert tariff.get_traffic_limit_for_server('sq-1') == 50
+    assert tariff.is_available_for_promo_group(10)
+    assert not tariff.is_available_for_promo_group(20)
+    assert [t.id for t in catalog.get_tariffs_for_promo_group(10)] == [1]
+
+    assert catalog.get_server_by_uuid('sq-4').is_full
+    assert [s.id for s in catalog.get_servers_by_uuids(['sq-2', 'missing', 'sq-1'])] == [2, 1]
+    assert [s.id for s in catalog.get_available_servers()] == [1, 2, 4]
+    assert [s.id for s in catalog.get_available_servers(10)] == [1, 2]
+    assert [s.id for s in catalog.get_available_servers(10, exclude_trial_only=True)] == [1]
+    assert catalog.get_available_servers(99) == []
+
+
+async def test_snapshot_is_immutable(versions) -> None:
+    catalog = await CatalogService().get(FakeSession())
+    tariff = catalog.get_tariff(1)
+
+    with pytest.raises(AttributeError):
+        tariff.name = 'changed'
+    with pytest.raises(TypeError):
+        tariff.period_prices['30'] = 1
+
+
+async def test_only_changed_part_is_reloaded(versions) -> None:
+    service = CatalogService()
+    db = FakeSession()
+
+    first = await service.get(db)
+    assert db.queries == 4
+
+    again = await service.get(db)
+    assert db.queries == 4
+    assert again.tariff_index is first.tariff_index
+
+    db.servers[0] = _server_row(1, price_kopeks=5000)
+    versions[ContentType.SERVERS] = 2
+
+    refreshed = await service.get(db)
+    assert db.queries == 6
+    assert refreshed.tariff_index is first.tariff_index
+    assert refreshed.get_server(1).price_kopeks == 5000
+    assert first.get_server(1).price_kopeks == 1000
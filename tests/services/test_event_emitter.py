@@ -0,0 +1,123 @@
+"""Тесты неблокирующей рассылки событий EventEmitter по WebSocket."""
+
+import asyncio
+from datetime import UTC, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services import event_emitter as event_emitter_module
+from app.services.event_emitter import EVENTS_WS_TOPIC, EventEmitter
+from app.services.ws_backplane import WebSocketBackplane
+from app.utils.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def _no_backplane_listener(monkeypatch):
+    monkeypatch.setattr(event_emitter_module.ws_backplane, 'ensure_listening', lambda: None)
+
+
+class FakeWebSocket:
+    def __init__(self, *, blocked: bool = False) -> None:
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def send_text(self, data: str) -> None:
+        await self.release.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str = '') -> None:
+        self.closed_with = code
+
+
+async def _drain() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_emit_does_not_wait_for_slow_socket() -> None:
+    emitter = EventEmitter()
+    fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+    emitter.register_websocket(fast)
+    emitter.register_websocket(slow)
+
+    await asyncio.wait_for(emitter.deliver_to_websockets('{"type":"payment.completed"}'), timeout=1)
+    await _drain()
+
+    assert fast.sent == ['{"type":"payment.completed"}']
+    assert slow.sent == []
+
+    slow.release.set()
+    await _drain()
+    assert slow.sent == fast.sent
+
+    emitter.unregister_websocket(fast)
+    emitter.unregister_websocket(slow)
+
+
+async def test_overflowing_consumer_is_disconnected() -> None:
+    emitter = EventEmitter()
+    emitter.WEBSOCKET_QUEUE_SIZE = 2
+    slow = FakeWebSocket(blocked=True)
+    emitter.register_websocket(slow)
+    await _drain()
+
+    # One message is taken by the writer, two fill the queue, the fourth overflows
+    for index in range(4):
+        await emitter.deliver_to_websockets(f'{{"index":{index}}}')
+        await _drain()
+
+    assert slow not in emitter._websocket_connections
+    assert slow.closed_with == EventEmitter.SLOW_CONSUMER_CLOSE_CODE
+
+
+async def test_failed_send_unregisters_socket() -> None:
+    emitter = EventEmitter()
+
+    class BrokenWebSocket(FakeWebSocket):
+        async def send_text(self, data: str) -> None:
+            raise RuntimeError('connection reset')
+
+    broken = BrokenWebSocket()
+    emitter.register_websocket(broken)
+
+    assert emitter.send_to_websocket(broken, {'type': 'pong'})
+    await _drain()
+
+    assert broken not in emitter._websocket_connections
+
+
+async def test_local_and_remote_sockets_receive_the_same_text(monkeypatch) -> None:
+    local, remote = EventEmitter(), EventEmitter()
+    local_ws, remote_ws = FakeWebSocket(), FakeWebSocket()
+    local.register_websocket(local_ws)
+    remote.register_websocket(remote_ws)
+
+    local_backplane, remote_backplane = WebSocketBackplane(), WebSocketBackplane()
+    local_backplane.register_topic(EVENTS_WS_TOPIC, local.deliver_to_websockets)
+    remote_backplane.register_topic(EVENTS_WS_TOPIC, remote.deliver_to_websockets)
+    monkeypatch.setattr(event_emitter_module, 'ws_backplane', local_backplane)
+    publish = AsyncMock(return_value=True)
+    monkeypatch.setattr(cache, 'publish', publish)
+
+    payload = {'amount': Decimal('10.50'), 'paid_at': datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC)}
+    await local.emit('payment.completed', payload)
+    await _drain()
+
+    channel, envelope = publish.await_args.args
+    await remote_backplane.handle_raw_message(
+        {'type': 'pmessage', 'channel': channel.encode(), 'data': cache.serializer.dumps(envelope)}
+    )
+    await _drain()
+
+    assert remote_ws.sent == local_ws.sent
+    event = cache.serializer.loads(local_ws.sent[0])
+    assert event['payload'] == {'amount': '10.50', 'paid_at': '2026-01-02T03:04:05+00:00'}
+    assert 'T' in event['timestamp']
+
+    for emitter, ws in ((local, local_ws), (remote, remote_ws)):
+        emitter.unregister_websocket(ws)
@@ -0,0 +1,152 @@
+"""Тесты прокси медиафайлов с дисковым LRU кешем."""
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import GetFile
+
+from app.services.media_proxy_service import (
+    CachedMedia,
+    MediaNotFoundError,
+    MediaProxy,
+    build_media_response,
+)
+
+
+FILES = {
+    'id-a': ('photos/file_1.jpg', 'UA', b'a' * 40),
+    'id-a2': ('photos/file_9.jpg', 'UA', b'a' * 40),
+    'id-b': ('photos/file_2.png', 'UB', b'b' * 40),
+    'id-c': ('documents/report.pdf', 'UC', b'c' * 40),
+}
+
+
+def _write(path: Path, content: bytes) -> None:
+    Path(path).write_bytes(content)
+
+
+def _cached_names(directory: Path) -> list[str]:
+    return sorted(path.name for path in directory.iterdir())
+
+
+def _make_proxy(
+    tmp_path: Path, max_size_bytes: int = 100, grace_seconds: float = 0
+) -> tuple[MediaProxy, SimpleNamespace]:
+    async def get_file(file_id: str) -> SimpleNamespace:
+        if file_id not in FILES:
+            raise TelegramBadRequest(method=GetFile(file_id=file_id), message='Bad Request: invalid file_id')
+        file_path, file_unique_id, _content = FILES[file_id]
+        return SimpleNamespace(file_path=file_path, file_unique_id=file_unique_id)
+
+    async def download_file(file_path: str, destination: Path, timeout: int) -> None:
+        content = next(content for path, _unique_id, content in FILES.values() if path == file_path)
+        _write(destination, content)
+
+    bot = SimpleNamespace(
+        get_file=AsyncMock(side_effect=get_file),
+        download_file=AsyncMock(side_effect=download_file),
+    )
+    proxy = MediaProxy(cache_dir=tmp_path, max_size_bytes=max_size_bytes)
+    proxy._bot = bot
+    proxy.EVICTION_GRACE_SECONDS = grace_seconds
+    return proxy, bot
+
+
+def _request(if_none_match: str | None = None) -> SimpleNamespace:
+    headers = {'if-none-match': if_none_match} if if_none_match else {}
+    return SimpleNamespace(headers=headers)
+
+
+async def test_hit_is_served_without_telegram_calls(tmp_path: Path) -> None:
+    proxy, bot = _make_proxy(tmp_path)
+
+    first = await proxy.get('id-a')
+    second = await proxy.get('id-a')
+
+    assert first == second
+    assert first.path == tmp_path / 'UA.jpg'
+    assert first.path.read_bytes() == b'a' * 40
+    assert first.filename == 'file_1.jpg'
+    assert bot.get_file.await_count == 1
+    assert bot.download_file.await_count == 1
+
+
+async def test_same_unique_id_is_downloaded_once(tmp_path: Path) -> None:
+    proxy, bot = _make_proxy(tmp_path)
+
+    await proxy.get('id-a')
+    other = await proxy.get('id-a2')
+
+    assert other.path == tmp_path / 'UA.jpg'
+    assert bot.get_file.await_count == 2
+    assert bot.download_file.await_count == 1
+
+
+async def test_least_recently_used_file_is_evicted(tmp_path: Path) -> None:
+    proxy, _bot = _make_proxy(tmp_path, max_size_bytes=100)
+
+    await proxy.get('id-a')
+    await proxy.get('id-b')
+    await proxy.get('id-a')
+    await proxy.get('id-c')
+
+    assert _cached_names(tmp_path) == ['UA.jpg', 'UC.pdf']
+    assert proxy.total_size == 80
+
+
+async def test_recently_served_files_are_not_evicted(tmp_path: Path) -> None:
+    proxy, _bot = _make_proxy(tmp_path, max_size_bytes=100, grace_seconds=300)
+
+    await proxy.get('id-a')
+    await proxy.get('id-b')
+    await proxy.get('id-c')
+
+    # Все три файла могут ещё передаваться клиентам — лимит временно превышен
+    assert _cached_names(tmp_path) == ['UA.jpg', 'UB.png', 'UC.pdf']
+    assert proxy.total_size == 120
+
+    proxy.EVICTION_GRACE_SECONDS = 0
+    await proxy.get('id-a2')
+
+    assert _cached_names(tmp_path) == ['UA.jpg', 'UC.pdf']
+    assert proxy.total_size == 80
+
+
+async def test_index_is_rebuilt_from_disk_in_mtime_order(tmp_path: Path) -> None:
+    for index, name in enumerate(['old.jpg', 'new.jpg', 'stale.jpg.abc.part']):
+        path = tmp_path / name
+        path.write_bytes(b'x' * 60)
+        os.utime(path, (1_000 + index, 1_000 + index))
+
+    proxy, _bot = _make_proxy(tmp_path, max_size_bytes=100)
+    await proxy.get('id-b')
+
+    assert _cached_names(tmp_path) == ['UB.png', 'new.jpg']
+
+
+async def test_unknown_file_raises_not_found(tmp_path: Path) -> None:
+    proxy, _bot = _make_proxy(tmp_path)
+
+    with pytest.raises(MediaNotFoundError):
+        await proxy.get('missing')
+
+
+def test_response_honours_if_none_match(tmp_path: Path) -> None:
+    path = tmp_path / 'UA.jpg'
+    path.write_bytes(b'data')
+    media = CachedMedia(path=path, file_unique_id='UA', filename='file_1.jpg')
+
+    full = build_media_response(_request(), media, cache_control='public, max-age=60')
+    assert full.status_code == 200
+    assert full.headers['etag'] == '"UA"'
+    assert full.headers['accept-ranges'] == 'bytes'
+    assert full.headers['content-disposition'] == 'inline; filename="file_1.jpg"'
+    assert full.media_type == 'image/jpeg'
+
+    not_modified = build_media_response(_request('"UA"'), media, cache_control='public, max-age=60')
+    assert not_modified.status_code == 304
+    assert not_modified.headers['etag'] == '"UA"'
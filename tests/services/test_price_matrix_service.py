@@ -0,0 +1,213 @@
+"""Property-тесты матрицы цен: результаты совпадают с текущими функциями расчёта."""
+
+import random
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import PERIOD_PRICES, settings
+from app.database.crud import server_squad as server_squad_crud, subscription as subscription_crud
+from app.database.models import PromoGroup, User
+from app.services.price_matrix_service import DiscountedPrice, PriceMatrixService, resolve_traffic_price
+from app.services.subscription_service import SubscriptionService
+from app.utils.price_display import calculate_user_price
+
+
+SEEDS = range(30)
+PERIODS = (14, 30, 60, 90, 180, 360)
+CATEGORIES = ('period', 'traffic', 'servers', 'devices')
+
+
+class FakeUser:
+    """Пользователь с заданной основной промогруппой и промо-оффером."""
+
+    get_promo_discount = User.get_promo_discount
+
+    def __init__(self, promo_group: PromoGroup | None, offer_percent: int) -> None:
+        self.promo_group = promo_group
+        self.telegram_id = 1
+        self.promo_offer_discount_percent = offer_percent
+        self.promo_offer_discount_expires_at = datetime.now(UTC) + timedelta(days=1) if offer_percent else None
+
+    def get_primary_promo_group(self) -> PromoGroup | None:
+        return self.promo_group
+
+
+def _random_settings(rng: random.Random, monkeypatch) -> None:
+    prices = {days: rng.choice([0, rng.randrange(1, 200_000)]) for days in PERIODS}
+    for days, price in prices.items():
+        monkeypatch.setitem(PERIOD_PRICES, days, price)
+
+    packages = rng.sample([0, 5, 10, 25, 50, 100, 250, 500], k=rng.randrange(1, 6))
+    config = ','.join(f'{gb}:{rng.randrange(0, 100_000)}:{rng.choice(["true", "true", "false"])}' for gb in packages)
+    monkeypatch.setattr(settings, 'TRAFFIC_PACKAGES_CONFIG', config)
+    monkeypatch.setattr(settings, 'PRICE_PER_DEVICE', rng.randrange(0, 30_000))
+    monkeypatch.setattr(settings, 'DEFAULT_DEVICE_LIMIT', rng.randrange(1, 4))
+    monkeypatch.setattr(settings, 'MAX_DEVICES_LIMIT', 0)
+    monkeypatch.setattr(settings, 'AVAILABLE_SUBSCRIPTION_PERIODS', ','.join(map(str, rng.sample(PERIODS, k=3))))
+    monkeypatch.setattr(settings, 'BASE_PROMO_GROUP_PERIOD_DISCOUNTS_ENABLED', rng.random() < 0.5)
+    monkeypatch.setattr(
+        settings,
+        'BASE_PROMO_GROUP_PERIOD_DISCOUNTS',
+        ','.join(f'{days}:{rng.randrange(0, 60)}' for days in rng.sample(PERIODS, k=2)),
+    )
+
+
+def _random_group(rng: random.Random) -> PromoGroup | None:
+    if rng.random() < 0.2:
+        return None
+    return PromoGroup(
+        id=rng.randrange(1, 5),
+        name='Group',
+        is_default=rng.random() < 0.3,
+        server_discount_percent=rng.choice([0, rng.randrange(0, 101)]),
+        traffic_discount_percent=rng.choice([0, rng.randrange(0, 101)]),
+        device_discount_percent=rng.choice([0, rng.randrange(0, 101)]),
+        period_discounts={str(days): rng.randrange(0, 101) for days in rng.sample(PERIODS, k=rng.randrange(0, 4))},
+    )
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_user_prices_match_calculate_user_price(seed: int, monkeypatch) -> None:
+    rng = random.Random(seed)
+    _random_settings(rng, monkeypatch)
+    service = PriceMatrixService()
+
+    for user in (None, FakeUser(_random_group(rng), rng.choice([0, rng.randrange(1, 60)]))):
+        offer_percent = user.promo_offer_discount_percent if user else 0
+        matrix = service.for_user(user)
+        assert [row.period_days for row in matrix.periods] == settings.get_available_subscription_periods()
+
+        for days in PERIODS:
+            row = matrix.period(days)
+            assert row.base.with_promo_offer(offer_percent) == calculate_user_price(
+                user, PERIOD_PRICES[days], days, 'period'
+            )
+            amount = rng.randrange(0, 500_000)
+            for category in CATEGORIES:
+                percent = row.discount_percent(category)
+                expected = calculate_user_price(user, amount, days, category)
+                assert DiscountedPrice.apply(amount, percent).with_promo_offer(offer_percent) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+async def test_totals_match_calculate_subscription_total_cost(seed: int, monkeypatch) -> None:
+    rng = random.Random(seed)
+    _random_settings(rng, monkeypatch)
+    server_prices = [rng.randrange(0, 50_000) for _ in range(rng.randrange(0, 4))]
+
+    async def fake_monthly_prices(db, server_squad_ids, *, user=None):
+        return server_prices
+
+    monkeypatch.setattr(subscription_crud, 'get_servers_monthly_prices', fake_monthly_prices)
+    service = PriceMatrixService()
+
+    for _ in range(5):
+        group = _random_group(rng)
+        user = FakeUser(group, 0) if rng.random() < 0.5 else None
+        matrix = service.for_user(user) if user else service.for_promo_group(group)
+        days = rng.choice(PERIODS)
+        traffic_gb = rng.choice([0, 1, 5, 7, 10, 30, 100, 400, 1000])
+        devices = rng.randrange(0, 8)
+
+        total, details = await subscription_crud.calculate_subscription_total_cost(
+            None,
+            days,
+            traffic_gb,
+            list(range(len(server_prices))),
+            devices,
+            user=user,
+            promo_group=group,
+        )
+
+        row = matrix.period(days)
+        assert row.total(traffic_gb, server_prices, devices) == total
+        assert row.base.final == details['base_price']
+        assert row.traffic_price(traffic_gb).original == details['traffic_price_per_month']
+        assert row.servers_discount_percent == details['servers_discount_percent']
+        assert row.devices_price(devices).original == details['devices_price_per_month']
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+async def test_matches_calculate_subscription_price_with_months(seed: int, monkeypatch) -> None:
+    rng = random.Random(seed)
+    _random_settings(rng, monkeypatch)
+    servers = {
+        index: SimpleNamespace(
+            display_name=f'server {index}',
+            price_kopeks=rng.randrange(0, 50_000),
+            is_available=True,
+            is_full=False,
+        )
+        for index in range(rng.randrange(0, 4))
+    }
+
+    async def fake_get_server(db, server_id):
+        return servers.get(server_id)
+
+    monkeypatch.setattr(server_squad_crud, 'get_server_squad_by_id', fake_get_server)
+    group = _random_group(rng)
+    user = FakeUser(group, 0)
+    days = rng.choice(PERIODS)
+    traffic_gb = rng.choice([0, 5, 10, 50, 1000])
+    devices = rng.randrange(0, 8)
+
+    total, server_totals = await SubscriptionService().calculate_subscription_price_with_months(
+        days, traffic_gb, list(servers), devices, None, user=user
+    )
+
+    row = PriceMatrixService().for_user(user).period(days)
+    expected_servers = [
+        DiscountedPrice.apply(server.price_kopeks, row.servers_discount_percent).final * row.months
+        for server in servers.values()
+    ]
+    assert server_totals == expected_servers
+    assert total == (
+        row.base.final
+        + row.traffic_price(traffic_gb).final * row.months
+        + sum(expected_servers)
+        + row.devices_price(devices).final * row.months
+    )
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_traffic_resolution_matches_settings(seed: int, monkeypatch) -> None:
+    rng = random.Random(seed)
+    _random_settings(rng, monkeypatch)
+    packages = [(pkg['gb'], pkg['price']) for pkg in settings.get_traffic_packages() if pkg['enabled']]
+
+    for gb in (None, 0, 1, 5, 9, 10, 49, 50, 99, 100, 499, 500, 5000):
+        assert resolve_traffic_price(packages, gb) == settings.get_traffic_price(gb)
+
+
+def test_matrix_is_cached_until_inputs_change(monkeypatch) -> None:
+    _random_settings(random.Random(1), monkeypatch)
+    service = PriceMatrixService()
+    group = PromoGroup(id=1, name='Group', server_discount_percent=10, period_discounts={'30': 5})
+
+    matrix = service.for_promo_group(group)
+    assert service.for_promo_group(group) is matrix
+
+    group.period_discounts = {'30': 20}
+    changed = service.for_promo_group(group)
+    assert changed is not matrix
+    assert changed.period(30).base.discount_percent == 20
+
+    monkeypatch.setattr(settings, 'PRICE_PER_DEVICE', settings.PRICE_PER_DEVICE + 100)
+    assert service.for_promo_group(group) is not changed
+
+    service.invalidate()
+    assert service.for_promo_group(group) is not changed
+
+
+def test_tariff_periods_skip_disabled_and_apply_group_discount() -> None:
+    tariff = SimpleNamespace(id=3, period_prices={'90': 27000, '30': 10000, '60': -1})
+    group = PromoGroup(id=1, name='Group', period_discounts={'90': 10})
+
+    periods = PriceMatrixService().tariff_periods(tariff, group)
+
+    assert [(row.period_days, row.price.original, row.price.final) for row in periods] == [
+        (30, 10000, 10000),
+        (90, 27000, 24300),
+    ]
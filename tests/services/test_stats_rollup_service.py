@@ -0,0 +1,352 @@
+"""Дневные агрегаты статистики: чтение из агрегатов совпадает с живым подсчётом (SQLite)."""
+
+import asyncio
+import random
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.crud import stats_rollup
+from app.database.crud.stats_rollup import (
+    ONE_DAY,
+    day_start,
+    get_daily_activity,
+    get_daily_referral_earnings,
+    get_daily_referral_invites,
+    get_daily_revenue,
+    get_reconciled_days,
+    plan_range,
+    reconcile_rollup_days,
+)
+from app.database.models import (
+    ReferralEarning,
+    StatsDailyActivity,
+    StatsDailyReferral,
+    StatsDailyRevenue,
+    Subscription,
+    SubscriptionConversion,
+    Transaction,
+    TransactionType,
+    User,
+)
+from app.services.stats_rollup_service import StatsRollupService, _chunks
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+# Удаление транзакции через ORM подгружает связанные платежи — их таблицы тоже нужны
+TABLES = dict.fromkeys(
+    (
+        User,
+        Subscription,
+        SubscriptionConversion,
+        Transaction,
+        ReferralEarning,
+        StatsDailyActivity,
+        StatsDailyRevenue,
+        StatsDailyReferral,
+        *(relationship.mapper.class_ for relationship in Transaction.__mapper__.relationships),
+    )
+)
+TYPES = [TransactionType.DEPOSIT.value, TransactionType.SUBSCRIPTION_PAYMENT.value, TransactionType.WITHDRAWAL.value]
+METHODS = ['yookassa', 'cryptobot', 'manual', '', None]
+
+
+def _fill(session: Session, rng: random.Random, now: datetime) -> None:
+    def moment() -> datetime:
+        return now - timedelta(days=rng.uniform(0, 20))
+
+    users = [{'id': index, 'first_name': f'User {index}', 'created_at': moment()} for index in range(1, 41)]
+    for user in users[5:]:
+        if rng.random() < 0.6:
+            user['referred_by_id'] = rng.randrange(1, 6)
+    subscriptions = [
+        {
+            'id': index,
+            'user_id': index,
+            'end_date': now + timedelta(days=30),
+            'is_trial': rng.random() < 0.4,
+            'created_at': moment(),
+        }
+        for index in range(1, 41)
+    ]
+    conversions = [
+        {'user_id': rng.randrange(1, 41), 'converted_at': moment(), 'first_payment_amount_kopeks': 100}
+        for _ in range(15)
+    ]
+    transactions = [
+        {
+            'user_id': rng.randrange(1, 41),
+            'type': rng.choice(TYPES),
+            'amount_kopeks': rng.randrange(-50_000, 100_000),
+            'payment_method': rng.choice(METHODS),
+            'is_completed': rng.random() < 0.8,
+            'created_at': moment(),
+        }
+        for _ in range(300)
+    ]
+    earnings = [
+        {
+            'user_id': rng.randrange(1, 6),
+            'referral_id': rng.randrange(6, 41),
+            'amount_kopeks': rng.randrange(0, 10_000),
+            'reason': 'test',
+            'campaign_id': rng.choice([None, 1, 2]),
+            'created_at': moment(),
+        }
+        for _ in range(60)
+    ]
+    for model, rows in (
+        (User, users),
+        (Subscription, subscriptions),
+        (SubscriptionConversion, conversions),
+        (Transaction, transactions),
+        (ReferralEarning, earnings),
+    ):
+        session.execute(insert(model), rows)
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES) as session:
+        yield session
+
+
+async def _read_all(db, start: datetime, end: datetime) -> dict:
+    return {
+        'activity': await get_daily_activity(db, start, end),
+        'revenue': await get_daily_revenue(db, start, end),
+        'deposits': await get_daily_revenue(
+            db, start, end, types=[TransactionType.DEPOSIT.value], payment_methods=['yookassa', 'cryptobot']
+        ),
+        'invites': await get_daily_referral_invites(db, start, end),
+        'referrer_invites': await get_daily_referral_invites(db, start, end, referrer_id=2),
+        'earnings': await get_daily_referral_earnings(db, start, end),
+        'campaign_earnings': await get_daily_referral_earnings(db, start, end, referrer_id=3, campaign_id=1),
+    }
+
+
+def _normalize_revenue(rows) -> dict:
+    # Без агрегатов NULL и '' в payment_method — разные группы, в агрегатах — одна
+    totals: dict = {}
+    for row in rows:
+        key = (row.day, row.type, row.payment_method or None)
+        count, amount, abs_amount = totals.get(key, (0, 0, 0))
+        totals[key] = (count + row.count, amount + row.amount_kopeks, abs_amount + row.abs_amount_kopeks)
+    return totals
+
+
+def test_plan_range_uses_reconciled_whole_days_only() -> None:
+    start = datetime(2026, 3, 1, 21, 0, tzinfo=UTC)
+    end = datetime(2026, 3, 6, 12, 0, tzinfo=UTC)
+    reconciled = {date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 3), date(2026, 3, 5), date(2026, 3, 6)}
+
+    plan = plan_range(start, end, reconciled)
+
+    assert plan.rollup_days == (date(2026, 3, 2), date(2026, 3, 3), date(2026, 3, 5))
+    assert plan.live_ranges == (
+        (start, day_start(date(2026, 3, 2))),
+        (day_start(date(2026, 3, 4)), day_start(date(2026, 3, 5))),
+        (day_start(date(2026, 3, 6)), end),
+    )
+
+
+def test_plan_range_without_rollups_is_one_live_range() -> None:
+    start = datetime(2026, 3, 1, tzinfo=UTC)
+    end = datetime(2026, 3, 3, tzinfo=UTC)
+
+    assert plan_range(start, end, set()).live_ranges == ((start, end),)
+    assert plan_range(start, end, {date(2026, 3, 1), date(2026, 3, 2)}).live_ranges == ()
+    assert plan_range(end, start, {date(2026, 3, 1)}).rollup_days == ()
+
+
+def test_chunks_split_gaps_and_long_runs() -> None:
+    first = date(2026, 1, 1)
+    days = [first + timedelta(days=offset) for offset in (0, 1, 2, 5, 6, 7, 8, 9)]
+
+    assert _chunks(days, 3) == [
+        (first, first + timedelta(days=2)),
+        (first + timedelta(days=5), first + timedelta(days=7)),
+        (first + timedelta(days=8), first + timedelta(days=9)),
+    ]
+
+
+@pytest.mark.parametrize('seed', range(4))
+async def test_rollup_reads_match_live_counts(session, monkeypatch, seed) -> None:
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+    _fill(session, rng, now)
+    session.commit()
+    db = SyncSessionAdapter(session)
+
+    today = now.date()
+    # Пропуск в середине: такие дни читаются по исходным таблицам
+    await reconcile_rollup_days(db, today - timedelta(days=21), today - timedelta(days=9))
+    await reconcile_rollup_days(db, today - timedelta(days=6), today - ONE_DAY)
+    assert len(await get_reconciled_days(db, today - timedelta(days=30), today)) == 19
+
+    start = now - timedelta(days=rng.uniform(10, 19))
+    end = now + timedelta(minutes=1)
+
+    monkeypatch.setattr(settings, 'STATS_ROLLUP_ENABLED', True)
+    from_rollups = await _read_all(db, start, end)
+    monkeypatch.setattr(settings, 'STATS_ROLLUP_ENABLED', False)
+    live = await _read_all(db, start, end)
+
+    assert from_rollups['activity'] == live['activity']
+    assert _normalize_revenue(from_rollups['revenue']) == _normalize_revenue(live['revenue'])
+    assert _normalize_revenue(from_rollups['deposits']) == _normalize_revenue(live['deposits'])
+    for key in ('invites', 'referrer_invites', 'earnings', 'campaign_earnings'):
+        assert from_rollups[key] == live[key], key
+
+
+async def test_transaction_completion_updates_closed_day(session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'STATS_ROLLUP_ENABLED', True)
+    now = datetime.now(UTC)
+    old_day = now - timedelta(days=3)
+    session.add(User(id=1, first_name='User', created_at=old_day))
+    pending = Transaction(
+        user_id=1,
+        type=TransactionType.DEPOSIT.value,
+        amount_kopeks=5_000,
+        payment_method='yookassa',
+        is_completed=False,
+        created_at=old_day,
+    )
+    refunded = Transaction(
+        user_id=1,
+        type=TransactionType.DEPOSIT.value,
+        amount_kopeks=7_000,
+        payment_method='yookassa',
+        is_completed=True,
+        created_at=old_day,
+    )
+    session.add_all([pending, refunded])
+    session.commit()
+
+    db = SyncSessionAdapter(session)
+    first_day, last_day = now.date() - timedelta(days=5), now.date() - ONE_DAY
+    await reconcile_rollup_days(db, first_day, last_day)
+
+    # Платёж за закрытый день завершился, другой отменён, третий создан сразу завершённым
+    pending.is_completed = True
+    refunded.is_completed = False
+    session.add(
+        Transaction(
+            user_id=1,
+            type=TransactionType.SUBSCRIPTION_PAYMENT.value,
+            amount_kopeks=-3_000,
+            is_completed=True,
+            created_at=old_day,
+        )
+    )
+    session.commit()
+
+    def snapshot() -> set:
+        return {
+            tuple(row)
+            for row in session.execute(select(StatsDailyRevenue.__table__)).all()
+            if row.count or row.amount_kopeks or row.abs_amount_kopeks
+        }
+
+    incremental = snapshot()
+    await reconcile_rollup_days(db, first_day, last_day)
+    assert incremental == snapshot()
+    assert incremental == {
+        (old_day.date(), TransactionType.DEPOSIT.value, 'yookassa', 1, 5_000, 5_000),
+        (old_day.date(), TransactionType.SUBSCRIPTION_PAYMENT.value, '', 1, -3_000, 3_000),
+    }
+
+
+def test_increment_statement_skips_unsupported_dialects() -> None:
+    assert stats_rollup.revenue_increment_statement('mysql', 1, 1) is None
+    assert stats_rollup.revenue_increment_statement('postgresql', 1, 1) is not None
+
+
+async def test_deletes_and_trial_conversion_unmark_closed_days(session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'STATS_ROLLUP_ENABLED', True)
+    now = datetime.now(UTC)
+    _fill(session, random.Random(11), now)
+    session.commit()
+    db = SyncSessionAdapter(session)
+    today = now.date()
+    await reconcile_rollup_days(db, today - timedelta(days=21), today - ONE_DAY)
+
+    closed = day_start(today)
+    trial = session.scalars(
+        select(Subscription).where(Subscription.is_trial == True, Subscription.created_at < closed)
+    ).first()
+    payment = session.scalars(
+        select(Transaction).where(Transaction.is_completed == True, Transaction.created_at < closed)
+    ).first()
+    deleted_users = session.scalars(select(User).where(User.id.in_([38, 39, 40]), User.created_at < closed)).all()
+    affected = {
+        trial.created_at.date(),
+        payment.created_at.date(),
+        *(user.created_at.date() for user in deleted_users),
+    }
+
+    # Переход из триала, удаление платежа через ORM и пакетное удаление пользователей
+    trial.is_trial = False
+    session.delete(payment)
+    session.execute(delete(User).where(User.id.in_([user.id for user in deleted_users])))
+    session.commit()
+
+    reconciled = await get_reconciled_days(db, today - timedelta(days=30), today)
+    assert reconciled and not affected & reconciled
+
+    start, end = now - timedelta(days=21), now + timedelta(minutes=1)
+    from_rollups = await _read_all(db, start, end)
+    monkeypatch.setattr(settings, 'STATS_ROLLUP_ENABLED', False)
+    live = await _read_all(db, start, end)
+
+    assert from_rollups['activity'] == live['activity']
+    assert _normalize_revenue(from_rollups['revenue']) == _normalize_revenue(live['revenue'])
+    assert from_rollups['invites'] == live['invites']
+
+
+def test_day_locks_are_taken_in_order_on_postgresql_only() -> None:
+    days = [date(2026, 3, 2), date(2026, 3, 1), date(2026, 3, 2)]
+
+    assert stats_rollup.day_lock_statement('sqlite', days, shared=False) is None
+    assert stats_rollup.day_lock_statement('postgresql', [], shared=False) is None
+
+    exclusive = str(
+        stats_rollup.day_lock_statement('postgresql', days, shared=False).compile(
+            dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}
+        )
+    )
+    assert exclusive.count('pg_advisory_xact_lock(') == 2
+    assert exclusive.index('20513') < exclusive.index('20514')
+    shared = stats_rollup.day_lock_statement('postgresql', days, shared=True)
+    assert 'pg_advisory_xact_lock_shared' in str(shared.compile(dialect=postgresql.dialect()))
+
+
+async def test_spending_reconciliation_does_not_depend_on_rollups(monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'STATS_ROLLUP_ENABLED', False)
+    monkeypatch.setattr(settings, 'USER_SPENDING_RECONCILE_ENABLED', True)
+    service = StatsRollupService()
+    runs = []
+
+    async def next_run() -> None:
+        await asyncio.sleep(0)
+
+    async def reconcile_spending() -> int:
+        runs.append('spending')
+        return 0
+
+    monkeypatch.setattr(service, '_sleep_until_next_run', next_run)
+    monkeypatch.setattr(service, 'run_spending_reconciliation', reconcile_spending)
+
+    service.start()
+    assert service.is_running()
+    assert service._task is None
+    for _ in range(3):
+        await asyncio.sleep(0)
+    await service.stop()
+
+    assert runs
+    assert not service.is_running()
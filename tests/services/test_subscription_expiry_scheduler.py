@@ -0,0 +1,150 @@
+"""Планировщик истечения подписок: ближайший срок по индексу и пробуждение после коммита."""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.database.crud.subscription import get_next_subscription_due_at
+from app.database.models import MonitoringLog, SentNotification, Subscription, SubscriptionStatus, User
+from app.services import subscription_expiry_scheduler as scheduler_module
+from app.services.monitoring_service import MonitoringService
+from tests._sqlite_session import SyncSessionAdapter, sqlite_session
+
+
+TABLES = dict.fromkeys(
+    (
+        Subscription,
+        *(relationship.mapper.class_ for relationship in Subscription.__mapper__.relationships),
+        SentNotification,
+        MonitoringLog,
+    )
+)
+OFFSETS = [timedelta(0), timedelta(hours=2), timedelta(days=1), timedelta(days=3)]
+STATUSES = [status.value for status in SubscriptionStatus]
+
+
+@pytest.fixture
+def session():
+    with sqlite_session(TABLES) as session:
+        yield session
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = scheduler_module.SubscriptionExpiryScheduler()
+    scheduler._offsets = OFFSETS
+    monkeypatch.setattr(scheduler, 'is_running', lambda: True)
+    monkeypatch.setattr(scheduler_module, 'subscription_expiry_scheduler', scheduler)
+    return scheduler
+
+
+def _subscription(user_id: int, end_date: datetime, status: str = SubscriptionStatus.ACTIVE.value) -> Subscription:
+    return Subscription(user_id=user_id, status=status, end_date=end_date)
+
+
+async def test_next_due_matches_scan(session) -> None:
+    rng = random.Random(5)
+    now = datetime(2026, 5, 1, 12, tzinfo=UTC)
+    subscriptions = [
+        _subscription(user_id, now + timedelta(minutes=rng.randrange(-3 * 24 * 60, 10 * 24 * 60)), rng.choice(STATUSES))
+        for user_id in range(1, 51)
+    ]
+    session.add_all(subscriptions)
+    session.commit()
+
+    expected = min(
+        subscription.end_date - offset
+        for subscription in subscriptions
+        for offset in OFFSETS
+        if subscription.status == SubscriptionStatus.ACTIVE.value and subscription.end_date - offset > now
+    )
+    assert await get_next_subscription_due_at(SyncSessionAdapter(session), OFFSETS, now=now) == expected
+    assert await get_next_subscription_due_at(SyncSessionAdapter(session), [], now=now) is None
+    assert (
+        await get_next_subscription_due_at(SyncSessionAdapter(session), OFFSETS, now=now + timedelta(days=30)) is None
+    )
+
+
+def test_committed_changes_pull_wakeup_earlier(session, scheduler) -> None:
+    now = datetime.now(UTC)
+    planned = now + timedelta(days=20)
+    scheduler._next_due_at = planned
+
+    # Откат и неактивные подписки план не меняют
+    session.add(_subscription(1, now + timedelta(days=5)))
+    session.flush()
+    session.rollback()
+    session.add(_subscription(2, now + timedelta(days=5), SubscriptionStatus.EXPIRED.value))
+    session.commit()
+    assert scheduler.next_due_at == planned
+    assert not scheduler._wakeup.is_set()
+
+    subscription = _subscription(3, now + timedelta(days=30))
+    session.add(subscription)
+    session.commit()
+    assert scheduler.next_due_at == planned
+
+    subscription.end_date = now + timedelta(days=10)
+    session.commit()
+    assert scheduler.next_due_at == now + timedelta(days=7)
+    assert scheduler._wakeup.is_set()
+
+    # Уже наступивший срок — обработать сразу
+    subscription.end_date = now + timedelta(days=1)
+    session.commit()
+    assert now <= scheduler.next_due_at <= datetime.now(UTC)
+
+
+async def test_expiry_warnings_check_only_newly_due_subscriptions(session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'AUTOPAY_WARNING_DAYS', '3,1')
+    now = datetime.now(UTC)
+    since = now - timedelta(minutes=5)
+    end_dates = [
+        now + timedelta(days=3, minutes=-1),  # порог 3 дней наступил после прошлого прохода
+        now + timedelta(days=1, minutes=-1),  # порог 1 дня — тоже, 3 дня уже отправлено
+        now + timedelta(days=2),  # предупреждён раньше
+        now + timedelta(days=2),  # то же, но подписку изменили после прошлого прохода
+        now + timedelta(days=4),  # ещё не пора
+    ]
+    subscriptions = []
+    for telegram_id, end_date in enumerate(end_dates, start=1):
+        subscription = _subscription(None, end_date)
+        subscription.is_trial = False
+        subscription.user = User(telegram_id=telegram_id, language='ru')
+        subscriptions.append(subscription)
+    session.add_all(subscriptions)
+    session.flush()
+    session.add(
+        SentNotification(
+            user_id=subscriptions[1].user_id,
+            subscription_id=subscriptions[1].id,
+            notification_type='expiring',
+            days_before=3,
+        )
+    )
+    for subscription in subscriptions:
+        subscription.updated_at = since - timedelta(days=1)
+    subscriptions[3].updated_at = now
+    session.commit()
+
+    service = MonitoringService(bot=object())
+    sent: list[tuple[int, int]] = []
+
+    async def send(user, subscription, days):
+        sent.append((user.telegram_id, days))
+        return True
+
+    monkeypatch.setattr(service, '_send_subscription_expiring_notification', send)
+    db = SyncSessionAdapter(session)
+    await service._check_expiring_subscriptions(db, since)
+
+    assert sorted(sent) == [(1, 3), (2, 1), (4, 3)]
+    # Подписки (пользователи — selectinload) и отправленные уведомления — по одному запросу,
+    # дальше только проверка в record_notification на каждое отправленное
+    assert db.queries == 2 + len(sent)
+
+    sent.clear()
+    await service._check_expiring_subscriptions(db, None)
+    assert sent == [(3, 3)]
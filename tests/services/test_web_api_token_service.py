@@ -0,0 +1,124 @@
+"""Тесты кеширования токенов веб-API и пакетной записи отметок использования."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import WebApiToken
+from app.services.web_api_token_service import WebApiTokenService
+
+
+def _token(service: WebApiTokenService, value: str = 'secret-token', **overrides) -> WebApiToken:
+    values = {
+        'id': 7,
+        'name': 'Integration',
+        'token_hash': service.hash_token(value),
+        'token_prefix': value[:8],
+        'is_active': True,
+        'expires_at': None,
+    }
+    values.update(overrides)
+    return WebApiToken(**values)
+
+
+async def test_authenticate_serves_repeated_calls_from_cache(monkeypatch) -> None:
+    service = WebApiTokenService()
+    stored = _token(service)
+    get_by_hash = AsyncMock(return_value=stored)
+    monkeypatch.setattr('app.services.web_api_token_service.crud.get_token_by_hash', get_by_hash)
+
+    first = await service.authenticate(MagicMock(), 'secret-token', remote_ip='10.0.0.1')
+    second = await service.authenticate(MagicMock(), 'secret-token', remote_ip='10.0.0.2')
+
+    assert first is second
+    assert first is not stored
+    assert first.name == 'Integration'
+    get_by_hash.assert_awaited_once()
+    assert service._pending_usage[7][1] == '10.0.0.2'
+
+
+async def test_revoke_invalidates_cached_token_after_commit(monkeypatch) -> None:
+    service = WebApiTokenService()
+    stored = _token(service)
+    get_by_hash = AsyncMock(return_value=stored)
+    monkeypatch.setattr('app.services.web_api_token_service.crud.get_token_by_hash', get_by_hash)
+    db = AsyncSession()
+    monkeypatch.setattr(db, 'flush', AsyncMock())
+    monkeypatch.setattr(db, 'refresh', AsyncMock())
+
+    assert await service.authenticate(db, 'secret-token') is not None
+
+    await service.revoke_token(db, stored)
+    # До коммита другие запросы видят прежнюю версию токена
+    assert await service.authenticate(db, 'secret-token') is not None
+    await db.commit()
+
+    assert await service.authenticate(db, 'secret-token') is None
+    assert get_by_hash.await_count == 2
+
+
+async def test_rolled_back_revoke_keeps_cached_token(monkeypatch) -> None:
+    service = WebApiTokenService()
+    stored = _token(service)
+    get_by_hash = AsyncMock(return_value=stored)
+    monkeypatch.setattr('app.services.web_api_token_service.crud.get_token_by_hash', get_by_hash)
+    db = AsyncSession()
+    monkeypatch.setattr(db, 'flush', AsyncMock())
+    monkeypatch.setattr(db, 'refresh', AsyncMock())
+
+    await service.authenticate(db, 'secret-token')
+    # Как при настоящем flush: изменения идут внутри открытой транзакции
+    await db.begin()
+    await service.revoke_token(db, stored)
+    await db.rollback()
+    await db.commit()
+
+    # Откат отменил сброс: кешированный снимок по-прежнему обслуживает запросы
+    assert await service.authenticate(db, 'secret-token') is not None
+    get_by_hash.assert_awaited_once()
+
+
+async def test_expired_cached_token_is_rejected(monkeypatch) -> None:
+    service = WebApiTokenService()
+    stored = _token(service, expires_at=datetime.now(UTC) - timedelta(minutes=1))
+    monkeypatch.setattr(
+        'app.services.web_api_token_service.crud.get_token_by_hash',
+        AsyncMock(return_value=stored),
+    )
+
+    assert await service.authenticate(MagicMock(), 'secret-token') is None
+    assert not service._pending_usage
+
+
+async def test_flush_usage_writes_pending_stamps_in_one_call(monkeypatch) -> None:
+    service = WebApiTokenService()
+    service.record_usage(1, '10.0.0.1')
+    service.record_usage(1)
+    service.record_usage(2, '10.0.0.2')
+
+    session = MagicMock(commit=AsyncMock())
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    monkeypatch.setattr('app.database.database.AsyncSessionLocal', session_factory)
+    record_usage = AsyncMock()
+    monkeypatch.setattr('app.services.web_api_token_service.crud.record_tokens_usage', record_usage)
+
+    assert await service.flush_usage() == 2
+
+    usage = record_usage.await_args.args[1]
+    assert [(token_id, ip) for token_id, _, ip in usage] == [(1, '10.0.0.1'), (2, '10.0.0.2')]
+    session.commit.assert_awaited_once()
+    assert await service.flush_usage() == 0
+
+
+async def test_flush_usage_keeps_stamps_on_failure(monkeypatch) -> None:
+    service = WebApiTokenService()
+    service.record_usage(1, '10.0.0.1')
+
+    session_factory = MagicMock(side_effect=RuntimeError('db down'))
+    monkeypatch.setattr('app.database.database.AsyncSessionLocal', session_factory)
+
+    assert await service.flush_usage() == 0
+    assert 1 in service._pending_usage
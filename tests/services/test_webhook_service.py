@@ -0,0 +1,104 @@
+"""Тесты очереди исходящих webhooks: постановка, повторы, пачки и параллельность."""
+
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.config import settings
+from app.services.webhook_service import DeliveryResult, WebhookService, compute_retry_delay
+
+
+def _delivery(delivery_id: int, attempt: int = 0) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=delivery_id,
+        webhook_id=1,
+        event_type='payment.completed',
+        payload={'id': delivery_id},
+        status='pending',
+        attempt_number=attempt,
+        response_status=None,
+        response_body=None,
+        error_message=None,
+        delivered_at=None,
+        next_retry_at=None,
+    )
+
+
+def test_retry_delay_grows_exponentially_with_jitter() -> None:
+    for attempt, full_delay in [(1, 10), (2, 20), (3, 40)]:
+        delay = compute_retry_delay(attempt, 10, 3600)
+        assert full_delay / 2 <= delay <= full_delay
+
+    assert compute_retry_delay(30, 10, 60) <= 60
+
+
+async def test_enqueue_only_inserts_deliveries(monkeypatch) -> None:
+    service = WebhookService()
+    webhooks = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+    monkeypatch.setattr('app.services.webhook_service.get_active_webhooks_for_event', AsyncMock(return_value=webhooks))
+    enqueue = AsyncMock(return_value=[object(), object()])
+    monkeypatch.setattr('app.services.webhook_service.enqueue_webhook_deliveries', enqueue)
+    http = AsyncMock()
+    monkeypatch.setattr(service, '_deliver_webhook_http', http)
+
+    assert await service.enqueue_webhook(AsyncMock(), 'payment.completed', {'id': 1}) == 2
+
+    enqueue.assert_awaited_once()
+    http.assert_not_awaited()
+    assert service._wakeup.is_set()
+
+
+def test_apply_result_schedules_retry_then_gives_up(monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'OUTBOUND_WEBHOOK_MAX_ATTEMPTS', 2)
+    service = WebhookService()
+    delivery = _delivery(1)
+    server_error = DeliveryResult(status='failed', response_status=503, error_message='HTTP 503')
+
+    service._apply_result(delivery, server_error)
+    assert delivery.status == 'pending'
+    assert delivery.attempt_number == 1
+    assert delivery.next_retry_at > datetime.now(UTC)
+
+    service._apply_result(delivery, server_error)
+    assert delivery.status == 'failed'
+    assert delivery.next_retry_at is None
+
+
+def test_apply_result_does_not_retry_client_errors() -> None:
+    service = WebhookService()
+    delivery = _delivery(1)
+
+    service._apply_result(delivery, DeliveryResult(status='failed', response_status=400))
+    assert delivery.status == 'failed'
+
+    delivery = _delivery(2)
+    service._apply_result(delivery, DeliveryResult(status='success', response_status=200))
+    assert delivery.status == 'success'
+    assert delivery.delivered_at is not None
+
+
+async def test_endpoint_delivery_batches_and_limits_concurrency(monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'OUTBOUND_WEBHOOK_BATCH_SIZE', 2)
+    monkeypatch.setattr(settings, 'OUTBOUND_WEBHOOK_CONCURRENCY_PER_ENDPOINT', 1)
+    service = WebhookService()
+    webhook = SimpleNamespace(id=1, is_active=True)
+    in_flight = max_in_flight = 0
+    bodies: list[dict] = []
+
+    async def fake_http(webhook, event_type, payload, **kwargs) -> DeliveryResult:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        bodies.append(payload)
+        in_flight -= 1
+        return DeliveryResult(status='success', response_status=200)
+
+    monkeypatch.setattr(service, '_deliver_webhook_http', fake_http)
+
+    results = await service._deliver_to_endpoint(webhook, [_delivery(1), _delivery(2), _delivery(3)])
+
+    assert [len(body['events']) for body in bodies] == [2, 1]
+    assert max_in_flight == 1
+    assert [delivery.id for delivery, _ in results] == [1, 2, 3]
@@ -0,0 +1,64 @@
+"""Тесты межрепличной доставки WebSocket уведомлений через backplane."""
+
+from unittest.mock import AsyncMock
+
+from app.cabinet.routes.websocket import CabinetConnectionManager
+from app.services import ws_backplane as backplane_module
+from app.services.ws_backplane import WebSocketBackplane
+from app.utils.cache import cache
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(data)
+
+
+def _raw(backplane: WebSocketBackplane, topic: str, envelope: dict) -> dict:
+    return {
+        'type': 'pmessage',
+        'channel': f'{backplane.CHANNEL_PREFIX}:{topic}'.encode(),
+        'data': cache.serializer.dumps(envelope),
+    }
+
+
+async def test_publish_delivers_locally_and_to_redis(monkeypatch) -> None:
+    backplane = WebSocketBackplane()
+    handler = AsyncMock()
+    backplane.register_topic('cabinet', handler)
+    publish = AsyncMock(return_value=True)
+    monkeypatch.setattr(backplane_module.cache, 'publish', publish)
+
+    await backplane.publish('cabinet', {'scope': 'admins', 'message': {'type': 'ticket.new'}})
+
+    handler.assert_awaited_once_with({'scope': 'admins', 'message': {'type': 'ticket.new'}})
+    channel, envelope = publish.await_args.args
+    assert channel == 'ws_backplane:cabinet'
+    assert envelope['origin'] == backplane.instance_id
+
+
+async def test_remote_messages_are_dispatched_and_own_are_skipped() -> None:
+    backplane = WebSocketBackplane()
+    handler = AsyncMock()
+    backplane.register_topic('events', handler)
+
+    await backplane.handle_raw_message(_raw(backplane, 'events', {'origin': backplane.instance_id, 'message': {}}))
+    handler.assert_not_awaited()
+
+    await backplane.handle_raw_message(_raw(backplane, 'events', {'origin': 'other', 'message': {'type': 'x'}}))
+    handler.assert_awaited_once_with({'type': 'x'})
+
+
+async def test_cabinet_manager_routes_backplane_messages() -> None:
+    manager = CabinetConnectionManager()
+    user_ws, admin_ws = FakeWebSocket(), FakeWebSocket()
+    manager._user_connections = {1: {user_ws}, 2: {admin_ws}}
+    manager._admin_connections = {2: {admin_ws}}
+
+    await manager.handle_backplane_message({'scope': 'user', 'user_id': 1, 'message': {'type': 'balance.topup'}})
+    await manager.handle_backplane_message({'scope': 'admins', 'message': {'type': 'ticket.new'}})
+
+    assert user_ws.sent == ['{"type": "balance.topup"}']
+    assert admin_ws.sent == ['{"type": "ticket.new"}']
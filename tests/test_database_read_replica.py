@@ -0,0 +1,94 @@
+"""Маршрутизация read-only сессий между репликой и основной БД."""
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.config import settings
+from app.database import database
+from app.database.database import DatabaseManager, with_read_only_db
+
+
+REPLICA_FACTORY = object()
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, 'DATABASE_READ_REPLICA_MAX_LAG_SECONDS', 5.0)
+    monkeypatch.setattr(settings, 'DATABASE_READ_REPLICA_LAG_CHECK_INTERVAL_SECONDS', 60.0)
+    manager = DatabaseManager()
+    manager._read_replica_session_factory = REPLICA_FACTORY
+    return manager
+
+
+def _lag_sequence(monkeypatch, manager, values):
+    calls = []
+
+    async def fake_measure():
+        calls.append(1)
+        return values[min(len(calls), len(values)) - 1]
+
+    monkeypatch.setattr(manager, '_measure_replica_lag', fake_measure)
+    return calls
+
+
+async def test_without_replica_reads_go_to_primary(monkeypatch) -> None:
+    manager = DatabaseManager()
+    manager._read_replica_session_factory = None
+
+    assert await manager._read_only_session_factory() is database.AsyncSessionLocal
+    assert await manager.get_replica_lag() is None
+    assert manager.get_replica_metrics()['reads'] == {'replica': 0, 'primary': 1, 'fallback': 0}
+
+
+async def test_fresh_replica_serves_reads_and_lag_is_cached(monkeypatch, manager) -> None:
+    calls = _lag_sequence(monkeypatch, manager, [0.5])
+
+    for _ in range(3):
+        assert await manager._read_only_session_factory() is REPLICA_FACTORY
+
+    assert len(calls) == 1
+    metrics = manager.get_replica_metrics()
+    assert metrics['lag_seconds'] == 0.5
+    assert metrics['degraded'] is False
+    assert metrics['reads'] == {'replica': 3, 'primary': 0, 'fallback': 0}
+
+
+@pytest.mark.parametrize('lag', [12.0, None])
+async def test_lagging_or_unavailable_replica_falls_back_to_primary(monkeypatch, manager, lag) -> None:
+    _lag_sequence(monkeypatch, manager, [lag])
+
+    assert await manager._read_only_session_factory() is database.AsyncSessionLocal
+    metrics = manager.get_replica_metrics()
+    assert metrics['degraded'] is True
+    assert metrics['reads']['fallback'] == 1
+
+
+async def test_replica_is_used_again_after_catching_up(monkeypatch, manager) -> None:
+    calls = _lag_sequence(monkeypatch, manager, [30.0, 1.0])
+
+    assert await manager._read_only_session_factory() is database.AsyncSessionLocal
+    await manager.get_replica_lag(force=True)
+    assert await manager._read_only_session_factory() is REPLICA_FACTORY
+
+    assert len(calls) == 2
+    assert manager.get_replica_metrics()['reads'] == {'replica': 1, 'primary': 0, 'fallback': 1}
+
+
+async def test_with_read_only_db_replaces_session(monkeypatch) -> None:
+    read_session = object()
+    opened = []
+
+    @asynccontextmanager
+    async def fake_session(read_only: bool = False):
+        opened.append(read_only)
+        yield read_session
+
+    monkeypatch.setattr(database.db_manager, 'session', fake_session)
+
+    @with_read_only_db
+    async def handler(event, db=None):
+        return event, db
+
+    assert await handler('event', db='primary-session') == ('event', read_session)
+    assert opened == [True]
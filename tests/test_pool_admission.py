@@ -0,0 +1,172 @@
+"""Допуск к пулу БД по приоритетам: лимиты, быстрый отказ, метрики и отступление фоновых задач."""
+
+import asyncio
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import settings
+from app.database import pool_admission as pool_admission_module
+from app.database.pool_admission import (
+    AdmissionQueuePool,
+    DbPriority,
+    PoolAdmissionRejected,
+    db_priority,
+    pool_admission,
+)
+from app.webapi.middleware import add_critical_routes, install_database_admission
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    monkeypatch.setattr(settings, 'DB_POOL_ADMISSION_ENABLED', True)
+    monkeypatch.setattr(settings, 'DB_POOL_RESERVED_CRITICAL', 1)
+    monkeypatch.setattr(settings, 'DB_POOL_RESERVED_INTERACTIVE', 1)
+    monkeypatch.setattr(settings, 'DB_POOL_ADMISSION_WAIT_SECONDS', 0.1)
+    monkeypatch.setattr(pool_admission, '_engine', None)
+    pool_admission.reset()
+    yield pool_admission
+    pool_admission.reset()
+
+
+@pytest.fixture
+def pool(admission):
+    # Ёмкость 3: критическим — все 3, интерактивным — 2, фоновым — 1
+    pool = AdmissionQueuePool(lambda: sqlite3.connect(':memory:'), pool_size=2, max_overflow=1)
+    admission.attach(SimpleNamespace(pool=pool))
+    yield pool
+    pool.dispose()
+
+
+async def _connect(pool, priority: DbPriority):
+    # Как AsyncEngine: выдача соединения в гринлете, пул видит контекст задачи
+    with db_priority(priority):
+        return await greenlet_spawn(pool.connect)
+
+
+async def _close(connection) -> None:
+    await greenlet_spawn(connection.close)
+
+
+def test_limits_reserve_capacity_for_higher_priorities(admission) -> None:
+    assert admission.limit(DbPriority.CRITICAL, 40) == 40
+    assert admission.limit(DbPriority.INTERACTIVE, 40) == 39
+    assert admission.limit(DbPriority.BACKGROUND, 40) == 38
+    # Резервы больше пула — каждому приоритету остаётся хотя бы одно соединение
+    assert admission.limit(DbPriority.BACKGROUND, 2) == 1
+
+
+async def test_checkout_respects_priority_limits(pool, admission) -> None:
+    background = await _connect(pool, DbPriority.BACKGROUND)
+
+    started_at = time.perf_counter()
+    with pytest.raises(PoolAdmissionRejected) as rejected:
+        await _connect(pool, DbPriority.BACKGROUND)
+    # Отказ после DB_POOL_ADMISSION_WAIT_SECONDS, а не после pool_timeout
+    assert time.perf_counter() - started_at < 5
+    assert rejected.value.priority is DbPriority.BACKGROUND
+
+    interactive = await _connect(pool, DbPriority.INTERACTIVE)
+    with pytest.raises(PoolAdmissionRejected):
+        await _connect(pool, DbPriority.INTERACTIVE)
+    critical = await _connect(pool, DbPriority.CRITICAL)
+    assert pool.checkedout() == 3
+
+    metrics = admission.get_metrics()
+    assert metrics['enabled'] is True
+    assert metrics['capacity'] == 3
+    priorities = metrics['priorities']
+    assert {name: (stats['limit'], stats['in_use'], stats['rejected']) for name, stats in priorities.items()} == {
+        'critical': (3, 1, 0),
+        'interactive': (2, 1, 1),
+        'background': (1, 1, 1),
+    }
+    assert priorities['background']['wait_max_ms'] >= 100
+
+    await _close(interactive)
+    # Место освободилось во время ожидания — запрос его получает
+    waiting = asyncio.create_task(_connect(pool, DbPriority.INTERACTIVE))
+    await asyncio.sleep(0.02)
+    await _close(critical)
+    await _close(await waiting)
+    await _close(background)
+
+    priorities = admission.get_metrics()['priorities']
+    assert all(stats['in_use'] == 0 for stats in priorities.values())
+    assert priorities['interactive']['checkouts'] == 2
+    assert priorities['critical']['held_max_ms'] > 0
+
+
+async def test_admission_disabled_only_collects_metrics(pool, admission, monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'DB_POOL_ADMISSION_ENABLED', False)
+    connections = [await _connect(pool, DbPriority.BACKGROUND) for _ in range(3)]
+    assert admission.get_metrics()['priorities']['background']['in_use'] == 3
+    for connection in connections:
+        await _close(connection)
+
+
+async def test_background_backoff_waits_while_pool_is_busy(admission, monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'DB_POOL_BACKGROUND_BACKOFF_PERCENT', 70)
+    monkeypatch.setattr(pool_admission_module, 'BACKOFF_INITIAL_SECONDS', 0.01)
+    monkeypatch.setattr(pool_admission_module, 'BACKOFF_MAX_SECONDS', 0.1)
+
+    utilization = iter([95.0, 80.0, 10.0])
+    monkeypatch.setattr(admission, 'utilization_percent', lambda: next(utilization))
+    assert await admission.background_backoff('job:test') == pytest.approx(0.03)
+
+    monkeypatch.setattr(admission, 'utilization_percent', lambda: 10.0)
+    assert await admission.background_backoff('job:test') == 0
+
+    # Пул занят постоянно — ожидание ограничено, проход всё равно выполняется
+    monkeypatch.setattr(admission, 'utilization_percent', lambda: 100.0)
+    assert await admission.background_backoff('job:test') == pytest.approx(0.1)
+
+    metrics = admission.get_metrics()
+    assert metrics['background_backoffs'] == {'job:test': 2}
+
+
+def test_middleware_sets_priority_and_returns_503(admission) -> None:
+    app = FastAPI()
+    seen: list[DbPriority] = []
+    webhooks = APIRouter()
+
+    @webhooks.post('/payments/{provider}/webhook')
+    async def webhook(provider: str) -> dict:
+        seen.append(pool_admission_module.current_priority())
+        return {'ok': True}
+
+    @app.get('/cabinet/profile')
+    async def profile() -> dict:
+        seen.append(pool_admission_module.current_priority())
+        raise PoolAdmissionRejected(DbPriority.INTERACTIVE, 35, 35)
+
+    @app.get('/cabinet/balance')
+    async def balance() -> dict:
+        # Типичный маршрут кабинета: любая ошибка превращается в 500
+        try:
+            raise PoolAdmissionRejected(DbPriority.INTERACTIVE, 35, 35)
+        except Exception as error:
+            raise HTTPException(status_code=500, detail='Failed to load balance') from error
+
+    @app.get('/cabinet/missing')
+    async def missing() -> dict:
+        raise HTTPException(status_code=404, detail='Not found')
+
+    app.include_router(webhooks)
+    add_critical_routes(app, webhooks.routes)
+    install_database_admission(app)
+    client = TestClient(app)
+
+    assert client.post('/payments/yookassa/webhook').status_code == 200
+    assert client.get('/payments/yookassa/webhook').status_code == 405
+    for path in ('/cabinet/profile', '/cabinet/balance'):
+        response = client.get(path)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(pool_admission_module.RETRY_AFTER_SECONDS)
+    assert client.get('/cabinet/missing').json() == {'detail': 'Not found'}
+    assert seen == [DbPriority.CRITICAL, DbPriority.INTERACTIVE]
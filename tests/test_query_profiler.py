@@ -0,0 +1,105 @@
+"""Профилировщик SQL: отпечатки, атрибуция по единицам работы и детектор N+1."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import settings
+from app.database.query_profiler import (
+    fingerprint,
+    profile_after_cursor_execute,
+    profile_before_cursor_execute,
+    query_profiler,
+)
+from app.webapi.middleware import QueryProfilingMiddleware
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    monkeypatch.setattr(settings, 'QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 10)
+    query_profiler.reset()
+    yield query_profiler
+    query_profiler.reset()
+
+
+def test_fingerprint_ignores_values() -> None:
+    assert fingerprint("SELECT * FROM users WHERE id = 42 AND name = 'O''Neil'") == (
+        'SELECT * FROM users WHERE id = ? AND name = ?'
+    )
+    assert fingerprint('SELECT users.id FROM users WHERE users.id IN ($1, $2, $3)') == fingerprint(
+        'SELECT users.id\n  FROM users WHERE users.id IN ($1::INTEGER)'.replace('::INTEGER', '')
+    )
+    assert fingerprint('INSERT INTO t (a, b) VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)') == (
+        'INSERT INTO t (a, b) VALUES (...)'
+    )
+    # Приведения типов PostgreSQL и имена с цифрами не задеваются
+    assert fingerprint('SELECT s.connected_squads::text, t1.col_2 FROM t1 LIMIT :param_1') == (
+        'SELECT s.connected_squads::text, t1.col_2 FROM t1 LIMIT ?'
+    )
+
+
+async def test_queries_are_attributed_to_units(profiler) -> None:
+    engine = create_engine('sqlite://')
+    # Глобальные слушатели Engine есть при QUERY_PROFILER_ENABLED; иначе вешаем на этот движок
+    if not event.contains(Engine, 'after_cursor_execute', profile_after_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', profile_before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', profile_after_cursor_execute)
+
+    async def execute(connection, statement: str, **params) -> None:
+        # Как AsyncSession: синхронный execute в гринлете, события движка видят контекст задачи
+        await greenlet_spawn(connection.execute, text(statement), params)
+
+    with engine.connect() as connection:
+        with profiler.unit_of_work('job:batch'):
+            for user_id in range(15):
+                await execute(connection, 'SELECT :user_id', user_id=user_id)
+            await execute(connection, 'SELECT 1, 2')
+        with profiler.unit_of_work('bot:handler'):
+            for user_id in range(3):
+                await execute(connection, 'SELECT :user_id', user_id=user_id)
+        await execute(connection, 'SELECT 1, 2')
+    engine.dispose()
+
+    metrics = profiler.get_metrics()
+    queries = {query['fingerprint']: query for query in metrics['queries']}
+    units = {unit['unit']: unit for unit in metrics['units']}
+
+    assert metrics['queries_total'] == 20
+    assert queries['SELECT ?']['count'] == 18
+    assert queries['SELECT ?']['n_plus_one'] == 1
+    assert queries['SELECT ?']['p95_ms'] <= queries['SELECT ?']['max_ms']
+    assert {unit['unit'] for unit in queries['SELECT ?']['units']} == {'job:batch', 'bot:handler'}
+    assert queries['SELECT ?, ?']['count'] == 2
+    assert units['job:batch'] | {'total_ms': None} == {
+        'unit': 'job:batch',
+        'runs': 1,
+        'queries': 16,
+        'total_ms': None,
+        'avg_queries': 16.0,
+        'n_plus_one': 1,
+    }
+    assert units['bot:handler']['n_plus_one'] == 0
+    assert units['unattributed']['queries'] == 1
+
+    profiler.reset()
+    assert profiler.get_metrics()['queries_total'] == 0
+
+
+def test_http_unit_is_named_after_route_template(profiler) -> None:
+    app = FastAPI()
+    app.add_middleware(QueryProfilingMiddleware)
+
+    @app.get('/users/{user_id}')
+    async def read_user(user_id: int) -> dict:
+        profiler.record('SELECT * FROM users WHERE id = 1', 0.001)
+        return {'id': user_id}
+
+    with TestClient(app) as client:
+        assert client.get('/users/5').status_code == 200
+        assert client.get('/users/6').status_code == 200
+
+    units = {unit['unit']: unit for unit in profiler.get_metrics()['units']}
+    assert units['http:GET /users/{user_id}']['runs'] == 2
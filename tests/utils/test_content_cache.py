@@ -0,0 +1,145 @@
+"""Тесты версионированного кеша статичного контента и ETag-ответов."""
+
+from types import SimpleNamespace
+
+from app.config import settings
+from app.utils.content_cache import (
+    ContentCache,
+    ContentType,
+    build_etag,
+    cached_content_response,
+    content_language,
+    etag_matches,
+    serialize_content,
+)
+
+
+def _request(if_none_match: str | None = None) -> SimpleNamespace:
+    headers = {'if-none-match': if_none_match} if if_none_match else {}
+    return SimpleNamespace(headers=headers)
+
+
+def test_etag_matches_handles_lists_weak_and_wildcard() -> None:
+    etag = build_etag(b'{"a":1}')
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(f'W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_serialize_content_is_compact_and_keeps_unicode() -> None:
+    assert serialize_content({'title': 'Правила', 'items': [1, 2]}) == '{"title":"Правила","items":[1,2]}'.encode()
+
+
+async def test_get_or_load_reuses_entry_until_invalidated() -> None:
+    content_cache = ContentCache()
+    calls: list[int] = []
+
+    async def loader() -> dict:
+        calls.append(1)
+        return {'content': f'v{len(calls)}'}
+
+    first = await content_cache.get_or_load(ContentType.RULES, 'ru-RU', loader)
+    second = await content_cache.get_or_load(ContentType.RULES, 'ru', loader)
+
+    assert first is second
+    assert len(calls) == 1
+
+    await content_cache.invalidate(ContentType.RULES)
+    third = await content_cache.get_or_load(ContentType.RULES, 'ru', loader)
+
+    assert len(calls) == 2
+    assert third.payload == {'content': 'v2'}
+    assert third.etag != first.etag
+
+
+async def test_invalidate_keeps_other_content_types() -> None:
+    content_cache = ContentCache()
+
+    async def loader() -> list:
+        return []
+
+    faq = await content_cache.get_or_load(ContentType.FAQ, 'en', loader)
+    await content_cache.invalidate(ContentType.RULES)
+
+    assert await content_cache.get_or_load(ContentType.FAQ, 'en', loader) is faq
+
+
+async def test_variants_are_cached_separately() -> None:
+    content_cache = ContentCache()
+
+    async def bot_loader() -> str:
+        return 'text'
+
+    async def cabinet_loader() -> dict:
+        return {'content': 'text'}
+
+    bot_entry = await content_cache.get_or_load(ContentType.RULES, 'ru', bot_loader, variant='bot')
+    cabinet_entry = await content_cache.get_or_load(ContentType.RULES, 'ru', cabinet_loader, variant='cabinet')
+
+    assert bot_entry.payload == 'text'
+    assert cabinet_entry.payload == {'content': 'text'}
+
+
+async def test_cached_content_response_returns_304_on_matching_etag() -> None:
+    content_cache = ContentCache()
+
+    async def loader() -> dict:
+        return {'name': 'Cabinet'}
+
+    entry = await content_cache.get_or_load(ContentType.BRANDING, None, loader)
+
+    full = cached_content_response(_request(), entry)
+    assert full.status_code == 200
+    assert full.body == entry.body
+    assert full.headers['etag'] == entry.etag
+
+    not_modified = cached_content_response(_request(entry.etag), entry)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b''
+    assert not_modified.headers['etag'] == entry.etag
+
+
+async def test_entries_are_bounded_and_missing_pages_are_not_stored(monkeypatch) -> None:
+    content_cache = ContentCache()
+    monkeypatch.setattr(content_cache, 'MAX_ENTRIES', 3)
+
+    async def page_loader() -> dict:
+        return {'id': 1}
+
+    async def missing_loader() -> None:
+        return None
+
+    first = await content_cache.get_or_load(ContentType.FAQ, 'ru', page_loader, variant='page:1')
+    for page_id in range(2, 100):
+        entry = await content_cache.get_or_load(
+            ContentType.FAQ, 'ru', missing_loader, variant=f'page:{page_id}', cache_missing=False
+        )
+        assert entry.payload is None
+    assert len(content_cache._entries) == 1
+
+    for page_id in range(2, 5):
+        await content_cache.get_or_load(ContentType.FAQ, 'ru', page_loader, variant=f'page:{page_id}')
+    assert len(content_cache._entries) == 3
+    assert await content_cache.get_or_load(ContentType.FAQ, 'ru', page_loader, variant='page:1') is not first
+
+
+async def test_unsupported_languages_share_default_entry(monkeypatch) -> None:
+    monkeypatch.setattr(settings, 'AVAILABLE_LANGUAGES', 'ru,en')
+    monkeypatch.setattr(settings, 'DEFAULT_LANGUAGE', 'ru')
+    content_cache = ContentCache()
+    calls: list[str] = []
+
+    async def loader() -> dict:
+        calls.append('load')
+        return {'content': 'rules'}
+
+    assert content_language('EN-us') == 'en'
+    assert content_language('xxxxxxxxxx') == 'ru'
+    entry = await content_cache.get_or_load(ContentType.RULES, 'ru', loader)
+    for language in ('de', 'xx-YY', 'qwertyuiop'):
+        assert await content_cache.get_or_load(ContentType.RULES, language, loader) is entry
+    assert len(calls) == 1
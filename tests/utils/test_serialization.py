@@ -0,0 +1,74 @@
+"""Тесты слоя JSON-сериализации (stdlib и orjson)."""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+import pytest
+
+from app.utils import serialization
+from app.utils.serialization import (
+    FastJSONResponse,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+    get_default_response_class,
+    get_json_serializer,
+)
+
+
+class _Color(Enum):
+    RED = 'red'
+
+
+PAYLOAD = {
+    'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC),
+    'day': date(2024, 1, 2),
+    'amount': Decimal('12.50'),
+    'color': _Color.RED,
+    'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+    'name': 'Пользователь',
+    'items': [1, 2.5, None, True],
+}
+
+EXPECTED = {
+    'created_at': '2024-01-02T03:04:05+00:00',
+    'day': '2024-01-02',
+    'amount': '12.50',
+    'color': 'red',
+    'uuid': '12345678-1234-5678-1234-567812345678',
+    'name': 'Пользователь',
+    'items': [1, 2.5, None, True],
+}
+
+
+def test_stdlib_serializer_handles_special_types() -> None:
+    serializer = StdlibJsonSerializer()
+    assert serializer.loads(serializer.dumps(PAYLOAD)) == EXPECTED
+
+
+def test_orjson_serializer_matches_stdlib() -> None:
+    pytest.importorskip('orjson')
+    serializer = OrjsonSerializer()
+
+    assert serializer.loads(serializer.dumps(PAYLOAD)) == EXPECTED
+    assert serializer.dumps(PAYLOAD) == StdlibJsonSerializer().dumps(PAYLOAD)
+
+
+def test_fast_response_renders_decimal() -> None:
+    pytest.importorskip('orjson')
+    response = FastJSONResponse({'amount': Decimal('1.10')})
+    assert response.body == b'{"amount":"1.10"}'
+
+
+def test_fast_json_falls_back_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serialization, 'orjson', None)
+    monkeypatch.setattr(serialization.settings, 'FAST_JSON_ENABLED', True)
+
+    assert isinstance(get_json_serializer(), StdlibJsonSerializer)
+    assert get_default_response_class() is not FastJSONResponse
+
+
+def test_fast_json_is_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(serialization.settings, 'FAST_JSON_ENABLED', False)
+    assert isinstance(get_json_serializer(), StdlibJsonSerializer)
@@ -0,0 +1,181 @@
+"""Тесты потокового экспорта CSV/NDJSON."""
+
+import gzip
+import json
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import sqlalchemy as sa
+
+from app.database import database
+from app.utils.streaming_export import (
+    ExportColumn,
+    ExportFormat,
+    ExportProgressRegistry,
+    column,
+    encode_rows,
+    export_response,
+    get_encoder,
+    iter_keyset_rows,
+)
+
+
+COLUMNS = [
+    column('id'),
+    column('name'),
+    ExportColumn('balance', lambda row: row.balance_kopeks / 100),
+    column('details'),
+    column('created_at'),
+]
+
+
+def _rows(count: int) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=index,
+            name=f'user {index}',
+            balance_kopeks=index * 150,
+            details={'ref': index} if index % 2 else None,
+            created_at=datetime(2025, 1, index % 28 + 1, tzinfo=UTC),
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(stream) -> bytes:
+    return b''.join([chunk async for chunk in stream])
+
+
+async def test_csv_export_has_bom_header_and_sanitized_cells() -> None:
+    rows = [SimpleNamespace(id=1, name='=cmd()', balance_kopeks=250, details={'a': 'б'}, created_at=None)]
+
+    data = await _collect(encode_rows(_aiter(rows), get_encoder(ExportFormat.CSV, COLUMNS)))
+
+    assert data.startswith(b'\xef\xbb\xbf')
+    lines = data.decode('utf-8-sig').splitlines()
+    assert lines[0] == 'id,name,balance,details,created_at'
+    assert lines[1] == '1,\'=cmd(),2.5,"{""a"":""б""}",'
+
+
+async def test_ndjson_export_with_gzip_and_progress() -> None:
+    registry = ExportProgressRegistry()
+    progress = registry.start('users', owner_id=7, total_rows=1201)
+
+    stream = encode_rows(
+        _aiter(_rows(1201)),
+        get_encoder(ExportFormat.NDJSON, COLUMNS),
+        gzip=True,
+        progress=progress,
+    )
+    chunks = [chunk async for chunk in stream]
+
+    # 500 строк на чанк — несколько частей, а не один большой буфер
+    assert len(chunks) > 2
+    lines = gzip.decompress(b''.join(chunks)).decode().splitlines()
+    assert len(lines) == 1201
+    assert json.loads(lines[0]) == {
+        'id': 1,
+        'name': 'user 1',
+        'balance': 1.5,
+        'details': {'ref': 1},
+        'created_at': '2025-01-02T00:00:00+00:00',
+    }
+    assert progress.rows_written == 1201
+    assert progress.status == 'finished'
+    assert registry.get(progress.export_id) is progress
+
+
+async def test_failed_export_is_reported_in_progress() -> None:
+    progress = ExportProgressRegistry().start('broken')
+
+    async def failing_rows():
+        yield _rows(1)[0]
+        raise RuntimeError('db gone')
+
+    stream = encode_rows(failing_rows(), get_encoder(ExportFormat.CSV, COLUMNS), progress=progress, chunk_rows=1)
+    try:
+        await _collect(stream)
+    except RuntimeError:
+        pass
+
+    assert progress.status == 'failed'
+    assert progress.error == 'db gone'
+    assert progress.rows_written == 1
+
+
+async def test_client_disconnect_is_reported_as_cancelled() -> None:
+    progress = ExportProgressRegistry().start('users')
+    stream = encode_rows(_aiter(_rows(5)), get_encoder(ExportFormat.CSV, COLUMNS), progress=progress, chunk_rows=1)
+
+    await anext(stream)
+    await stream.aclose()
+
+    assert progress.status == 'failed'
+    assert progress.error == 'cancelled'
+    assert progress.finished_at is not None
+
+
+def test_finished_exports_are_kept_from_finish_time() -> None:
+    registry = ExportProgressRegistry()
+    long_export = registry.start('long')
+    long_export.started_at = datetime.now(UTC) - timedelta(hours=5)
+    long_export.finished_at = datetime.now(UTC)
+    old_export = registry.start('old')
+    old_export.finished_at = datetime.now(UTC) - timedelta(seconds=registry.KEEP_FINISHED_SECONDS + 1)
+
+    registry.start('next')
+
+    assert registry.get(long_export.export_id) is long_export
+    assert registry.get(old_export.export_id) is None
+
+
+async def test_keyset_iteration_uses_last_key_and_limit(monkeypatch) -> None:
+    table = sa.table('items', sa.column('id'), sa.column('name'))
+    data = [{'id': index, 'name': f'item {index}'} for index in range(1, 8)]
+    queries: list[dict] = []
+
+    class FakeResult:
+        def __init__(self, rows):
+            self._rows = rows
+
+        def all(self):
+            return [SimpleNamespace(_mapping={table.c.id: row['id']}, **row) for row in self._rows]
+
+    class FakeSession:
+        async def execute(self, query):
+            params = query.compile().params
+            queries.append(params)
+            last_key = next((value for key, value in params.items() if key.startswith('id_')), 0)
+            size = params['param_1']
+            return FakeResult([row for row in data if row['id'] > last_key][:size])
+
+    @asynccontextmanager
+    async def fake_session(read_only: bool = False):
+        assert read_only
+        yield FakeSession()
+
+    monkeypatch.setattr(database.db_manager, 'session', fake_session)
+
+    stmt = sa.select(table.c.id, table.c.name)
+    ids = [row.id async for row in iter_keyset_rows(stmt, table.c.id, batch_size=3)]
+    assert ids == [1, 2, 3, 4, 5, 6, 7]
+    assert len(queries) == 3
+
+    queries.clear()
+    limited = [row.id async for row in iter_keyset_rows(stmt, table.c.id, batch_size=3, limit=5)]
+    assert limited == [1, 2, 3, 4, 5]
+    assert queries[-1]['param_1'] == 2
+
+
+def test_export_response_headers() -> None:
+    response = export_response('users', _aiter([]), COLUMNS, export_format=ExportFormat.CSV, gzip=True)
+
+    assert response.media_type == 'application/gzip'
+    assert response.headers['content-disposition'].endswith('.csv.gz"')
+    assert response.headers['x-export-id']